@@ -1,24 +1,104 @@
+import asyncio
 import asyncpg
+import collections
+import contextlib
+import itertools
+from functools import partial
 from typing import Any, List, Union
+import math
+import os
+import random
 import re
+import shlex
+import shutil
+import tempfile
+import time
 
 from pg_perfbench.const import (
     WorkMode,
+    CacheMode,
+    ConnectionType,
+    ResetStrategy,
+    WorkloadLocation,
+    WorkloadTypes,
     DEFAULT_REPORT_NAME,
     BENCHMARK_TEMPLATE_JSON_PATH,
+    PGBENCH_LOG_PREFIX,
+    PGBENCH_RESULT_FIELDS,
+    PGBENCH_STATS_FIELDS,
+    PGBENCH_SWEEP_PARAMS,
+    REMOTE_TEMP_DIR_TEMPLATE,
+    REPORT_FOLDER,
+    TUNED_CONFIG_SUFFIX,
     get_datetime_report,
 )
-from pg_perfbench.connections import get_connection
+from pg_perfbench.connections import SSHConnection, get_connection
 from pg_perfbench.db_operations import (
     get_conn_type_tasks,
     DBTasks,
     run_command,
+    run_command_stream,
     collect_db_logs,
+    get_reset_strategy,
 )
+from pg_perfbench.metrics import (
+    LatencyHistogram,
+    LATENCY_PERCENTILES,
+    read_pgbench_log,
+    get_pgbench_log_files,
+    get_latency_summary,
+    merge_latency_summaries,
+    get_mean,
+    get_summary_stats,
+    SteadyStateDetector,
+    get_pg_stats_snapshot,
+    get_pg_stats_delta,
+    merge_pg_stats,
+    reset_pg_stat_statements,
+    get_top_statements,
+    merge_statements,
+    OSSampler,
+    SAMPLER_APPLICATION_NAME,
+    PollingSampler,
+    WaitEventSampler,
+    merge_wait_events,
+    LockSampler,
+    merge_locks,
+    Profiler,
+    get_client_times_script,
+    get_client_cpu_times,
+    get_progress_transactions,
+    get_client_summary,
+    merge_client_stats,
+    get_cache_summary,
+    merge_cache_stats,
+)
+from pg_perfbench.driver import run_native_workload
+from pg_perfbench.search import KneeSearch, SettingsTuner, get_tuned_config
+from pg_perfbench.journal import RunJournal
 from pg_perfbench.report.processing import get_report_structure
 from pg_perfbench.report.commands import fill_info_report
 from pg_perfbench.log import display_user_configuration
 
+PROGRESS_LINE_RE = re.compile(r'progress:\s+(\d+(?:[.,]\d+)?)\s+s')
+PROGRESS_TPS_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s+tps')
+PROGRESS_LATENCY_RE = re.compile(r'lat\s+(-?[\w.,]+)\s+ms')
+PROGRESS_STDDEV_RE = re.compile(r'stddev\s+(-?[\w.,]+?)(?:,|\s|$)')
+PROGRESS_LAG_RE = re.compile(r'lag\s+(-?[\w.,]+)\s+ms')
+PROGRESS_OPTION_RE = re.compile(r'(^|\s)(-P\s*\d|--progress[=\s])')
+LATENCY_LIMIT_OPTION_RE = re.compile(r'(^|\s)(-L\s*\d|--latency-limit[=\s])')
+RATE_OPTION_RE = re.compile(r'(?:^|\s)(?:-R\s*|--rate[=\s]\s*)(\d+(?:\.\d+)?)')
+CLIENTS_OPTION_RE = re.compile(r'(?:^|\s)(?:-c\s*|--client[=\s]\s*)(\d+)')
+JOBS_OPTION_RE = re.compile(r'(?:^|\s)(?:-j\s*|--jobs[=\s]\s*)(\d+)')
+DURATION_OPTION_RE = re.compile(r'(?:^|\s)(?:-T\s*|--time[=\s]\s*)(\d+)')
+RATE_LAG_RE = re.compile(
+    r'schedule\slag:\savg\s(\d+(?:[.,]\d+)?)\s\(max\s(\d+(?:[.,]\d+)?)\)'
+)
+RATE_SKIPPED_RE = re.compile(r'number\sof\stransactions\sskipped:\s(\d+)')
+RATE_LATE_RE = re.compile(
+    r'number\sof\stransactions\sabove\sthe\s[\d.,]+\sms\slatency\slimit:\s(\d+)'
+)
+
 
 class BenchmarkRunner:
     """
@@ -89,6 +169,231 @@ class BenchmarkRunner:
             tps,
         ]
 
+    @staticmethod
+    def get_pgbench_progress(line: str) -> List[Union[float, None]] | None:
+        """
+        Parses a single pgbench --progress report line.
+        Returns [time, tps, latency_avg, latency_stddev, lag] or None
+        if the line is not a progress report.
+        """
+        match = PROGRESS_LINE_RE.search(line)
+        if not match:
+            return None
+
+        def get_val(pattern) -> Union[float, None]:
+            val_match = pattern.search(line, match.end())
+            if not val_match:
+                return None
+            try:
+                value = float(val_match.group(1).replace(',', '.'))
+            except ValueError:
+                return None
+            return None if math.isnan(value) else value
+
+        return [
+            float(match.group(1).replace(',', '.')),
+            get_val(PROGRESS_TPS_RE),
+            get_val(PROGRESS_LATENCY_RE),
+            get_val(PROGRESS_STDDEV_RE),
+            get_val(PROGRESS_LAG_RE),
+        ]
+
+    @staticmethod
+    def add_progress_option(workload_command: str, interval: Any) -> str:
+        """
+        Appends pgbench --progress to the workload command
+        unless the command already requests progress reports.
+        """
+        if not interval or PROGRESS_OPTION_RE.search(workload_command):
+            return workload_command
+        return f'{workload_command} --progress={interval}'
+
+    @staticmethod
+    def add_latency_limit_option(workload_command: str, limit: Any) -> str:
+        """
+        Appends pgbench --latency-limit (ms) to the workload command
+        unless the command already sets it.
+        """
+        if not limit or LATENCY_LIMIT_OPTION_RE.search(workload_command):
+            return workload_command
+        return f'{workload_command} --latency-limit={limit}'
+
+    @staticmethod
+    def add_workload_options(
+        workload_command: str, workload_conf: dict
+    ) -> str:
+        """
+        Appends the pgbench options requested by the workload config.
+        """
+        workload_command = BenchmarkRunner.add_progress_option(
+            workload_command, workload_conf.get('pgbench_progress')
+        )
+        return BenchmarkRunner.add_latency_limit_option(
+            workload_command, workload_conf.get('pgbench_latency_limit')
+        )
+
+    @staticmethod
+    def get_warmup_command(
+        workload_command: str, warmup_time: int | None
+    ) -> str:
+        """
+        Returns the workload command of the warm-up run: its -T duration
+        replaced by warmup_time when set.
+        """
+        duration = DURATION_OPTION_RE.search(workload_command)
+        if not warmup_time or not duration:
+            return workload_command
+        return (
+            workload_command[: duration.start(1)]
+            + str(warmup_time)
+            + workload_command[duration.end(1) :]
+        )
+
+    @staticmethod
+    def add_cpu_affinity(
+        workload_command: str, cpu_set: list[int] | None
+    ) -> str:
+        """
+        Wraps the local workload command with taskset so that it runs
+        on the CPUs of cpu_set only.
+        """
+        if not cpu_set:
+            return workload_command
+        cpus = ','.join(map(str, cpu_set))
+        return f'taskset -c {cpus} sh -c {shlex.quote(workload_command)}'
+
+    @staticmethod
+    def add_client_times(workload_command: str) -> str:
+        """
+        Wraps the workload command in a shell that prints the CPU times
+        of the load generator when it exits or is terminated.
+        """
+        script = get_client_times_script(workload_command)
+        return f'sh -c {shlex.quote(script)}'
+
+    @staticmethod
+    def get_client_results(
+        workload_command: str,
+        perf_result: str,
+        duration: float,
+        transactions: int | float | None,
+        cpus: int | None = None,
+    ) -> dict | None:
+        """
+        Builds the CPU use of the load generator from the times printed
+        by the add_client_times wrapper. The client threads are those of
+        the pgbench --jobs option, one when it is not given.
+        """
+        cpu_times = get_client_cpu_times(perf_result)
+        if cpu_times is None:
+            return None
+        jobs = JOBS_OPTION_RE.search(workload_command)
+        return get_client_summary(
+            cpu_times,
+            duration,
+            int(jobs.group(1)) if jobs else 1,
+            transactions,
+            cpus,
+        )
+
+    @staticmethod
+    def get_steady_state_results(
+        workload_command: str, steady_state: dict
+    ) -> List[Union[int, float, None]]:
+        """
+        Builds the pgbench metrics of a run stopped in the steady state
+        from its measured window, pgbench prints no summary then.
+        """
+        clients = CLIENTS_OPTION_RE.search(workload_command)
+        duration = steady_state['window_end'] - steady_state['window_start']
+        return [
+            int(clients.group(1)) if clients else None,
+            round(duration, 3),
+            round(steady_state['tps'] * duration),
+            steady_state['latency_avg'],
+            None,
+            steady_state['tps'],
+        ]
+
+    @staticmethod
+    def get_pgbench_rate_results(
+        pgbench_output: str, workload_command: str = ''
+    ) -> dict | None:
+        """
+        Extracts the results of a rate-limited (--rate) or latency-limited
+        (--latency-limit) pgbench run: the target rate, the schedule lag
+        average and max in ms, the skipped and the late transactions.
+        Returns None for a run without these limits.
+        """
+
+        def to_float(value: str) -> float:
+            return float(value.replace(',', '.'))
+
+        rate_match = RATE_OPTION_RE.search(workload_command)
+        target_rate = to_float(rate_match.group(1)) if rate_match else None
+        lag_match = RATE_LAG_RE.search(pgbench_output)
+        skipped_match = RATE_SKIPPED_RE.search(pgbench_output)
+        late_match = RATE_LATE_RE.search(pgbench_output)
+        if not any((rate_match, lag_match, skipped_match, late_match)):
+            return None
+        return {
+            'target_rate': target_rate,
+            'lag_avg': to_float(lag_match.group(1)) if lag_match else None,
+            'lag_max': to_float(lag_match.group(2)) if lag_match else None,
+            'skipped': int(skipped_match.group(1)) if skipped_match else 0,
+            'late': int(late_match.group(1)) if late_match else 0,
+        }
+
+    @staticmethod
+    def aggregate_rate_results(rate_results: list) -> dict | None:
+        """
+        Combines the rate results of repeated runs: the means of
+        the values and the largest schedule lag.
+        """
+        rate_results = [rate for rate in rate_results if rate]
+        if not rate_results:
+            return None
+        aggregated = {}
+        for key in rate_results[0]:
+            values = [rate.get(key) for rate in rate_results]
+            if key == 'lag_max':
+                values = [value for value in values if value is not None]
+                aggregated[key] = max(values) if values else None
+            else:
+                mean = get_mean(values)
+                aggregated[key] = None if mean is None else round(mean, 3)
+        return aggregated
+
+    @staticmethod
+    def add_latency_log_option(workload_command: str, log_prefix: str) -> str:
+        """
+        Appends the pgbench per-transaction log options to the workload
+        command, the log files are written under log_prefix.
+        """
+        return (
+            f'{workload_command} --log --log-prefix={shlex.quote(log_prefix)}'
+        )
+
+    @staticmethod
+    def read_latency_logs(log_prefix: str) -> dict | None:
+        """
+        Merges the pgbench per-transaction logs written under log_prefix
+        into one latency histogram and returns its summary.
+        """
+        log_files = get_pgbench_log_files(log_prefix)
+        if not log_files:
+            return None
+
+        histogram = LatencyHistogram()
+        counters = {'skipped': 0, 'failed': 0}
+        for log_file in log_files:
+            file_histogram = LatencyHistogram(histogram.precision)
+            file_counters = read_pgbench_log(log_file, file_histogram)
+            histogram.merge(file_histogram)
+            for key, value in file_counters.items():
+                counters[key] += value
+        return get_latency_summary(histogram, counters)
+
     @staticmethod
     def get_filled_load_commands(
         db_conf: dict,
@@ -100,7 +405,19 @@ class BenchmarkRunner:
         Replaces placeholders (ARG_*) in the init_command and workload_command
         with actual config values and iteration-specific parameter.
         """
-        arg_values = {**db_conf, **workload_conf, pgbench_param: iter_amount}
+        return BenchmarkRunner.get_point_load_commands(
+            db_conf, workload_conf, {pgbench_param: iter_amount}
+        )
+
+    @staticmethod
+    def get_point_load_commands(
+        db_conf: dict, workload_conf: dict, point: dict
+    ) -> list[str]:
+        """
+        Replaces placeholders (ARG_*) in the init_command and workload_command
+        with actual config values and the parameter values of a sweep point.
+        """
+        arg_values = {**db_conf, **workload_conf, **point}
         init_command = workload_conf['init_command']
         workload_command = workload_conf['workload_command']
 
@@ -114,6 +431,161 @@ class BenchmarkRunner:
 
         return [init_command, workload_command]
 
+    @staticmethod
+    def get_sweep_points(workload_conf: dict) -> list[dict]:
+        """
+        Expands the swept pgbench parameters into the list of points
+        ({parameter: value}) of their cross product. Falls back to
+        the single pgbench_iter_name/pgbench_iter_list parameter.
+        The swept PostgreSQL settings are crossed last, so the points of
+        one pgbench configuration share a dataset.
+        """
+        if not workload_conf or not isinstance(workload_conf, dict):
+            return []
+
+        sweep = workload_conf.get('pgbench_sweep')
+        if not sweep:
+            iter_name = workload_conf.get('pgbench_iter_name')
+            iter_list = workload_conf.get('pgbench_iter_list')
+            if not iter_name or not isinstance(iter_list, list):
+                return []
+            sweep = {iter_name: iter_list}
+
+        sweep = {**sweep, **(workload_conf.get('pg_settings_sweep') or {})}
+        if not all(isinstance(values, list) for values in sweep.values()):
+            return []
+        # the outermost parameter changes least often
+        names = [name for name in PGBENCH_SWEEP_PARAMS if name in sweep]
+        names += [name for name in sweep if name not in names]
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(sweep[name] for name in names))
+        ]
+
+    @staticmethod
+    def get_settings_names(workload_conf: dict) -> list[str]:
+        """Returns the PostgreSQL settings swept or tuned by the runs."""
+        return [
+            *(workload_conf.get('pg_settings_sweep') or {}),
+            *(workload_conf.get('tune_settings') or {}),
+        ]
+
+    @staticmethod
+    def get_point_settings(workload_conf: dict, point: dict) -> dict:
+        """Returns the swept or tuned PostgreSQL settings of a point."""
+        return {
+            name: point[name]
+            for name in BenchmarkRunner.get_settings_names(workload_conf)
+            if name in point
+        }
+
+    @staticmethod
+    async def restart_db(logger, db_tasks, conn_tasks) -> None:
+        logger.info('Restarting PostgreSQL...')
+        await conn_tasks.stop_db()
+        await conn_tasks.start_db()
+        await db_tasks.check_db_access()
+
+    @staticmethod
+    async def apply_pg_settings(
+        logger, db_tasks, conn_tasks, settings: dict
+    ) -> dict:
+        """
+        Applies the PostgreSQL settings of a sweep point with ALTER SYSTEM
+        and a reload. The server is restarted only when the new value of a
+        setting with the postmaster context (pg_settings.context) differs
+        from the running one, as the server reports after the reload.
+        Returns the effective values of the settings.
+        """
+        current = await db_tasks.get_settings(settings)
+        for name in settings:
+            if name not in current:
+                raise ValueError(f'Unknown PostgreSQL setting "{name}"')
+            if current[name][1] == 'internal':
+                raise ValueError(f'PostgreSQL setting "{name}" is read-only')
+        restart = await db_tasks.alter_system(settings)
+        if restart:
+            logger.info(f'Settings {restart} require a restart.')
+            await BenchmarkRunner.restart_db(logger, db_tasks, conn_tasks)
+        effective = {
+            name: setting
+            for name, (setting, _) in (
+                await db_tasks.get_settings(settings)
+            ).items()
+        }
+        logger.info(f'PostgreSQL settings applied: {effective}')
+        return effective
+
+    @staticmethod
+    async def restore_pg_settings(
+        logger, db_tasks, conn_tasks, names: list[str]
+    ) -> None:
+        """
+        Resets the swept PostgreSQL settings with ALTER SYSTEM RESET,
+        restarting the server when one of them requires it.
+        """
+        current = await db_tasks.get_settings(names)
+        if await db_tasks.alter_system({name: None for name in current}):
+            await BenchmarkRunner.restart_db(logger, db_tasks, conn_tasks)
+        logger.info(f'PostgreSQL settings {list(current)} restored.')
+
+    @staticmethod
+    async def prepare_cache(
+        logger,
+        load_iteration: list[str],
+        db_conf: dict,
+        workload_conf: dict,
+        workload_conn=None,
+        native_db_conf: dict | None = None,
+    ) -> dict:
+        """
+        Brings the caches into the state of the cache mode before a run:
+        a discarded warm-up run of the workload in the warm mode, the
+        dataset loaded with pg_prewarm in the primed one. Returns the
+        arguments of get_cache_summary but the run statistics.
+        """
+        cache_mode = workload_conf.get('cache_mode', CacheMode.COLD)
+        state: dict = {'mode': str(cache_mode)}
+        if cache_mode == CacheMode.WARM:
+            init_cmd, workload_cmd = load_iteration
+            logger.info('Running the discarded warm-up run...')
+            started = time.monotonic()
+            await BenchmarkRunner.run_benchmark(
+                logger,
+                [
+                    init_cmd,
+                    BenchmarkRunner.get_warmup_command(
+                        workload_cmd, workload_conf.get('warmup_time')
+                    ),
+                ],
+                run_init=False,
+                workload_conn=workload_conn,
+                native_db_conf=native_db_conf,
+                cpu_set=workload_conf.get('cpu_set'),
+            )
+            state['warmup_time'] = round(time.monotonic() - started, 3)
+        elif cache_mode == CacheMode.PRIMED:
+            started = time.monotonic()
+            state['primed'] = await DBTasks(db_conf, logger).prewarm_db()
+            state['prime_time'] = round(time.monotonic() - started, 3)
+            relations, blocks = state['primed']
+            logger.info(
+                f'{relations} relations ({blocks} blocks) prewarmed in '
+                f'{state["prime_time"]} s.'
+            )
+        return state
+
+    @staticmethod
+    def get_workload_db_conf(db_conf: dict, workload_conf: dict) -> dict:
+        """
+        Returns the ARG_PG_* placeholder values of the load commands:
+        the database address as seen from the host running the workload.
+        """
+        workload_db_conf = workload_conf.get('workload_db_conf') or {}
+        return {
+            f'pg_{k}': v for k, v in {**db_conf, **workload_db_conf}.items()
+        }
+
     @staticmethod
     def load_iterations_config(
         db_conf: dict, workload_conf: dict
@@ -121,73 +593,273 @@ class BenchmarkRunner:
         """
         Builds a list of [init_command, workload_command] pairs for each iteration.
         """
-        db_conf_pg = {f'pg_{k}': v for k, v in db_conf.items()}
+        db_conf_pg = BenchmarkRunner.get_workload_db_conf(
+            db_conf, workload_conf
+        )
 
-        pgbench_param_name = workload_conf.get('pgbench_iter_name')
-        iter_list = workload_conf.get('pgbench_iter_list')
+        sweep_points = BenchmarkRunner.get_sweep_points(workload_conf)
         if (
-            not workload_conf
-            or not isinstance(workload_conf, dict)
-            or not pgbench_param_name
-            or not iter_list
-            or not isinstance(iter_list, list)
+            not sweep_points
             or 'init_command' not in workload_conf
             or 'workload_command' not in workload_conf
         ):
             return []
 
-        return [
-            BenchmarkRunner.get_filled_load_commands(
-                db_conf_pg, workload_conf, pgbench_param_name, iteration
+        return BenchmarkRunner.get_points_load_iterations(
+            db_conf_pg, workload_conf, sweep_points
+        )
+
+    @staticmethod
+    def get_points_load_iterations(
+        db_conf_pg: dict, workload_conf: dict, sweep_points: list[dict]
+    ) -> list[list[str]]:
+        """
+        Builds the [init_command, workload_command] pair run for every
+        sweep point, db_conf_pg holds the ARG_PG_* placeholder values.
+        """
+        load_iterations = []
+        for point in sweep_points:
+            load_commands = BenchmarkRunner.get_point_load_commands(
+                db_conf_pg, workload_conf, point
             )
-            for iteration in iter_list
-        ]
+            load_commands[1] = BenchmarkRunner.add_workload_options(
+                load_commands[1], workload_conf
+            )
+            load_iterations.append(load_commands)
+        return load_iterations
 
     @staticmethod
-    async def reset_db_environment(
+    def setup_reset_strategy(
         logger, conn_type: str, conn, db_conf: dict, workload_conf: dict
-    ) -> None:
+    ):
         """
-        Fully resets the database environment before a test iteration.
+        Creates the reset strategy object selected by the workload config.
         """
-        try:
-            db_tasks = DBTasks(db_conf, logger)
-            conn_tasks = get_conn_type_tasks(conn_type)(
-                db_conf=workload_conf, conn=conn, logger=logger
-            )
+        strategy = workload_conf.get('reset_strategy', ResetStrategy.RECREATE)
+        strategy_class = get_reset_strategy(strategy)
+        if not strategy_class:
+            raise ValueError(f'Unknown reset strategy: {strategy}')
 
-            try:
-                await conn_tasks.start_db()
-            except Exception as e:
-                logger.warning(str(e))
-
-            await db_tasks.check_db_access()
-            await db_tasks.drop_db()
-            await conn_tasks.stop_db()
-            await conn_tasks.sync()
-            await conn_tasks.drop_caches()
-            await conn_tasks.start_db()
-            await db_tasks.check_db_access()
-            await db_tasks.init_db()
-            await db_tasks.check_user_db_access()
+        db_tasks = DBTasks(db_conf, logger)
+        conn_tasks = get_conn_type_tasks(conn_type)(
+            db_conf=workload_conf, conn=conn, logger=logger
+        )
+        return strategy_class(logger, db_tasks, conn_tasks, workload_conf)
 
-        except Exception as e:
-            raise RuntimeError(f'Failed to reset DB environment:\n{str(e)}')
+    @staticmethod
+    def get_workload_location(conn_type: str, workload_conf: dict) -> dict:
+        """
+        Describes where the load generator runs, for the report.
+        """
+        location = workload_conf.get(
+            'workload_location', WorkloadLocation.LOCAL
+        )
+        if location == WorkloadLocation.CLIENT_HOST:
+            host = workload_conf['client_conn_params']['host']
+        elif (
+            location == WorkloadLocation.DB_HOST
+            and conn_type != ConnectionType.LOCAL
+        ):
+            host = f'database host ({conn_type} connection)'
+        else:
+            location = WorkloadLocation.LOCAL
+            host = 'local host'
+        return {
+            'location': str(location),
+            'host': host,
+            'db_conf': workload_conf.get('workload_db_conf') or {},
+        }
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def workload_connection(
+        logger, conn_type: str, client, workload_conf: dict
+    ):
+        """
+        Yields the connection running the init and workload commands
+        or None when they run on this host.
+        """
+        location = workload_conf.get(
+            'workload_location', WorkloadLocation.LOCAL
+        )
+        if location == WorkloadLocation.CLIENT_HOST:
+            connection = SSHConnection(
+                dict(workload_conf['client_conn_params'])
+            )
+            connection.logger = logger
+            async with connection as client_host:
+                yield client_host
+        elif (
+            location == WorkloadLocation.DB_HOST
+            and conn_type != ConnectionType.LOCAL
+        ):
+            yield client
+        else:
+            yield None
+
+    @staticmethod
+    async def run_init_command(
+        logger, init_cmd: str, workload_conn=None
+    ) -> None:
+        """
+        Runs the dataset initialization command.
+        """
+        logger.info(f'Executing init_command:\n {init_cmd}')
+        if workload_conn is None:
+            await run_command(logger, init_cmd, check=True)
+        else:
+            await workload_conn.run_command_stream(init_cmd, check=True)
 
     @staticmethod
     async def run_benchmark(
-        logger, load_iteration: List[str]
-    ) -> List[Union[int, float]]:
+        logger,
+        load_iteration: List[str],
+        run_init: bool = True,
+        latency_log: bool = False,
+        workload_conn=None,
+        native_db_conf: dict | None = None,
+        cpu_set: list[int] | None = None,
+        steady_state: dict | None = None,
+    ) -> dict:
         """
-        Runs a benchmark iteration and returns the parsed pgbench metrics.
+        Runs a benchmark iteration and returns the parsed pgbench metrics
+        ('result'), the pgbench --progress time series ('progress') and,
+        when latency_log is set, the latency percentiles computed from
+        the pgbench per-transaction logs ('latency').
+        The init command is skipped when run_init is False.
+        The commands run through workload_conn when it is given, the logs
+        written there are fetched to this host before parsing.
+        With native_db_conf the workload command is run by the native
+        asyncpg driver, which always measures the latency percentiles.
+        Local load processes are pinned to the CPUs of cpu_set.
+        With steady_state the run is stopped once its throughput settled
+        (see run_workload).
         """
         init_cmd, workload_cmd = load_iteration
 
-        logger.info(f'Executing init_command:\n {init_cmd}')
-        await run_command(logger, init_cmd, check=True)
+        if run_init:
+            await BenchmarkRunner.run_init_command(
+                logger, init_cmd, workload_conn
+            )
+
+        if native_db_conf is not None:
+            logger.info(f'Executing native workload:\n {workload_cmd}')
+            return await run_native_workload(
+                logger, workload_cmd, native_db_conf, cpu_set
+            )
+
+        if not latency_log:
+            return await BenchmarkRunner.run_workload(
+                logger, workload_cmd, workload_conn, cpu_set, steady_state
+            )
+
+        log_dir = tempfile.mkdtemp(prefix='pg_perfbench_')
+        log_prefix = os.path.join(log_dir, PGBENCH_LOG_PREFIX)
+        remote_log_dir = None
+        try:
+            if workload_conn is not None:
+                remote_log_dir = await workload_conn.run_command_stream(
+                    f'mktemp -d {REMOTE_TEMP_DIR_TEMPLATE}', check=True
+                )
+                remote_log_dir = remote_log_dir.strip()
+            benchmark = await BenchmarkRunner.run_workload(
+                logger,
+                BenchmarkRunner.add_latency_log_option(
+                    workload_cmd,
+                    f'{remote_log_dir}/{PGBENCH_LOG_PREFIX}'
+                    if remote_log_dir
+                    else log_prefix,
+                ),
+                workload_conn,
+                cpu_set,
+                steady_state,
+            )
+            if remote_log_dir:
+                logger.info('Fetching pgbench transaction logs...')
+                await workload_conn.fetch_files(remote_log_dir, log_dir)
+            logger.info('Reading pgbench transaction logs...')
+            # parsing is CPU bound, keep the event loop responsive
+            benchmark['latency'] = await asyncio.to_thread(
+                BenchmarkRunner.read_latency_logs, log_prefix
+            )
+            if benchmark['latency'] is None:
+                logger.warning(
+                    f'No pgbench transaction logs found in '
+                    f'{remote_log_dir or log_dir}.'
+                )
+        finally:
+            shutil.rmtree(log_dir, ignore_errors=True)
+            if remote_log_dir:
+                await workload_conn.run_command_stream(
+                    f'rm -rf {shlex.quote(remote_log_dir)}'
+                )
+        return benchmark
+
+    @staticmethod
+    async def run_workload(
+        logger,
+        workload_cmd: str,
+        workload_conn=None,
+        cpu_set: list[int] | None = None,
+        steady_state: dict | None = None,
+    ) -> dict:
+        """
+        Runs the workload command, collecting pgbench --progress reports
+        while it is running. The command runs through workload_conn when
+        it is given, a local command is pinned to the CPUs of cpu_set.
+        With the steady_state config (window, max_cv, min_time) a local
+        command is stopped as soon as its tps settled, the metrics are
+        then those of the measured window ('steady_state'). The CPU use of
+        the load generator is measured as well ('client').
+        """
+        progress = []
+        detector = None
+        stop = None
+        if steady_state:
+            detector = SteadyStateDetector(
+                steady_state['window'],
+                steady_state.get('max_cv'),
+                steady_state.get('min_time'),
+            )
+            stop = asyncio.Event()
+
+        def handle_line(line: str) -> None:
+            sample = BenchmarkRunner.get_pgbench_progress(line)
+            if sample is not None:
+                progress.append(sample)
+                logger.debug(line)
+                elapsed, tps, latency = sample[:3]
+                if (
+                    detector
+                    and stop
+                    and elapsed is not None
+                    and not stop.is_set()
+                    and detector.add_sample(elapsed, tps, latency)
+                ):
+                    logger.info(
+                        f'Steady state reached at {sample[0]} s, '
+                        f'stopping the workload.'
+                    )
+                    stop.set()
 
         logger.info(f'Executing workload_command:\n {workload_cmd}')
-        perf_result = await run_command(logger, workload_cmd, check=True)
+        client_cmd = BenchmarkRunner.add_client_times(workload_cmd)
+        started = time.monotonic()
+        if workload_conn is None:
+            perf_result = await run_command_stream(
+                logger,
+                BenchmarkRunner.add_cpu_affinity(client_cmd, cpu_set),
+                handle_line,
+                check=True,
+                stop=stop,
+            )
+            cpus = len(cpu_set) if cpu_set else len(os.sched_getaffinity(0))
+        else:
+            perf_result = await workload_conn.run_command_stream(
+                client_cmd, handle_line, check=True
+            )
+            cpus = None
+        elapsed = time.monotonic() - started
 
         if not perf_result.strip():
             logger.warning(
@@ -195,7 +867,40 @@ class BenchmarkRunner:
             )
         else:
             logger.debug(f'Result of pgbench iteration:\n{perf_result}')
-        return BenchmarkRunner.get_pgbench_results(perf_result)
+
+        result: list = BenchmarkRunner.get_pgbench_results(perf_result)
+        transactions = result[2]
+        steady_state_summary = None
+        if detector:
+            duration = DURATION_OPTION_RE.search(workload_cmd)
+            steady_state_summary = detector.get_summary(
+                int(duration.group(1)) if duration else None
+            )
+            if stop and stop.is_set():
+                result = BenchmarkRunner.get_steady_state_results(
+                    workload_cmd, steady_state_summary
+                )
+                # the client ran beyond the measured window
+                transactions = get_progress_transactions(progress)
+        client = BenchmarkRunner.get_client_results(
+            workload_cmd, perf_result, elapsed, transactions, cpus
+        )
+        if client and client['saturated']:
+            logger.warning(
+                f'The load generator was CPU-saturated '
+                f'({client["utilization"]}% of {client["threads"]} '
+                f'thread(s)), the results may be limited by the client.'
+            )
+        return {
+            'result': result,
+            'progress': progress,
+            'latency': None,
+            'rate': BenchmarkRunner.get_pgbench_rate_results(
+                perf_result, workload_cmd
+            ),
+            'steady_state': steady_state_summary,
+            'client': client,
+        }
 
     @staticmethod
     def setup_report_structure(report_conf: dict, logger) -> dict:
@@ -228,6 +933,142 @@ class BenchmarkRunner:
         connection.logger = logger
         return connection
 
+    @staticmethod
+    def set_tune_seed(workload_conf: dict, journal: RunJournal) -> None:
+        """
+        Fixes the seed of a settings tuning run without --tune-seed,
+        a resumed tuning takes the journaled one to sample the same
+        configurations.
+        """
+        if not workload_conf.get('tune_settings') or (
+            workload_conf.get('tune_seed') is not None
+        ):
+            return
+        config = journal.read_config() if workload_conf.get('resume') else None
+        seed = (config or {}).get('tune_seed')
+        workload_conf['tune_seed'] = (
+            seed if seed is not None else random.randrange(2**32)
+        )
+
+    @staticmethod
+    def get_run_order(
+        load_iterations: list[list[str]],
+        repetitions: int = 1,
+        shuffle: bool = False,
+        seed: int | None = None,
+    ) -> list[int]:
+        """
+        Returns the indexes of the load iterations in execution order,
+        every iteration is repeated the given number of times.
+        With shuffle the runs are randomized within each group of
+        consecutive iterations sharing the init command, so a cached
+        dataset is not rebuilt between them.
+        """
+        groups: list[list[int]] = []
+        for idx, (init_cmd, _) in enumerate(load_iterations):
+            if not groups or load_iterations[groups[-1][0]][0] != init_cmd:
+                groups.append([])
+            groups[-1].extend([idx] * repetitions)
+
+        if shuffle:
+            rng = random.Random(seed)
+            for group in groups:
+                rng.shuffle(group)
+        return [idx for group in groups for idx in group]
+
+    @staticmethod
+    async def take_pg_stats_snapshot(logger, db_conf: dict) -> dict | None:
+        """
+        Reads the cumulative pg_stat_* counters of the benchmark database.
+        A failure only loses the statistics of the run, it is logged.
+        """
+        try:
+            db_conn = await asyncpg.connect(**db_conf)
+            try:
+                return await get_pg_stats_snapshot(db_conn)
+            finally:
+                await db_conn.close()
+        except Exception as e:
+            logger.warning(f'Failed to read the server statistics: {e}')
+            return None
+
+    @staticmethod
+    async def reset_statements(logger, db_conf: dict) -> bool:
+        """
+        Resets pg_stat_statements of the benchmark database before a run.
+        Returns False when it is not available, a failure is logged.
+        """
+        try:
+            db_conn = await asyncpg.connect(**db_conf)
+            try:
+                return await reset_pg_stat_statements(db_conn)
+            finally:
+                await db_conn.close()
+        except Exception as e:
+            logger.warning(f'Failed to reset pg_stat_statements: {e}')
+            return False
+
+    @staticmethod
+    async def read_statements(
+        logger, db_conf: dict, limit: int, exclude: list[str] | None = None
+    ) -> list[dict] | None:
+        """
+        Reads the top statements of the benchmark database after a run,
+        without the queries in exclude.
+        """
+        try:
+            db_conn = await asyncpg.connect(**db_conf)
+            try:
+                return await get_top_statements(db_conn, limit, exclude)
+            finally:
+                await db_conn.close()
+        except Exception as e:
+            logger.warning(f'Failed to read pg_stat_statements: {e}')
+            return None
+
+    @staticmethod
+    def get_run_samplers(
+        logger, client, db_conf: dict, workload_conf: dict, iteration: int
+    ) -> dict:
+        """
+        Returns the samplers running alongside a workload run of the
+        iteration by the run record key they fill, None for the ones
+        not enabled.
+        """
+        connect = partial(
+            asyncpg.connect,
+            **db_conf,
+            server_settings={'application_name': SAMPLER_APPLICATION_NAME},
+        )
+        os_interval = workload_conf.get('os_sampling_interval')
+        wait_interval = workload_conf.get('wait_event_sampling_interval')
+        lock_interval = workload_conf.get('lock_sampling_interval')
+        return {
+            'os_stats': (
+                OSSampler(client, os_interval, logger) if os_interval else None
+            ),
+            'wait_events': (
+                WaitEventSampler(connect, wait_interval, logger)
+                if wait_interval
+                else None
+            ),
+            'locks': (
+                LockSampler(connect, lock_interval, logger)
+                if lock_interval
+                else None
+            ),
+            'profile': (
+                Profiler(
+                    client,
+                    workload_conf['profile_frequency'],
+                    workload_conf.get('pg_data_path'),
+                    logger,
+                )
+                if iteration in (workload_conf.get('profile_iterations') or [])
+                else None
+            ),
+        }
+
     @staticmethod
     async def run_benchmark_iterations(
         logger,
@@ -236,23 +1077,491 @@ class BenchmarkRunner:
         client,
         db_conf: dict,
         workload_conf: dict,
-    ) -> list[List[Union[int, float]]]:
+        sweep_points: list[dict] | None = None,
+        run_order: list[int] | None = None,
+        reset_strategy=None,
+        workload_conn=None,
+        journal: RunJournal | None = None,
+        repetition_offset: int = 0,
+    ) -> list[dict]:
         """
-        Executes all load test iterations sequentially and gathers results.
+        Executes the load test runs sequentially and gathers results.
+        run_order lists the iteration index of every run (each iteration
+        runs once by default), the repetitions of an iteration are
+        numbered from repetition_offset + 1. Each run record holds the swept parameter
+        values, the parsed pgbench metrics, the dataset reset timings and
+        the pg_stat_* counter changes over the run, the top statements of
+        pg_stat_statements when it is available, the results of the
+        enabled samplers (see get_run_samplers) and the effective values
+        of the swept PostgreSQL settings, which are applied before the run
+        and reset after the last one, and the cache state the run was
+        measured in (see prepare_cache).
+        A reset_strategy passed by the caller is not cleaned up here, nor
+        are the PostgreSQL settings reset then.
+        The load commands run through workload_conn when it is given.
+        Every completed run is written to the journal, the runs already
+        completed there are restored instead of being run again.
         """
-        perf_results = []
-        logger.info('Starting load iterations...')
-        for idx, load_iteration in enumerate(load_iterations, start=1):
-            logger.info(f'Preparing for iteration {idx}...')
-            await BenchmarkRunner.reset_db_environment(
+        runs = []
+        own_reset_strategy = reset_strategy is None
+        if own_reset_strategy:
+            reset_strategy = BenchmarkRunner.setup_reset_strategy(
                 logger, conn_type, client, db_conf, workload_conf
             )
-            result = await BenchmarkRunner.run_benchmark(
-                logger, load_iteration
+        native_db_conf = (
+            db_conf
+            if workload_conf.get('benchmark_type') == WorkloadTypes.NATIVE
+            else None
+        )
+        run_init = partial(
+            BenchmarkRunner.run_init_command,
+            logger,
+            workload_conn=workload_conn,
+        )
+        logger.info(
+            f'Starting load iterations (reset strategy: {reset_strategy.strategy})...'
+        )
+        settings_tasks: tuple[DBTasks, Any] | None = None
+        if BenchmarkRunner.get_settings_names(workload_conf):
+            settings_tasks = (
+                DBTasks(db_conf, logger),
+                get_conn_type_tasks(conn_type)(
+                    db_conf=workload_conf, conn=client, logger=logger
+                ),
             )
-            perf_results.append(result)
-            logger.info(f'Iteration {idx} completed.')
-        return perf_results
+        points = sweep_points or [{}] * len(load_iterations)
+        if run_order is None:
+            run_order = list(range(len(load_iterations)))
+        repetitions: collections.Counter[int] = collections.Counter()
+        try:
+            for run_idx, iteration_idx in enumerate(run_order, start=1):
+                load_iteration = load_iterations[iteration_idx]
+                params = points[iteration_idx]
+                idx = iteration_idx + 1
+                repetitions[idx] += 1
+                repetition = repetitions[idx] + repetition_offset
+                run_numbers = {
+                    'iteration': idx,
+                    'run': run_idx,
+                    'repetition': repetition,
+                    'params': params,
+                }
+                settings = BenchmarkRunner.get_point_settings(
+                    workload_conf, params
+                )
+                # the points of a settings sweep share their load commands
+                run_key = load_iteration + [
+                    f'{name}={value}' for name, value in settings.items()
+                ]
+                journaled = journal and journal.get_run(run_key, repetition)
+                if journaled:
+                    logger.info(
+                        f'Iteration {idx} {params} (run {run_idx}/'
+                        f'{len(run_order)}) restored from the journal.'
+                    )
+                    runs.append({**run_numbers, **journaled})
+                    continue
+                logger.info(
+                    f'Preparing for iteration {idx} {params} '
+                    f'(run {run_idx}/{len(run_order)})...'
+                )
+                try:
+                    reset_timings = await reset_strategy.reset(
+                        load_iteration[0], run_init
+                    )
+                except Exception as e:
+                    raise RuntimeError(
+                        f'Failed to reset DB environment:\n{str(e)}'
+                    )
+                logger.info(
+                    f'Iteration {idx} dataset {reset_timings["dataset"]}: '
+                    f'reset {reset_timings["reset_time"]} s, '
+                    f'init {reset_timings["init_time"]} s, '
+                    f'cache build {reset_timings["cache_time"]} s.'
+                )
+                effective_settings = (
+                    await BenchmarkRunner.apply_pg_settings(
+                        logger, *settings_tasks, settings
+                    )
+                    if settings_tasks and settings
+                    else None
+                )
+                cache_state = await BenchmarkRunner.prepare_cache(
+                    logger,
+                    load_iteration,
+                    db_conf,
+                    workload_conf,
+                    workload_conn,
+                    native_db_conf,
+                )
+                stats_before = await BenchmarkRunner.take_pg_stats_snapshot(
+                    logger, db_conf
+                )
+                top_statements = (
+                    workload_conf.get('pg_stat_statements_top') or 0
+                )
+                statements_reset = bool(
+                    top_statements
+                ) and await BenchmarkRunner.reset_statements(logger, db_conf)
+                samplers = BenchmarkRunner.get_run_samplers(
+                    logger, client, db_conf, workload_conf, idx
+                )
+                for sampler in samplers.values():
+                    if sampler:
+                        await sampler.start()
+                try:
+                    benchmark = await BenchmarkRunner.run_benchmark(
+                        logger,
+                        load_iteration,
+                        run_init=False,
+                        latency_log=workload_conf.get(
+                            'pgbench_latency_log', False
+                        ),
+                        workload_conn=workload_conn,
+                        native_db_conf=native_db_conf,
+                        cpu_set=workload_conf.get('cpu_set'),
+                        steady_state=workload_conf.get('steady_state'),
+                    )
+                finally:
+                    sampled = {
+                        name: await sampler.stop() if sampler else None
+                        for name, sampler in samplers.items()
+                    }
+                # the polls of the samplers are not part of the workload
+                pollers = [
+                    sampler
+                    for sampler in samplers.values()
+                    if isinstance(sampler, PollingSampler)
+                ]
+                statements = (
+                    await BenchmarkRunner.read_statements(
+                        logger,
+                        db_conf,
+                        top_statements,
+                        [sampler.query for sampler in pollers],
+                    )
+                    if statements_reset
+                    else None
+                )
+                stats_after = await BenchmarkRunner.take_pg_stats_snapshot(
+                    logger, db_conf
+                )
+                run = {
+                    **benchmark,
+                    'reset': reset_timings,
+                    'pg_stats': (
+                        get_pg_stats_delta(
+                            stats_before,
+                            stats_after,
+                            sum(sampler.samples for sampler in pollers),
+                        )
+                        if stats_before and stats_after
+                        else None
+                    ),
+                    'statements': statements,
+                    **sampled,
+                    'settings': effective_settings,
+                }
+                run['cache'] = get_cache_summary(
+                    **cache_state, pg_stats=run['pg_stats']
+                )
+                runs.append({**run_numbers, **run})
+                if journal:
+                    journal.add_run(run_key, repetition, run)
+                logger.info(f'Iteration {idx} completed.')
+        finally:
+            if settings_tasks and own_reset_strategy:
+                try:
+                    await BenchmarkRunner.restore_pg_settings(
+                        logger,
+                        *settings_tasks,
+                        BenchmarkRunner.get_settings_names(workload_conf),
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f'Failed to restore the PostgreSQL settings: {e}'
+                    )
+            if own_reset_strategy:
+                await reset_strategy.cleanup()
+        return runs
+
+    @staticmethod
+    async def run_knee_search(
+        logger,
+        conn_type: str,
+        client,
+        db_conf: dict,
+        workload_conf: dict,
+        workload_conn=None,
+        journal: RunJournal | None = None,
+    ) -> tuple[list[dict], list[dict], dict]:
+        """
+        Runs the adaptive client count search: every next client count
+        is chosen from the results so far (see KneeSearch).
+        Returns the run records, the explored sweep points ordered
+        by client count and the search summary.
+        """
+        search = KneeSearch(
+            workload_conf.get('knee_min_clients'),
+            workload_conf.get('knee_max_clients'),
+            workload_conf.get('knee_latency_factor'),
+            workload_conf.get('knee_max_points'),
+        )
+        # the other swept parameters hold a single value
+        sweep = workload_conf.get('pgbench_sweep') or {}
+        fixed_params = {name: values[0] for name, values in sweep.items()}
+        db_conf_pg = BenchmarkRunner.get_workload_db_conf(
+            db_conf, workload_conf
+        )
+        repetitions = workload_conf.get('repetitions', 1)
+
+        runs: list[dict] = []
+        points = {}
+        reset_strategy = BenchmarkRunner.setup_reset_strategy(
+            logger, conn_type, client, db_conf, workload_conf
+        )
+        try:
+            while (clients := search.next_clients()) is not None:
+                logger.info(
+                    f'Knee search ({search.phase}): running {clients} clients.'
+                )
+                point = {**fixed_params, 'pgbench_clients': clients}
+                load_commands = BenchmarkRunner.get_point_load_commands(
+                    db_conf_pg, workload_conf, point
+                )
+                load_commands[1] = BenchmarkRunner.add_workload_options(
+                    load_commands[1], workload_conf
+                )
+                point_runs = await BenchmarkRunner.run_benchmark_iterations(
+                    logger,
+                    [load_commands],
+                    conn_type,
+                    client,
+                    db_conf,
+                    workload_conf,
+                    [point],
+                    [0] * repetitions,
+                    reset_strategy,
+                    workload_conn,
+                    journal,
+                )
+                for run in point_runs:
+                    run['run'] = len(runs) + 1
+                    runs.append(run)
+                points[clients] = (point, point_runs)
+
+                iteration = BenchmarkRunner.aggregate_runs(point_runs)[0]
+                search.add_result(
+                    clients, iteration['result'][5], iteration['result'][3]
+                )
+        finally:
+            await reset_strategy.cleanup()
+
+        # number the iterations by client count for the report charts
+        sweep_points = []
+        for idx, clients in enumerate(sorted(points), start=1):
+            point, point_runs = points[clients]
+            sweep_points.append(point)
+            for run in point_runs:
+                run['iteration'] = idx
+
+        summary = search.get_summary()
+        logger.info(
+            f'Knee search finished: peak {summary["peak_tps"]} tps '
+            f'at {summary["peak_clients"]} clients, latency within '
+            f'{summary["latency_limit"]} ms up to {summary["knee_clients"]} clients.'
+        )
+        return runs, sweep_points, summary
+
+    @staticmethod
+    async def run_tuning(
+        logger,
+        load_iteration: list[str],
+        conn_type: str,
+        client,
+        db_conf: dict,
+        workload_conf: dict,
+        point: dict,
+        workload_conn=None,
+        journal: RunJournal | None = None,
+    ) -> tuple[list[dict], list[dict], dict]:
+        """
+        Runs the search of the PostgreSQL settings with the highest tps
+        within the p99 latency limit (see SettingsTuner). Every run of a
+        configuration applies its settings like a settings sweep point.
+        Returns the run records, the configurations run as sweep points
+        ordered by their first run and the search summary.
+        """
+        tuner = SettingsTuner(
+            workload_conf['tune_settings'],
+            workload_conf['tune_latency_p99'],
+            workload_conf.get('tune_budget'),
+            workload_conf.get('tune_seed'),
+        )
+        logger.info(
+            f'Tuning {tuner.names}: {len(tuner.configs)} of '
+            f'{tuner.space_size} configurations, {tuner.budget} runs.'
+        )
+        runs: list[dict] = []
+        points = []
+        reset_strategy = BenchmarkRunner.setup_reset_strategy(
+            logger, conn_type, client, db_conf, workload_conf
+        )
+        try:
+            while (config := tuner.next_config()) is not None:
+                config_point = {**point, **config}
+                if config_point not in points:
+                    points.append(config_point)
+                logger.info(
+                    f'Tuning trial {len(tuner.trials) + 1} '
+                    f'(rung {tuner.rung}): {config}.'
+                )
+                run = (
+                    await BenchmarkRunner.run_benchmark_iterations(
+                        logger,
+                        [load_iteration],
+                        conn_type,
+                        client,
+                        db_conf,
+                        workload_conf,
+                        [config_point],
+                        [0],
+                        reset_strategy,
+                        workload_conn,
+                        journal,
+                        repetition_offset=tuner.get_runs(config),
+                    )
+                )[0]
+                run['run'] = len(runs) + 1
+                run['iteration'] = points.index(config_point) + 1
+                runs.append(run)
+                latency = run.get('latency') or {}
+                tuner.add_result(
+                    config,
+                    run['result'][5],
+                    latency.get('percentiles', {}).get('99'),
+                )
+        finally:
+            try:
+                await BenchmarkRunner.restore_pg_settings(
+                    logger,
+                    DBTasks(db_conf, logger),
+                    get_conn_type_tasks(conn_type)(
+                        db_conf=workload_conf, conn=client, logger=logger
+                    ),
+                    tuner.names,
+                )
+            except Exception as e:
+                logger.warning(
+                    f'Failed to restore the PostgreSQL settings: {e}'
+                )
+            await reset_strategy.cleanup()
+
+        summary = tuner.get_summary()
+        if summary['best']:
+            logger.info(
+                f'Tuning finished: {summary["best"]} gives '
+                f'{summary["best_tps"]} tps with p99 latency '
+                f'{summary["best_latency_p99"]} ms.'
+            )
+        else:
+            logger.warning(
+                f'Tuning finished: no configuration kept the p99 latency '
+                f'within {summary["latency_limit"]} ms.'
+            )
+        return runs, points, summary
+
+    @staticmethod
+    def save_tuned_config(logger, report_name: str, summary: dict) -> None:
+        """Writes the best settings of the tuning next to the report."""
+        config = get_tuned_config(summary)
+        if not config:
+            return
+        path = REPORT_FOLDER / f'{report_name}{TUNED_CONFIG_SUFFIX}'
+        os.makedirs(REPORT_FOLDER, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(config)
+        logger.info(f'Tuned PostgreSQL settings written to {path}')
+
+    @staticmethod
+    def aggregate_runs(runs: list[dict]) -> list[dict]:
+        """
+        Combines the repeated runs of every iteration into one record:
+        the mean pgbench metrics ('result'), the latency summary of all
+        runs ('latency'), the mean server statistics deltas ('pg_stats'),
+        the mean top statements ('statements'), the wait event samples
+        of all runs ('wait_events'), the lock contention of the runs
+        ('locks'), the mean CPU use of the load generator ('client'), the
+        effective PostgreSQL settings ('settings'), the mean cache state
+        ('cache') and the summary statistics of every metric across the
+        runs ('stats').
+        Records are ordered by iteration.
+        """
+        grouped: dict[int, list[dict]] = {}
+        for run in runs:
+            grouped.setdefault(run['iteration'], []).append(run)
+
+        iterations = []
+        for idx in sorted(grouped):
+            iteration_runs = grouped[idx]
+            results = [run['result'] for run in iteration_runs]
+            result = []
+            for values in zip(*results):
+                if all(value == values[0] for value in values):
+                    result.append(values[0])
+                else:
+                    mean = get_mean(values)
+                    result.append(None if mean is None else round(mean, 3))
+
+            stats = {}
+            for name in PGBENCH_STATS_FIELDS:
+                field_idx = PGBENCH_RESULT_FIELDS.index(name)
+                stats[name] = get_summary_stats(
+                    [values[field_idx] for values in results]
+                )
+            latencies = [run.get('latency') for run in iteration_runs]
+            for percent in LATENCY_PERCENTILES:
+                samples = [
+                    latency['percentiles'].get(str(percent))
+                    for latency in latencies
+                    if latency
+                ]
+                if samples:
+                    stats[f'latency_p{percent}'] = get_summary_stats(samples)
+
+            iterations.append(
+                {
+                    'iteration': idx,
+                    'params': iteration_runs[0].get('params', {}),
+                    'repetitions': len(iteration_runs),
+                    'result': result,
+                    'latency': merge_latency_summaries(latencies),
+                    'rate': BenchmarkRunner.aggregate_rate_results(
+                        [run.get('rate') for run in iteration_runs]
+                    ),
+                    'pg_stats': merge_pg_stats(
+                        [run.get('pg_stats') for run in iteration_runs]
+                    ),
+                    'statements': merge_statements(
+                        [run.get('statements') for run in iteration_runs]
+                    ),
+                    'wait_events': merge_wait_events(
+                        [run.get('wait_events') for run in iteration_runs]
+                    ),
+                    'locks': merge_locks(
+                        [run.get('locks') for run in iteration_runs]
+                    ),
+                    'client': merge_client_stats(
+                        [run.get('client') for run in iteration_runs]
+                    ),
+                    'settings': iteration_runs[0].get('settings'),
+                    'cache': merge_cache_stats(
+                        [run.get('cache') for run in iteration_runs]
+                    ),
+                    'stats': stats,
+                }
+            )
+        return iterations
 
     @staticmethod
     async def collect_monitoring_metrics(
@@ -293,14 +1602,17 @@ class BenchmarkRunner:
         """
         display_user_configuration(args, logger)
 
+        journal = None
         try:
             report = BenchmarkRunner.setup_report_structure(
                 report_conf, logger
             )
+            knee_search = workload_conf.get('knee_search', False)
+            # with the knee search the iterations are chosen while running
             load_iterations = BenchmarkRunner.load_iterations_config(
                 db_conf, workload_conf
             )
-            if not load_iterations:
+            if not load_iterations and not knee_search:
                 logger.error('No valid load iterations configured.')
                 return None
 
@@ -310,10 +1622,26 @@ class BenchmarkRunner:
             if not connection:
                 return None
 
-            report_data = {
+            journal = RunJournal(
+                workload_conf.get('journal_path')
+                or RunJournal.get_journal_path(report_conf['report_name']),
+                logger,
+            )
+            BenchmarkRunner.set_tune_seed(workload_conf, journal)
+            journal.start(
+                RunJournal.get_config(db_conf, workload_conf),
+                workload_conf.get('resume', False),
+            )
+
+            sweep_points = BenchmarkRunner.get_sweep_points(workload_conf)
+            report_data: dict = {
                 'args': args,
                 'workload_conf': workload_conf,
                 'report_conf': report_conf,
+                'sweep_points': sweep_points,
+                'workload_location': BenchmarkRunner.get_workload_location(
+                    conn_type, workload_conf
+                ),
             }
 
             async with connection as client:
@@ -330,23 +1658,91 @@ class BenchmarkRunner:
                         f'Config applied: {custom_path} -> {remote_config}'
                     )
 
-                perf_results = await BenchmarkRunner.run_benchmark_iterations(
-                    logger,
-                    load_iterations,
-                    conn_type,
-                    client,
-                    db_conf,
-                    workload_conf,
+                async with BenchmarkRunner.workload_connection(
+                    logger, conn_type, client, workload_conf
+                ) as workload_conn:
+                    if knee_search:
+                        journal.phase('knee_search')
+                        knee_result = await BenchmarkRunner.run_knee_search(
+                            logger,
+                            conn_type,
+                            client,
+                            db_conf,
+                            workload_conf,
+                            workload_conn,
+                            journal,
+                        )
+                        runs, sweep_points, report_data['knee'] = knee_result
+                        report_data['sweep_points'] = sweep_points
+                        workload_conf['pgbench_iter_name'] = 'pgbench_clients'
+                        workload_conf['pgbench_iter_list'] = [
+                            point['pgbench_clients'] for point in sweep_points
+                        ]
+                    elif workload_conf.get('tune_settings'):
+                        journal.phase('tuning')
+                        tuning_result = await BenchmarkRunner.run_tuning(
+                            logger,
+                            load_iterations[0],
+                            conn_type,
+                            client,
+                            db_conf,
+                            workload_conf,
+                            sweep_points[0],
+                            workload_conn,
+                            journal,
+                        )
+                        runs, sweep_points, tuning = tuning_result
+                        report_data['sweep_points'] = sweep_points
+                        report_data['tuning'] = tuning
+                        BenchmarkRunner.save_tuned_config(
+                            logger, report_conf['report_name'], tuning
+                        )
+                    else:
+                        run_order = BenchmarkRunner.get_run_order(
+                            load_iterations,
+                            workload_conf.get('repetitions', 1),
+                            workload_conf.get('shuffle', False),
+                            workload_conf.get('shuffle_seed'),
+                        )
+                        journal.phase('iterations')
+                        runs = await BenchmarkRunner.run_benchmark_iterations(
+                            logger,
+                            load_iterations,
+                            conn_type,
+                            client,
+                            db_conf,
+                            workload_conf,
+                            sweep_points,
+                            run_order,
+                            workload_conn=workload_conn,
+                            journal=journal,
+                        )
+                iterations = BenchmarkRunner.aggregate_runs(runs)
+                # the commands of the points actually run, password hidden
+                report_db_conf = BenchmarkRunner.get_workload_db_conf(
+                    {**db_conf, 'password': '***'}, workload_conf
                 )
-                report_data['pgbench_outputs'] = perf_results
+                load_commands = BenchmarkRunner.get_points_load_iterations(
+                    report_db_conf, workload_conf, report_data['sweep_points']
+                )
+                report_data['load_iterations'] = load_commands
+                report_data['runs'] = runs
+                report_data['iterations'] = iterations
+                report_data['pgbench_outputs'] = [
+                    iteration['result'] for iteration in iterations
+                ]
 
+                journal.phase('metrics')
                 await BenchmarkRunner.collect_monitoring_metrics(
                     logger, db_conf, report_data, report, log_conf, client
                 )
 
+            journal.phase('finished')
             logger.info('Benchmarking process completed successfully.')
             return report
 
         except Exception as e:
             logger.error(f'Benchmark failed: {e}')
+            if journal is not None:
+                journal.error(str(e))
             return None
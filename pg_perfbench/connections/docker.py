@@ -1,3 +1,5 @@
+import asyncio
+import collections
 import docker
 import io
 import os
@@ -5,6 +7,9 @@ import tarfile
 from typing import Optional
 from types import TracebackType
 
+# Number of trailing stderr lines kept by run_command_stream
+STDERR_TAIL_LINES = 100
+
 
 class DockerConnection:
     def __init__(self, conn_params, env) -> None:
@@ -99,6 +104,80 @@ class DockerConnection:
         out, _ = result.output
         return out.decode('utf-8', 'replace') if out else ''
 
+    async def run_command_stream(
+        self, cmd: str, line_handler=None, check=False
+    ) -> str:
+        """
+        Runs a command passing every stdout and stderr line to line_handler
+        as soon as it arrives. Fails on a non-zero exit code if check.
+        """
+        if not self.container:
+            raise PermissionError(
+                'Container not available or no access to "postgres" user.'
+            )
+
+        api = self.docker_client.api
+        exec_id = api.exec_create(
+            self.container.id,
+            ['/bin/bash', '-c', cmd],
+            user='postgres',
+            environment=self.env,
+        )['Id']
+        stream = api.exec_start(exec_id, stream=True, demux=True)
+
+        loop = asyncio.get_running_loop()
+        stdout_lines = []
+        stderr_lines = collections.deque(maxlen=STDERR_TAIL_LINES)
+
+        def emit(lines, line):
+            lines.append(line)
+            if line_handler:
+                loop.call_soon_threadsafe(line_handler, line)
+
+        def consume():
+            # the docker client is blocking, read the stream in a thread
+            pending = {'stdout': '', 'stderr': ''}
+            targets = {'stdout': stdout_lines, 'stderr': stderr_lines}
+            for chunks in stream:
+                for name, chunk in zip(('stdout', 'stderr'), chunks):
+                    if not chunk:
+                        continue
+                    pending[name] += chunk.decode('utf-8', 'replace')
+                    *lines, pending[name] = pending[name].split('\n')
+                    for line in lines:
+                        emit(targets[name], line)
+            for name, rest in pending.items():
+                if rest:
+                    emit(targets[name], rest)
+
+        await asyncio.to_thread(consume)
+        exit_code = api.exec_inspect(exec_id).get('ExitCode')
+        if exit_code != 0 and check:
+            error_message = '\n'.join(stderr_lines) or 'Unknown error'
+            raise RuntimeError(
+                f'Command "{cmd}" failed for Docker connection with exit code '
+                f'{exit_code}: {error_message} \n'
+            )
+        return ''.join(f'{line}\n' for line in stdout_lines)
+
+    async def fetch_files(self, remote_dir: str, local_dir: str) -> None:
+        """Copies the files of a container directory into a local directory."""
+        if not self.container:
+            raise PermissionError('Container not available.')
+
+        stream, _ = self.container.get_archive(remote_dir)
+        tar_buffer = io.BytesIO(b''.join(stream))
+        with tarfile.open(fileobj=tar_buffer) as tar:
+            for member in tar.getmembers():
+                if not member.isfile():
+                    continue
+                source = tar.extractfile(member)
+                target_path = os.path.join(
+                    local_dir, os.path.basename(member.name)
+                )
+                with open(target_path, 'wb') as target:
+                    target.write(source.read())
+
     async def run_command_as_root(self, cmd: str) -> str:
         if not self.container:
             raise PermissionError('No container available.')
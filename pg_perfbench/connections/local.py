@@ -1,10 +1,14 @@
 import asyncio
+import collections
 import os
 import shutil
 import tarfile
 from typing import Optional
 from types import TracebackType
 
+# Number of trailing stderr lines kept by run_command_stream
+STDERR_TAIL_LINES = 100
+
 
 class LocalConnection:
     def __init__(self, env) -> None:
@@ -76,6 +80,48 @@ class LocalConnection:
 
         return stdout.decode('utf-8', errors='replace')
 
+    async def run_command_stream(
+        self, cmd: str, line_handler=None, check: bool = False
+    ) -> str:
+        """
+        Runs a command passing every stdout and stderr line to line_handler
+        as soon as it arrives. Fails on a non-zero exit code if check.
+        """
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            shell=True,
+            limit=262144,
+            env=self.env,
+        )
+        stdout_lines: list[str] = []
+        stderr_lines: collections.deque[str] = collections.deque(
+            maxlen=STDERR_TAIL_LINES
+        )
+
+        async def read_stream(stream, lines):
+            while True:
+                raw_line = await stream.readline()
+                if not raw_line:
+                    break
+                line = raw_line.decode('utf-8', errors='replace')
+                lines.append(line)
+                if line_handler:
+                    line_handler(line.rstrip('\n'))
+
+        await asyncio.gather(
+            read_stream(process.stdout, stdout_lines),
+            read_stream(process.stderr, stderr_lines),
+        )
+        await process.wait()
+        if process.returncode != 0 and check:
+            raise RuntimeError(
+                f'Command "{cmd}" failed for Local connection with exit code '
+                f'{process.returncode}:\n{"".join(stderr_lines)}'
+            )
+        return ''.join(stdout_lines)
+
     async def send_pg_config_file(
         self, local_config_path: str, remote_data_dir: str
     ) -> str:
@@ -1,10 +1,14 @@
 import asyncio
 import asyncssh
+import collections
 import os
 from typing import Optional
 
 from pg_perfbench.const import SRC_LOG_ARCHIVE_DIR
 
+# Number of trailing stderr lines kept by run_command_stream
+STDERR_TAIL_LINES = 100
+
 
 class SSHConnection:
     def __init__(self, conn_params, tunnel_params=None):
@@ -68,6 +72,49 @@ class SSHConnection:
         process.close()
         return stdout
 
+    async def run_command_stream(
+        self, cmd: str, line_handler=None, check=False
+    ) -> str:
+        """
+        Runs a command passing every stdout and stderr line to line_handler
+        as soon as it arrives. Fails on a non-zero exit status if check.
+        """
+        if not self.client:
+            raise ConnectionError('SSH client not initialized.')
+
+        process = await self.client.create_process(cmd)
+        stdout_lines: list[str] = []
+        stderr_lines: collections.deque[str] = collections.deque(
+            maxlen=STDERR_TAIL_LINES
+        )
+
+        async def read_stream(stream, lines):
+            async for line in stream:
+                lines.append(line)
+                if line_handler:
+                    line_handler(line.rstrip('\n'))
+
+        await asyncio.gather(
+            read_stream(process.stdout, stdout_lines),
+            read_stream(process.stderr, stderr_lines),
+        )
+        await process.wait()
+        process.close()
+        if process.exit_status != 0 and check:
+            raise RuntimeError(
+                f'Command "{cmd}" failed for SSH connection with exit code '
+                f'{process.exit_status}:\n{"".join(stderr_lines)}'
+            )
+        return ''.join(stdout_lines)
+
+    async def fetch_files(self, remote_dir: str, local_dir: str) -> None:
+        """Copies the files of a remote directory into a local directory."""
+        if not self.client:
+            raise ConnectionError('SSH client not initialized.')
+
+        async with self.client.start_sftp_client() as sftp_client:
+            await sftp_client.mget(f'{remote_dir}/*', local_dir)
+
     async def send_pg_config_file(self, local_config_path, remote_data_dir):
         if not self.client:
             raise ConnectionError('SSH client not initialized.')
@@ -55,6 +55,12 @@ DEFAULT_REPORT_NAME = f'report_{CURRENT_TIME}'
 LOCAL_DB_LOGS_PATH = PROJECT_ROOT_FOLDER / 'db_logs'
 DEFAULT_LOG_ARCHIVE_NAME = f'logs_archive_report_{CURRENT_TIME}.tar.gz'
 SRC_LOG_ARCHIVE_DIR = '/tmp/log_archive'
+PGBENCH_LOG_PREFIX = 'pgbench_log'
+JOURNAL_FILE_SUFFIX = '.journal.jsonl'
+# postgresql.conf settings found by the tuning, written next to the report
+TUNED_CONFIG_SUFFIX = '.tuned.conf'
+# SQLite database of the stored benchmark results in the report folder
+RESULTS_DB_NAME = 'results.sqlite3'
 
 
 @enum.unique
@@ -63,6 +69,8 @@ class WorkMode(StrEnum):
 
     BENCHMARK = 'benchmark'
     JOIN = 'join'
+    GATE = 'gate'
+    HISTORY = 'history'
     COLLECT_SYS_INFO = 'collect-sys-info'
     COLLECT_DB_INFO = 'collect-db-info'
     COLLECT_ALL_INFO = 'collect-all-info'
@@ -74,6 +82,86 @@ class WorkloadTypes(StrEnum):
 
     CUSTOM = 'custom'
     DEFAULT = 'default'
+    NATIVE = 'native'
+
+
+@enum.unique
+class ResetStrategy(StrEnum):
+    """Enumeration of database reset strategies between iterations."""
+
+    RECREATE = 'recreate'
+    TEMPLATE = 'template'
+    SNAPSHOT = 'snapshot'
+
+
+@enum.unique
+class CacheMode(StrEnum):
+    """Enumeration of the cache states the iterations are measured in."""
+
+    COLD = 'cold'
+    WARM = 'warm'
+    PRIMED = 'primed'
+
+
+@enum.unique
+class CloneStrategy(StrEnum):
+    """Enumeration of CREATE DATABASE strategies used for template cloning."""
+
+    FILE_COPY = 'file_copy'
+    WAL_LOG = 'wal_log'
+
+
+@enum.unique
+class SnapshotMethod(StrEnum):
+    """Enumeration of PGDATA snapshot methods for the snapshot reset."""
+
+    AUTO = 'auto'
+    REFLINK = 'reflink'
+    RSYNC = 'rsync'
+    COMMAND = 'command'
+
+
+# Suffix of the PGDATA snapshot directory created next to the data directory
+SNAPSHOT_DIR_SUFFIX = '_pg_perfbench_snapshot'
+# Suffix of the template database holding the initialized dataset
+TEMPLATE_DB_SUFFIX = '_pg_perfbench_tmpl'
+# CREATE DATABASE ... STRATEGY is available since PostgreSQL 15
+CLONE_STRATEGY_MIN_VERSION_NUM = 150000
+
+# Metrics returned by BenchmarkRunner.get_pgbench_results, in order
+PGBENCH_RESULT_FIELDS = (
+    'clients',
+    'duration',
+    'transactions',
+    'latency_avg',
+    'init_conn_time',
+    'tps',
+)
+# Result metrics summarized over the repetitions of a workload point
+PGBENCH_STATS_FIELDS = ('transactions', 'latency_avg', 'init_conn_time', 'tps')
+
+# pgbench parameters that can be swept, the cross product is iterated
+# in this order, so points sharing a scale (dataset) are run together
+PGBENCH_SWEEP_PARAMS = (
+    'pgbench_scale',
+    'pgbench_clients',
+    'pgbench_jobs',
+    'pgbench_time',
+    'pgbench_rate',
+)
+
+
+@enum.unique
+class WorkloadLocation(StrEnum):
+    """Enumeration of hosts running the workload (load generator)."""
+
+    LOCAL = 'local'
+    DB_HOST = 'db-host'
+    CLIENT_HOST = 'client-host'
+
+
+# Temporary directory created on the host running the workload
+REMOTE_TEMP_DIR_TEMPLATE = '/tmp/pg_perfbench_XXXXXX'
 
 
 @enum.unique
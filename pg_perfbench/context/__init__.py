@@ -1,5 +1,13 @@
 from .benchmark import Context
 from .collect_info import CollectInfoContext
 from .join import JoinContext
+from .gate import GateContext
+from .history import HistoryContext
 
-__all__ = ['Context', 'CollectInfoContext', 'JoinContext']
+__all__ = [
+    'Context',
+    'CollectInfoContext',
+    'JoinContext',
+    'GateContext',
+    'HistoryContext',
+]
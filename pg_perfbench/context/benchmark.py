@@ -1,6 +1,25 @@
-from pg_perfbench.const import ConnectionType, WorkMode, WorkloadTypes
+import re
+
+from pg_perfbench.const import (
+    ConnectionType,
+    WorkMode,
+    WorkloadTypes,
+    ResetStrategy,
+    CacheMode,
+    SnapshotMethod,
+    WorkloadLocation,
+    SNAPSHOT_DIR_SUFFIX,
+    PGBENCH_SWEEP_PARAMS,
+)
+from pg_perfbench.metrics import (
+    DEFAULT_TOP_STATEMENTS,
+    DEFAULT_PROFILE_FREQUENCY,
+)
 from .base_context import BaseContext, transform_key
 
+# Names of PostgreSQL settings, with a prefix for the extension ones
+PG_SETTING_NAME_RE = re.compile(r'^[A-Za-z_][\w]*(\.[A-Za-z_][\w]*)?$')
+
 
 class Context(BaseContext):
     def __init__(self, args, logger):
@@ -49,38 +68,153 @@ class Context(BaseContext):
             'workload_path': args.workload_path,
             'init_command': args.init_command,
             'workload_command': args.workload_command,
+            'reset_strategy': args.reset_strategy,
+            'template_strategy': args.template_strategy,
+            'cache_mode': args.cache_mode,
+            'warmup_time': args.warmup_time,
+            'pgbench_progress': args.pgbench_progress,
+            'pgbench_latency_log': args.pgbench_latency_log,
+            'repetitions': args.repetitions,
+            'shuffle': args.shuffle,
+            'shuffle_seed': args.shuffle_seed,
+            'pgbench_latency_limit': args.pgbench_latency_limit,
+            'os_sampling_interval': args.os_sampling_interval,
+            'wait_event_sampling_interval': args.wait_event_sampling_interval,
+            'lock_sampling_interval': args.lock_sampling_interval,
+            'profile_iterations': args.profile_iterations,
+            'profile_frequency': args.profile_frequency,
+            'pg_stat_statements_top': args.pg_stat_statements_top,
+            'journal_path': args.journal,
+            'resume': args.resume,
         }
+        if self.structured_params['workload_conf']['repetitions'] < 1:
+            raise ValueError(
+                f'Parameter "{transform_key("repetitions")}" must be positive'
+            )
 
-        # Handle pgbench parameters
-        if args.pgbench_clients and args.pgbench_time:
-            logger.error(
-                'Only one of two parameters can be set: --pgbench-clients or --pgbench-time'
+        workload_conf = self.structured_params['workload_conf']
+        os_sampling_interval = workload_conf['os_sampling_interval']
+        if os_sampling_interval is not None and os_sampling_interval < 1:
+            raise ValueError(
+                f'Parameter "{transform_key("os_sampling_interval")}" '
+                f'must be at least 1 second'
             )
+        for name in ('wait_event_sampling_interval', 'lock_sampling_interval'):
+            if workload_conf[name] is not None and workload_conf[name] <= 0:
+                raise ValueError(
+                    f'Parameter "{transform_key(name)}" must be positive'
+                )
+
+        if workload_conf['warmup_time'] is not None:
+            if workload_conf['cache_mode'] != CacheMode.WARM:
+                raise ValueError(
+                    f'Parameter "{transform_key("warmup_time")}" requires '
+                    f'"{transform_key("cache_mode")}" {CacheMode.WARM}'
+                )
+            if workload_conf['warmup_time'] < 1:
+                raise ValueError(
+                    f'Parameter "{transform_key("warmup_time")}" must be '
+                    f'positive'
+                )
+
+        if any(
+            iteration < 1
+            for iteration in workload_conf['profile_iterations'] or []
+        ):
             raise ValueError(
-                'Only one of two parameters can be set: --pgbench-clients or --pgbench-time'
+                f'Parameter "{transform_key("profile_iterations")}" '
+                f'lists iteration numbers starting at 1'
             )
 
-        if args.pgbench_clients is not None:
-            self.structured_params['workload_conf'].update(
-                {
-                    'pgbench_iter_name': 'pgbench_clients',
-                    'pgbench_iter_list': args.pgbench_clients,
-                }
+        if workload_conf['profile_frequency'] is None:
+            workload_conf['profile_frequency'] = DEFAULT_PROFILE_FREQUENCY
+        elif workload_conf['profile_frequency'] < 1:
+            raise ValueError(
+                f'Parameter "{transform_key("profile_frequency")}" '
+                f'must be positive'
+            )
+
+        if workload_conf['pg_stat_statements_top'] is None:
+            workload_conf['pg_stat_statements_top'] = DEFAULT_TOP_STATEMENTS
+        elif workload_conf['pg_stat_statements_top'] < 0:
+            raise ValueError(
+                f'Parameter "{transform_key("pg_stat_statements_top")}" '
+                f'must not be negative'
+            )
+
+        # The default report name holds the start time, it cannot be resumed
+        if args.resume and not (args.report_name or args.journal):
+            raise ValueError(
+                f'Parameter "{transform_key("resume")}" requires '
+                f'"{transform_key("report_name")}" or '
+                f'"{transform_key("journal")}" to find the journal'
             )
-        if args.pgbench_time is not None:
+
+        # Percentiles need the per-transaction logs written by pg_perfbench
+        if args.pgbench_latency_log and re.search(
+            r'--log-prefix|--aggregate-interval', args.workload_command or ''
+        ):
+            raise ValueError(
+                f'Parameter "{transform_key("pgbench_latency_log")}" '
+                f'cannot be combined with --log-prefix or --aggregate-interval '
+                f'in "{transform_key("workload_command")}"'
+            )
+
+        # Add snapshot reset configuration
+        if self.structured_params['workload_conf']['reset_strategy'] == (
+            ResetStrategy.SNAPSHOT
+        ):
+            self._add_snapshot_config(args)
+
+        # Add the host running the workload
+        self._add_workload_location_config(args)
+
+        # Add steady state detection, it ends the runs early
+        if args.steady_state_window is not None:
+            self._add_steady_state_config(args)
+
+        # Handle pgbench parameters, several of them form a sweep matrix
+        sweep = {
+            name: getattr(args, name)
+            for name in PGBENCH_SWEEP_PARAMS
+            if getattr(args, name) is not None
+        }
+        self.structured_params['workload_conf']['pgbench_sweep'] = sweep
+        if 'pgbench_rate' in sweep and 'ARG_PGBENCH_RATE' not in (
+            args.workload_command or ''
+        ):
+            raise ValueError(
+                f'Parameter "{transform_key("pgbench_rate")}" requires the '
+                f'ARG_PGBENCH_RATE placeholder in '
+                f'"{transform_key("workload_command")}"'
+            )
+        if len(sweep) == 1:
+            iter_name, iter_list = next(iter(sweep.items()))
             self.structured_params['workload_conf'].update(
                 {
-                    'pgbench_iter_name': 'pgbench_time',
-                    'pgbench_iter_list': args.pgbench_time,
+                    'pgbench_iter_name': iter_name,
+                    'pgbench_iter_list': iter_list,
                 }
             )
 
+        # Add adaptive client count search configuration
+        if args.knee_search:
+            self._add_knee_search_config(args, sweep)
+
         # Add custom config if present
         if args.pg_custom_config is not None:
             self.structured_params['workload_conf'][
                 'pg_custom_config'
             ] = args.pg_custom_config
 
+        # Add the PostgreSQL settings sweep, applied with ALTER SYSTEM
+        if args.pg_setting:
+            self._add_pg_settings_sweep_config(args)
+
+        # Add the PostgreSQL settings tuning, it replaces the sweep
+        if args.tune_setting:
+            self._add_tuning_config(args, sweep)
+
         # Add report configuration
         self.structured_params['report_conf'] = {
             'report_name': args.report_name
@@ -93,6 +227,226 @@ class Context(BaseContext):
             'log_level': args.log_level,
         }
 
+    @staticmethod
+    def _get_pg_settings(pg_settings, key):
+        """Check the [name, values] pairs of PostgreSQL settings"""
+        settings = {}
+        for name, values in pg_settings:
+            if not PG_SETTING_NAME_RE.match(name):
+                raise ValueError(
+                    f'Invalid setting name "{name}" in "{transform_key(key)}"'
+                )
+            if name in settings:
+                raise ValueError(
+                    f'Setting "{name}" is given more than once in '
+                    f'"{transform_key(key)}"'
+                )
+            settings[name] = values
+        return settings
+
+    def _add_tuning_config(self, args, sweep):
+        """Add the search of the best PostgreSQL settings"""
+        workload_conf = self.structured_params['workload_conf']
+        # workload_conf key -> argument setting it
+        for key, arg in (
+            ('knee_search', 'knee_search'),
+            ('pg_settings_sweep', 'pg_setting'),
+        ):
+            if workload_conf.get(key):
+                raise ValueError(
+                    f'Parameters "{transform_key("tune_setting")}" and '
+                    f'"{transform_key(arg)}" cannot be used together'
+                )
+        if any(len(values) != 1 for values in sweep.values()):
+            raise ValueError(
+                f'Parameter "{transform_key("tune_setting")}" requires single '
+                f'values of the swept pgbench parameters'
+            )
+        latency_limit = args.tune_latency_p99
+        if latency_limit is None or latency_limit <= 0:
+            raise ValueError(
+                f'Parameter "{transform_key("tune_setting")}" requires a '
+                f'positive "{transform_key("tune_latency_p99")}"'
+            )
+        # the p99 latency comes from the transaction logs
+        if workload_conf.get(
+            'benchmark_type'
+        ) != WorkloadTypes.NATIVE and not workload_conf.get(
+            'pgbench_latency_log'
+        ):
+            raise ValueError(
+                f'Parameter "{transform_key("tune_setting")}" requires '
+                f'"{transform_key("pgbench_latency_log")}"'
+            )
+        budget = args.tune_budget
+        if budget is not None and budget < 1:
+            raise ValueError(
+                f'Parameter "{transform_key("tune_budget")}" must be at least 1'
+            )
+        workload_conf.update(
+            {
+                'tune_settings': self._get_pg_settings(
+                    args.tune_setting, 'tune_setting'
+                ),
+                'tune_latency_p99': latency_limit,
+                'tune_budget': budget,
+                'tune_seed': args.tune_seed,
+            }
+        )
+
+    def _add_pg_settings_sweep_config(self, args):
+        """Add the sweep of PostgreSQL settings (GUCs)"""
+        settings = self._get_pg_settings(args.pg_setting, 'pg_setting')
+        if self.structured_params['workload_conf'].get('knee_search'):
+            raise ValueError(
+                f'Parameters "{transform_key("knee_search")}" and '
+                f'"{transform_key("pg_setting")}" cannot be used together'
+            )
+        self.structured_params['workload_conf']['pg_settings_sweep'] = settings
+
+    def _add_knee_search_config(self, args, sweep):
+        """Add the adaptive client count (knee) search configuration"""
+        if 'pgbench_clients' in sweep:
+            raise ValueError(
+                f'Parameters "{transform_key("knee_search")}" and '
+                f'"{transform_key("pgbench_clients")}" cannot be used together'
+            )
+        if 'ARG_PGBENCH_CLIENTS' not in (args.workload_command or ''):
+            raise ValueError(
+                f'Parameter "{transform_key("knee_search")}" requires the '
+                f'ARG_PGBENCH_CLIENTS placeholder in '
+                f'"{transform_key("workload_command")}"'
+            )
+        if any(len(values) != 1 for values in sweep.values()):
+            raise ValueError(
+                f'Parameter "{transform_key("knee_search")}" requires single '
+                f'values of the other swept pgbench parameters'
+            )
+        self.structured_params['workload_conf'].update(
+            {
+                'knee_search': True,
+                'knee_min_clients': args.knee_min_clients,
+                'knee_max_clients': args.knee_max_clients,
+                'knee_latency_factor': args.knee_latency_factor,
+                'knee_max_points': args.knee_max_points,
+            }
+        )
+        # the client counts are chosen by the search
+        self.structured_params['workload_conf'].pop('pgbench_iter_name', None)
+        self.structured_params['workload_conf'].pop('pgbench_iter_list', None)
+
+    def _add_workload_location_config(self, args):
+        """Add the configuration of the host running the workload"""
+        location = args.workload_location
+        host = args.workload_pg_host
+        port = args.workload_pg_port
+
+        if location == WorkloadLocation.DB_HOST:
+            if args.connection_type == ConnectionType.SSH:
+                host = host or args.remote_pg_host
+                port = port or args.remote_pg_port
+            elif args.connection_type == ConnectionType.DOCKER:
+                host = host or args.docker_pg_host
+                port = port or args.docker_pg_port
+        elif location == WorkloadLocation.CLIENT_HOST:
+            for key in ('client_ssh_host', 'workload_pg_host'):
+                if getattr(args, key) is None:
+                    raise ValueError(
+                        f'Parameter "{transform_key(key)}" must be specified '
+                        f'for workload location "{WorkloadLocation.CLIENT_HOST}"'
+                    )
+            self.structured_params['workload_conf']['client_conn_params'] = {
+                'host': args.client_ssh_host,
+                'port': int(args.client_ssh_port),
+                'username': args.client_ssh_user,
+                'client_keys': args.client_ssh_key,
+                'known_hosts': None,
+                'env': {'ARG_PG_BIN_PATH': f'{args.pg_bin_path}'},
+                'connect_timeout': 5,
+            }
+
+        if (
+            args.benchmark_type == WorkloadTypes.NATIVE
+            and location != WorkloadLocation.LOCAL
+        ):
+            raise ValueError(
+                f'Benchmark type "{WorkloadTypes.NATIVE}" runs on the local '
+                f'host only, "{transform_key("workload_location")}" '
+                f'"{location}" is not supported'
+            )
+
+        self.structured_params['workload_conf'].update(
+            {
+                'workload_location': location,
+                # placeholders of the commands run on the workload host
+                'workload_db_conf': {
+                    key: value
+                    for key, value in (('host', host), ('port', port))
+                    if value is not None
+                },
+            }
+        )
+
+    def _add_steady_state_config(self, args):
+        """Add the steady state detection of the workload runs"""
+        workload_conf = self.structured_params['workload_conf']
+        if args.benchmark_type == WorkloadTypes.NATIVE or (
+            workload_conf['workload_location'] != WorkloadLocation.LOCAL
+        ):
+            raise ValueError(
+                f'Parameter "{transform_key("steady_state_window")}" '
+                f'requires pgbench running on the local host'
+            )
+        # the detection reads the progress reports
+        if not workload_conf['pgbench_progress']:
+            workload_conf['pgbench_progress'] = 1
+        if args.steady_state_window < 2 * workload_conf['pgbench_progress']:
+            raise ValueError(
+                f'Parameter "{transform_key("steady_state_window")}" must '
+                f'cover at least two "{transform_key("pgbench_progress")}" '
+                f'intervals'
+            )
+        workload_conf['steady_state'] = {
+            'window': args.steady_state_window,
+            'max_cv': args.steady_state_cv,
+            'min_time': args.steady_state_min_time,
+        }
+
+    def _add_snapshot_config(self, args):
+        """Add PGDATA snapshot configuration for the snapshot reset"""
+        if args.connection_type == ConnectionType.DOCKER:
+            raise ValueError(
+                f'Reset strategy "{ResetStrategy.SNAPSHOT}" is not supported '
+                f'for connection type "{ConnectionType.DOCKER}"'
+            )
+
+        method = args.snapshot_method
+        create_command = args.snapshot_create_command
+        restore_command = args.snapshot_restore_command
+        if method == SnapshotMethod.COMMAND and not (
+            create_command and restore_command
+        ):
+            raise ValueError(
+                f'Parameters "{transform_key("snapshot_create_command")}" and '
+                f'"{transform_key("snapshot_restore_command")}" must be specified '
+                f'for snapshot method "{SnapshotMethod.COMMAND}"'
+            )
+
+        snapshot_path = args.snapshot_path
+        if not snapshot_path:
+            snapshot_path = (
+                f"{args.pg_data_path.rstrip('/')}{SNAPSHOT_DIR_SUFFIX}"
+            )
+
+        self.structured_params['workload_conf'].update(
+            {
+                'snapshot_method': method,
+                'snapshot_path': snapshot_path,
+                'snapshot_create_command': create_command,
+                'snapshot_restore_command': restore_command,
+            }
+        )
+
     def filter_none(self, d: dict) -> dict:
         SSHConnectionArgs = [
             'ssh_host',
@@ -122,6 +476,9 @@ class Context(BaseContext):
 
         if d.get('benchmark_type') == WorkloadTypes.CUSTOM:
             WorkloadParamsArgs.append('workload_path')
+        # the native driver does not need the pgbench binary
+        if d.get('benchmark_type') == WorkloadTypes.NATIVE:
+            WorkloadParamsArgs.remove('pgbench_path')
 
         ctype = d.get('connection_type')
         if ctype == ConnectionType.SSH:
@@ -0,0 +1,21 @@
+class GateContext:
+    def __init__(self, args, logger):
+        if not args.baseline_report:
+            raise ValueError('The gate mode requires --baseline-report')
+        for name in ('gate_tps_tolerance', 'gate_latency_tolerance'):
+            if getattr(args, name) < 0:
+                raise ValueError(
+                    f'Invalid --{name.replace("_", "-")}: '
+                    f'{getattr(args, name)}'
+                )
+        if not 0 < args.gate_alpha < 1:
+            raise ValueError(f'Invalid --gate-alpha: {args.gate_alpha}')
+
+        self.current_report = args.current_report
+        self.structured_params = {
+            'logger': logger,
+            'baseline_report': args.baseline_report,
+            'tps_tolerance': args.gate_tps_tolerance,
+            'latency_tolerance': args.gate_latency_tolerance,
+            'alpha': args.gate_alpha,
+        }
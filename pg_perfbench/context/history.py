@@ -0,0 +1,24 @@
+class HistoryContext:
+    def __init__(self, args, logger):
+        for name in ('history_clients', 'history_days', 'history_limit'):
+            value = getattr(args, name)
+            minimum = 1 if name == 'history_limit' else 0
+            if value is not None and value < minimum:
+                raise ValueError(
+                    f'Invalid --{name.replace("_", "-")}: {value}'
+                )
+
+        self.structured_params = {
+            'logger': logger,
+            'results_db': args.results_db,
+            'ingest': args.ingest or [],
+            'filters': {
+                'host': args.history_host,
+                'pg_version': args.history_pg_version,
+                'workload': args.history_workload,
+                'config_hash': args.history_config_hash,
+                'clients': args.history_clients,
+                'days': args.history_days,
+                'limit': args.history_limit,
+            },
+        }
@@ -2,7 +2,14 @@ from pg_perfbench.report.commands import collect_logs
 from pg_perfbench.const import ConnectionType
 
 from .db import DBTasks
-from .conn_tasks import run_command, SSHTasks, DockerTasks, LocalConnTasks
+from .conn_tasks import (
+    run_command,
+    run_command_stream,
+    SSHTasks,
+    DockerTasks,
+    LocalConnTasks,
+)
+from .reset import get_reset_strategy, recreate_db_environment
 
 __all__ = [
     'DBTasks',
@@ -10,6 +17,9 @@ __all__ = [
     'DockerTasks',
     'LocalConnTasks',
     'run_command',
+    'run_command_stream',
+    'get_reset_strategy',
+    'recreate_db_environment',
 ]
 
 
@@ -1,6 +1,13 @@
 from .ssh import SSHTasks
 from .docker import DockerTasks
 from .local import LocalConnTasks
-from .common import run_command
+from .common import run_command, run_command_stream, get_snapshot_commands
 
-__all__ = ['SSHTasks', 'DockerTasks', 'LocalConnTasks', 'run_command']
+__all__ = [
+    'SSHTasks',
+    'DockerTasks',
+    'LocalConnTasks',
+    'run_command',
+    'run_command_stream',
+    'get_snapshot_commands',
+]
@@ -1,4 +1,13 @@
 import asyncio
+import collections
+import os
+import shlex
+import signal
+
+from pg_perfbench.const import SnapshotMethod
+
+# Number of trailing stderr lines kept by run_command_stream
+STDERR_TAIL_LINES = 100
 
 
 async def run_command(logger, command: str, check: bool = True) -> str:
@@ -35,3 +44,128 @@ async def run_command(logger, command: str, check: bool = True) -> str:
     await process.wait()
 
     return stdout.decode('utf-8')
+
+
+def get_snapshot_commands(
+    method: str,
+    data_path: str,
+    snapshot_path: str,
+    create_command: str | None = None,
+    restore_command: str | None = None,
+) -> tuple[str, str]:
+    """
+    Builds the shell commands creating and restoring a PGDATA snapshot.
+    Both commands must be run while the server is stopped.
+    """
+    data_dir = shlex.quote(data_path.rstrip('/'))
+    snapshot_dir = shlex.quote(snapshot_path.rstrip('/'))
+
+    if method == SnapshotMethod.REFLINK:
+        return (
+            f'rm -rf {snapshot_dir} && '
+            f'cp -a --reflink=always {data_dir} {snapshot_dir}',
+            f'rm -rf {data_dir} && '
+            f'cp -a --reflink=always {snapshot_dir} {data_dir}',
+        )
+    if method == SnapshotMethod.RSYNC:
+        # Only files changed since the snapshot are copied back on restore.
+        # The snapshot is never hardlinked into PGDATA: the server rewrites
+        # relation files in place, which would modify the snapshot as well.
+        return (
+            f'mkdir -p {snapshot_dir} && '
+            f'rsync -a --delete {data_dir}/ {snapshot_dir}/',
+            f'rsync -a --delete {snapshot_dir}/ {data_dir}/',
+        )
+    if method == SnapshotMethod.COMMAND:
+        if not create_command or not restore_command:
+            raise ValueError(
+                'Snapshot method "command" requires both snapshot create '
+                'and restore commands.'
+            )
+        commands = []
+        for command in (create_command, restore_command):
+            command = command.replace('ARG_PG_DATA_PATH', data_dir)
+            command = command.replace('ARG_SNAPSHOT_PATH', snapshot_dir)
+            commands.append(command)
+        return commands[0], commands[1]
+
+    raise ValueError(f'Unknown snapshot method: {method}')
+
+
+async def run_command_stream(
+    logger,
+    command: str,
+    line_handler=None,
+    check: bool = True,
+    stop: asyncio.Event | None = None,
+) -> str:
+    """
+    Run shell command asynchronously, passing every stdout and stderr line
+    to line_handler as soon as it is produced. Returns the stdout text.
+    When the stop event is set the command and its children are
+    terminated, the exit code is not checked then.
+    """
+    if not command.strip():
+        raise Exception('Attempting to run an empty command string.')
+
+    try:
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            shell=True,
+            limit=262144,
+            # a session of its own lets the whole process group be stopped
+            start_new_session=stop is not None,
+        )
+    except Exception as e:
+        raise Exception(
+            f'Failed to start subprocess for command: {command}\nError:\n{str(e)} .'
+        )
+
+    async def terminate_on_stop():
+        await stop.wait()
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    stop_task = asyncio.create_task(terminate_on_stop()) if stop else None
+    stdout_lines: list[str] = []
+    # keep only the tail of stderr for error reporting
+    stderr_lines: collections.deque[str] = collections.deque(
+        maxlen=STDERR_TAIL_LINES
+    )
+
+    async def read_stream(stream, lines):
+        while True:
+            raw_line = await stream.readline()
+            if not raw_line:
+                break
+            line = raw_line.decode('utf-8', errors='replace')
+            lines.append(line)
+            if line_handler:
+                line_handler(line.rstrip('\n'))
+
+    await asyncio.gather(
+        read_stream(process.stdout, stdout_lines),
+        read_stream(process.stderr, stderr_lines),
+    )
+    await process.wait()
+    if stop and stop_task:
+        stop_task.cancel()
+        if stop.is_set():
+            logger.info(f"Command '{command}' was stopped.")
+            return ''.join(stdout_lines)
+
+    if process.returncode != 0:
+        logger.error(
+            f"Command '{command}' failed with exit code {process.returncode}."
+        )
+        logger.error(f"STDERR: {''.join(stderr_lines)} .")
+        if check:
+            raise Exception(
+                f"Command '{command}' - returned non-zero exit code."
+            )
+
+    return ''.join(stdout_lines)
@@ -33,3 +33,20 @@ class DockerTasks:
             "sudo /bin/sh -c 'echo 3 | /usr/bin/tee /proc/sys/vm/drop_caches'"
         )
         await run_command(self.logger, cmd, True)
+
+    async def snapshot_db(self, snapshot_conf: dict):
+        # PostgreSQL is the main process of the container: stopping it stops
+        # the container, so PGDATA cannot be copied while the server is down.
+        raise RuntimeError(
+            'The snapshot reset strategy is not supported for the docker '
+            'connection, use the "template" reset strategy instead.'
+        )
+
+    async def restore_db(self, snapshot_conf: dict):
+        raise RuntimeError(
+            'The snapshot reset strategy is not supported for the docker '
+            'connection, use the "template" reset strategy instead.'
+        )
+
+    async def remove_snapshot(self, snapshot_conf: dict):
+        return None
@@ -1,4 +1,6 @@
-from .common import run_command
+import shlex
+
+from .common import run_command, get_snapshot_commands
 
 
 class LocalConnTasks:
@@ -39,3 +41,41 @@ class LocalConnTasks:
             "sudo /bin/sh -c 'echo 3 | /usr/bin/tee /proc/sys/vm/drop_caches'"
         )
         await run_command(self.logger, cmd, True)
+
+    async def snapshot_db(self, snapshot_conf: dict):
+        create_cmd, _ = get_snapshot_commands(
+            snapshot_conf['method'],
+            self.pg_data_path,
+            snapshot_conf['path'],
+            snapshot_conf.get('create_command'),
+            snapshot_conf.get('restore_command'),
+        )
+        self.logger.debug(f'Creating PGDATA snapshot:\n {create_cmd}')
+        try:
+            return await self.conn.run_command(create_cmd, check=True)
+        except Exception as e:
+            raise RuntimeError(
+                f"Database '{self.pg_data_path}' snapshot error:\n{str(e)}"
+            )
+
+    async def restore_db(self, snapshot_conf: dict):
+        _, restore_cmd = get_snapshot_commands(
+            snapshot_conf['method'],
+            self.pg_data_path,
+            snapshot_conf['path'],
+            snapshot_conf.get('create_command'),
+            snapshot_conf.get('restore_command'),
+        )
+        self.logger.debug(f'Restoring PGDATA snapshot:\n {restore_cmd}')
+        try:
+            return await self.conn.run_command(restore_cmd, check=True)
+        except Exception as e:
+            raise RuntimeError(
+                f"Database '{self.pg_data_path}' restore error:\n{str(e)}"
+            )
+
+    async def remove_snapshot(self, snapshot_conf: dict):
+        snapshot_dir = shlex.quote(snapshot_conf['path'].rstrip('/'))
+        return await self.conn.run_command(
+            f'rm -rf {snapshot_dir}', check=False
+        )
@@ -1,3 +1,8 @@
+import shlex
+
+from .common import get_snapshot_commands
+
+
 class SSHTasks:
     def __init__(self, db_conf, conn, logger):
         self.pg_bin_path = db_conf['pg_bin_path']
@@ -34,3 +39,41 @@ class SSHTasks:
             check=False,
         )
         return res
+
+    async def snapshot_db(self, snapshot_conf: dict):
+        create_cmd, _ = get_snapshot_commands(
+            snapshot_conf['method'],
+            self.pg_data_path,
+            snapshot_conf['path'],
+            snapshot_conf.get('create_command'),
+            snapshot_conf.get('restore_command'),
+        )
+        self.logger.debug(f'Creating PGDATA snapshot:\n {create_cmd}')
+        try:
+            return await self.conn.run_command(create_cmd, check=True)
+        except Exception as e:
+            raise RuntimeError(
+                f"Database '{self.pg_data_path}' snapshot error:\n{str(e)}"
+            )
+
+    async def restore_db(self, snapshot_conf: dict):
+        _, restore_cmd = get_snapshot_commands(
+            snapshot_conf['method'],
+            self.pg_data_path,
+            snapshot_conf['path'],
+            snapshot_conf.get('create_command'),
+            snapshot_conf.get('restore_command'),
+        )
+        self.logger.debug(f'Restoring PGDATA snapshot:\n {restore_cmd}')
+        try:
+            return await self.conn.run_command(restore_cmd, check=True)
+        except Exception as e:
+            raise RuntimeError(
+                f"Database '{self.pg_data_path}' restore error:\n{str(e)}"
+            )
+
+    async def remove_snapshot(self, snapshot_conf: dict):
+        snapshot_dir = shlex.quote(snapshot_conf['path'].rstrip('/'))
+        return await self.conn.run_command(
+            f'rm -rf {snapshot_dir}', check=False
+        )
@@ -1,5 +1,5 @@
 import asyncpg
-import time
+import asyncio
 
 
 class DBTasks:
@@ -84,6 +84,214 @@ class DBTasks:
         finally:
             await db.close()
 
+    async def get_server_version_num(self) -> int:
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the database for reading server version: {e}'
+            )
+        try:
+            return int(await db.fetchval('SHOW server_version_num'))
+        finally:
+            await db.close()
+
+    async def vacuum_db(self):
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database=self.db_conf['database'],
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the test DB for vacuuming: {e}'
+            )
+
+        self.logger.debug(
+            f"Vacuuming test DB: \"{self.db_conf['database']}\"."
+        )
+        try:
+            await db.execute('VACUUM (FREEZE, ANALYZE)')
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to vacuum test DB \"{self.db_conf['database']}\": {e}"
+            )
+        finally:
+            await db.close()
+
+    async def prewarm_db(self):
+        """
+        Loads every relation of the test database (tables, indexes,
+        materialized views and TOAST tables, the system catalogs left
+        out) into shared buffers with pg_prewarm, creating the extension
+        first. Returns the number of relations and of blocks loaded.
+        """
+        prewarm_sql = """
+            SELECT count(*) AS relations,
+                   coalesce(sum(pg_prewarm(c.oid)), 0) AS blocks
+              FROM pg_class c
+              JOIN pg_namespace n ON n.oid = c.relnamespace
+             WHERE c.relkind IN ('r', 'i', 'm', 't')
+                   AND c.relpersistence <> 't'
+                   AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+        """
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database=self.db_conf['database'],
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the test DB for prewarming: {e}'
+            )
+
+        self.logger.debug(
+            f"Prewarming test DB: \"{self.db_conf['database']}\"."
+        )
+        try:
+            await db.execute('CREATE EXTENSION IF NOT EXISTS pg_prewarm')
+            row = await db.fetchrow(prewarm_sql)
+        except Exception as e:
+            raise RuntimeError(
+                'Failed to prewarm test DB '
+                f"\"{self.db_conf['database']}\": {e}"
+            )
+        finally:
+            await db.close()
+        return row['relations'], int(row['blocks'])
+
+    async def drop_template_db(self, template_name):
+        unmark_template_sql = f"""
+            ALTER DATABASE {template_name} WITH IS_TEMPLATE false
+        """
+        drop_template_sql = f"""
+            DROP DATABASE IF EXISTS {template_name}
+        """
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                'Failed to connect to the database for dropping template '
+                f'DB: {e}'
+            )
+
+        self.logger.debug(f'Dropping template DB: "{template_name}".')
+        try:
+            exists = await db.fetchval(
+                'SELECT 1 FROM pg_database WHERE datname = $1', template_name
+            )
+            if exists:
+                await db.execute(unmark_template_sql)
+            await db.execute(drop_template_sql)
+        except Exception as e:
+            raise RuntimeError(
+                f'Failed to drop template DB "{template_name}": {e}'
+            )
+        finally:
+            await db.close()
+
+    async def create_template_db(self, template_name, strategy=None):
+        terminate_db_pid_sql = f"""
+            SELECT pg_terminate_backend(pid)
+              FROM pg_stat_activity
+             WHERE pid <> pg_backend_pid()
+                   AND datname = '{self.db_conf['database']}'
+        """
+        strategy_sql = f'STRATEGY = {strategy}' if strategy else ''
+        create_template_sql = f"""
+            CREATE DATABASE {template_name}
+                   WITH
+                   TEMPLATE = {self.db_conf['database']}
+                   {strategy_sql}
+        """
+        mark_template_sql = f"""
+            ALTER DATABASE {template_name}
+                  WITH IS_TEMPLATE true ALLOW_CONNECTIONS false
+        """
+
+        await self.drop_template_db(template_name)
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                'Failed to connect to the database for creating template '
+                f'DB: {e}'
+            )
+
+        self.logger.debug(
+            f'Creating template DB "{template_name}" from '
+            f"\"{self.db_conf['database']}\"."
+        )
+        try:
+            await db.execute(terminate_db_pid_sql)
+            await db.execute(create_template_sql)
+            await db.execute(mark_template_sql)
+        except Exception as e:
+            raise RuntimeError(
+                f'Failed to create template DB "{template_name}": {e}'
+            )
+        finally:
+            await db.close()
+
+    async def create_db_from_template(self, template_name, strategy=None):
+        strategy_sql = f'STRATEGY = {strategy}' if strategy else ''
+        clone_db_sql = f"""
+            CREATE DATABASE {self.db_conf['database']}
+                   WITH
+                   OWNER = {self.db_conf['user']}
+                   TEMPLATE = {template_name}
+                   {strategy_sql}
+        """
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the database for cloning test DB: {e}'
+            )
+
+        self.logger.debug(
+            f"Cloning test DB \"{self.db_conf['database']}\" from template "
+            f'"{template_name}".'
+        )
+        try:
+            await db.execute(clone_db_sql)
+        except Exception as e:
+            raise RuntimeError(
+                f'Error executing the query to clone the database:\n{e}'
+            )
+        finally:
+            await db.close()
+
     async def check_user_db_access(self):
         for attempt in range(1, 11):  # Adjust the number of attempts as needed
             try:
@@ -104,7 +312,7 @@ class DBTasks:
                 self.logger.warning(
                     f'Database not yet available. Attempt {attempt}/10. Error: {e}.'
                 )
-                time.sleep(1)
+                await asyncio.sleep(1)
         else:
             raise ConnectionError(
                 'Failed to connect to the database after multiple attempts.'
@@ -130,9 +338,86 @@ class DBTasks:
                 self.logger.warning(
                     f'Database not yet available. Attempt {attempt}/10. Error: {e}.'
                 )
-                time.sleep(1)
+                await asyncio.sleep(1)
         else:
             raise ConnectionError(
                 'Failed to connect to the database after multiple attempts.'
                 '\nVerify the database connection parameters.'
             )
+
+    async def get_settings(self, names):
+        """
+        Returns {name: [current value, context]} of the PostgreSQL
+        settings, the value as shown by SHOW (with its unit).
+        """
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the database for reading settings: {e}'
+            )
+        try:
+            rows = await db.fetch(
+                'SELECT name, current_setting(name) AS setting, context '
+                'FROM pg_settings WHERE name = any($1::text[])',
+                list(names),
+            )
+        except Exception as e:
+            raise RuntimeError(f'Failed to read settings: {e}')
+        finally:
+            await db.close()
+        return {row['name']: [row['setting'], row['context']] for row in rows}
+
+    async def alter_system(self, settings) -> list[str]:
+        """
+        Writes the settings to postgresql.auto.conf with ALTER SYSTEM and
+        reloads the configuration, waiting until the reload took effect.
+        A None value resets the setting. Returns the names of the settings
+        whose new value takes effect after a restart only: the server
+        compares the values itself, units included (pending_restart).
+        The names must be checked against pg_settings beforehand.
+        """
+        try:
+            db = await asyncpg.connect(
+                host=self.db_conf['host'],
+                port=self.db_conf['port'],
+                user=self.db_conf['user'],
+                database='postgres',
+                password=self.db_conf['password'],
+            )
+        except Exception as e:
+            raise ConnectionError(
+                f'Failed to connect to the database for changing settings: {e}'
+            )
+        try:
+            for name, value in settings.items():
+                if value is None:
+                    self.logger.debug(f'Resetting setting "{name}".')
+                    await db.execute(f'ALTER SYSTEM RESET {name}')
+                else:
+                    self.logger.debug(f'Setting "{name}" to "{value}".')
+                    literal = str(value).replace("'", "''")
+                    await db.execute(f"ALTER SYSTEM SET {name} = '{literal}'")
+            loaded = await db.fetchval('SELECT pg_conf_load_time()')
+            await db.execute('SELECT pg_reload_conf()')
+            # the reload is signalled, wait until this backend reloaded too
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+                if await db.fetchval('SELECT pg_conf_load_time()') != loaded:
+                    break
+            rows = await db.fetch(
+                'SELECT name FROM pg_settings '
+                'WHERE pending_restart AND name = any($1::text[])',
+                list(settings),
+            )
+        except Exception as e:
+            raise RuntimeError(f'Failed to change settings: {e}')
+        finally:
+            await db.close()
+        return [row['name'] for row in rows]
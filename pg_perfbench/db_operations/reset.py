@@ -0,0 +1,271 @@
+import time
+
+from pg_perfbench.const import (
+    CacheMode,
+    ResetStrategy,
+    CloneStrategy,
+    SnapshotMethod,
+    TEMPLATE_DB_SUFFIX,
+    CLONE_STRATEGY_MIN_VERSION_NUM,
+)
+
+
+def elapsed_since(start: float) -> float:
+    """Return seconds elapsed since a time.perf_counter() mark."""
+    return round(time.perf_counter() - start, 3)
+
+
+async def recreate_db_environment(
+    logger, db_tasks, conn_tasks, create_db=None, cold=True
+):
+    """
+    Restarts the server with cold caches and recreates the test database.
+    create_db is an optional coroutine function replacing DBTasks.init_db.
+    Without cold the server keeps running with its caches.
+    """
+    try:
+        await conn_tasks.start_db()
+    except Exception as e:
+        logger.warning(str(e))
+
+    await db_tasks.check_db_access()
+    await db_tasks.drop_db()
+    if cold:
+        await conn_tasks.stop_db()
+        await conn_tasks.sync()
+        await conn_tasks.drop_caches()
+        await conn_tasks.start_db()
+        await db_tasks.check_db_access()
+    if create_db is None:
+        await db_tasks.init_db()
+    else:
+        await create_db()
+    await db_tasks.check_user_db_access()
+
+
+class RecreateReset:
+    """
+    Default reset: drops the test database, restarts the server
+    and re-runs init_command before every iteration. The server is
+    restarted with dropped OS caches in the cold cache mode only.
+    """
+
+    strategy = ResetStrategy.RECREATE
+
+    def __init__(self, logger, db_tasks, conn_tasks, workload_conf):
+        self.logger = logger
+        self.db_tasks = db_tasks
+        self.conn_tasks = conn_tasks
+        self.workload_conf = workload_conf
+        self.cold = (
+            workload_conf.get('cache_mode', CacheMode.COLD) == CacheMode.COLD
+        )
+
+    def timings(self, dataset: str) -> dict:
+        return {
+            'strategy': str(self.strategy),
+            'dataset': dataset,
+            'reset_time': 0.0,
+            'init_time': 0.0,
+            'cache_time': 0.0,
+        }
+
+    async def initialize(self, timings, init_command, run_init):
+        start = time.perf_counter()
+        await recreate_db_environment(
+            self.logger, self.db_tasks, self.conn_tasks, cold=self.cold
+        )
+        timings['reset_time'] = elapsed_since(start)
+
+        start = time.perf_counter()
+        await run_init(init_command)
+        timings['init_time'] = elapsed_since(start)
+
+    async def reset(self, init_command: str, run_init) -> dict:
+        """
+        Prepares the dataset for the next iteration and returns timings.
+        run_init is a coroutine function executing the init command.
+        """
+        timings = self.timings('initialized')
+        await self.initialize(timings, init_command, run_init)
+        return timings
+
+    async def cleanup(self):
+        return None
+
+
+class TemplateReset(RecreateReset):
+    """
+    Dataset cache reset: the first iteration builds a vacuumed template
+    database, later iterations clone the test database from it with
+    CREATE DATABASE ... TEMPLATE. The template is rebuilt whenever the
+    init command changes.
+    """
+
+    strategy = ResetStrategy.TEMPLATE
+
+    def __init__(self, logger, db_tasks, conn_tasks, workload_conf):
+        super().__init__(logger, db_tasks, conn_tasks, workload_conf)
+        self.template_name = (
+            f"{db_tasks.db_conf['database']}{TEMPLATE_DB_SUFFIX}"
+        )
+        self.clone_strategy = workload_conf.get(
+            'template_strategy', CloneStrategy.FILE_COPY
+        )
+        self.cached_init_command = None
+
+    async def get_clone_strategy(self):
+        version_num = await self.db_tasks.get_server_version_num()
+        if version_num < CLONE_STRATEGY_MIN_VERSION_NUM:
+            self.logger.debug(
+                f'Server version {version_num} does not support '
+                f'CREATE DATABASE ... STRATEGY, using the default copy.'
+            )
+            return None
+        return str(self.clone_strategy).upper()
+
+    async def build_cache(self, timings, init_command, run_init):
+        await self.initialize(timings, init_command, run_init)
+
+        start = time.perf_counter()
+        await self.db_tasks.vacuum_db()
+        await self.db_tasks.create_template_db(
+            self.template_name, await self.get_clone_strategy()
+        )
+        timings['cache_time'] = elapsed_since(start)
+        self.cached_init_command = init_command
+        self.logger.info(f'Dataset template "{self.template_name}" built.')
+
+    async def reset(self, init_command: str, run_init) -> dict:
+        timings = self.timings('cloned')
+        if self.cached_init_command != init_command:
+            await self.build_cache(timings, init_command, run_init)
+
+        clone_strategy = await self.get_clone_strategy()
+
+        async def clone_db():
+            await self.db_tasks.create_db_from_template(
+                self.template_name, clone_strategy
+            )
+
+        start = time.perf_counter()
+        await recreate_db_environment(
+            self.logger,
+            self.db_tasks,
+            self.conn_tasks,
+            create_db=clone_db,
+            cold=self.cold,
+        )
+        timings['reset_time'] = round(
+            timings['reset_time'] + elapsed_since(start), 3
+        )
+        return timings
+
+    async def cleanup(self):
+        if self.cached_init_command is None:
+            return
+        try:
+            await self.db_tasks.drop_template_db(self.template_name)
+        except Exception as e:
+            self.logger.warning(
+                f'Failed to drop template DB "{self.template_name}": {e}'
+            )
+        self.cached_init_command = None
+
+
+class SnapshotReset(RecreateReset):
+    """
+    Physical reset: after the first initialization the stopped cluster's
+    PGDATA is snapshotted once, later iterations restore it with the
+    fastest method the host supports instead of re-running init_command.
+    The snapshot is rebuilt whenever the init command changes. The server
+    is restarted to restore PGDATA in every cache mode, the OS caches are
+    dropped in the cold one only.
+    """
+
+    strategy = ResetStrategy.SNAPSHOT
+
+    def __init__(self, logger, db_tasks, conn_tasks, workload_conf):
+        super().__init__(logger, db_tasks, conn_tasks, workload_conf)
+        self.snapshot_conf = {
+            'method': workload_conf.get(
+                'snapshot_method', SnapshotMethod.AUTO
+            ),
+            'path': workload_conf.get('snapshot_path'),
+            'create_command': workload_conf.get('snapshot_create_command'),
+            'restore_command': workload_conf.get('snapshot_restore_command'),
+        }
+        if not self.snapshot_conf['path']:
+            raise ValueError('Snapshot path is not specified.')
+        self.cached_init_command = None
+
+    async def take_snapshot(self):
+        if self.snapshot_conf['method'] != SnapshotMethod.AUTO:
+            await self.conn_tasks.snapshot_db(self.snapshot_conf)
+            return
+
+        for method in (SnapshotMethod.REFLINK, SnapshotMethod.RSYNC):
+            snapshot_conf = {**self.snapshot_conf, 'method': method}
+            try:
+                await self.conn_tasks.snapshot_db(snapshot_conf)
+            except Exception as e:
+                self.logger.info(f'Snapshot method "{method}" failed: {e}')
+                continue
+            self.snapshot_conf = snapshot_conf
+            self.logger.info(f'Snapshot method selected: {method}')
+            return
+        raise RuntimeError('No supported snapshot method found on the host.')
+
+    async def build_cache(self, timings, init_command, run_init):
+        await self.initialize(timings, init_command, run_init)
+
+        start = time.perf_counter()
+        await self.db_tasks.vacuum_db()
+        await self.conn_tasks.stop_db()
+        await self.take_snapshot()
+        timings['cache_time'] = elapsed_since(start)
+        self.cached_init_command = init_command
+        self.logger.info(
+            f'PGDATA snapshot "{self.snapshot_conf["path"]}" created.'
+        )
+
+    async def reset(self, init_command: str, run_init) -> dict:
+        timings = self.timings('restored')
+        server_running = True
+        if self.cached_init_command != init_command:
+            await self.build_cache(timings, init_command, run_init)
+            server_running = False
+
+        start = time.perf_counter()
+        if server_running:
+            await self.conn_tasks.stop_db()
+        await self.conn_tasks.restore_db(self.snapshot_conf)
+        if self.cold:
+            await self.conn_tasks.sync()
+            await self.conn_tasks.drop_caches()
+        await self.conn_tasks.start_db()
+        await self.db_tasks.check_db_access()
+        await self.db_tasks.check_user_db_access()
+        timings['reset_time'] = round(
+            timings['reset_time'] + elapsed_since(start), 3
+        )
+        return timings
+
+    async def cleanup(self):
+        if self.cached_init_command is None:
+            return
+        if self.snapshot_conf['method'] != SnapshotMethod.COMMAND:
+            try:
+                await self.conn_tasks.remove_snapshot(self.snapshot_conf)
+            except Exception as e:
+                self.logger.warning(f'Failed to remove PGDATA snapshot: {e}')
+        self.cached_init_command = None
+
+
+def get_reset_strategy(strategy):
+    if strategy == ResetStrategy.SNAPSHOT:
+        return SnapshotReset
+    if strategy == ResetStrategy.TEMPLATE:
+        return TemplateReset
+    if strategy == ResetStrategy.RECREATE:
+        return RecreateReset
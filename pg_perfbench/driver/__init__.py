@@ -0,0 +1,12 @@
+from .expressions import compile_expression
+from .scripts import BUILTIN_SCRIPTS, parse_script
+from .native import parse_native_options, run_native_workload
+
+
+__all__ = [
+    'BUILTIN_SCRIPTS',
+    'compile_expression',
+    'parse_native_options',
+    'parse_script',
+    'run_native_workload',
+]
@@ -0,0 +1,140 @@
+import ast
+import math
+import re
+from typing import Callable
+
+# pgbench variable references (:name), a double colon is a type cast
+VARIABLE_RE = re.compile(r'(?<!:):([A-Za-z_]\w*)')
+
+
+def c_div(left, right):
+    # pgbench follows C semantics: integer division truncates towards zero
+    if isinstance(left, int) and isinstance(right, int):
+        if right == 0:
+            raise ZeroDivisionError('division by zero')
+        quotient = abs(left) // abs(right)
+        return quotient if (left >= 0) == (right >= 0) else -quotient
+    return left / right
+
+
+def c_mod(left, right):
+    if not (isinstance(left, int) and isinstance(right, int)):
+        raise ValueError('% requires integer operands')
+    if right == 0:
+        raise ZeroDivisionError('division by zero')
+    return left - c_div(left, right) * right
+
+
+def random_uniform(rng, low, high):
+    return rng.randint(int(low), int(high))
+
+
+def random_exponential(rng, low, high, parameter):
+    if parameter <= 0:
+        raise ValueError('exponential parameter must be greater than zero')
+    cut = math.exp(-parameter)
+    rand = -math.log(cut + (1 - cut) * (1 - rng.random())) / parameter
+    return int(low) + int((int(high) - int(low) + 1) * rand)
+
+
+def random_gaussian(rng, low, high, parameter):
+    if parameter < 2:
+        raise ValueError('gaussian parameter must be at least 2')
+    while True:
+        stdev = rng.gauss(0, 1)
+        if -parameter <= stdev < parameter:
+            break
+    rand = (stdev + parameter) / (parameter * 2)
+    return int(low) + int((int(high) - int(low) + 1) * rand)
+
+
+# name -> (function, takes the random generator)
+FUNCTIONS: dict[str, tuple[Callable, bool]] = {
+    'abs': (abs, False),
+    'int': (int, False),
+    'double': (float, False),
+    'greatest': (max, False),
+    'least': (min, False),
+    'sqrt': (math.sqrt, False),
+    'pi': (lambda: math.pi, False),
+    'random': (random_uniform, True),
+    'random_exponential': (random_exponential, True),
+    'random_gaussian': (random_gaussian, True),
+}
+
+BINARY_OPERATORS = {
+    ast.Add: lambda left, right: left + right,
+    ast.Sub: lambda left, right: left - right,
+    ast.Mult: lambda left, right: left * right,
+    ast.Div: c_div,
+    ast.Mod: c_mod,
+}
+
+UNARY_OPERATORS = {
+    ast.USub: lambda value: -value,
+    ast.UAdd: lambda value: value,
+}
+
+
+def compile_expression(text: str):
+    """
+    Compiles a pgbench \\set expression into a function of the variables
+    dict and the random generator. Only numeric literals, variables,
+    arithmetic operators and the functions of FUNCTIONS are accepted,
+    anything else raises ValueError.
+    """
+    try:
+        tree = ast.parse(VARIABLE_RE.sub(r'\1', text.strip()), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f'Invalid expression "{text}": {e.msg}')
+    return _compile_node(tree.body, text)
+
+
+def _compile_node(node, text: str):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda variables, rng: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def get_variable(variables, rng):
+            try:
+                return variables[name]
+            except KeyError:
+                raise ValueError(f'Undefined variable "{name}" in "{text}"')
+
+        return get_variable
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        operator = BINARY_OPERATORS[type(node.op)]
+        left = _compile_node(node.left, text)
+        right = _compile_node(node.right, text)
+        return lambda variables, rng: operator(
+            left(variables, rng), right(variables, rng)
+        )
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        unary = UNARY_OPERATORS[type(node.op)]
+        operand = _compile_node(node.operand, text)
+        return lambda variables, rng: unary(operand(variables, rng))
+
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in FUNCTIONS
+        and not node.keywords
+    ):
+        function, uses_rng = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, text) for arg in node.args]
+        if uses_rng:
+            return lambda variables, rng: function(
+                rng, *(arg(variables, rng) for arg in args)
+            )
+        return lambda variables, rng: function(
+            *(arg(variables, rng) for arg in args)
+        )
+
+    raise ValueError(
+        f'Unsupported element {type(node).__name__} in expression "{text}"'
+    )
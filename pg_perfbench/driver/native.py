@@ -0,0 +1,465 @@
+import argparse
+import asyncio
+import concurrent.futures
+import math
+import multiprocessing
+import os
+import random
+import shlex
+import time
+
+import asyncpg
+
+from pg_perfbench.metrics import LatencyHistogram, get_latency_summary
+from .scripts import (
+    COMMAND_SET,
+    COMMAND_SLEEP,
+    get_builtin_script,
+    parse_script,
+    split_weight,
+    substitute_variables,
+)
+
+DEFAULT_PROGRESS_INTERVAL = 1
+DEFAULT_TRANSACTIONS = 10
+
+
+def get_options_parser() -> argparse.ArgumentParser:
+    """
+    Parser of the pgbench options understood by the native driver,
+    the workload command of the native benchmark type holds these options.
+    """
+    parser = argparse.ArgumentParser(
+        prog='native', add_help=False, exit_on_error=False
+    )
+    parser.add_argument('-c', '--client', type=int, default=1)
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('-T', '--time', type=int, default=None)
+    parser.add_argument('-t', '--transactions', type=int, default=None)
+    parser.add_argument('-f', '--file', action='append', default=[])
+    parser.add_argument('-b', '--builtin', action='append', default=[])
+    parser.add_argument('-D', '--define', action='append', default=[])
+    parser.add_argument('-s', '--scale', type=int, default=1)
+    parser.add_argument('-P', '--progress', type=int, default=None)
+    parser.add_argument('-R', '--rate', type=float, default=None)
+    parser.add_argument('-L', '--latency-limit', type=float, default=None)
+    parser.add_argument('--random-seed', type=int, default=None)
+    parser.add_argument('-h', '--host', default=None)
+    parser.add_argument('-p', '--port', default=None)
+    parser.add_argument('-U', '--username', default=None)
+    parser.add_argument('dbname', nargs='?', default=None)
+    return parser
+
+
+def parse_native_options(workload_command: str):
+    """
+    Parses the workload command of the native benchmark type.
+    Returns the options and the list of pgbench options not supported
+    by the native driver, which are ignored.
+    """
+    try:
+        options, unknown = get_options_parser().parse_known_args(
+            shlex.split(workload_command)
+        )
+    except argparse.ArgumentError as e:
+        raise ValueError(f'Invalid native workload command: {e}')
+    if options.time is not None and options.transactions is not None:
+        raise ValueError('Specify either --time or --transactions, not both')
+    if options.client < 1 or options.jobs < 1:
+        raise ValueError('Number of clients and jobs must be positive')
+    if options.rate is not None and options.rate <= 0:
+        raise ValueError('Rate must be positive')
+    if options.time is None and options.transactions is None:
+        # pgbench default
+        options.transactions = DEFAULT_TRANSACTIONS
+    if not options.file and not options.builtin:
+        raise ValueError('Specify a script with --file or --builtin')
+    return options, unknown
+
+
+def load_scripts(options) -> list[tuple[str, str, int]]:
+    """Returns (name, text, weight) of every script of the options."""
+    scripts = []
+    for builtin in options.builtin:
+        name, weight = split_weight(builtin)
+        scripts.append((name, get_builtin_script(name), weight))
+    for path in options.file:
+        path, weight = split_weight(path)
+        with open(path, 'r', encoding='utf-8') as script_file:
+            scripts.append((path, script_file.read(), weight))
+    for name, text, _ in scripts:
+        try:
+            parse_script(text)
+        except ValueError as e:
+            raise ValueError(f'Invalid script {name}: {e}')
+    if not sum(weight for *_, weight in scripts):
+        raise ValueError('Total weight of the scripts must be positive')
+    return scripts
+
+
+def get_worker_confs(options, scripts: list, db_conf: dict) -> list[dict]:
+    """
+    Splits the clients between the jobs (worker processes) as pgbench
+    splits them between threads: contiguous ranges of client ids.
+    """
+    jobs = min(options.jobs, options.client)
+    variables = {'scale': options.scale}
+    for define in options.define:
+        name, _, value = define.partition('=')
+        try:
+            variables[name] = int(value)
+        except ValueError:
+            try:
+                variables[name] = float(value)
+            except ValueError:
+                variables[name] = value
+
+    connect_params = {
+        'host': options.host or db_conf.get('host'),
+        'port': options.port or db_conf.get('port'),
+        'user': options.username or db_conf.get('user'),
+        'database': options.dbname or db_conf.get('database'),
+        'password': db_conf.get('password'),
+    }
+    # every client follows its share of the target rate
+    client_rate = options.rate / options.client if options.rate else None
+    confs = []
+    first_client = 0
+    for job in range(jobs):
+        clients = options.client // jobs + (
+            1 if job < options.client % jobs else 0
+        )
+        confs.append(
+            {
+                'job': job,
+                'client_ids': list(
+                    range(first_client, first_client + clients)
+                ),
+                'connect_params': connect_params,
+                'scripts': [(text, weight) for _, text, weight in scripts],
+                'variables': variables,
+                'time': options.time,
+                'transactions': options.transactions,
+                'progress': options.progress or DEFAULT_PROGRESS_INTERVAL,
+                'rate': client_rate,
+                'latency_limit': (
+                    options.latency_limit / 1000
+                    if options.latency_limit
+                    else None
+                ),
+                'random_seed': options.random_seed,
+            }
+        )
+        first_client += clients
+    return confs
+
+
+def set_cpu_affinity(cpu_set: list[int] | None) -> None:
+    """Worker process initializer: pins the process to cpu_set."""
+    if cpu_set:
+        os.sched_setaffinity(0, cpu_set)
+
+
+def run_worker(worker_conf: dict) -> dict:
+    """Worker process entry point: runs the sessions of one job."""
+    return asyncio.run(run_sessions(worker_conf))
+
+
+async def run_sessions(worker_conf: dict) -> dict:
+    scripts = [parse_script(text) for text, _ in worker_conf['scripts']]
+    weights = [weight for _, weight in worker_conf['scripts']]
+    stats: dict = {
+        'transactions': 0,
+        'failed': 0,
+        'skipped': 0,
+        'late': 0,
+        'lag_sum': 0.0,
+        'lag_max': 0.0,
+        'histogram': LatencyHistogram(),
+        # interval -> [transactions, latency sum, latency sum of squares,
+        #              schedule lag sum]
+        'intervals': {},
+    }
+
+    conn_start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            asyncpg.connect(**worker_conf['connect_params'])
+            for _ in worker_conf['client_ids']
+        ),
+        return_exceptions=True,
+    )
+    connections = [
+        conn for conn in results if not isinstance(conn, BaseException)
+    ]
+    errors = [error for error in results if isinstance(error, BaseException)]
+    if errors:
+        # a refused client must not leave the other sessions open
+        await asyncio.gather(*(conn.close() for conn in connections))
+        raise errors[0]
+    conn_time = time.perf_counter() - conn_start
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                run_client(
+                    conn,
+                    client_id,
+                    scripts,
+                    weights,
+                    worker_conf,
+                    stats,
+                    started,
+                )
+                for conn, client_id in zip(
+                    connections, worker_conf['client_ids']
+                )
+            )
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
+
+    return {
+        **stats,
+        'elapsed': elapsed,
+        'conn_time': conn_time,
+        'histogram': stats['histogram'].to_dict(),
+    }
+
+
+async def run_client(
+    conn, client_id, scripts, weights, worker_conf, stats, started
+) -> None:
+    seed = worker_conf['random_seed']
+    rng = random.Random(None if seed is None else f'{seed}-{client_id}')
+    variables = {**worker_conf['variables'], 'client_id': client_id}
+    deadline = started + worker_conf['time'] if worker_conf['time'] else None
+    transactions = worker_conf['transactions']
+    interval = worker_conf['progress']
+    rate = worker_conf['rate']
+    limit = worker_conf['latency_limit']
+    scheduled = started
+    done = 0
+
+    while True:
+        if transactions is not None and done >= transactions:
+            break
+        if rate:
+            # open loop: Poisson arrivals independent of the responses
+            scheduled += rng.expovariate(rate)
+            if deadline is not None and scheduled >= deadline:
+                break
+            now = time.perf_counter()
+            if scheduled > now:
+                await asyncio.sleep(scheduled - now)
+            elif limit is not None and now - scheduled > limit:
+                # the transaction would be late before it starts
+                stats['skipped'] += 1
+                done += 1
+                continue
+        elif deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        script = rng.choices(scripts, weights)[0]
+        start = time.perf_counter()
+        if not rate:
+            scheduled = start
+        try:
+            await run_script(conn, script, variables, rng)
+        except asyncpg.PostgresError:
+            # serialization failures and deadlocks do not stop the client
+            stats['failed'] += 1
+            if conn.is_in_transaction():
+                await conn.execute('ROLLBACK')
+            done += 1
+            continue
+        end = time.perf_counter()
+        done += 1
+
+        # latency counts from the scheduled start (coordinated omission)
+        latency = (end - scheduled) * 1e6
+        lag = (start - scheduled) * 1e6
+        stats['transactions'] += 1
+        stats['histogram'].add(latency)
+        stats['lag_sum'] += lag
+        stats['lag_max'] = max(stats['lag_max'], lag)
+        if limit is not None and end - scheduled > limit:
+            stats['late'] += 1
+        counters = stats['intervals'].setdefault(
+            int((end - started) // interval), [0, 0.0, 0.0, 0.0]
+        )
+        counters[0] += 1
+        counters[1] += latency
+        counters[2] += latency * latency
+        counters[3] += lag
+
+
+async def run_script(conn, script: list, variables: dict, rng) -> None:
+    for command in script:
+        if command[0] == COMMAND_SET:
+            variables[command[1]] = command[2](variables, rng)
+        elif command[0] == COMMAND_SLEEP:
+            await asyncio.sleep(command[1](variables, rng) * command[2])
+        else:
+            await conn.execute(substitute_variables(command[1], variables))
+
+
+def get_progress(
+    worker_results: list[dict], interval: int, rate: float | None = None
+) -> list[list]:
+    """
+    Merges the per-interval counters of the workers into the pgbench
+    --progress series: [time, tps, latency_avg, latency_stddev, lag].
+    The schedule lag is reported for rate-limited runs only.
+    """
+    merged: dict[int, list] = {}
+    for result in worker_results:
+        for idx, counters in result['intervals'].items():
+            total = merged.setdefault(int(idx), [0, 0.0, 0.0, 0.0])
+            for pos, value in enumerate(counters):
+                total[pos] += value
+
+    progress = []
+    for idx in sorted(merged):
+        count, latency_sum, latency_sq_sum, lag_sum = merged[idx]
+        mean = latency_sum / count
+        variance = max(latency_sq_sum / count - mean * mean, 0.0)
+        progress.append(
+            [
+                float((idx + 1) * interval),
+                round(count / interval, 1),
+                round(mean / 1000, 3),
+                round(math.sqrt(variance) / 1000, 3),
+                round(lag_sum / count / 1000, 3) if rate else None,
+            ]
+        )
+    return progress
+
+
+def get_native_results(options, worker_results: list[dict]) -> list:
+    """
+    Builds the metrics list of BenchmarkRunner.get_pgbench_results:
+    [clients, duration, transactions, latency_avg, init_conn_time, tps].
+    """
+    transactions = sum(result['transactions'] for result in worker_results)
+    latency_sum = sum(
+        result['histogram']['total'] for result in worker_results
+    )
+    tps = sum(
+        result['transactions'] / result['elapsed']
+        for result in worker_results
+        if result['elapsed'] > 0
+    )
+    conn_time = sum(result['conn_time'] for result in worker_results) / len(
+        worker_results
+    )
+    return [
+        options.client,
+        options.time,
+        transactions,
+        round(latency_sum / transactions / 1000, 3) if transactions else None,
+        round(conn_time * 1000, 3),
+        round(tps, 6),
+    ]
+
+
+def get_native_rate_results(
+    options, worker_results: list[dict]
+) -> dict | None:
+    """
+    Builds the rate results of BenchmarkRunner.get_pgbench_rate_results
+    for a rate-limited or latency-limited run, None otherwise.
+    """
+    if not options.rate and not options.latency_limit:
+        return None
+    transactions = sum(result['transactions'] for result in worker_results)
+    lag_sum = sum(result['lag_sum'] for result in worker_results)
+    lag_max = max(result['lag_max'] for result in worker_results)
+    rate_limited = options.rate and transactions
+    return {
+        'target_rate': options.rate,
+        'lag_avg': round(lag_sum / transactions / 1000, 3)
+        if rate_limited
+        else None,
+        'lag_max': round(lag_max / 1000, 3) if rate_limited else None,
+        'skipped': sum(result['skipped'] for result in worker_results),
+        'late': sum(result['late'] for result in worker_results),
+    }
+
+
+async def run_native_workload(
+    logger,
+    workload_command: str,
+    db_conf: dict,
+    cpu_set: list[int] | None = None,
+) -> dict:
+    """
+    Runs the workload command of the native benchmark type: the scripts
+    are executed with asyncpg by one process per job, each running
+    the sessions of its clients concurrently. Returns the parsed
+    metrics ('result'), the progress series ('progress') and the latency
+    summary of all transactions ('latency'). The worker processes
+    are pinned to the CPUs of cpu_set when it is given.
+    """
+    options, unknown = parse_native_options(workload_command)
+    if unknown:
+        logger.warning(
+            f'Options not supported by the native driver are ignored: '
+            f'{" ".join(unknown)}'
+        )
+    scripts = load_scripts(options)
+    worker_confs = get_worker_confs(options, scripts, db_conf)
+
+    logger.info(
+        f'Running native workload: {options.client} clients, '
+        f'{len(worker_confs)} jobs, scripts: '
+        f'{", ".join(f"{name}@{weight}" for name, _, weight in scripts)}'
+    )
+    loop = asyncio.get_running_loop()
+    # spawn: the parent holds threads and connections that must not be forked
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=len(worker_confs),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=set_cpu_affinity,
+        initargs=(cpu_set,),
+    )
+    try:
+        worker_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, run_worker, conf)
+                for conf in worker_confs
+            )
+        )
+    except Exception as e:
+        raise RuntimeError(f'Native workload failed: {e}')
+    finally:
+        # waiting for the workers to exit must not block the event loop,
+        # other targets may be running in it
+        await asyncio.to_thread(
+            executor.shutdown, wait=True, cancel_futures=True
+        )
+
+    histogram = LatencyHistogram()
+    for result in worker_results:
+        histogram.merge(LatencyHistogram.from_dict(result['histogram']))
+    counters = {
+        key: sum(result[key] for result in worker_results)
+        for key in ('skipped', 'failed')
+    }
+    result = get_native_results(options, worker_results)
+    logger.info(
+        f'Native workload finished: {result[2]} transactions, '
+        f'{result[5]} tps, {counters["failed"]} failed.'
+    )
+    return {
+        'result': result,
+        'progress': (
+            get_progress(worker_results, options.progress, options.rate)
+            if options.progress
+            else []
+        ),
+        'latency': get_latency_summary(histogram, counters),
+        'rate': get_native_rate_results(options, worker_results),
+    }
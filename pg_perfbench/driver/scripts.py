@@ -0,0 +1,124 @@
+import re
+
+from .expressions import VARIABLE_RE, compile_expression
+
+# Scripts of pgbench --builtin
+BUILTIN_SCRIPTS = {
+    'tpcb-like': """
+\\set aid random(1, 100000 * :scale)
+\\set bid random(1, 1 * :scale)
+\\set tid random(1, 10 * :scale)
+\\set delta random(-5000, 5000)
+BEGIN;
+UPDATE pgbench_accounts SET abalance = abalance + :delta WHERE aid = :aid;
+SELECT abalance FROM pgbench_accounts WHERE aid = :aid;
+UPDATE pgbench_tellers SET tbalance = tbalance + :delta WHERE tid = :tid;
+UPDATE pgbench_branches SET bbalance = bbalance + :delta WHERE bid = :bid;
+INSERT INTO pgbench_history (tid, bid, aid, delta, mtime)
+    VALUES (:tid, :bid, :aid, :delta, CURRENT_TIMESTAMP);
+END;
+""",
+    'simple-update': """
+\\set aid random(1, 100000 * :scale)
+\\set bid random(1, 1 * :scale)
+\\set tid random(1, 10 * :scale)
+\\set delta random(-5000, 5000)
+BEGIN;
+UPDATE pgbench_accounts SET abalance = abalance + :delta WHERE aid = :aid;
+SELECT abalance FROM pgbench_accounts WHERE aid = :aid;
+INSERT INTO pgbench_history (tid, bid, aid, delta, mtime)
+    VALUES (:tid, :bid, :aid, :delta, CURRENT_TIMESTAMP);
+END;
+""",
+    'select-only': """
+\\set aid random(1, 100000 * :scale)
+SELECT abalance FROM pgbench_accounts WHERE aid = :aid;
+""",
+}
+
+SLEEP_UNITS = {'us': 1e-6, 'ms': 1e-3, 's': 1.0}
+WEIGHT_RE = re.compile(r'^(.*)@(\d+)$')
+
+# Script commands
+COMMAND_SQL = 'sql'
+COMMAND_SET = 'set'
+COMMAND_SLEEP = 'sleep'
+
+
+def split_weight(name: str) -> tuple[str, int]:
+    """Splits the pgbench 'script@weight' notation, the weight is 1 by default."""
+    match = WEIGHT_RE.match(name)
+    if not match:
+        return name, 1
+    return match.group(1), int(match.group(2))
+
+
+def get_builtin_script(name: str) -> str:
+    # pgbench accepts any unambiguous prefix of a builtin name
+    matches = [
+        builtin for builtin in BUILTIN_SCRIPTS if builtin.startswith(name)
+    ]
+    if len(matches) != 1:
+        raise ValueError(
+            f'Unknown builtin script "{name}", '
+            f'available: {", ".join(BUILTIN_SCRIPTS)}'
+        )
+    return BUILTIN_SCRIPTS[matches[0]]
+
+
+def parse_script(text: str) -> list[tuple]:
+    """
+    Parses a pgbench script into a list of commands:
+    ('sql', statement), ('set', variable, expression function)
+    and ('sleep', duration function, unit seconds). SQL statements
+    end with a semicolon at the end of a line.
+    """
+    commands = []
+    statement: list[str] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not statement and (not stripped or stripped.startswith('--')):
+            continue
+
+        if not statement and stripped.startswith('\\'):
+            commands.append(parse_meta_command(stripped))
+            continue
+
+        statement.append(line)
+        if stripped.endswith(';'):
+            commands.append((COMMAND_SQL, '\n'.join(statement).strip()))
+            statement = []
+
+    if statement:
+        # the last statement may omit the semicolon
+        commands.append((COMMAND_SQL, '\n'.join(statement).strip()))
+    if not any(command[0] == COMMAND_SQL for command in commands):
+        raise ValueError('Script contains no SQL commands')
+    return commands
+
+
+def parse_meta_command(line: str) -> tuple:
+    name, _, rest = line[1:].partition(' ')
+    rest = rest.strip()
+    if name == 'set':
+        variable, _, expression = rest.partition(' ')
+        if not variable or not expression.strip():
+            raise ValueError(f'Invalid \\set command: {line}')
+        return COMMAND_SET, variable, compile_expression(expression)
+    if name == 'sleep':
+        value, _, unit = rest.partition(' ')
+        unit = unit.strip() or 's'
+        if not value or unit not in SLEEP_UNITS:
+            raise ValueError(f'Invalid \\sleep command: {line}')
+        return COMMAND_SLEEP, compile_expression(value), SLEEP_UNITS[unit]
+    raise ValueError(f'Unsupported meta command: {line}')
+
+
+def substitute_variables(statement: str, variables: dict) -> str:
+    """Replaces :name references by the variable values, as pgbench -M simple."""
+    return VARIABLE_RE.sub(
+        lambda match: str(variables[match.group(1)])
+        if match.group(1) in variables
+        else match.group(0),
+        statement,
+    )
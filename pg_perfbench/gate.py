@@ -0,0 +1,251 @@
+import json
+import os
+import statistics
+
+from pg_perfbench.log import format_table
+from pg_perfbench.metrics import mann_whitney_u
+
+DEFAULT_TPS_TOLERANCE = 5.0
+DEFAULT_LATENCY_TOLERANCE = 10.0
+DEFAULT_GATE_ALPHA = 0.05
+# Exit code of the gate mode when a sweep point regressed
+REGRESSION_EXIT_CODE = 3
+
+GATE_THEADER = [
+    'point',
+    'metric',
+    'samples',
+    'baseline',
+    'current',
+    'change, %',
+    'p-value',
+    'verdict',
+]
+
+# Columns of tps and latency average in the result tables of a report,
+# the rows of the repeated runs and the progress reports are prefixed by
+# the run, iteration and repetition numbers
+SAMPLE_SOURCES = {
+    'pgbench_runs': (8, 6),
+    'pgbench_progress': (3, 4),
+    'pgbench_outputs': (5, 3),
+}
+
+
+class RegressionGate:
+    """
+    A stateless utility class comparing the sweep points of a benchmark
+    report against a baseline report: the tps and latency samples of
+    every point are compared with the Mann-Whitney U test, a point
+    regressed when a metric got worse by more than its tolerance and the
+    difference is significant.
+    """
+
+    @staticmethod
+    def load_report(logger, path: str) -> dict | None:
+        if not os.path.isfile(path):
+            logger.error(f'Report not found: {path}')
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f'Cannot load {path}: {e}')
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def get_result_rows(report: dict, name: str) -> list:
+        data = (
+            report.get('sections', {})
+            .get('result', {})
+            .get('reports', {})
+            .get(name, {})
+            .get('data')
+        )
+        return data if isinstance(data, list) else []
+
+    @staticmethod
+    def get_point_samples(report: dict) -> dict:
+        """
+        Collects the samples of every sweep point of a report by their
+        source: {iteration: {source: [[tps, latency average], ...]}}.
+        The sources are the repeated runs, the progress reports and the
+        single result of the iteration.
+        """
+        points = {}
+        outputs = RegressionGate.get_result_rows(report, 'pgbench_outputs')
+        for idx, row in enumerate(outputs, start=1):
+            points[idx] = {'clients': row[0] if row else None}
+
+        for source, (tps_idx, latency_idx) in SAMPLE_SOURCES.items():
+            for idx, row in enumerate(
+                RegressionGate.get_result_rows(report, source), start=1
+            ):
+                if len(row) <= max(tps_idx, latency_idx):
+                    continue
+                if source == 'pgbench_runs':
+                    iteration = row[1]
+                elif source == 'pgbench_progress':
+                    iteration = row[0]
+                else:
+                    iteration = idx
+                if iteration not in points:
+                    continue
+                points[iteration].setdefault(source, []).append(
+                    [row[tps_idx], row[latency_idx]]
+                )
+        return points
+
+    @staticmethod
+    def get_point_label(iteration: int, point: dict) -> str:
+        if point.get('clients') is None:
+            return f'iteration {iteration}'
+        return f'iteration {iteration} (clients={point["clients"]})'
+
+    @staticmethod
+    def compare_samples(
+        baseline: list,
+        current: list,
+        higher_is_better: bool,
+        tolerance: float,
+        alpha: float,
+    ) -> list:
+        """
+        Compares the medians of the samples, returns the sample counts,
+        the medians, the change in percent, the p-value (None without
+        two samples on each side, then the tolerance alone decides) and
+        the verdict. Samples missing from the current report only are
+        a regression.
+        """
+        baseline = [value for value in baseline if value is not None]
+        current = [value for value in current if value is not None]
+        if not baseline:
+            return [None] * 5 + ['no data']
+        if not current:
+            return [None] * 5 + ['missing']
+        base_median = statistics.median(baseline)
+        current_median = statistics.median(current)
+        change = (
+            100 * (current_median - base_median) / base_median
+            if base_median
+            else 0.0
+        )
+        p_value = None
+        if len(baseline) > 1 and len(current) > 1:
+            test = mann_whitney_u(current, baseline)
+            p_value = test[1] if test else None
+        worse = -change if higher_is_better else change
+        significant = p_value is None or p_value < alpha
+        if worse > tolerance and significant:
+            verdict = 'regression'
+        elif -worse > tolerance and significant:
+            verdict = 'improvement'
+        else:
+            verdict = 'ok'
+        return [
+            f'{len(baseline)}/{len(current)}',
+            round(base_median, 3),
+            round(current_median, 3),
+            round(change, 2),
+            None if p_value is None else round(p_value, 4),
+            verdict,
+        ]
+
+    @staticmethod
+    def compare_reports(
+        baseline: dict,
+        current: dict,
+        tps_tolerance: float = DEFAULT_TPS_TOLERANCE,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+        alpha: float = DEFAULT_GATE_ALPHA,
+    ) -> list[list]:
+        """
+        Returns a verdict row of the tps and of the latency average of
+        every sweep point (GATE_THEADER). The samples of a point come
+        from the richest source both reports have: the repeated runs,
+        else the progress reports, else the single results. A point of
+        the baseline missing from the current report, or run with other
+        clients, is a regression as well.
+        """
+        baseline_points = RegressionGate.get_point_samples(baseline)
+        current_points = RegressionGate.get_point_samples(current)
+        rows = []
+        for iteration, base_point in baseline_points.items():
+            label = RegressionGate.get_point_label(iteration, base_point)
+            point = current_points.get(iteration)
+            if point is None or point.get('clients') != base_point.get(
+                'clients'
+            ):
+                rows.append([label] + [None] * 6 + ['missing'])
+                continue
+            source = next(
+                (
+                    source
+                    for source in SAMPLE_SOURCES
+                    if base_point.get(source) and point.get(source)
+                ),
+                None,
+            )
+            for idx, (metric, higher_is_better, tolerance) in enumerate(
+                (
+                    ('tps', True, tps_tolerance),
+                    ('latency average, ms', False, latency_tolerance),
+                )
+            ):
+                rows.append(
+                    [label, metric]
+                    + RegressionGate.compare_samples(
+                        [sample[idx] for sample in base_point.get(source, [])],
+                        [sample[idx] for sample in point.get(source, [])],
+                        higher_is_better,
+                        tolerance,
+                        alpha,
+                    )
+                )
+        return rows
+
+    @staticmethod
+    def format_table(rows: list[list]) -> str:
+        return format_table(GATE_THEADER, rows)
+
+    @staticmethod
+    def run_gate(
+        logger,
+        baseline_report: str,
+        current: dict,
+        tps_tolerance: float,
+        latency_tolerance: float,
+        alpha: float,
+    ) -> bool:
+        """
+        Compares the current report against the baseline report file,
+        prints the verdict table and returns whether a point regressed.
+        """
+        baseline = RegressionGate.load_report(logger, baseline_report)
+        if baseline is None:
+            raise ValueError(f'Invalid baseline report: {baseline_report}')
+        rows = RegressionGate.compare_reports(
+            baseline, current, tps_tolerance, latency_tolerance, alpha
+        )
+        if not rows:
+            raise ValueError(
+                f'No benchmark results in the baseline: {baseline_report}'
+            )
+        logger.info(
+            f'Regression gate against {baseline.get("report_name")} '
+            f'(tps tolerance {tps_tolerance}%, latency tolerance '
+            f'{latency_tolerance}%, alpha {alpha}):\n'
+            + RegressionGate.format_table(rows)
+        )
+        regressions = [
+            row for row in rows if row[-1] in {'regression', 'missing'}
+        ]
+        if regressions:
+            logger.error(
+                f'Performance regression in {len(regressions)} of the '
+                f'compared metrics.'
+            )
+            return True
+        logger.info('No performance regression.')
+        return False
@@ -8,6 +8,7 @@ from pg_perfbench.const import (
     get_datetime_report,
 )
 from pg_perfbench.log import display_user_configuration
+from pg_perfbench.report.commands import STATEMENTS_THEADER
 from pg_perfbench.report.processing import parse_json_in_order
 
 # JOIN_TASKS_PATH is the folder that contains join task configuration files.
@@ -225,6 +226,91 @@ class ReportJoiner:
                 [inc.get('report_name', 'Unnamed'), inc_logs['data']]
             )
 
+    @staticmethod
+    def join_statements(base: dict, reports: list[dict]) -> None:
+        """
+        Lines up the top statements tables of the reports: one table per
+        iteration with a row of every statement in every report and the
+        change of its mean time against the reference report.
+        """
+        tables = []
+        for report in reports:
+            data = (
+                report.get('sections', {})
+                .get('result', {})
+                .get('reports', {})
+                .get('pg_statements', {})
+                .get('data')
+            )
+            tables.append(
+                {label: rows for label, rows in data}
+                if isinstance(data, list)
+                else {}
+            )
+        if not any(tables):
+            return
+
+        labels = []
+        for table in tables:
+            labels += [label for label in table if label not in labels]
+        mean_idx = STATEMENTS_THEADER.index('mean time, ms')
+        data = []
+        for label in labels:
+            queries = []
+            for table in tables:
+                queries += [
+                    row[0]
+                    for row in table.get(label, [])
+                    if row[0] not in queries
+                ]
+            rows = []
+            for query in queries:
+                by_report = [
+                    next(
+                        (
+                            row
+                            for row in table.get(label, [])
+                            if row[0] == query
+                        ),
+                        None,
+                    )
+                    for table in tables
+                ]
+                ref_mean = by_report[0] and by_report[0][mean_idx]
+                for report, row in zip(reports, by_report):
+                    if row is None:
+                        continue
+                    change = (
+                        round(100 * (row[mean_idx] - ref_mean) / ref_mean, 2)
+                        if ref_mean and row[mean_idx] is not None
+                        else None
+                    )
+                    rows.append(
+                        [query, report.get('report_name', 'Unnamed')]
+                        + row[1:]
+                        + [change]
+                    )
+            data.append([label, rows])
+
+        base_reports = base['sections']['result']['reports']
+        item = base_reports.setdefault(
+            'pg_statements',
+            {
+                'header': 'top statements',
+                'item_type': 'table',
+                'python_command': '',
+            },
+        )
+        item.update(
+            {
+                'state': 'collapsed',
+                'theader': [STATEMENTS_THEADER[0], 'report']
+                + STATEMENTS_THEADER[1:]
+                + ['mean time vs reference, %'],
+                'data': data,
+            }
+        )
+
     @staticmethod
     def merge_reports(
         logger, names: list[str], reports: list[dict], compare_items: list[str]
@@ -273,6 +359,7 @@ class ReportJoiner:
                 logger.error(f'Comparison failed: {ve}')
                 return None
             ReportJoiner.add_result(ref, r)
+        ReportJoiner.join_statements(ref, reports)
 
         ref[
             'header'
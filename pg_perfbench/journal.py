@@ -0,0 +1,158 @@
+import json
+import os
+import time
+
+from pg_perfbench.const import REPORT_FOLDER, JOURNAL_FILE_SUFFIX
+
+# workload settings that must not change between a run and its resume
+JOURNAL_CONFIG_KEYS = (
+    'benchmark_type',
+    'init_command',
+    'workload_command',
+    'pgbench_sweep',
+    'pg_settings_sweep',
+    'tune_settings',
+    'tune_latency_p99',
+    'tune_budget',
+    'tune_seed',
+    'repetitions',
+    'cache_mode',
+    'warmup_time',
+    'knee_search',
+    'pgbench_progress',
+    'pgbench_latency_log',
+    'pgbench_latency_limit',
+    'steady_state',
+)
+
+# Journal events
+EVENT_START = 'start'
+EVENT_PHASE = 'phase'
+EVENT_RUN = 'run'
+EVENT_ERROR = 'error'
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of a benchmark: every phase and every
+    completed run is written as one line and synced to disk at once,
+    so that an interrupted sweep can be resumed from the journal.
+    Runs are identified by their load commands and repetition number.
+    """
+
+    def __init__(self, path: str, logger):
+        self.path = path
+        self.logger = logger
+        self.completed: dict[str, dict] = {}
+
+    @staticmethod
+    def get_journal_path(report_name: str) -> str:
+        return str(REPORT_FOLDER / f'{report_name}{JOURNAL_FILE_SUFFIX}')
+
+    @staticmethod
+    def get_config(db_conf: dict, workload_conf: dict) -> dict:
+        """Returns the settings a resumed benchmark must share."""
+        config = {key: workload_conf.get(key) for key in JOURNAL_CONFIG_KEYS}
+        config['db'] = {
+            key: db_conf.get(key) for key in ('host', 'port', 'database')
+        }
+        # compare the values as they are read back from the journal
+        return json.loads(json.dumps(config))
+
+    @staticmethod
+    def get_run_key(load_iteration: list[str], repetition: int) -> str:
+        return json.dumps([*load_iteration, repetition])
+
+    def read(self) -> list[dict]:
+        """
+        Reads the journal records. A line cut by a crash while it was
+        written can only be the last one and is skipped.
+        """
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self.logger.warning(
+                        f'Skipping incomplete journal line {line_number}.'
+                    )
+        return records
+
+    def read_config(self) -> dict | None:
+        """Returns the configuration of an existing journal."""
+        if not os.path.isfile(self.path):
+            return None
+        records = self.read()
+        if not records or records[0].get('event') != EVENT_START:
+            return None
+        return records[0].get('config')
+
+    def start(self, config: dict, resume: bool = False) -> None:
+        """
+        Starts a new journal, or with resume reloads the completed runs
+        of the existing one, which must have been written for config.
+        """
+        if not resume:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8'):
+                pass
+            self.write(EVENT_START, config=config)
+            return
+
+        if not os.path.isfile(self.path):
+            raise ValueError(f'Journal to resume not found: {self.path}')
+        records = self.read()
+        if not records or records[0].get('event') != EVENT_START:
+            raise ValueError(f'Invalid journal: {self.path}')
+        if records[0].get('config') != config:
+            raise ValueError(
+                f'Journal {self.path} was written for a different '
+                f'benchmark configuration'
+            )
+        self.truncate_incomplete_line()
+        for record in records:
+            if record.get('event') == EVENT_RUN:
+                self.completed[record['key']] = record['run']
+        self.logger.info(
+            f'Resuming from journal {self.path}: '
+            f'{len(self.completed)} completed runs.'
+        )
+        self.write(EVENT_START, config=config, resume=True)
+
+    def truncate_incomplete_line(self) -> None:
+        # the records appended on resume must start on a new line
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            if content and not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+
+    def write(self, event: str, **data) -> None:
+        record = {'event': event, 'time': round(time.time(), 3), **data}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def phase(self, name: str) -> None:
+        self.write(EVENT_PHASE, phase=name)
+
+    def error(self, message: str) -> None:
+        self.write(EVENT_ERROR, message=message)
+
+    def add_run(
+        self, load_iteration: list[str], repetition: int, run: dict
+    ) -> None:
+        self.write(
+            EVENT_RUN,
+            key=self.get_run_key(load_iteration, repetition),
+            run=run,
+        )
+
+    def get_run(
+        self, load_iteration: list[str], repetition: int
+    ) -> dict | None:
+        """Returns the journaled results of a completed run."""
+        return self.completed.get(self.get_run_key(load_iteration, repetition))
@@ -19,6 +19,22 @@ def display_user_configuration(raw_args, logger):
     logger.info('\n'.join(message_lines))
 
 
+def format_table(theader: list[str], rows: list[list]) -> str:
+    # a fixed-width text table, missing values shown as '-'
+    table = [theader] + [
+        ['-' if value is None else str(value) for value in row] for row in rows
+    ]
+    widths = [
+        max(len(row[idx]) for row in table) for idx in range(len(theader))
+    ]
+    lines = [
+        '  '.join(value.ljust(width) for value, width in zip(row, widths))
+        for row in table
+    ]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(line.rstrip() for line in lines)
+
+
 def setup_logger(raw_log_level, arg_clear_logs=False):
     # optional clearing of old logs
     if arg_clear_logs:
@@ -0,0 +1,98 @@
+from .histogram import (
+    LatencyHistogram,
+    LATENCY_PERCENTILES,
+    read_pgbench_log,
+    get_pgbench_log_files,
+    get_latency_summary,
+    merge_latency_summaries,
+)
+from .stats import (
+    get_mean,
+    get_summary_stats,
+    t_critical_95,
+    mann_whitney_u,
+)
+from .steady_state import SteadyStateDetector
+from .pg_stats import (
+    PG_STATS_FIELDS,
+    get_pg_stats_snapshot,
+    get_pg_stats_delta,
+    get_pg_stats_ratios,
+    merge_pg_stats,
+    DEFAULT_TOP_STATEMENTS,
+    PG_STAT_STATEMENTS_FIELDS,
+    reset_pg_stat_statements,
+    get_top_statements,
+    merge_statements,
+)
+from .os_stats import (
+    OS_STATS_FIELDS,
+    OSSampler,
+    parse_os_sample,
+    get_os_series,
+)
+from .sampler import SAMPLER_APPLICATION_NAME, PollingSampler
+from .wait_events import (
+    WaitEventSampler,
+    merge_wait_events,
+    get_active_sessions,
+)
+from .locks import LockSampler, merge_locks, get_chain_depth
+from .profile import DEFAULT_PROFILE_FREQUENCY, Profiler, StackFolder
+from .client import (
+    CLIENT_SATURATION_LIMIT,
+    get_client_times_script,
+    get_client_cpu_times,
+    get_progress_transactions,
+    get_client_summary,
+    merge_client_stats,
+)
+from .cache import get_cache_summary, merge_cache_stats
+
+
+__all__ = [
+    'LatencyHistogram',
+    'LATENCY_PERCENTILES',
+    'read_pgbench_log',
+    'get_pgbench_log_files',
+    'get_latency_summary',
+    'merge_latency_summaries',
+    'get_mean',
+    'get_summary_stats',
+    't_critical_95',
+    'mann_whitney_u',
+    'SteadyStateDetector',
+    'PG_STATS_FIELDS',
+    'get_pg_stats_snapshot',
+    'get_pg_stats_delta',
+    'get_pg_stats_ratios',
+    'merge_pg_stats',
+    'DEFAULT_TOP_STATEMENTS',
+    'PG_STAT_STATEMENTS_FIELDS',
+    'reset_pg_stat_statements',
+    'get_top_statements',
+    'merge_statements',
+    'OS_STATS_FIELDS',
+    'OSSampler',
+    'parse_os_sample',
+    'get_os_series',
+    'SAMPLER_APPLICATION_NAME',
+    'PollingSampler',
+    'WaitEventSampler',
+    'merge_wait_events',
+    'get_active_sessions',
+    'LockSampler',
+    'merge_locks',
+    'get_chain_depth',
+    'DEFAULT_PROFILE_FREQUENCY',
+    'Profiler',
+    'StackFolder',
+    'CLIENT_SATURATION_LIMIT',
+    'get_client_times_script',
+    'get_client_cpu_times',
+    'get_progress_transactions',
+    'get_client_summary',
+    'merge_client_stats',
+    'get_cache_summary',
+    'merge_cache_stats',
+]
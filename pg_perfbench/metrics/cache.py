@@ -0,0 +1,39 @@
+from .pg_stats import get_pg_stats_ratios
+from .stats import get_mean
+
+
+def get_cache_summary(
+    mode: str,
+    warmup_time: float | None = None,
+    prime_time: float | None = None,
+    primed: tuple[int, int] | None = None,
+    pg_stats: dict | None = None,
+) -> dict:
+    """
+    Describes the cache state a run was measured in: the cache mode, the
+    seconds of the discarded warm-up run or of the priming with the
+    relations and blocks loaded, and the buffer cache hit ratio (%) the
+    run reached.
+    """
+    relations, blocks = primed or (None, None)
+    return {
+        'mode': mode,
+        'warmup_time': warmup_time,
+        'prime_time': prime_time,
+        'relations': relations,
+        'blocks': blocks,
+        'hit_ratio': get_pg_stats_ratios(pg_stats)['cache_hit_ratio'],
+    }
+
+
+def merge_cache_stats(summaries: list) -> dict | None:
+    """Averages the cache state of repeated runs."""
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        return None
+    merged = {'mode': summaries[0]['mode']}
+    for key in ('warmup_time', 'prime_time', 'blocks', 'hit_ratio'):
+        mean = get_mean([summary.get(key) for summary in summaries])
+        merged[key] = None if mean is None else round(mean, 3)
+    merged['relations'] = summaries[-1].get('relations')
+    return merged
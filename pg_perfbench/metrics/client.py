@@ -0,0 +1,113 @@
+import re
+
+from .stats import get_mean
+
+CLIENT_TIMES_MARKER = '#client-times'
+# CPU use in percent of the client threads above which it is saturated
+CLIENT_SATURATION_LIMIT = 90.0
+SHELL_TIME_RE = re.compile(r'(\d+)m\s*(\d+(?:[.,]\d+)?)s')
+
+# Runs a command and prints the CPU times of the processes it waited for
+# with the `times` shell builtin, also when the command is terminated
+CLIENT_TIMES_SCRIPT = """trap 'echo "{marker}"; times; exit 143' TERM
+{command}
+status=$?
+echo "{marker}"
+times
+exit $status"""
+
+
+def get_client_times_script(command: str) -> str:
+    return CLIENT_TIMES_SCRIPT.format(
+        marker=CLIENT_TIMES_MARKER, command=command
+    )
+
+
+def get_client_cpu_times(output: str) -> tuple[float, float] | None:
+    """
+    Returns the user and system CPU seconds reported by `times` after
+    the marker line of the command output: those of the shell and of
+    the processes it waited for.
+    """
+    lines = output.splitlines()
+    if CLIENT_TIMES_MARKER not in lines:
+        return None
+    # the shell's own times, then the times of its children
+    times = lines[lines.index(CLIENT_TIMES_MARKER) + 1 :][:2]
+    values = [
+        int(minutes) * 60 + float(seconds.replace(',', '.'))
+        for minutes, seconds in SHELL_TIME_RE.findall(' '.join(times))
+    ]
+    if len(values) != 4:
+        return None
+    return (values[0] + values[2], values[1] + values[3])
+
+
+def get_progress_transactions(progress: list) -> int | None:
+    """Estimates the transactions of a run from its progress reports."""
+    transactions = 0
+    previous = 0
+    for sample in progress:
+        if sample[1] is not None:
+            transactions += sample[1] * (sample[0] - previous)
+        previous = sample[0]
+    return round(transactions) if progress else None
+
+
+def get_client_summary(
+    cpu_times: tuple[float, float],
+    duration: float,
+    threads: int,
+    transactions: int | float | None,
+    cpus: int | None = None,
+) -> dict:
+    """
+    Summarizes the CPU use of the load generator over a run: its CPU
+    time, the share of the CPU time its threads could use (limited by
+    the CPUs it may run on when they are known), the CPU time per
+    transaction and whether the client was CPU-saturated.
+    """
+    user, system = cpu_times
+    cpu_time = user + system
+    capacity = min(threads, cpus) if cpus else threads
+    utilization = (
+        100 * cpu_time / (duration * capacity) if duration > 0 else None
+    )
+    return {
+        'user': round(user, 3),
+        'system': round(system, 3),
+        'duration': round(duration, 3),
+        'threads': threads,
+        'utilization': (
+            None if utilization is None else round(utilization, 1)
+        ),
+        'cpu_per_xact_us': (
+            round(1e6 * cpu_time / transactions, 3) if transactions else None
+        ),
+        'saturated': (
+            utilization is not None and utilization >= CLIENT_SATURATION_LIMIT
+        ),
+    }
+
+
+def merge_client_stats(summaries: list) -> dict | None:
+    """
+    Averages the client CPU use of repeated runs, the client counts as
+    saturated when it was in any of them.
+    """
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        return None
+    merged = {}
+    for key in (
+        'user',
+        'system',
+        'duration',
+        'utilization',
+        'cpu_per_xact_us',
+    ):
+        mean = get_mean([summary.get(key) for summary in summaries])
+        merged[key] = None if mean is None else round(mean, 3)
+    merged['threads'] = summaries[0]['threads']
+    merged['saturated'] = any(summary['saturated'] for summary in summaries)
+    return merged
@@ -0,0 +1,215 @@
+import collections
+import glob
+import math
+import os
+
+# Latency percentiles reported for every iteration
+LATENCY_PERCENTILES = (50, 90, 95, 99, 99.9)
+# Relative error of the values restored from histogram buckets
+DEFAULT_HISTOGRAM_PRECISION = 0.01
+# Size hint (bytes) of the line batches read from pgbench log files
+LOG_READ_BATCH_SIZE = 1 << 20
+
+# Non-numeric latency values of pgbench per-transaction logs
+SKIPPED_TRANSACTION = 'skipped'
+FAILED_TRANSACTIONS = ('failed', 'serialization', 'deadlock')
+
+
+class LatencyHistogram:
+    """
+    Mergeable log-bucketed latency histogram. Every bucket covers
+    the values within a fixed relative error, so the memory used depends
+    on the latency range only, not on the number of transactions.
+    Latencies are stored in microseconds.
+    """
+
+    def __init__(self, precision: float = DEFAULT_HISTOGRAM_PRECISION):
+        if not 0 < precision < 1:
+            raise ValueError(f'Invalid histogram precision: {precision}')
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: collections.Counter[int] = collections.Counter()
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def bucket_index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def bucket_value(self, index: int) -> float:
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+        else:
+            self.buckets[self.bucket_index(value)] += count
+        self._add_stats(value, value, value * count, count)
+
+    def add_batch(self, values: list) -> None:
+        """Adds a batch of latencies at once."""
+        if not values:
+            return
+        log_gamma = self.log_gamma
+        positive = [value for value in values if value > 0]
+        self.zero_count += len(values) - len(positive)
+        self.buckets.update(
+            math.ceil(math.log(value) / log_gamma) for value in positive
+        )
+        self._add_stats(min(values), max(values), sum(values), len(values))
+
+    def _add_stats(self, min_value, max_value, total, count) -> None:
+        self.count += count
+        self.total += total
+        if self.min is None or min_value < self.min:
+            self.min = min_value
+        if self.max is None or max_value > self.max:
+            self.max = max_value
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Adds the counts of another histogram of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError(
+                'Histograms of different precision cannot be merged: '
+                f'{self.precision} and {other.precision}'
+            )
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        if other.count:
+            self._add_stats(other.min, other.max, other.total, other.count)
+        return self
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Returns the latency below which the given percent of transactions
+        fall, within the histogram precision.
+        """
+        # the extremes are known once a value was added
+        if not self.count or self.min is None or self.max is None:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        if rank >= self.count:
+            return self.max
+        if rank <= self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # the exact extremes are known, keep estimates within them
+                return min(max(self.bucket_value(index), self.min), self.max)
+        return self.max
+
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        return {
+            'precision': self.precision,
+            'buckets': {
+                str(index): count for index, count in self.buckets.items()
+            },
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls(data.get('precision', DEFAULT_HISTOGRAM_PRECISION))
+        histogram.buckets.update(
+            {int(index): count for index, count in data['buckets'].items()}
+        )
+        histogram.zero_count = data.get('zero_count', 0)
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('total', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
+
+
+def read_pgbench_log(path: str, histogram: LatencyHistogram) -> dict:
+    """
+    Streams a pgbench per-transaction log (--log) into the histogram.
+    Lines are read in batches of bounded size. Returns the numbers
+    of skipped and failed transactions found in the log.
+    """
+    counters = {'skipped': 0, 'failed': 0}
+    with open(path, 'r', encoding='utf-8', errors='replace') as log_file:
+        while True:
+            lines = log_file.readlines(LOG_READ_BATCH_SIZE)
+            if not lines:
+                break
+            latencies = []
+            for line in lines:
+                # client_id transaction_no time script_no time_epoch time_us
+                fields = line.split(maxsplit=3)
+                if len(fields) < 3:
+                    continue
+                try:
+                    latencies.append(float(fields[2]))
+                except ValueError:
+                    if fields[2] == SKIPPED_TRANSACTION:
+                        counters['skipped'] += 1
+                    elif fields[2] in FAILED_TRANSACTIONS:
+                        counters['failed'] += 1
+            histogram.add_batch(latencies)
+    return counters
+
+
+def get_pgbench_log_files(log_prefix: str) -> list[str]:
+    """
+    Lists the log files pgbench wrote for the prefix: one per process,
+    suffixed with the thread number when more than one thread is used.
+    """
+    return sorted(
+        path for path in glob.glob(f'{log_prefix}.*') if os.path.isfile(path)
+    )
+
+
+def get_latency_summary(
+    histogram: LatencyHistogram, counters: dict | None = None
+) -> dict:
+    """
+    Builds the per-iteration latency summary in milliseconds:
+    percentiles, max and the transaction counters.
+    """
+
+    def to_ms(value):
+        return None if value is None else round(value / 1000, 3)
+
+    summary = {
+        'transactions': histogram.count,
+        'percentiles': {
+            str(percent): to_ms(histogram.percentile(percent))
+            for percent in LATENCY_PERCENTILES
+        },
+        'max': to_ms(histogram.max),
+        'histogram': histogram.to_dict(),
+    }
+    summary.update(counters or {'skipped': 0, 'failed': 0})
+    return summary
+
+
+def merge_latency_summaries(summaries: list) -> dict | None:
+    """
+    Merges the latency summaries of repeated runs into one summary
+    computed from their combined histogram.
+    """
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        return None
+
+    histogram = LatencyHistogram.from_dict(summaries[0]['histogram'])
+    for summary in summaries[1:]:
+        histogram.merge(LatencyHistogram.from_dict(summary['histogram']))
+    counters = {
+        key: sum(summary.get(key, 0) for summary in summaries)
+        for key in ('skipped', 'failed')
+    }
+    return get_latency_summary(histogram, counters)
@@ -0,0 +1,135 @@
+from .sampler import PollingSampler, merge_sampler_overhead
+
+# Sessions of the benchmark database waiting for a lock and the sessions
+# blocking them, a row lock wait has no relation and is named by its type
+BLOCKED_LOCKS_QUERY = """SELECT a.pid, pg_blocking_pids(a.pid) AS blocking_pids,
+    coalesce(l.relation::regclass::text, l.locktype) AS relation, l.mode
+FROM pg_stat_activity a
+JOIN pg_locks l ON l.pid = a.pid AND NOT l.granted
+WHERE a.datname = current_database() AND a.pid <> pg_backend_pid()
+    AND a.application_name <> $1"""
+
+
+def get_chain_depth(blocking: dict) -> int:
+    """
+    Returns the length of the longest blocking chain, blocking maps every
+    waiting pid to the pids blocking it. A deadlock cycle counts once.
+    """
+    depths: dict[int, int] = {}
+
+    def depth(pid, path):
+        if pid in depths:
+            return depths[pid]
+        if pid not in blocking or pid in path:
+            return 0
+        result = 1 + max(
+            (depth(blocker, path | {pid}) for blocker in blocking[pid]),
+            default=0,
+        )
+        depths[pid] = result
+        return result
+
+    return max((depth(pid, frozenset()) for pid in blocking), default=0)
+
+
+class LockSampler(PollingSampler):
+    """
+    Polls pg_locks joined with pg_blocking_pids() during a run. The
+    blocked sessions are aggregated by relation and lock mode, the time
+    they were blocked is estimated from the time between the samples.
+    The longest blocking chain and the most sessions blocked at once
+    are kept as well.
+    """
+
+    query = BLOCKED_LOCKS_QUERY
+
+    def __init__(self, connect, interval: float, logger):
+        super().__init__(connect, interval, logger)
+        self.locks: dict[tuple, dict] = {}
+        self.max_depth = 0
+        self.max_blocked = 0
+        self.previous: float | None = None
+
+    def add_sample(self, rows: list, elapsed: float) -> None:
+        # every sample stands for the time since the previous one
+        duration = (
+            self.interval if self.previous is None else elapsed - self.previous
+        )
+        self.previous = elapsed
+        blocked: dict[tuple, int] = {}
+        for row in rows:
+            blocked.setdefault((row['relation'], row['mode']), 0)
+            blocked[(row['relation'], row['mode'])] += 1
+        for key, sessions in blocked.items():
+            lock = self.locks.setdefault(
+                key, {'blocked_time': 0.0, 'max_blocked': 0}
+            )
+            lock['blocked_time'] += sessions * duration
+            lock['max_blocked'] = max(lock['max_blocked'], sessions)
+        self.max_blocked = max(self.max_blocked, len(rows))
+        self.max_depth = max(
+            self.max_depth,
+            get_chain_depth(
+                {row['pid']: row['blocking_pids'] or [] for row in rows}
+            ),
+        )
+
+    def get_summary(self) -> dict:
+        return {
+            'locks': sorted(
+                [
+                    [
+                        relation,
+                        mode,
+                        round(lock['blocked_time'], 3),
+                        lock['max_blocked'],
+                    ]
+                    for (relation, mode), lock in self.locks.items()
+                ],
+                key=lambda lock: lock[2],
+                reverse=True,
+            ),
+            'blocked_time': round(
+                sum(lock['blocked_time'] for lock in self.locks.values()), 3
+            ),
+            'max_blocked': self.max_blocked,
+            'max_depth': self.max_depth,
+        }
+
+
+def merge_locks(summaries: list) -> dict | None:
+    """
+    Combines the lock samples of repeated runs: the mean blocked times
+    and the largest chain depth and blocked session counts.
+    """
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        return None
+    locks: dict[tuple, list] = {}
+    for summary in summaries:
+        for relation, mode, blocked_time, max_blocked in summary['locks']:
+            lock = locks.setdefault((relation, mode), [0.0, 0])
+            lock[0] += blocked_time / len(summaries)
+            lock[1] = max(lock[1], max_blocked)
+    return {
+        'locks': sorted(
+            [
+                [relation, mode, round(blocked_time, 3), max_blocked]
+                for (relation, mode), (blocked_time, max_blocked) in (
+                    locks.items()
+                )
+            ],
+            key=lambda lock: lock[2],
+            reverse=True,
+        ),
+        'blocked_time': round(
+            sum(summary['blocked_time'] for summary in summaries)
+            / len(summaries),
+            3,
+        ),
+        'max_blocked': max(summary['max_blocked'] for summary in summaries),
+        'max_depth': max(summary['max_depth'] for summary in summaries),
+        'samples': sum(summary['samples'] for summary in summaries),
+        'interval': summaries[0]['interval'],
+        'overhead': merge_sampler_overhead(summaries),
+    }
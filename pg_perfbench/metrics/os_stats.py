@@ -0,0 +1,246 @@
+import asyncio
+import re
+import shlex
+import time
+import uuid
+
+# Whole disks of /proc/diskstats, partitions and virtual devices are skipped
+DISK_NAME_RE = re.compile(
+    r'^(sd[a-z]+|vd[a-z]+|xvd[a-z]+|hd[a-z]+|nvme\d+n\d+|mmcblk\d+)$'
+)
+MEMINFO_FIELDS = ('MemTotal', 'MemAvailable', 'Cached', 'Dirty', 'Writeback')
+VMSTAT_FIELDS = ('pswpin', 'pswpout', 'pgmajfault')
+SECTOR_BYTES = 512
+MIB = 1024 * 1024
+
+# Columns of the sampled time series, one row per sampling interval
+OS_STATS_FIELDS = [
+    'time',
+    'cpu_user',
+    'cpu_system',
+    'cpu_iowait',
+    'cpu_steal',
+    'cpu_idle',
+    'disk_read_mb',
+    'disk_write_mb',
+    'disk_util',
+    'net_rx_mb',
+    'net_tx_mb',
+    'mem_available_mb',
+    'mem_dirty_mb',
+    'swap_in',
+    'swap_out',
+    'major_faults',
+]
+
+SAMPLE_MARKER = '#sample'
+SAMPLER_SCRIPT = """stop={stop_file}
+while [ ! -e "$stop" ]; do
+    echo "{marker} $(date +%s.%N)"
+    head -n 1 /proc/stat
+    grep -E '^({meminfo}):' /proc/meminfo
+    grep -E '^({vmstat}) ' /proc/vmstat
+    cat /proc/diskstats /proc/net/dev
+    sleep {interval}
+done
+rm -f "$stop"
+"""
+
+
+def parse_os_sample(lines: list[str]) -> dict:
+    """
+    Parses the /proc readings of one sample into cumulative counters:
+    cpu jiffies, memory (kB), vmstat counters and the disk and network
+    totals over the whole disks and the non-loopback interfaces.
+    """
+    cpu: list[int] | None = None
+    memory: dict[str, int] = {}
+    vmstat: dict[str, int] = {}
+    disk = [0, 0, 0]
+    net = [0, 0]
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] == 'cpu':
+            cpu = [int(value) for value in fields[1:]]
+        elif fields[0].rstrip(':') in MEMINFO_FIELDS:
+            memory[fields[0].rstrip(':')] = int(fields[1])
+        elif fields[0] in VMSTAT_FIELDS and len(fields) == 2:
+            vmstat[fields[0]] = int(fields[1])
+        elif len(fields) >= 14 and DISK_NAME_RE.match(fields[2]):
+            # sectors read, sectors written, milliseconds doing I/O
+            disk[0] += int(fields[5])
+            disk[1] += int(fields[9])
+            disk[2] = max(disk[2], int(fields[12]))
+        elif ':' in line and '|' not in line:
+            name, _, counters = line.partition(':')
+            net_fields = counters.split()
+            if name.strip() != 'lo' and len(net_fields) >= 9:
+                net[0] += int(net_fields[0])
+                net[1] += int(net_fields[8])
+    return {
+        'cpu': cpu,
+        'memory': memory,
+        'vmstat': vmstat,
+        'disk': disk,
+        'net': net,
+    }
+
+
+def get_os_series(samples: list[tuple]) -> list[list]:
+    """
+    Turns the (time, remote time, counters) samples into rows of
+    OS_STATS_FIELDS: cpu shares in percent, disk and network MiB/s,
+    the busiest disk utilization in percent, memory in MiB and swap
+    and fault rates per second. The rows are timed by the local
+    receive time, rates use the remote clock.
+    """
+    rows = []
+    for previous, current in zip(samples, samples[1:]):
+        local_time, remote_time, counters = current
+        _, previous_time, previous_counters = previous
+        elapsed = remote_time - previous_time
+        if elapsed <= 0:
+            continue
+
+        cpu = [None] * 5
+        if counters['cpu'] and previous_counters['cpu']:
+            # user nice system idle iowait irq softirq steal
+            delta = [
+                value - previous_value
+                for value, previous_value in zip(
+                    counters['cpu'][:8], previous_counters['cpu'][:8]
+                )
+            ]
+            delta += [0] * (8 - len(delta))
+            total = sum(delta)
+            if total > 0:
+                cpu = [
+                    round(100 * value / total, 1)
+                    for value in (
+                        delta[0] + delta[1],
+                        delta[2] + delta[5] + delta[6],
+                        delta[4],
+                        delta[7],
+                        delta[3],
+                    )
+                ]
+
+        def rate(values, previous_values, idx, scale):
+            return round(
+                (values[idx] - previous_values[idx]) * scale / elapsed, 3
+            )
+
+        disk, previous_disk = counters['disk'], previous_counters['disk']
+        net, previous_net = counters['net'], previous_counters['net']
+        memory = counters['memory']
+        vmstat, previous_vmstat = (
+            counters['vmstat'],
+            previous_counters['vmstat'],
+        )
+
+        def vmstat_rate(key):
+            if key not in vmstat or key not in previous_vmstat:
+                return None
+            return round((vmstat[key] - previous_vmstat[key]) / elapsed, 1)
+
+        rows.append(
+            [
+                round(local_time, 3),
+                *cpu,
+                rate(disk, previous_disk, 0, SECTOR_BYTES / MIB),
+                rate(disk, previous_disk, 1, SECTOR_BYTES / MIB),
+                min(rate(disk, previous_disk, 2, 100 / 1000), 100.0),
+                rate(net, previous_net, 0, 1 / MIB),
+                rate(net, previous_net, 1, 1 / MIB),
+                round(memory['MemAvailable'] / 1024, 1)
+                if 'MemAvailable' in memory
+                else None,
+                round(memory['Dirty'] / 1024, 1)
+                if 'Dirty' in memory
+                else None,
+                vmstat_rate('pswpin'),
+                vmstat_rate('pswpout'),
+                vmstat_rate('pgmajfault'),
+            ]
+        )
+    return rows
+
+
+class OSSampler:
+    """
+    Samples /proc/stat, /proc/meminfo, /proc/vmstat, /proc/diskstats
+    and /proc/net/dev on the database host while a workload runs.
+    A single shell loop runs through the connection and streams the
+    readings back, it ends when its stop file is created.
+    """
+
+    def __init__(self, conn, interval: float, logger):
+        self.conn = conn
+        self.interval = interval
+        self.logger = logger
+        self.stop_file = f'/tmp/pg_perfbench_sampler_{uuid.uuid4().hex}'
+        self.samples: list[tuple] = []
+        self.lines: tuple[float, float, list[str]] | None = None
+        self.started: float | None = None
+        self.task: asyncio.Task | None = None
+
+    def get_script(self) -> str:
+        return SAMPLER_SCRIPT.format(
+            stop_file=shlex.quote(self.stop_file),
+            marker=SAMPLE_MARKER,
+            meminfo='|'.join(MEMINFO_FIELDS),
+            vmstat='|'.join(VMSTAT_FIELDS),
+            interval=self.interval,
+        )
+
+    def handle_line(self, line: str) -> None:
+        if self.started is None:
+            return
+        if line.startswith(SAMPLE_MARKER):
+            self.flush()
+            local_time = time.monotonic() - self.started
+            remote_time = float(line.split()[1])
+            self.lines = (local_time, remote_time, [])
+        elif self.lines is not None:
+            self.lines[2].append(line)
+
+    def flush(self) -> None:
+        if self.lines is not None:
+            local_time, remote_time, lines = self.lines
+            self.samples.append(
+                (local_time, remote_time, parse_os_sample(lines))
+            )
+            self.lines = None
+
+    async def start(self) -> None:
+        self.started = time.monotonic()
+        self.task = asyncio.create_task(
+            self.conn.run_command_stream(
+                f'sh -c {shlex.quote(self.get_script())}', self.handle_line
+            )
+        )
+
+    async def stop(self) -> dict | None:
+        """
+        Stops the sampling loop and returns the time series, None when
+        nothing was sampled. Sampling failures are only logged.
+        """
+        if self.task is None:
+            return None
+        try:
+            await self.conn.run_command(f'touch {shlex.quote(self.stop_file)}')
+            await asyncio.wait_for(self.task, timeout=self.interval + 30)
+        except Exception as e:
+            self.task.cancel()
+            self.logger.warning(f'OS metrics sampling failed: {e}')
+        self.flush()
+        rows = get_os_series(self.samples)
+        if not rows:
+            return None
+        return {
+            'interval': self.interval,
+            'fields': OS_STATS_FIELDS,
+            'samples': rows,
+        }
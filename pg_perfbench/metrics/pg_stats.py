@@ -0,0 +1,288 @@
+from .stats import get_mean
+
+# (first version, first version without it, query) of the statistics views,
+# the counters are renamed to be comparable between the server versions
+PG_STAT_QUERIES = [
+    (
+        0,
+        None,
+        """SELECT xact_commit, xact_rollback, blks_read, blks_hit,
+            temp_files, temp_bytes, deadlocks, tup_returned, tup_fetched,
+            tup_inserted, tup_updated, tup_deleted
+        FROM pg_stat_database WHERE datname = current_database()""",
+    ),
+    (
+        0,
+        170000,
+        """SELECT checkpoints_timed, checkpoints_req, buffers_checkpoint,
+            buffers_clean, buffers_backend, buffers_alloc
+        FROM pg_stat_bgwriter""",
+    ),
+    (
+        170000,
+        None,
+        """SELECT c.num_timed AS checkpoints_timed,
+            c.num_requested AS checkpoints_req,
+            c.buffers_written AS buffers_checkpoint,
+            b.buffers_clean, b.buffers_alloc
+        FROM pg_stat_checkpointer c, pg_stat_bgwriter b""",
+    ),
+    (
+        100000,
+        140000,
+        """SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')::bigint
+            AS wal_bytes""",
+    ),
+    (
+        140000,
+        None,
+        """SELECT wal_records, wal_fpi, wal_bytes::bigint, wal_buffers_full
+        FROM pg_stat_wal""",
+    ),
+    (
+        160000,
+        None,
+        """SELECT sum(reads)::bigint AS io_reads,
+            sum(writes)::bigint AS io_writes,
+            sum(extends)::bigint AS io_extends,
+            sum(fsyncs)::bigint AS io_fsyncs,
+            sum(evictions)::bigint AS io_evictions
+        FROM pg_stat_io""",
+    ),
+]
+
+# Order of the counters in the report
+PG_STATS_FIELDS = [
+    'xact_commit',
+    'xact_rollback',
+    'blks_read',
+    'blks_hit',
+    'temp_files',
+    'temp_bytes',
+    'deadlocks',
+    'tup_returned',
+    'tup_fetched',
+    'tup_inserted',
+    'tup_updated',
+    'tup_deleted',
+    'checkpoints_timed',
+    'checkpoints_req',
+    'buffers_checkpoint',
+    'buffers_clean',
+    'buffers_backend',
+    'buffers_alloc',
+    'wal_records',
+    'wal_fpi',
+    'wal_bytes',
+    'wal_buffers_full',
+    'io_reads',
+    'io_writes',
+    'io_extends',
+    'io_fsyncs',
+    'io_evictions',
+]
+
+
+def get_pg_stat_queries(server_version_num: int) -> list[str]:
+    """Returns the statistics queries supported by the server version."""
+    return [
+        query
+        for since, until, query in PG_STAT_QUERIES
+        if server_version_num >= since
+        and (until is None or server_version_num < until)
+    ]
+
+
+async def get_pg_stats_snapshot(db_conn) -> dict:
+    """
+    Reads the cumulative counters of the statistics views of the server
+    and of the current database through an asyncpg connection.
+    """
+    server_version_num = int(await db_conn.fetchval('SHOW server_version_num'))
+    snapshot = {}
+    for query in get_pg_stat_queries(server_version_num):
+        row = await db_conn.fetchrow(query)
+        if row is not None:
+            snapshot.update(dict(row))
+    return snapshot
+
+
+def get_pg_stats_delta(
+    before: dict, after: dict, sampler_commits: int = 0
+) -> dict:
+    """
+    Returns the counter changes between two snapshots. The transactions
+    committed by the polls of the samplers are not counted as commits.
+    The correction is approximate: the few transactions of the snapshot
+    and pg_stat_statements connections are still counted, which inflates
+    the per-transaction ratios of short runs slightly.
+    """
+    delta = {
+        key: after[key] - before[key]
+        for key in PG_STATS_FIELDS
+        if before.get(key) is not None and after.get(key) is not None
+    }
+    if sampler_commits and delta.get('xact_commit') is not None:
+        delta['xact_commit'] = max(delta['xact_commit'] - sampler_commits, 0)
+    return delta
+
+
+def merge_pg_stats(deltas: list) -> dict | None:
+    """Averages the counter changes of repeated runs."""
+    deltas = [delta for delta in deltas if delta]
+    if not deltas:
+        return None
+    merged = {}
+    for key in PG_STATS_FIELDS:
+        mean = get_mean([delta.get(key) for delta in deltas])
+        if mean is not None:
+            merged[key] = round(mean, 3)
+    return merged
+
+
+def get_pg_stats_ratios(
+    delta: dict | None, transactions: int | float | None = None
+) -> dict:
+    """
+    Derives the per-run indicators from the counter changes: the buffer
+    cache hit ratio (%), WAL and temporary file bytes per transaction,
+    checkpoints, deadlocks and rollbacks. Transactions default to the
+    committed ones when the pgbench transaction count is not known.
+    """
+    delta = delta or {}
+    transactions = transactions or delta.get('xact_commit')
+
+    def per_transaction(key):
+        if delta.get(key) is None or not transactions:
+            return None
+        return round(delta[key] / transactions, 3)
+
+    hit, read = delta.get('blks_hit'), delta.get('blks_read')
+    checkpoints = [
+        delta[key]
+        for key in ('checkpoints_timed', 'checkpoints_req')
+        if delta.get(key) is not None
+    ]
+    return {
+        'cache_hit_ratio': (
+            round(100 * hit / (hit + read), 2)
+            if hit is not None and read is not None and hit + read
+            else None
+        ),
+        'wal_bytes_per_xact': per_transaction('wal_bytes'),
+        'temp_bytes_per_xact': per_transaction('temp_bytes'),
+        'checkpoints': sum(checkpoints) if checkpoints else None,
+        'deadlocks': delta.get('deadlocks'),
+        'rollbacks': delta.get('xact_rollback'),
+    }
+
+
+DEFAULT_TOP_STATEMENTS = 10
+
+# Statement counters kept for the top statements by total execution time
+PG_STAT_STATEMENTS_FIELDS = [
+    'calls',
+    'total_time',
+    'mean_time',
+    'stddev_time',
+    'rows',
+    'shared_blks_hit',
+    'shared_blks_read',
+]
+PER_CALL_FIELDS = ('mean_time', 'stddev_time')
+
+
+async def reset_pg_stat_statements(db_conn) -> bool:
+    """
+    Resets pg_stat_statements when the module is preloaded by the server,
+    its extension is created in the current database when missing.
+    Returns False when pg_stat_statements is not available.
+    """
+    libraries = await db_conn.fetchval('SHOW shared_preload_libraries')
+    if 'pg_stat_statements' not in (libraries or ''):
+        return False
+    await db_conn.execute('CREATE EXTENSION IF NOT EXISTS pg_stat_statements')
+    await db_conn.execute('SELECT pg_stat_statements_reset()')
+    return True
+
+
+async def get_top_statements(
+    db_conn, limit: int, exclude: list[str] | None = None
+) -> list[dict]:
+    """
+    Reads the statements of the current database that took the most
+    execution time since the last reset, at most limit of them. The
+    statements of pg_stat_statements itself and the queries in exclude
+    (the queries of the samplers) are left out, whitespace is ignored
+    when comparing them.
+    """
+    server_version_num = int(await db_conn.fetchval('SHOW server_version_num'))
+    # the execution time columns were renamed in PostgreSQL 13
+    suffix = 'exec_time' if server_version_num >= 130000 else 'time'
+    rows = await db_conn.fetch(
+        f"""SELECT queryid, query, calls,
+            total_{suffix} AS total_time, mean_{suffix} AS mean_time,
+            stddev_{suffix} AS stddev_time, rows,
+            shared_blks_hit, shared_blks_read
+        FROM pg_stat_statements
+        WHERE dbid = (
+            SELECT oid FROM pg_database WHERE datname = current_database()
+        ) AND query NOT LIKE '%pg_stat_statements%'
+            AND NOT btrim(regexp_replace(query, '\\s+', ' ', 'g'))
+                = ANY($2::text[])
+        ORDER BY total_{suffix} DESC
+        LIMIT $1""",
+        limit,
+        [' '.join(query.split()) for query in exclude or []],
+    )
+    return [
+        {
+            'queryid': row['queryid'],
+            'query': ' '.join(row['query'].split()),
+            **{
+                key: (
+                    round(row[key], 3)
+                    if isinstance(row[key], float)
+                    else row[key]
+                )
+                for key in PG_STAT_STATEMENTS_FIELDS
+            },
+        }
+        for row in rows
+    ]
+
+
+def merge_statements(runs: list) -> list | None:
+    """
+    Averages the statement counters of repeated runs by query text,
+    a statement missing from a run counts as not executed there,
+    the per call times are averaged over the runs executing it.
+    Returns as many statements as the longest run list, ordered by
+    the total execution time.
+    """
+    runs = [statements for statements in runs if statements is not None]
+    if not runs:
+        return None
+    merged: dict[str, list] = {}
+    for statements in runs:
+        for statement in statements:
+            merged.setdefault(statement['query'], []).append(statement)
+
+    def merge(statements, key):
+        values = [statement.get(key) or 0 for statement in statements]
+        count = len(values) if key in PER_CALL_FIELDS else len(runs)
+        return round(sum(values) / count, 3)
+
+    result = [
+        {
+            'queryid': statements[0].get('queryid'),
+            'query': query,
+            **{
+                key: merge(statements, key)
+                for key in PG_STAT_STATEMENTS_FIELDS
+            },
+        }
+        for query, statements in merged.items()
+    ]
+    result.sort(key=lambda statement: statement['total_time'], reverse=True)
+    return result[: max(len(statements) for statements in runs)]
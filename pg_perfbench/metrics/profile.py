@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import re
+import shlex
+import uuid
+
+DEFAULT_PROFILE_FREQUENCY = 99
+# Seconds before the backends of the workload are looked up
+PROFILE_DELAY = 2
+# Interval in seconds of the /proc sampling fallback
+PROC_SAMPLING_INTERVAL = 0.1
+# Seconds allowed to stop perf and fold its samples
+PROFILE_STOP_TIMEOUT = 600
+# Folded stacks kept by the number of samples
+PROFILE_MAX_STACKS = 5000
+
+METHOD_MARKER = '#method'
+PIDS_MARKER = '#pids'
+PROC_MARKER = '#proc'
+SYMBOL_OFFSET_RE = re.compile(r'\+0x[0-9a-f]+$')
+
+# Profiles the children of the postmaster with perf, or samples their
+# /proc state when perf is missing or cannot attach to them
+PROFILER_SCRIPT = """stop={stop_file}
+data={data_file}
+sleep {delay}
+postmaster=$(head -n 1 {pid_file} 2>/dev/null || pgrep -o -x postgres)
+pids=$(pgrep -d, -P "$postmaster")
+echo "{pids_marker} $pids"
+if [ -n "$pids" ] && command -v perf >/dev/null 2>&1; then
+    perf record -F {frequency} -g -p "$pids" -o "$data" >/dev/null 2>&1 &
+    perf_pid=$!
+    sleep 1
+    if kill -0 "$perf_pid" 2>/dev/null; then
+        while [ ! -e "$stop" ]; do sleep 0.2; done
+        kill -INT "$perf_pid"
+        wait "$perf_pid"
+        echo "{method_marker} perf"
+        perf script -i "$data" 2>/dev/null
+        rm -f "$stop" "$data"
+        exit 0
+    fi
+fi
+echo "{method_marker} proc"
+while [ ! -e "$stop" ]; do
+    for pid in $(echo "$pids" | tr , ' '); do
+        state=$(cut -d ' ' -f 3 /proc/$pid/stat 2>/dev/null) || continue
+        echo "{proc_marker} $state $(cat /proc/$pid/wchan 2>/dev/null)"
+    done
+    sleep {interval}
+done
+rm -f "$stop" "$data"
+"""
+
+PROC_STATES = {
+    'R': 'running',
+    'S': 'sleeping',
+    'D': 'disk sleep',
+    'T': 'stopped',
+    'Z': 'zombie',
+}
+
+
+class StackFolder:
+    """
+    Folds the stacks of `perf script` output or of the /proc samples
+    into 'frame;frame;frame' keys counted by samples, root frame first.
+    Lines are added one by one, only the folded counters are kept.
+    """
+
+    def __init__(self):
+        self.stacks = collections.Counter()
+        self.method = None
+        self.comm = None
+        self.frames = []
+
+    def add_line(self, line: str) -> None:
+        if line.startswith(METHOD_MARKER):
+            self.method = line.split()[1]
+        elif line.startswith(PROC_MARKER):
+            fields = line.split()[1:]
+            state = PROC_STATES.get(fields[0], fields[0]) if fields else '?'
+            frames = ['postgres', state]
+            if len(fields) > 1 and fields[1] != '0':
+                frames.append(fields[1])
+            self.stacks[';'.join(frames)] += 1
+        elif line.startswith(PIDS_MARKER) or self.method != 'perf':
+            return
+        elif not line.strip():
+            self.flush()
+        elif line.startswith('\t'):
+            # address, symbol+offset and the binary of a frame
+            fields = line.split()
+            if len(fields) >= 2:
+                self.frames.append(
+                    SYMBOL_OFFSET_RE.sub('', ' '.join(fields[1:-1]) or '?')
+                )
+        else:
+            self.flush()
+            self.comm = line.split()[0]
+
+    def flush(self) -> None:
+        if self.comm is not None:
+            self.stacks[';'.join([self.comm, *reversed(self.frames)])] += 1
+        self.comm = None
+        self.frames = []
+
+    def get_stacks(self, limit: int = PROFILE_MAX_STACKS) -> list[list]:
+        self.flush()
+        return [
+            [stack, count] for stack, count in self.stacks.most_common(limit)
+        ]
+
+
+class Profiler:
+    """
+    Profiles the PostgreSQL backends on the database host during a run:
+    `perf record -g` on the children of the postmaster, or sampling of
+    their /proc state when perf is not usable. The samples are folded
+    into collapsed stacks. A failure only loses the profile of the run.
+    """
+
+    def __init__(self, conn, frequency: int, pg_data_path: str | None, logger):
+        self.conn = conn
+        self.frequency = frequency
+        self.pg_data_path = pg_data_path
+        self.logger = logger
+        name = f'pg_perfbench_profile_{uuid.uuid4().hex}'
+        self.stop_file = f'/tmp/{name}.stop'
+        self.data_file = f'/tmp/{name}.data'
+        self.folder = StackFolder()
+        self.task: asyncio.Task | None = None
+
+    def get_script(self) -> str:
+        pid_file = (
+            f'{self.pg_data_path}/postmaster.pid'
+            if self.pg_data_path
+            else '/nonexistent'
+        )
+        return PROFILER_SCRIPT.format(
+            stop_file=shlex.quote(self.stop_file),
+            data_file=shlex.quote(self.data_file),
+            pid_file=shlex.quote(pid_file),
+            delay=PROFILE_DELAY,
+            frequency=self.frequency,
+            interval=PROC_SAMPLING_INTERVAL,
+            pids_marker=PIDS_MARKER,
+            method_marker=METHOD_MARKER,
+            proc_marker=PROC_MARKER,
+        )
+
+    async def start(self) -> None:
+        self.task = asyncio.create_task(
+            self.conn.run_command_stream(
+                f'sh -c {shlex.quote(self.get_script())}',
+                self.folder.add_line,
+            )
+        )
+
+    async def stop(self) -> dict | None:
+        """Returns the folded stacks, None when nothing was profiled."""
+        if self.task is None:
+            return None
+        try:
+            await self.conn.run_command(f'touch {shlex.quote(self.stop_file)}')
+            await asyncio.wait_for(self.task, timeout=PROFILE_STOP_TIMEOUT)
+        except Exception as e:
+            self.task.cancel()
+            self.logger.warning(f'Profiling failed: {e}')
+        stacks = self.folder.get_stacks()
+        if not stacks:
+            self.logger.warning('No profile samples of the backends.')
+            return None
+        return {
+            'method': self.folder.method,
+            'frequency': (
+                self.frequency if self.folder.method == 'perf' else None
+            ),
+            'samples': sum(count for _, count in stacks),
+            'stacks': stacks,
+        }
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import asyncpg
+
+# application_name of the sampling connections, excluded from the samples
+SAMPLER_APPLICATION_NAME = 'pg_perfbench_sampler'
+
+
+class PollingSampler:
+    """
+    Runs query over a dedicated database connection every interval
+    seconds while a workload runs. Subclasses aggregate the rows of
+    every sample in add_sample and return them from get_summary.
+    The time spent in the queries is measured as the sampler overhead.
+    """
+
+    query = ''
+
+    def __init__(self, connect, interval: float, logger):
+        self.connect = connect
+        self.interval = interval
+        self.logger = logger
+        self.samples = 0
+        self.query_time = 0.0
+        self.started: float | None = None
+        self.db_conn: asyncpg.Connection | None = None
+        self.task: asyncio.Task | None = None
+        self.stop_event = asyncio.Event()
+
+    def add_sample(self, rows: list, elapsed: float) -> None:
+        raise NotImplementedError
+
+    def get_summary(self) -> dict:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        try:
+            self.db_conn = await self.connect()
+        except Exception as e:
+            self.logger.warning(
+                f'{type(self).__name__} cannot connect to the database: {e}'
+            )
+            return
+        self.started = time.monotonic()
+        self.task = asyncio.create_task(self.poll())
+
+    async def poll(self) -> None:
+        if self.db_conn is None or self.started is None:
+            return
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            rows = await self.db_conn.fetch(
+                self.query, SAMPLER_APPLICATION_NAME
+            )
+            query_time = time.monotonic() - started
+            self.query_time += query_time
+            self.samples += 1
+            self.add_sample(rows, started - self.started)
+            try:
+                await asyncio.wait_for(
+                    self.stop_event.wait(),
+                    max(self.interval - query_time, 0),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> dict | None:
+        """
+        Stops the polling and returns the aggregated samples with the
+        query overhead, None when nothing was sampled. Sampling failures
+        are only logged.
+        """
+        # the task is started once connected
+        if self.task is None or self.db_conn is None or self.started is None:
+            return None
+        self.stop_event.set()
+        try:
+            await self.task
+        except Exception as e:
+            self.logger.warning(f'{type(self).__name__} failed: {e}')
+        finally:
+            await self.db_conn.close()
+        if not self.samples:
+            return None
+        elapsed = time.monotonic() - self.started
+        return {
+            **self.get_summary(),
+            'samples': self.samples,
+            'interval': self.interval,
+            'overhead': {
+                'query_ms': round(1000 * self.query_time / self.samples, 3),
+                'busy': round(100 * self.query_time / elapsed, 3),
+            },
+        }
+
+
+def merge_sampler_overhead(summaries: list[dict]) -> dict:
+    """Averages the sampler overhead of repeated runs."""
+    return {
+        key: round(
+            sum(summary['overhead'][key] for summary in summaries)
+            / len(summaries),
+            3,
+        )
+        for key in ('query_ms', 'busy')
+    }
@@ -0,0 +1,153 @@
+import math
+import statistics
+
+# Two-sided 95% Student t critical values by degrees of freedom
+T_CRITICAL_95 = {
+    1: 12.706,
+    2: 4.303,
+    3: 3.182,
+    4: 2.776,
+    5: 2.571,
+    6: 2.447,
+    7: 2.365,
+    8: 2.306,
+    9: 2.262,
+    10: 2.228,
+    11: 2.201,
+    12: 2.179,
+    13: 2.160,
+    14: 2.145,
+    15: 2.131,
+    16: 2.120,
+    17: 2.110,
+    18: 2.101,
+    19: 2.093,
+    20: 2.086,
+    21: 2.080,
+    22: 2.074,
+    23: 2.069,
+    24: 2.064,
+    25: 2.060,
+    26: 2.056,
+    27: 2.052,
+    28: 2.048,
+    29: 2.045,
+    30: 2.042,
+    40: 2.021,
+    60: 2.000,
+    120: 1.980,
+}
+Z_CRITICAL_95 = 1.960
+# Samples up to which the Mann-Whitney p-value is computed exactly
+MANN_WHITNEY_EXACT_LIMIT = 40
+
+
+def t_critical_95(degrees_of_freedom: int) -> float:
+    """
+    Returns the two-sided 95% t critical value. Between the tabulated
+    values the nearest smaller degree of freedom is used, which keeps
+    the interval conservative.
+    """
+    if degrees_of_freedom < 1:
+        raise ValueError(f'Invalid degrees of freedom: {degrees_of_freedom}')
+    if degrees_of_freedom > max(T_CRITICAL_95):
+        return Z_CRITICAL_95
+    return T_CRITICAL_95[
+        max(df for df in T_CRITICAL_95 if df <= degrees_of_freedom)
+    ]
+
+
+def get_mean(values: list) -> float | None:
+    values = [value for value in values if value is not None]
+    return statistics.fmean(values) if values else None
+
+
+def get_summary_stats(values: list) -> dict:
+    """
+    Returns the number of samples, mean, sample standard deviation,
+    coefficient of variation and 95% confidence interval of the mean.
+    Missing (None) samples are ignored.
+    """
+    values = [value for value in values if value is not None]
+    stats: dict[str, int | float | None] = {
+        'n': len(values),
+        'mean': None,
+        'stddev': None,
+        'cv': None,
+        'ci_low': None,
+        'ci_high': None,
+    }
+    if not values:
+        return stats
+
+    mean = statistics.fmean(values)
+    stats['mean'] = round(mean, 3)
+    if len(values) < 2:
+        return stats
+
+    stddev = statistics.stdev(values)
+    half_width = (
+        t_critical_95(len(values) - 1) * stddev / math.sqrt(len(values))
+    )
+    stats.update(
+        {
+            'stddev': round(stddev, 3),
+            'cv': round(stddev / mean, 4) if mean else None,
+            'ci_low': round(mean - half_width, 3),
+            'ci_high': round(mean + half_width, 3),
+        }
+    )
+    return stats
+
+
+def get_u_distribution(m: int, n: int) -> list[int]:
+    # counts of the orderings of m and n samples by their U statistic
+    counts = [[[1] for _ in range(n + 1)] for _ in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            size = i * j + 1
+            # the largest sample is one of the first ones or of the others
+            first = [0] * j + counts[i - 1][j]
+            other = counts[i][j - 1]
+            counts[i][j] = [
+                (first[u] if u < len(first) else 0)
+                + (other[u] if u < len(other) else 0)
+                for u in range(size)
+            ]
+    return counts[m][n]
+
+
+def mann_whitney_u(first: list, second: list) -> tuple[float, float] | None:
+    """
+    Two-sided Mann-Whitney U test of the samples, returns the U statistic
+    of the first sample (pairs where it is greater, ties count half) and
+    the p-value. Without ties and for up to MANN_WHITNEY_EXACT_LIMIT
+    samples the p-value is exact, otherwise it is the normal
+    approximation with the tie and continuity corrections. Missing
+    (None) samples are ignored, None is returned without samples.
+    """
+    first = [value for value in first if value is not None]
+    second = [value for value in second if value is not None]
+    m, n = len(first), len(second)
+    if not m or not n:
+        return None
+    u = sum(
+        1.0 if x > y else 0.5 if x == y else 0.0 for x in first for y in second
+    )
+    combined = first + second
+    ties = [combined.count(value) for value in set(combined)]
+    has_ties = any(count > 1 for count in ties)
+    # the distance of U from its mean, the same for both samples
+    extreme = min(u, m * n - u)
+    if not has_ties and m + n <= MANN_WHITNEY_EXACT_LIMIT:
+        counts = get_u_distribution(m, n)
+        tail = sum(counts[: int(extreme) + 1]) / sum(counts)
+        return u, min(1.0, 2 * tail)
+
+    tie_term = sum(count**3 - count for count in ties)
+    total = m + n
+    variance = m * n / 12 * (total + 1 - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = max(0.0, abs(u - m * n / 2) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(z / math.sqrt(2)))
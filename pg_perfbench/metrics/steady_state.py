@@ -0,0 +1,106 @@
+import math
+
+from .stats import get_mean
+
+DEFAULT_STEADY_STATE_CV = 5.0
+
+
+class SteadyStateDetector:
+    """
+    Watches the pgbench --progress samples of a run and detects when
+    the throughput settled: the coefficient of variation of tps over
+    the last window seconds stays within max_cv percent, not before
+    min_time seconds of the run. The window found is the measured one.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_cv: float | None = None,
+        min_time: float | None = None,
+    ):
+        if window <= 0:
+            raise ValueError('Steady state window must be positive')
+        self.window = window
+        self.max_cv = DEFAULT_STEADY_STATE_CV if max_cv is None else max_cv
+        self.min_time = min_time or 0
+        self.samples: list[tuple] = []
+        self.steady_window: list[tuple] | None = None
+
+    def add_sample(
+        self, time: float, tps: float | None, latency: float | None
+    ) -> bool:
+        """
+        Adds a progress sample (time from the run start, tps, latency
+        average), returns True once the steady state is reached.
+        """
+        if self.steady_window is not None:
+            return True
+        if tps is None:
+            return False
+        self.samples.append((time, tps, latency))
+        if time < max(self.min_time, self.window):
+            return False
+
+        # the samples reported within the last window seconds
+        window = [
+            sample for sample in self.samples if sample[0] > time - self.window
+        ]
+        if len(window) < 2:
+            return False
+        cv = self.get_cv([sample[1] for sample in window])
+        if cv is None or cv > self.max_cv:
+            return False
+        self.steady_window = window
+        return True
+
+    @staticmethod
+    def get_cv(values: list[float]) -> float | None:
+        """Coefficient of variation in percent."""
+        mean = get_mean(values)
+        if not mean:
+            return None
+        variance = sum((value - mean) ** 2 for value in values) / len(values)
+        return math.sqrt(variance) / mean * 100
+
+    def get_summary(self, duration: float | None = None) -> dict:
+        """
+        Returns the measured window: its bounds in seconds from the run
+        start, the mean tps and latency and the tps variation, and the
+        time saved against the planned duration of the run.
+        """
+        if self.steady_window is None:
+            return {
+                'steady': False,
+                'window_start': None,
+                'window_end': None,
+                'tps': None,
+                'latency_avg': None,
+                'cv': None,
+                'stopped_at': None,
+                'time_saved': 0,
+            }
+
+        interval = self.get_interval()
+        tps = [sample[1] for sample in self.steady_window]
+        latency = get_mean([sample[2] for sample in self.steady_window])
+        cv = self.get_cv(tps)
+        window_end = self.steady_window[-1][0]
+        return {
+            'steady': True,
+            'window_start': round(self.steady_window[0][0] - interval, 3),
+            'window_end': window_end,
+            'tps': round(sum(tps) / len(tps), 3),
+            'latency_avg': None if latency is None else round(latency, 3),
+            'cv': None if cv is None else round(cv, 3),
+            'stopped_at': window_end,
+            'time_saved': (
+                round(max(duration - window_end, 0), 3) if duration else None
+            ),
+        }
+
+    def get_interval(self) -> float:
+        # progress times mark the end of each reporting interval
+        if len(self.samples) < 2:
+            return self.samples[0][0] if self.samples else 0
+        return self.samples[-1][0] - self.samples[-2][0]
@@ -0,0 +1,73 @@
+import collections
+
+from .sampler import PollingSampler, merge_sampler_overhead
+
+# Client backends of the benchmark database by wait event: a session
+# running without a wait event is on CPU, an idle one waits for its client
+WAIT_EVENTS_QUERY = """SELECT CASE WHEN state = 'idle' THEN 'Idle'
+        ELSE coalesce(wait_event_type, 'CPU') END AS wait_event_type,
+    coalesce(wait_event, 'CPU') AS wait_event, count(*) AS sessions
+FROM pg_stat_activity
+WHERE datname = current_database() AND backend_type = 'client backend'
+    AND pid <> pg_backend_pid() AND application_name <> $1
+GROUP BY 1, 2"""
+
+
+class WaitEventSampler(PollingSampler):
+    """
+    Polls pg_stat_activity during a run and counts the sessions of the
+    benchmark database by wait_event_type and wait_event. Only the
+    counters of the distinct wait events are kept, so the memory does
+    not grow with the sampling rate or the run duration.
+    """
+
+    query = WAIT_EVENTS_QUERY
+
+    def __init__(self, connect, interval: float, logger):
+        super().__init__(connect, interval, logger)
+        self.events: collections.Counter[tuple] = collections.Counter()
+
+    def add_sample(self, rows: list, elapsed: float) -> None:
+        for row in rows:
+            self.events[(row['wait_event_type'], row['wait_event'])] += row[
+                'sessions'
+            ]
+
+    def get_summary(self) -> dict:
+        return {
+            'events': [
+                [event_type, event, count]
+                for (event_type, event), count in self.events.most_common()
+            ]
+        }
+
+
+def merge_wait_events(summaries: list) -> dict | None:
+    """Adds up the wait event samples of repeated runs."""
+    summaries = [summary for summary in summaries if summary]
+    if not summaries:
+        return None
+    events: collections.Counter[tuple] = collections.Counter()
+    for summary in summaries:
+        for event_type, event, count in summary['events']:
+            events[(event_type, event)] += count
+    return {
+        'events': [
+            [event_type, event, count]
+            for (event_type, event), count in events.most_common()
+        ],
+        'samples': sum(summary['samples'] for summary in summaries),
+        'interval': summaries[0]['interval'],
+        'overhead': merge_sampler_overhead(summaries),
+    }
+
+
+def get_active_sessions(summary: dict) -> dict:
+    """
+    Returns the average number of sessions in every wait event,
+    keyed by 'wait_event_type:wait_event'.
+    """
+    return {
+        f'{event_type}:{event}': round(count / summary['samples'], 3)
+        for event_type, event, count in summary['events']
+    }
@@ -0,0 +1,240 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+from argparse import ArgumentParser, Namespace
+
+from pg_perfbench.const import WorkMode, DEFAULT_REPORT_NAME
+from pg_perfbench.benchmark import BenchmarkRunner
+from pg_perfbench.context import Context
+from pg_perfbench.join import ReportJoiner
+from pg_perfbench.report.processing import save_report
+from pg_perfbench.store import ResultStore
+
+# target keys that are not command line options
+TARGET_CPUS_KEY = 'cpus'
+
+
+class TargetLogger(logging.LoggerAdapter):
+    """Prefixes the messages of a target with its report name."""
+
+    def process(self, msg, kwargs):
+        return f'[{self.extra["target"]}] {msg}', kwargs
+
+
+class MultiTargetRunner:
+    """
+    A stateless utility class that runs the benchmark against several
+    PostgreSQL targets concurrently in one event loop, saves a report
+    per target and joins them into one comparison report.
+    """
+
+    @staticmethod
+    def load_targets(targets_path: str) -> list[dict]:
+        """
+        Loads the targets file: a JSON list of objects, each holding
+        the command line options that differ from the common ones.
+        """
+        if not os.path.isfile(targets_path):
+            raise ValueError(f'Targets file not found: {targets_path}')
+        try:
+            with open(targets_path, 'r', encoding='utf-8') as f:
+                targets = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f'Cannot parse targets file: {e}')
+        if (
+            not isinstance(targets, list)
+            or not targets
+            or not all(isinstance(target, dict) for target in targets)
+        ):
+            raise ValueError(
+                f'Targets file must contain a non-empty list of objects: '
+                f'{targets_path}'
+            )
+        return targets
+
+    @staticmethod
+    def get_target_args(
+        parser: ArgumentParser, base_args: Namespace, target: dict, idx: int
+    ) -> Namespace:
+        """
+        Returns the arguments of a target: the common arguments updated
+        by the options of the target, parsed by the command line parser.
+        Option names may be written with dashes or underscores.
+        The report name defaults to '<common report name>-target-<idx>'.
+        """
+        argv = ['--mode', str(base_args.mode)]
+        for key, value in target.items():
+            if key == TARGET_CPUS_KEY or value is None or value is False:
+                continue
+            argv.append(f'--{key.replace("_", "-")}')
+            if value is True:
+                continue
+            if isinstance(value, list):
+                value = ','.join(map(str, value))
+            argv.append(str(value))
+
+        # the copied namespace keeps the common values not set by the target
+        args = copy.copy(base_args)
+        try:
+            args = parser.parse_args(argv, namespace=args)
+        except SystemExit:
+            raise ValueError(f'Invalid options of target {idx}: {target}')
+
+        if 'report_name' not in target and 'report-name' not in target:
+            args.report_name = (
+                f'{MultiTargetRunner.get_base_report_name(base_args)}'
+                f'-target-{idx}'
+            )
+        if 'journal' not in target:
+            # every target keeps its own journal next to its report
+            args.journal = None
+        args.targets = None
+        return args
+
+    @staticmethod
+    def get_base_report_name(args: Namespace) -> str:
+        return (
+            args.report_name or f'{WorkMode.BENCHMARK}-{DEFAULT_REPORT_NAME}'
+        )
+
+    @staticmethod
+    def get_cpu_partitions(
+        slots: int, cpus: list[int] | None = None
+    ) -> list[list[int]]:
+        """
+        Splits the CPUs available to this process into slots contiguous
+        sets of (almost) equal size, one per concurrently running target.
+        """
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0))
+        if slots > len(cpus):
+            raise ValueError(
+                f'Cannot partition {len(cpus)} CPUs between {slots} targets'
+            )
+        size, extra = divmod(len(cpus), slots)
+        partitions = []
+        start = 0
+        for slot in range(slots):
+            end = start + size + (1 if slot < extra else 0)
+            partitions.append(cpus[start:end])
+            start = end
+        return partitions
+
+    @staticmethod
+    def join_target_reports(
+        logger, reports: list[dict], compare_items: list[str], report_name
+    ) -> dict | None:
+        """
+        Joins the reports of the targets into one comparison report,
+        the first report is the reference.
+        """
+        names = [report['report_name'] for report in reports]
+        # merging modifies the reference report, keep the saved ones intact
+        joined = ReportJoiner.merge_reports(
+            logger, names, copy.deepcopy(reports), compare_items
+        )
+        if joined is None:
+            return None
+        joined['report_name'] = report_name
+        joined[
+            'description'
+        ] = f'Comparison of the targets: {", ".join(names)}'
+        return joined
+
+    @staticmethod
+    async def run_targets(
+        parser: ArgumentParser, args: Namespace, logger
+    ) -> dict | None:
+        """
+        Main entry point of the multi-target benchmark:
+          1. Builds the context of every target (fails on invalid options).
+          2. Runs the targets concurrently, at most max_concurrent_targets
+             at a time, each in a CPU partition when requested.
+          3. Saves the report of every target and returns the joined
+             comparison report. The only successful report is returned
+             as is, None is returned when every target failed.
+        """
+        targets = MultiTargetRunner.load_targets(args.targets)
+        contexts = []
+        for idx, target in enumerate(targets, start=1):
+            target_args = MultiTargetRunner.get_target_args(
+                parser, args, target, idx
+            )
+            target_logger = TargetLogger(
+                logger, {'target': target_args.report_name}
+            )
+            ctx = Context(target_args, target_logger)
+            contexts.append((target, ctx, target_logger))
+
+        concurrency = args.max_concurrent_targets or len(contexts)
+        if concurrency < 1:
+            raise ValueError(
+                'Maximum number of concurrent targets must be positive'
+            )
+        concurrency = min(concurrency, len(contexts))
+
+        # every running target holds a slot, the slots bound the concurrency
+        slots: asyncio.Queue[list[int] | None] = asyncio.Queue()
+        if args.cpu_partition:
+            for partition in MultiTargetRunner.get_cpu_partitions(concurrency):
+                slots.put_nowait(partition)
+        else:
+            for _ in range(concurrency):
+                slots.put_nowait(None)
+
+        async def run_target(target, ctx, target_logger):
+            slot = await slots.get()
+            try:
+                cpu_set = target.get(TARGET_CPUS_KEY) or slot
+                if cpu_set:
+                    target_logger.info(
+                        f'Load generator pinned to CPUs: '
+                        f'{",".join(map(str, cpu_set))}'
+                    )
+                ctx.structured_params['workload_conf']['cpu_set'] = cpu_set
+                return await BenchmarkRunner.run_benchmark_and_collect_metrics(
+                    **ctx.structured_params
+                )
+            finally:
+                slots.put_nowait(slot)
+
+        logger.info(
+            f'Running {len(contexts)} targets, {concurrency} at a time...'
+        )
+        results = await asyncio.gather(
+            *(run_target(*context) for context in contexts),
+            return_exceptions=True,
+        )
+
+        reports = []
+        for (_, ctx, target_logger), report in zip(contexts, results):
+            if isinstance(report, BaseException):
+                target_logger.error(f'Target failed: {report}')
+                continue
+            if report is None:
+                target_logger.error('Target failed, no report generated.')
+                continue
+            ResultStore.store_report(target_logger, args.results_db, report)
+            reports.append((target_logger, report))
+
+        logger.info(f'{len(reports)} of {len(contexts)} targets succeeded.')
+        if len(reports) < 2:
+            # nothing to compare, the caller saves the only report
+            return reports[0][1] if reports else None
+
+        for target_logger, report in reports:
+            save_report(target_logger, report)
+
+        compare_items = []
+        if args.join_tasks:
+            compare_items = (
+                ReportJoiner.load_compare_items(logger, args.join_tasks) or []
+            )
+        return MultiTargetRunner.join_target_reports(
+            logger,
+            [report for _, report in reports],
+            compare_items,
+            f'{MultiTargetRunner.get_base_report_name(args)}-join',
+        )
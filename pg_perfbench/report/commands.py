@@ -1,3 +1,5 @@
+import copy
+import html
 import json
 import re
 import os
@@ -7,10 +9,46 @@ from pg_perfbench.const import (
     SQL_COMMANDS_PATH,
     DEFAULT_LOG_ARCHIVE_NAME,
     LOCAL_DB_LOGS_PATH,
+    PGBENCH_SWEEP_PARAMS,
     WorkloadTypes,
 )
+from pg_perfbench.metrics import (
+    LATENCY_PERCENTILES,
+    PG_STATS_FIELDS,
+    PG_STAT_STATEMENTS_FIELDS,
+    get_pg_stats_ratios,
+    get_active_sessions,
+)
+from pg_perfbench.driver import parse_native_options
+from pg_perfbench.driver.scripts import get_builtin_script, split_weight
+from pg_perfbench.report.flamegraph import get_flamegraph_svg
+from pg_perfbench.search import get_tuned_config
 from pg_perfbench.report.processing import parse_json_in_order
 
+# Roles of the swept parameters in the charts: x axis, series, slices
+SWEEP_CHART_PARAMS_ORDER = (
+    'pgbench_rate',
+    'pgbench_clients',
+    'pgbench_time',
+    'pgbench_jobs',
+    'pgbench_scale',
+)
+
+# Wait events charted separately, the others are summed up as 'other'
+WAIT_EVENTS_CHART_LIMIT = 10
+
+# Columns of the top statements tables
+STATEMENTS_THEADER = [
+    'query',
+    'calls',
+    'total time, ms',
+    'mean time, ms',
+    'stddev time, ms',
+    'rows',
+    'shared blks hit',
+    'shared blks read',
+]
+
 
 def get_script_text(full_script_path) -> str:
     # check if file exists before reading
@@ -177,9 +215,102 @@ def get_workload_cmds(report_data):
 
 def pgbench_options_table(report_data, item):
     # build a table "iteration number -> pgbench_options"
-    pgbench_cmds = get_workload_cmds(report_data)
-    item['theader'] = ['iteration number', 'pgbench_options']
-    item['data'] = [[idx, cmd] for idx, cmd in enumerate(pgbench_cmds)]
+    load_iterations = report_data.get('load_iterations')
+    if not isinstance(load_iterations, list) or not load_iterations:
+        pgbench_cmds = get_workload_cmds(report_data)
+        item['theader'] = ['iteration number', 'pgbench_options']
+        item['data'] = [[idx, cmd] for idx, cmd in enumerate(pgbench_cmds)]
+        return
+
+    # the commands run for every sweep point, labelled by the point
+    # when more than one parameter or a PostgreSQL setting is swept
+    sweep_points = report_data.get('sweep_points') or []
+    if not any(len(point) > 1 for point in sweep_points):
+        item['theader'] = ['iteration number', 'pgbench_options']
+        item['data'] = [
+            [idx, workload_cmd]
+            for idx, (_, workload_cmd) in enumerate(load_iterations)
+        ]
+        return
+
+    item['theader'] = ['iteration number', 'sweep point', 'pgbench_options']
+    item['data'] = [
+        [
+            idx,
+            ', '.join(
+                f'{get_param_label(name)}={value}'
+                for name, value in sweep_points[idx].items()
+            )
+            if idx < len(sweep_points)
+            else None,
+            workload_cmd,
+        ]
+        for idx, (_, workload_cmd) in enumerate(load_iterations)
+    ]
+
+
+def get_script_files_text(paths: list[str]) -> str:
+    # the content of every script file
+    data = ''
+    for m in paths:
+        if not os.path.exists(m):
+            data += f'File not found: {m}\n\n'
+            continue
+        try:
+            with open(m, 'r', encoding='utf-8') as f:
+                content = f.read()
+            data += f'{m} :\n{content}\n\n'
+        except OSError as e:
+            data += f'Error reading file {m}: {str(e)}\n\n'
+    return data
+
+
+def get_native_workload_text(report_data) -> str:
+    """
+    Describes the native workload: the workload command, the client,
+    job and duration options of every sweep point and the builtin
+    scripts and script files the native driver runs.
+    """
+    workload_conf = report_data.get('workload_conf', {})
+    command = str(workload_conf.get('workload_command', '')).replace(
+        'ARG_WORKLOAD_PATH', str(workload_conf.get('workload_path', ''))
+    )
+    load_iterations = report_data.get('load_iterations')
+    if not isinstance(load_iterations, list) or not load_iterations:
+        load_iterations = [[None, command]]
+
+    data = f'{command}\n\n'
+    options = None
+    for idx, (_, workload_cmd) in enumerate(load_iterations, start=1):
+        try:
+            options, _ = parse_native_options(workload_cmd)
+        except ValueError as e:
+            data += f'iteration {idx}: {e}\n'
+            continue
+        duration = (
+            f'duration {options.time} s'
+            if options.time is not None
+            else f'{options.transactions} transactions per client'
+        )
+        data += (
+            f'iteration {idx}: clients {options.client}, '
+            f'jobs {options.jobs}, {duration}\n'
+        )
+    if options is None:
+        return data
+    data += '\n'
+
+    for builtin in options.builtin:
+        name, weight = split_weight(builtin)
+        try:
+            script = get_builtin_script(name)
+        except ValueError as e:
+            data += f'{e}\n\n'
+            continue
+        data += f'builtin {name}@{weight} :\n{script.lstrip()}\n'
+    return data + get_script_files_text(
+        [split_weight(path)[0] for path in options.file]
+    )
 
 
 def workload_parse(report_data, item, phase='workload'):
@@ -210,23 +341,16 @@ def workload_parse(report_data, item, phase='workload'):
         matches = pattern.findall(command)
         matches = [match for match in matches if match]
 
-        data = ''
-        for m in matches:
-            if not os.path.exists(m):
-                data += f'File not found: {m}\n\n'
-                continue
-            try:
-                with open(m, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                data += f'{m} :\n{content}\n\n'
-            except OSError as e:
-                data += f'Error reading file {m}: {str(e)}\n\n'
-
-        item['data'] = data
+        item['data'] = get_script_files_text(matches)
 
-    elif btype == WorkloadTypes.DEFAULT:
+    elif btype == WorkloadTypes.DEFAULT or (
+        btype == WorkloadTypes.NATIVE and phase == 'init'
+    ):
         item['data'] = str(workload_conf.get(command_key, ''))
 
+    elif btype == WorkloadTypes.NATIVE:
+        item['data'] = get_native_workload_text(report_data)
+
     else:
         item['data'] = f'Unknown or missing benchmark_type: {btype}'
 
@@ -263,9 +387,1215 @@ def benchmark_result(report_data, item):
     ]
     item['data'] = results
 
+    iterations = report_data.get('iterations')
+    if not isinstance(iterations, list):
+        return
+    # latency percentiles computed from the pgbench transaction logs
+    with_latency = any(iteration.get('latency') for iteration in iterations)
+    # indicators derived from the pg_stat_* counter changes
+    with_pg_stats = any(iteration.get('pg_stats') for iteration in iterations)
+    # CPU use of the load generator
+    with_client = any(iteration.get('client') for iteration in iterations)
+    if not with_latency and not with_pg_stats and not with_client:
+        return
+
+    if with_latency:
+        item['theader'] = item['theader'] + [
+            f'latency p{percent}, ms' for percent in LATENCY_PERCENTILES
+        ]
+        item['theader'].append('latency max, ms')
+    if with_pg_stats:
+        item['theader'] = item['theader'] + [
+            'cache hit, %',
+            'WAL bytes per transaction',
+            'temp bytes per transaction',
+            'checkpoints',
+            'deadlocks',
+            'rollbacks',
+        ]
+    if with_client:
+        item['theader'] = item['theader'] + [
+            'client CPU per transaction, µs',
+            'client CPU, %',
+            'client saturated',
+        ]
+    item['data'] = []
+    for result, iteration in zip(results, iterations):
+        row = list(result)
+        if with_latency:
+            latency = iteration.get('latency') or {}
+            percentiles = latency.get('percentiles', {})
+            row += [percentiles.get(str(p)) for p in LATENCY_PERCENTILES]
+            row.append(latency.get('max'))
+        if with_pg_stats:
+            transactions = result[2] if len(result) > 2 else None
+            ratios = get_pg_stats_ratios(
+                iteration.get('pg_stats'), transactions
+            )
+            row += list(ratios.values())
+        if with_client:
+            client = iteration.get('client') or {}
+            saturated = client.get('saturated')
+            row += [
+                client.get('cpu_per_xact_us'),
+                client.get('utilization'),
+                None if saturated is None else ('yes' if saturated else 'no'),
+            ]
+        item['data'].append(row)
+
+
+def pg_stats(report_data, item):
+    # turn the pg_stat_* counter changes of each iteration into a table
+    iterations = [
+        iteration
+        for iteration in report_data.get('iterations') or []
+        if iteration.get('pg_stats')
+    ]
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No server statistics'
+        return
+
+    fields = [
+        field
+        for field in PG_STATS_FIELDS
+        if any(field in iteration['pg_stats'] for iteration in iterations)
+    ]
+    item['theader'] = ['iteration'] + fields
+    item['data'] = [
+        [get_iteration_label(report_data, iteration['iteration'])]
+        + [iteration['pg_stats'].get(field) for field in fields]
+        for iteration in iterations
+    ]
+
+
+def pg_statements(report_data, item):
+    # one table of the top pg_stat_statements entries per iteration
+    iterations = [
+        iteration
+        for iteration in report_data.get('iterations') or []
+        if iteration.get('statements')
+    ]
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No pg_stat_statements data'
+        return
+
+    item['theader'] = STATEMENTS_THEADER
+    item['data'] = [
+        [
+            get_iteration_label(report_data, iteration['iteration']),
+            [
+                [html.escape(statement['query'])]
+                + [statement.get(key) for key in PG_STAT_STATEMENTS_FIELDS]
+                for statement in iteration['statements']
+            ],
+        ]
+        for iteration in iterations
+    ]
+
+
+def get_wait_event_iterations(report_data):
+    # iterations with wait event samples and their average active sessions
+    return [
+        (iteration, get_active_sessions(iteration['wait_events']))
+        for iteration in report_data.get('iterations') or []
+        if iteration.get('wait_events')
+    ]
+
+
+def wait_events(report_data, item):
+    # list the sampled wait events of each iteration with the sampler cost
+    iterations = get_wait_event_iterations(report_data)
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No wait event samples'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'samples',
+        'sampling interval, s',
+        'sampler query, ms',
+        'sampler busy, %',
+        'average active sessions by wait event',
+    ]
+    item['data'] = [
+        [
+            get_iteration_label(report_data, iteration['iteration']),
+            iteration['wait_events']['samples'],
+            iteration['wait_events']['interval'],
+            iteration['wait_events']['overhead']['query_ms'],
+            iteration['wait_events']['overhead']['busy'],
+            ', '.join(
+                f'{event} {sessions}' for event, sessions in sessions.items()
+            ),
+        ]
+        for iteration, sessions in iterations
+    ]
+
+
+def chart_wait_events(report_data, item):
+    # stack the average active sessions by wait event of every iteration
+    iterations = get_wait_event_iterations(report_data)
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No wait event samples'
+        return
+
+    totals = {}
+    for _, sessions in iterations:
+        for event, value in sessions.items():
+            totals[event] = totals.get(event, 0) + value
+    events = sorted(totals, key=totals.get, reverse=True)
+    shown = events[:WAIT_EVENTS_CHART_LIMIT]
+    series = [
+        {
+            'name': event,
+            'data': [sessions.get(event, 0) for _, sessions in iterations],
+        }
+        for event in shown
+    ]
+    if len(events) > len(shown):
+        series.append(
+            {
+                'name': 'other',
+                'data': [
+                    round(
+                        sum(
+                            value
+                            for event, value in sessions.items()
+                            if event not in shown
+                        ),
+                        3,
+                    )
+                    for _, sessions in iterations
+                ],
+            }
+        )
+    item['data'].update(
+        {
+            'series': series,
+            'xaxis': {
+                **item['data'].get('xaxis', {}),
+                'categories': [
+                    get_iteration_label(report_data, iteration['iteration'])
+                    for iteration, _ in iterations
+                ],
+            },
+        }
+    )
+
+
+def get_lock_iterations(report_data):
+    # iterations with lock samples
+    return [
+        iteration
+        for iteration in report_data.get('iterations') or []
+        if iteration.get('locks')
+    ]
+
+
+def lock_contention(report_data, item):
+    # list the blocking chains of each iteration by relation and lock mode
+    iterations = get_lock_iterations(report_data)
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No lock samples'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'tps',
+        'blocked time, s',
+        'max blocked sessions',
+        'max blocking chain depth',
+        'blocked time by relation and lock mode, s',
+        'samples',
+        'sampler query, ms',
+    ]
+    item['data'] = []
+    for iteration in iterations:
+        locks = iteration['locks']
+        result = iteration.get('result') or []
+        item['data'].append(
+            [
+                get_iteration_label(report_data, iteration['iteration']),
+                result[5] if len(result) > 5 else None,
+                locks['blocked_time'],
+                locks['max_blocked'],
+                locks['max_depth'],
+                ', '.join(
+                    f'{relation} {mode} {blocked_time} '
+                    f'(max {max_blocked} blocked)'
+                    for relation, mode, blocked_time, max_blocked in locks[
+                        'locks'
+                    ]
+                ),
+                locks['samples'],
+                locks['overhead']['query_ms'],
+            ]
+        )
+
+
+def chart_locks(report_data, item):
+    # plot the lock contention of every iteration next to its tps
+    iterations = get_lock_iterations(report_data)
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No lock samples'
+        return
+
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+    series = [
+        {
+            'name': f'{report_name},tps',
+            'data': [
+                (iteration.get('result') or [None] * 6)[5]
+                for iteration in iterations
+            ],
+        },
+        {
+            'name': 'blocked time, s',
+            'data': [
+                iteration['locks']['blocked_time'] for iteration in iterations
+            ],
+        },
+        {
+            'name': 'max blocking chain depth',
+            'data': [
+                iteration['locks']['max_depth'] for iteration in iterations
+            ],
+        },
+    ]
+    item['data'].update(
+        {
+            'series': series,
+            'yaxis': [
+                {'seriesName': series[0]['name'], 'title': {'text': 'tps'}},
+                {
+                    'seriesName': series[1]['name'],
+                    'opposite': True,
+                    'title': {'text': 'blocked time, s'},
+                },
+                {
+                    'seriesName': series[2]['name'],
+                    'opposite': True,
+                    'title': {'text': 'chain depth'},
+                },
+            ],
+            'xaxis': {
+                **item['data'].get('xaxis', {}),
+                'categories': [
+                    get_iteration_label(report_data, iteration['iteration'])
+                    for iteration in iterations
+                ],
+            },
+        }
+    )
+
+
+def profile(report_data, item):
+    # render the backend profiles of the profiled runs as flame graphs
+    iterations = get_runs(report_data)
+    if not isinstance(iterations, list):
+        item['data'] = "No 'iterations' in report_data"
+        return
+
+    graphs = []
+    for iteration in iterations:
+        run_profile = iteration.get('profile')
+        if not run_profile or not run_profile.get('stacks'):
+            continue
+        label = get_iteration_label(report_data, iteration.get('iteration'))
+        if len(iterations) > len(report_data.get('iterations') or []):
+            label += f', repetition {iteration.get("repetition")}'
+        if run_profile.get('method') == 'perf':
+            label += f', perf record -g at {run_profile.get("frequency")} Hz'
+        else:
+            label += ', /proc state samples (perf not available)'
+        label += f', {run_profile.get("samples")} samples'
+        graphs.append([label, get_flamegraph_svg(run_profile['stacks'])])
+
+    if not graphs:
+        item['state'] = 'hidden'
+        item['data'] = 'No profiled iterations'
+        return
+    item['data'] = graphs
+
+
+def get_runs(report_data):
+    # every pgbench run, repeated runs of an iteration included
+    runs = report_data.get('runs')
+    return runs if isinstance(runs, list) else report_data.get('iterations')
+
+
+def pgbench_runs(report_data, item):
+    # turn the raw results of repeated runs into a table
+    runs = report_data.get('runs')
+    iterations = report_data.get('iterations') or []
+    if not isinstance(runs, list) or len(runs) <= len(iterations):
+        item['state'] = 'hidden'
+        item['data'] = 'No repeated runs'
+        return
+
+    item['theader'] = [
+        'run',
+        'iteration',
+        'repetition',
+        'clients',
+        'duration',
+        'number of transactions actually processed',
+        'latency average',
+        'initial connection time',
+        'tps',
+    ]
+    item['data'] = [
+        [run.get('run'), run.get('iteration'), run.get('repetition')]
+        + list(run.get('result') or [])
+        for run in runs
+    ]
+
+
+def repetition_stats(report_data, item):
+    # turn the statistics of repeated runs into a table
+    iterations = report_data.get('iterations')
+    if not isinstance(iterations, list) or not any(
+        iteration.get('repetitions', 1) > 1 for iteration in iterations
+    ):
+        item['state'] = 'hidden'
+        item['data'] = 'No repeated runs'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'metric',
+        'runs',
+        'mean',
+        'stddev',
+        'cv, %',
+        '95% CI low',
+        '95% CI high',
+    ]
+    item['data'] = []
+    for iteration in iterations:
+        label = get_iteration_label(report_data, iteration.get('iteration'))
+        for metric, stats in (iteration.get('stats') or {}).items():
+            cv = stats.get('cv')
+            item['data'].append(
+                [
+                    label,
+                    metric,
+                    stats.get('n'),
+                    stats.get('mean'),
+                    stats.get('stddev'),
+                    None if cv is None else round(cv * 100, 2),
+                    stats.get('ci_low'),
+                    stats.get('ci_high'),
+                ]
+            )
+
+
+def reset_timings(report_data, item):
+    # turn the reset timings of each run into a table
+    iterations = get_runs(report_data)
+    if not isinstance(iterations, list):
+        item['data'] = "No 'iterations' in report_data"
+        return
+
+    item['theader'] = [
+        'iteration',
+        'repetition',
+        'reset strategy',
+        'dataset',
+        'reset time, s',
+        'init time, s',
+        'cache build time, s',
+    ]
+    item['data'] = [
+        [
+            iteration.get('iteration'),
+            iteration.get('repetition', 1),
+            iteration['reset'].get('strategy'),
+            iteration['reset'].get('dataset'),
+            iteration['reset'].get('reset_time'),
+            iteration['reset'].get('init_time'),
+            iteration['reset'].get('cache_time'),
+        ]
+        for iteration in iterations
+        if isinstance(iteration.get('reset'), dict)
+    ]
+
+
+def steady_state(report_data, item):
+    # turn the measured window of each run into a table
+    runs = [
+        run
+        for run in get_runs(report_data) or []
+        if isinstance(run.get('steady_state'), dict)
+    ]
+    if not runs:
+        item['state'] = 'hidden'
+        item['data'] = 'No steady state detection'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'repetition',
+        'steady',
+        'measured window, s',
+        'window tps',
+        'tps cv, %',
+        'window latency average, ms',
+        'stopped at, s',
+        'time saved, s',
+    ]
+    item['data'] = []
+    for run in runs:
+        window = run['steady_state']
+        item['data'].append(
+            [
+                get_iteration_label(report_data, run.get('iteration')),
+                run.get('repetition', 1),
+                'yes' if window.get('steady') else 'no',
+                f'{window["window_start"]}-{window["window_end"]}'
+                if window.get('steady')
+                else 'full run',
+                window.get('tps'),
+                window.get('cv'),
+                window.get('latency_avg'),
+                window.get('stopped_at'),
+                window.get('time_saved'),
+            ]
+        )
+    saved = [run['steady_state'].get('time_saved') or 0 for run in runs]
+    item['data'].append(
+        ['total', None, None, None, None, None, None, None, sum(saved)]
+    )
+
+
+def cache_state(report_data, item):
+    # turn the cache state each run was measured in into a table
+    runs = [
+        run
+        for run in get_runs(report_data) or []
+        if isinstance(run.get('cache'), dict)
+    ]
+    if all(run['cache'].get('mode') == 'cold' for run in runs):
+        item['state'] = 'hidden'
+        item['data'] = 'No cache preparation'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'repetition',
+        'cache mode',
+        'warm-up run, s',
+        'priming time, s',
+        'relations primed',
+        'blocks primed',
+        'buffer hit ratio, %',
+    ]
+    item['data'] = [
+        [
+            get_iteration_label(report_data, run.get('iteration')),
+            run.get('repetition', 1),
+            run['cache'].get('mode'),
+            run['cache'].get('warmup_time'),
+            run['cache'].get('prime_time'),
+            run['cache'].get('relations'),
+            run['cache'].get('blocks'),
+            run['cache'].get('hit_ratio'),
+        ]
+        for run in runs
+    ]
+
+
+def get_param_label(param_name: str) -> str:
+    # 'pgbench_clients' -> 'clients'
+    return param_name.removeprefix('pgbench_')
+
+
+def get_iteration_label(report_data, iteration_idx) -> str:
+    # describe an iteration by its pgbench parameter values
+    label = f'iteration {iteration_idx}'
+    sweep_points = report_data.get('sweep_points')
+    if not isinstance(sweep_points, list) or not sweep_points:
+        workload_conf = report_data.get('workload_conf', {})
+        iter_name = workload_conf.get('pgbench_iter_name')
+        iter_list = workload_conf.get('pgbench_iter_list')
+        if not iter_name or not isinstance(iter_list, list):
+            return label
+        sweep_points = [{iter_name: value} for value in iter_list]
+
+    if 0 < iteration_idx <= len(sweep_points):
+        params = ', '.join(
+            f'{name}={value}'
+            for name, value in sweep_points[iteration_idx - 1].items()
+        )
+        label += f' ({params})'
+    return label
+
+
+def get_sweep_dimensions(report_data) -> list[str]:
+    # swept parameter names ordered by chart role: x axis, series, slices
+    sweep = report_data.get('workload_conf', {}).get('pgbench_sweep') or {}
+    return [name for name in SWEEP_CHART_PARAMS_ORDER if name in sweep]
+
+
+def get_settings_sweep(report_data) -> dict:
+    # swept PostgreSQL settings: {name: [values]}
+    return report_data.get('workload_conf', {}).get('pg_settings_sweep') or {}
+
+
+def group_sweep_results(report_data) -> dict:
+    """
+    Groups the tps of every sweep point into chart slices:
+    {slice params: {series value: [[x value, tps], ...]}}.
+    """
+    dimensions = get_sweep_dimensions(report_data)
+    x_name, series_name, *slice_names = dimensions
+
+    slices: dict[tuple, dict] = {}
+    for iteration in report_data.get('iterations') or []:
+        params = iteration.get('params') or {}
+        result = iteration.get('result')
+        if x_name not in params or not isinstance(result, list):
+            continue
+        if len(result) < 6 or result[5] is None:
+            continue
+        slice_key = tuple((name, params.get(name)) for name in slice_names)
+        series = slices.setdefault(slice_key, {})
+        series.setdefault(params.get(series_name), []).append(
+            [params[x_name], round(result[5], 1)]
+        )
+    return slices
+
+
+def get_slice_title(title: str, slice_key: tuple) -> str:
+    if not slice_key:
+        return title
+    params = ', '.join(
+        f'{get_param_label(name)}={value}' for name, value in slice_key
+    )
+    return f'{title}, {params}'
+
+
+def sweep_results(report_data, item):
+    # turn the sweep results into a table grouped by the swept parameters
+    iterations = report_data.get('iterations')
+    dimensions = [
+        name
+        for name in PGBENCH_SWEEP_PARAMS
+        if name in get_sweep_dimensions(report_data)
+    ]
+    if (
+        not isinstance(iterations, list)
+        or len(dimensions) < 2
+        or get_settings_sweep(report_data)
+    ):
+        item['state'] = 'hidden'
+        item['data'] = 'No multi-dimensional parameter sweep'
+        return
+
+    item['theader'] = [get_param_label(name) for name in dimensions] + [
+        'tps',
+        'latency average, ms',
+        'latency p99, ms',
+    ]
+    item['data'] = []
+    for iteration in iterations:
+        params = iteration.get('params') or {}
+        result = iteration.get('result') or []
+        latency = iteration.get('latency') or {}
+        item['data'].append(
+            [params.get(name) for name in dimensions]
+            + [
+                result[5] if len(result) > 5 else None,
+                result[3] if len(result) > 3 else None,
+                latency.get('percentiles', {}).get('99'),
+            ]
+        )
+
+
+def chart_sweep(report_data, item):
+    # build tps charts of the sweep: one per slice, one series per value
+    dimensions = get_sweep_dimensions(report_data)
+    if len(dimensions) < 2 or get_settings_sweep(report_data):
+        item['state'] = 'hidden'
+        item['data'] = 'No multi-dimensional parameter sweep'
+        return
+
+    base_chart = item.get('data') if isinstance(item.get('data'), dict) else {}
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+    x_label, series_label = map(get_param_label, dimensions[:2])
+
+    charts = []
+    for slice_key, series in group_sweep_results(report_data).items():
+        chart = copy.deepcopy(base_chart)
+        chart['title'] = {
+            **chart.get('title', {}),
+            'text': get_slice_title(f'tps({x_label})', slice_key),
+        }
+        chart['xaxis'] = {**chart.get('xaxis', {}), 'title': {'text': x_label}}
+        chart['series'] = [
+            {'name': f'{report_name},{series_label}={value}', 'data': data}
+            for value, data in series.items()
+        ]
+        charts.append(chart)
+    item['data'] = charts
+
+
+def chart_heatmap(report_data, item):
+    # build tps heatmaps of the first two swept parameters for every slice
+    dimensions = get_sweep_dimensions(report_data)
+    if len(dimensions) < 2 or get_settings_sweep(report_data):
+        item['state'] = 'hidden'
+        item['data'] = 'No multi-dimensional parameter sweep'
+        return
+
+    base_chart = item.get('data') if isinstance(item.get('data'), dict) else {}
+    x_label, series_label = map(get_param_label, dimensions[:2])
+
+    charts = []
+    for slice_key, series in group_sweep_results(report_data).items():
+        chart = copy.deepcopy(base_chart)
+        chart['title'] = {
+            **chart.get('title', {}),
+            'text': get_slice_title(
+                f'tps({x_label}, {series_label})', slice_key
+            ),
+        }
+        chart['xaxis'] = {**chart.get('xaxis', {}), 'title': {'text': x_label}}
+        chart['series'] = [
+            {
+                'name': f'{series_label}={value}',
+                'data': [{'x': str(x), 'y': tps} for x, tps in data],
+            }
+            for value, data in series.items()
+        ]
+        charts.append(chart)
+    item['data'] = charts
+
+
+def pg_settings_results(report_data, item):
+    # turn the settings sweep into a table of requested and effective values
+    settings_sweep = get_settings_sweep(report_data)
+    iterations = report_data.get('iterations')
+    if not settings_sweep or not isinstance(iterations, list):
+        item['state'] = 'hidden'
+        item['data'] = 'No PostgreSQL settings sweep'
+        return
+
+    dimensions = [
+        name
+        for name in PGBENCH_SWEEP_PARAMS
+        if name in get_sweep_dimensions(report_data)
+    ]
+    item['theader'] = (
+        ['iteration']
+        + [get_param_label(name) for name in dimensions]
+        + list(settings_sweep)
+        + [
+            'effective settings',
+            'tps',
+            'latency average, ms',
+            'latency p99, ms',
+        ]
+    )
+    item['data'] = []
+    for iteration in iterations:
+        params = iteration.get('params') or {}
+        result = iteration.get('result') or []
+        latency = iteration.get('latency') or {}
+        effective = iteration.get('settings') or {}
+        item['data'].append(
+            [iteration.get('iteration')]
+            + [params.get(name) for name in dimensions]
+            + [params.get(name) for name in settings_sweep]
+            + [
+                ', '.join(
+                    f'{name}={value}' for name, value in effective.items()
+                ),
+                result[5] if len(result) > 5 else None,
+                result[3] if len(result) > 3 else None,
+                latency.get('percentiles', {}).get('99'),
+            ]
+        )
+
+
+def chart_pg_settings(report_data, item):
+    # plot tps and latency against every swept setting, one chart per slice
+    settings_sweep = get_settings_sweep(report_data)
+    iterations = [
+        iteration
+        for iteration in report_data.get('iterations') or []
+        if len(iteration.get('result') or []) > 5
+    ]
+    if not settings_sweep or not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No PostgreSQL settings sweep'
+        return
+
+    base_chart = item.get('data') if isinstance(item.get('data'), dict) else {}
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+    with_p99 = any(iteration.get('latency') for iteration in iterations)
+
+    charts = []
+    for name in settings_sweep:
+        # the other swept values of a point select its slice
+        slices = {}
+        for iteration in iterations:
+            params = iteration.get('params') or {}
+            if name in params:
+                slice_key = tuple(
+                    (key, value)
+                    for key, value in params.items()
+                    if key != name
+                )
+                slices.setdefault(slice_key, []).append(iteration)
+
+        for slice_key, slice_iterations in slices.items():
+            series = [
+                {
+                    'name': f'{report_name},tps',
+                    'data': [it['result'][5] for it in slice_iterations],
+                },
+                {
+                    'name': 'latency average, ms',
+                    'data': [it['result'][3] for it in slice_iterations],
+                },
+            ]
+            yaxis = [
+                {'seriesName': series[0]['name'], 'title': {'text': 'tps'}},
+                {
+                    'seriesName': series[1]['name'],
+                    'opposite': True,
+                    'title': {'text': 'latency, ms'},
+                },
+            ]
+            if with_p99:
+                series.append(
+                    {
+                        'name': 'latency p99, ms',
+                        'data': [
+                            (it.get('latency') or {})
+                            .get('percentiles', {})
+                            .get('99')
+                            for it in slice_iterations
+                        ],
+                    }
+                )
+                # drawn on the axis of the average latency
+                yaxis.append(
+                    {
+                        'seriesName': series[1]['name'],
+                        'opposite': True,
+                        'show': False,
+                    }
+                )
+            chart = copy.deepcopy(base_chart)
+            chart['title'] = {
+                **chart.get('title', {}),
+                'text': get_slice_title(f'tps, latency({name})', slice_key),
+            }
+            chart['series'] = series
+            chart['yaxis'] = yaxis
+            chart['xaxis'] = {
+                **chart.get('xaxis', {}),
+                'title': {'text': name},
+                'categories': [
+                    str(it['params'][name]) for it in slice_iterations
+                ],
+            }
+            charts.append(chart)
+    item['data'] = charts
+
+
+def pgbench_progress(report_data, item):
+    # turn the pgbench --progress time series into a table
+    iterations = get_runs(report_data)
+    if not isinstance(iterations, list):
+        item['data'] = "No 'iterations' in report_data"
+        return
+
+    item['theader'] = [
+        'iteration',
+        'repetition',
+        'time, s',
+        'tps',
+        'latency average, ms',
+        'latency stddev, ms',
+        'lag, ms',
+    ]
+    item['data'] = [
+        [iteration.get('iteration'), iteration.get('repetition', 1), *sample]
+        for iteration in iterations
+        for sample in iteration.get('progress') or []
+    ]
+    if not item['data']:
+        item['state'] = 'hidden'
+
+
+def chart_progress(report_data, item):
+    # build a tps-over-time chart for every run with progress reports
+    iterations = get_runs(report_data)
+    if not isinstance(iterations, list):
+        item['data'] = "No 'iterations' in report_data"
+        return
+
+    base_chart = item.get('data') if isinstance(item.get('data'), dict) else {}
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+
+    charts = []
+    for iteration in iterations:
+        progress = iteration.get('progress')
+        if not progress:
+            continue
+        label = get_iteration_label(report_data, iteration.get('iteration'))
+        if len(iterations) > len(report_data.get('iterations') or []):
+            label += f', repetition {iteration.get("repetition")}'
+        chart = copy.deepcopy(base_chart)
+        chart['title'] = {
+            **chart.get('title', {}),
+            'text': f'tps over time, {label}',
+        }
+        chart['series'] = [
+            {
+                'name': f'{report_name},tps',
+                'data': [
+                    [sample[0], sample[1]]
+                    for sample in progress
+                    if sample[1] is not None
+                ],
+            }
+        ]
+        charts.append(chart)
+
+    if not charts:
+        item['state'] = 'hidden'
+        item['data'] = 'No pgbench progress reports collected'
+        return
+    item['data'] = charts
+
+
+def chart_os(report_data, item):
+    # plot the OS metrics of the database host against tps for every run
+    iterations = get_runs(report_data)
+    if not isinstance(iterations, list):
+        item['data'] = "No 'iterations' in report_data"
+        return
+
+    base_chart = item.get('data') if isinstance(item.get('data'), dict) else {}
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+
+    charts = []
+    for iteration in iterations:
+        os_stats = iteration.get('os_stats')
+        if not os_stats or not os_stats.get('samples'):
+            continue
+        fields = os_stats.get('fields') or []
+        samples = os_stats['samples']
+
+        def points(*names):
+            if not all(name in fields for name in names):
+                return []
+            indexes = [fields.index(name) for name in names]
+            time_idx = fields.index('time')
+            return [
+                [
+                    sample[time_idx],
+                    round(sum(sample[idx] for idx in indexes), 3),
+                ]
+                for sample in samples
+                if all(sample[idx] is not None for idx in indexes)
+            ]
+
+        series = [
+            {
+                'name': 'cpu busy, %',
+                'data': points('cpu_user', 'cpu_system'),
+            },
+            {'name': 'cpu iowait, %', 'data': points('cpu_iowait')},
+            {'name': 'disk read, MB/s', 'data': points('disk_read_mb')},
+            {'name': 'disk write, MB/s', 'data': points('disk_write_mb')},
+        ]
+        yaxis = [
+            {
+                'seriesName': 'cpu busy, %',
+                'min': 0,
+                'max': 100,
+                'title': {'text': 'cpu, %'},
+            },
+            {'seriesName': 'cpu busy, %', 'min': 0, 'max': 100, 'show': False},
+            {
+                'seriesName': 'disk read, MB/s',
+                'opposite': True,
+                'title': {'text': 'disk, MB/s'},
+            },
+            {'seriesName': 'disk read, MB/s', 'show': False},
+        ]
+        progress = iteration.get('progress')
+        if progress:
+            series.append(
+                {
+                    'name': f'{report_name},tps',
+                    'data': [
+                        [sample[0], sample[1]]
+                        for sample in progress
+                        if sample[1] is not None
+                    ],
+                }
+            )
+            yaxis.append(
+                {
+                    'seriesName': f'{report_name},tps',
+                    'opposite': True,
+                    'title': {'text': 'tps'},
+                }
+            )
+
+        label = get_iteration_label(report_data, iteration.get('iteration'))
+        if len(iterations) > len(report_data.get('iterations') or []):
+            label += f', repetition {iteration.get("repetition")}'
+        chart = copy.deepcopy(base_chart)
+        chart['title'] = {
+            **chart.get('title', {}),
+            'text': f'database host OS metrics, {label}',
+        }
+        chart['series'] = series
+        chart['yaxis'] = yaxis
+        charts.append(chart)
+
+    if not charts:
+        item['state'] = 'hidden'
+        item['data'] = 'No OS metrics sampled'
+        return
+    item['data'] = charts
+
+
+def workload_location(report_data, item):
+    # describe the host which ran pgbench
+    location = report_data.get('workload_location')
+    if not isinstance(location, dict):
+        item['data'] = 'local host'
+        return
+
+    lines = [f'Location: {location.get("location")}']
+    lines.append(f'Host: {location.get("host")}')
+    db_conf = location.get('db_conf') or {}
+    if db_conf:
+        lines.append(
+            f'PostgreSQL address from the load generator: '
+            f'{db_conf.get("host", "")}:{db_conf.get("port", "")}'
+        )
+    item['data'] = '\n'.join(lines)
+
+
+def knee_summary(report_data, item):
+    # describe the saturation point found by the knee search
+    knee = report_data.get('knee')
+    if not isinstance(knee, dict):
+        item['state'] = 'hidden'
+        item['data'] = 'No knee search'
+        return
+
+    blowup = knee.get('blowup_clients')
+    item['data'] = '\n'.join(
+        [
+            f'Peak tps: {knee.get("peak_tps")} '
+            f'at {knee.get("peak_clients")} clients',
+            f'Latency at the smallest client count: '
+            f'{knee.get("baseline_latency")} ms, '
+            f'blow-up threshold: {knee.get("latency_limit")} ms',
+            f'Latency within the threshold up to '
+            f'{knee.get("knee_clients")} clients',
+            f'Latency blow-up from {blowup} clients'
+            if blowup is not None
+            else 'No latency blow-up in the explored range',
+        ]
+    )
+
+
+def knee_steps(report_data, item):
+    # turn the points explored by the knee search into a table
+    knee = report_data.get('knee')
+    if not isinstance(knee, dict):
+        item['state'] = 'hidden'
+        item['data'] = 'No knee search'
+        return
+
+    item['theader'] = [
+        'step',
+        'phase',
+        'clients',
+        'tps',
+        'latency average, ms',
+    ]
+    item['data'] = knee.get('steps', [])
+
+
+def tuning_summary(report_data, item):
+    # describe the search and the best settings as postgresql.conf lines
+    tuning = report_data.get('tuning')
+    if not isinstance(tuning, dict):
+        item['state'] = 'hidden'
+        item['data'] = 'No settings tuning'
+        return
+
+    lines = [
+        f'Tuned settings: {", ".join(tuning.get("settings", []))}',
+        f'Configurations: {tuning.get("candidates")} sampled of '
+        f'{tuning.get("space_size")}, '
+        f'{len(tuning.get("trials", []))} of {tuning.get("budget")} runs',
+        f'p99 latency limit: {tuning.get("latency_limit")} ms',
+    ]
+    config = get_tuned_config(tuning)
+    if config:
+        lines += ['', config.rstrip('\n')]
+    else:
+        lines.append('No configuration kept the p99 latency within the limit')
+    item['data'] = html.escape('\n'.join(lines), quote=False)
+
+
+def tuning_trials(report_data, item):
+    # turn the runs of the settings tuning into a table in run order
+    tuning = report_data.get('tuning')
+    if not isinstance(tuning, dict):
+        item['state'] = 'hidden'
+        item['data'] = 'No settings tuning'
+        return
+
+    item['theader'] = (
+        ['trial', 'rung']
+        + list(tuning.get('settings', []))
+        + ['tps', 'latency p99, ms', 'within limit']
+    )
+    item['data'] = [
+        trial[:-1] + ['yes' if trial[-1] else 'no']
+        for trial in tuning.get('trials', [])
+    ]
+
+
+def get_rate_iterations(report_data) -> list[dict]:
+    # iterations of rate-limited or latency-limited runs
+    return [
+        iteration
+        for iteration in report_data.get('iterations') or []
+        if isinstance(iteration.get('rate'), dict)
+    ]
+
+
+def rate_results(report_data, item):
+    # compare the achieved and the target rate of every iteration
+    iterations = get_rate_iterations(report_data)
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No rate-limited runs'
+        return
+
+    item['theader'] = [
+        'iteration',
+        'target rate, tps',
+        'achieved tps',
+        'achieved, %',
+        'schedule lag average, ms',
+        'schedule lag max, ms',
+        'skipped',
+        'late',
+    ] + [f'latency p{percent}, ms' for percent in (50, 99, 99.9)]
+    item['data'] = []
+    for iteration in iterations:
+        rate = iteration['rate']
+        result = iteration.get('result') or []
+        tps = result[5] if len(result) > 5 else None
+        target = rate.get('target_rate')
+        percentiles = (iteration.get('latency') or {}).get('percentiles', {})
+        item['data'].append(
+            [
+                get_iteration_label(report_data, iteration['iteration']),
+                target,
+                tps,
+                round(100 * tps / target, 1) if tps and target else None,
+                rate.get('lag_avg'),
+                rate.get('lag_max'),
+                rate.get('skipped'),
+                rate.get('late'),
+            ]
+            + [percentiles.get(str(percent)) for percent in (50, 99, 99.9)]
+        )
+
+
+def chart_rate(report_data, item):
+    # plot the achieved rate and the latency against the target rate
+    iterations = [
+        iteration
+        for iteration in get_rate_iterations(report_data)
+        if iteration['rate'].get('target_rate') is not None
+        and len(iteration.get('result') or []) > 5
+    ]
+    if not iterations:
+        item['state'] = 'hidden'
+        item['data'] = 'No rate-limited runs'
+        return
+
+    report_name = report_data.get('report_conf', {}).get('report_name', 'N/A')
+    targets = [iteration['rate']['target_rate'] for iteration in iterations]
+    series = [
+        {
+            'name': f'{report_name},achieved tps',
+            'data': [
+                [target, iteration['result'][5]]
+                for target, iteration in zip(targets, iterations)
+            ],
+        },
+        {
+            'name': 'target rate',
+            'data': [[target, target] for target in targets],
+        },
+    ]
+    yaxis = [
+        {'seriesName': series[0]['name'], 'title': {'text': 'tps'}},
+        {'seriesName': series[0]['name'], 'show': False},
+    ]
+    for percent in (50, 99):
+        points = [
+            [
+                target,
+                (iteration.get('latency') or {})
+                .get('percentiles', {})
+                .get(str(percent)),
+            ]
+            for target, iteration in zip(targets, iterations)
+        ]
+        if any(latency is not None for _, latency in points):
+            series.append(
+                {'name': f'{report_name},latency p{percent}', 'data': points}
+            )
+            yaxis.append(
+                {
+                    'seriesName': f'{report_name},latency p50',
+                    'opposite': True,
+                    'title': {'text': 'latency, ms'},
+                    'show': percent == 50,
+                }
+            )
+
+    item['data'].update({'series': series, 'yaxis': yaxis})
+
 
 def chart_tps(report_data, item):
     # fill chart data with tps vs iteration
+    if len(get_sweep_dimensions(report_data)) > 1:
+        # multi-dimensional sweeps are shown by chart_sweep
+        item['state'] = 'hidden'
+        return
+    if get_settings_sweep(report_data) or report_data.get('tuning'):
+        # settings sweeps are shown by chart_pg_settings, the tuning
+        # trials by tuning_trials
+        item['state'] = 'hidden'
+        return
+
     if (
         'workload_conf' not in report_data
         or 'pgbench_iter_list' not in report_data['workload_conf']
@@ -313,6 +1643,43 @@ def chart_tps(report_data, item):
         }
     )
 
+    # knee search: mark the peak tps and the latency knee
+    knee = report_data.get('knee')
+    if isinstance(knee, dict):
+        marks = [
+            ('peak tps', knee.get('peak_clients')),
+            ('latency knee', knee.get('knee_clients')),
+        ]
+        item['data']['annotations'] = {
+            'xaxis': [
+                {'x': x, 'borderColor': '#775DD0', 'label': {'text': text}}
+                for text, x in marks
+                if x is not None
+            ]
+        }
+
+    # repeated runs: draw the 95% confidence interval of the mean tps
+    band = []
+    for x, iteration in zip(iter_list, report_data.get('iterations') or []):
+        tps_stats = iteration.get('stats', {}).get('tps', {})
+        if tps_stats.get('ci_low') is not None:
+            band.append(
+                {'x': x, 'y': [tps_stats['ci_low'], tps_stats['ci_high']]}
+            )
+    if band:
+        chart = item['data']
+        chart['series'][0]['type'] = 'line'
+        chart['series'].append(
+            {
+                'name': f'{report_name},tps 95% CI',
+                'type': 'rangeArea',
+                'data': band,
+            }
+        )
+        chart['chart'] = {**chart.get('chart', {}), 'type': 'rangeArea'}
+        chart['fill'] = {'opacity': [1, 0.24]}
+        chart['stroke'] = {**chart.get('stroke', {}), 'width': [2, 0]}
+
 
 async def collect_logs(
     logger,
@@ -0,0 +1,85 @@
+import html
+import zlib
+
+FLAMEGRAPH_WIDTH = 1200
+FRAME_HEIGHT = 16
+# Frames narrower than this many pixels are left out
+MIN_FRAME_WIDTH = 0.5
+CHAR_WIDTH = 7
+
+
+def get_stack_tree(stacks: list[list]) -> dict:
+    # merge the folded stacks into a tree of frames counted by samples
+    root: dict = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks:
+        root['value'] += count
+        node = root
+        for frame in stack.split(';'):
+            node = node['children'].setdefault(
+                frame, {'name': frame, 'value': 0, 'children': {}}
+            )
+            node['value'] += count
+    return root
+
+
+def get_frame_color(name: str) -> str:
+    # a stable warm color for every frame name
+    seed = zlib.crc32(name.encode('utf-8'))
+    return f'rgb({205 + seed % 50},{(seed >> 8) % 200},{(seed >> 16) % 55})'
+
+
+def get_flamegraph_svg(stacks: list[list], width: int = FLAMEGRAPH_WIDTH):
+    """
+    Renders folded stacks ('frame;frame' keys with their sample counts)
+    as an SVG flame graph: the root at the bottom, frames ordered by
+    name, every frame as wide as its share of the samples. Hovering a
+    frame shows its name, samples and share.
+    """
+    root = get_stack_tree(stacks)
+    if not root['value']:
+        return ''
+    scale = width / root['value']
+    frames = []
+    depth = 0
+
+    def layout(node, x, level):
+        nonlocal depth
+        frame_width = node['value'] * scale
+        if frame_width < MIN_FRAME_WIDTH:
+            return
+        depth = max(depth, level)
+        frames.append((node, x, level, frame_width))
+        for name in sorted(node['children']):
+            child = node['children'][name]
+            layout(child, x, level + 1)
+            x += child['value'] * scale
+
+    layout(root, 0.0, 0)
+    height = (depth + 1) * FRAME_HEIGHT
+    elements = []
+    for node, x, level, frame_width in frames:
+        y = height - (level + 1) * FRAME_HEIGHT
+        name = node['name']
+        share = 100 * node['value'] / root['value']
+        label = name[: int((frame_width - 4) // CHAR_WIDTH)]
+        if len(label) < len(name) and len(label) > 2:
+            label = label[:-2] + '..'
+        elements.append(
+            f'<g><title>{html.escape(name)} ({node["value"]} samples, '
+            f'{share:.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{frame_width:.1f}" '
+            f'height="{FRAME_HEIGHT - 1}" rx="2" '
+            f'fill="{get_frame_color(name)}"/>'
+            + (
+                f'<text x="{x + 3:.1f}" y="{y + FRAME_HEIGHT - 4}">'
+                f'{html.escape(label)}</text>'
+                if len(label) > 2
+                else ''
+            )
+            + '</g>'
+        )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" '
+        f'viewBox="0 0 {width} {height}" font-family="monospace" '
+        f'font-size="11">' + ''.join(elements) + '</svg>'
+    )
@@ -8,13 +8,33 @@ from pg_perfbench.const import (
     WorkloadTypes,
     WorkMode,
     ConnectionType,
+    ResetStrategy,
+    CacheMode,
+    CloneStrategy,
+    SnapshotMethod,
+    WorkloadLocation,
 )
 from pg_perfbench.benchmark import BenchmarkRunner
-from pg_perfbench.context import Context, CollectInfoContext, JoinContext
+from pg_perfbench.context import (
+    Context,
+    CollectInfoContext,
+    JoinContext,
+    GateContext,
+    HistoryContext,
+)
 from pg_perfbench.log import setup_logger
 from pg_perfbench.report.processing import save_report
 from pg_perfbench.collect_info import InfoCollector
 from pg_perfbench.join import ReportJoiner
+from pg_perfbench.gate import (
+    RegressionGate,
+    DEFAULT_TPS_TOLERANCE,
+    DEFAULT_LATENCY_TOLERANCE,
+    DEFAULT_GATE_ALPHA,
+    REGRESSION_EXIT_CODE,
+)
+from pg_perfbench.store import ResultStore, DEFAULT_HISTORY_LIMIT
+from pg_perfbench.multi_target import MultiTargetRunner
 
 
 def parse_pgbench_options(value):
@@ -24,6 +44,16 @@ def parse_pgbench_options(value):
     return None
 
 
+def parse_pg_setting(value):
+    # parse 'name=value1,value2' of a swept PostgreSQL setting
+    name, sep, values = value.partition('=')
+    if not sep or not name.strip() or not values:
+        raise argparse.ArgumentTypeError(
+            f'expected NAME=VALUE[,VALUE...], got "{value}"'
+        )
+    return [name.strip(), values.split(',')]
+
+
 def get_args_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description='pg_perfbench CLI')
 
@@ -54,6 +84,28 @@ def get_args_parser() -> argparse.ArgumentParser:
         default=None,
         help='Custom report name',
     )
+    parser.add_argument(
+        '--journal',
+        type=str,
+        default=None,
+        help='Path to the JSONL journal of the benchmark runs '
+        '(default: <report-name>.journal.jsonl in the report folder)',
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        default=False,
+        help='Resume an interrupted benchmark from its journal, '
+        'skipping the completed runs',
+    )
+    parser.add_argument(
+        '--results-db',
+        type=str,
+        default=None,
+        help='Path to the SQLite database every benchmark report is added '
+        'to (default: results.sqlite3 in the report folder, an empty '
+        'value disables it)',
+    )
 
     # group for workload and benchmark options
     workload_group = parser.add_argument_group(
@@ -71,7 +123,7 @@ def get_args_parser() -> argparse.ArgumentParser:
         type=str,
         choices=list(map(str, WorkloadTypes)),
         default=None,
-        help='Benchmark type (default or custom)',
+        help='Benchmark type (default, custom or native)',
     )
     workload_group.add_argument(
         '--workload-path',
@@ -91,6 +143,196 @@ def get_args_parser() -> argparse.ArgumentParser:
         default=None,
         help='Comma-separated list of test durations (in seconds) for pgbench',
     )
+    workload_group.add_argument(
+        '--pgbench-jobs',
+        type=parse_pgbench_options,
+        default=None,
+        help='Comma-separated list of pgbench thread counts (--jobs)',
+    )
+    workload_group.add_argument(
+        '--pgbench-scale',
+        type=parse_pgbench_options,
+        default=None,
+        help='Comma-separated list of pgbench scale factors '
+        '(substituted into ARG_PGBENCH_SCALE of the init command)',
+    )
+    workload_group.add_argument(
+        '--pgbench-rate',
+        type=parse_pgbench_options,
+        default=None,
+        help='Comma-separated list of target transaction rates (tps) of '
+        'an open-loop run (substituted into ARG_PGBENCH_RATE, '
+        'e.g. --rate=ARG_PGBENCH_RATE)',
+    )
+    workload_group.add_argument(
+        '--pgbench-latency-limit',
+        type=float,
+        default=None,
+        help='pgbench --latency-limit in ms: transactions above it are '
+        'counted as late, with --rate those that would start late are skipped',
+    )
+    workload_group.add_argument(
+        '--knee-search',
+        action='store_true',
+        default=False,
+        help='Search the saturation point over client counts instead of '
+        'running --pgbench-clients: double the clients, then bisect '
+        'around the peak tps and the latency blow-up',
+    )
+    workload_group.add_argument(
+        '--knee-min-clients',
+        type=int,
+        default=None,
+        help='Smallest client count of the knee search (default: 1)',
+    )
+    workload_group.add_argument(
+        '--knee-max-clients',
+        type=int,
+        default=None,
+        help='Largest client count of the knee search (default: 1024)',
+    )
+    workload_group.add_argument(
+        '--knee-latency-factor',
+        type=float,
+        default=None,
+        help='Latency blow-up threshold as a multiple of the latency at '
+        'the smallest client count (default: 2.0)',
+    )
+    workload_group.add_argument(
+        '--knee-max-points',
+        type=int,
+        default=None,
+        help='Maximum number of client counts run by the knee search '
+        '(default: 20)',
+    )
+    workload_group.add_argument(
+        '--tune-setting',
+        type=parse_pg_setting,
+        action='append',
+        default=None,
+        help='Candidate values of a PostgreSQL setting to tune '
+        '(NAME=VALUE[,VALUE...], may be repeated): searches the '
+        'configuration with the highest tps within --tune-latency-p99',
+    )
+    workload_group.add_argument(
+        '--tune-latency-p99',
+        type=float,
+        default=None,
+        help='p99 latency limit in ms of the tuned configuration',
+    )
+    workload_group.add_argument(
+        '--tune-budget',
+        type=int,
+        default=None,
+        help='Maximum number of runs of the settings tuning (default: 20)',
+    )
+    workload_group.add_argument(
+        '--tune-seed',
+        type=int,
+        default=None,
+        help='Random seed of the configurations sampled by the tuning',
+    )
+    workload_group.add_argument(
+        '--repetitions',
+        type=int,
+        default=1,
+        help='Number of runs of every workload point, the report shows '
+        'the mean, stddev and 95%% confidence interval of the metrics',
+    )
+    workload_group.add_argument(
+        '--shuffle',
+        action='store_true',
+        default=False,
+        help='Run the repetitions of the workload points in random order '
+        '(points sharing the init command stay together)',
+    )
+    workload_group.add_argument(
+        '--shuffle-seed',
+        type=int,
+        default=None,
+        help='Random seed of --shuffle for a reproducible run order',
+    )
+    workload_group.add_argument(
+        '--pgbench-progress',
+        type=int,
+        default=None,
+        help='Interval in seconds of pgbench --progress reports collected '
+        'as a time series for each iteration',
+    )
+    workload_group.add_argument(
+        '--steady-state-window',
+        type=float,
+        default=None,
+        help='Stop every workload run once its tps varies within '
+        '--steady-state-cv over a window of this many seconds, '
+        'the window is measured instead of the whole -T',
+    )
+    workload_group.add_argument(
+        '--steady-state-cv',
+        type=float,
+        default=None,
+        help='Maximum coefficient of variation (%%) of tps in the '
+        'steady state window (default 5)',
+    )
+    workload_group.add_argument(
+        '--steady-state-min-time',
+        type=float,
+        default=None,
+        help='Minimum run time in seconds before the steady state '
+        'can be detected',
+    )
+    workload_group.add_argument(
+        '--pgbench-latency-log',
+        action='store_true',
+        default=False,
+        help='Write pgbench per-transaction logs (--log) and report '
+        'latency percentiles for each iteration',
+    )
+    workload_group.add_argument(
+        '--pg-stat-statements-top',
+        type=int,
+        default=None,
+        help='Number of statements by total time read from '
+        'pg_stat_statements after each run when the server preloads it, '
+        '0 disables it (default 10)',
+    )
+    workload_group.add_argument(
+        '--os-sampling-interval',
+        type=int,
+        default=None,
+        help='Sample CPU, disk, network and memory counters of the '
+        'database host every this many seconds during each run '
+        'and chart them against tps',
+    )
+    workload_group.add_argument(
+        '--wait-event-sampling-interval',
+        type=float,
+        default=None,
+        help='Poll pg_stat_activity every this many seconds (e.g. 0.01) '
+        'during each run and chart the wait event profile per iteration',
+    )
+    workload_group.add_argument(
+        '--lock-sampling-interval',
+        type=float,
+        default=None,
+        help='Sample pg_locks and pg_blocking_pids() every this many '
+        'seconds during each run and report the blocking chains by '
+        'relation and lock mode',
+    )
+    workload_group.add_argument(
+        '--profile-iterations',
+        type=parse_pgbench_options,
+        default=None,
+        help='Comma-separated iteration numbers whose runs are profiled '
+        'with perf record -g on the database host, shown as flame graphs',
+    )
+    workload_group.add_argument(
+        '--profile-frequency',
+        type=int,
+        default=None,
+        help='perf sampling frequency in Hz of --profile-iterations '
+        '(default 99)',
+    )
     workload_group.add_argument(
         '--init-command',
         type=str,
@@ -115,6 +357,96 @@ def get_args_parser() -> argparse.ArgumentParser:
         default=None,
         help='Path to the psql binary (on the local or remote host)',
     )
+    workload_group.add_argument(
+        '--reset-strategy',
+        type=str,
+        choices=list(map(str, ResetStrategy)),
+        default=str(ResetStrategy.RECREATE),
+        help='How the test database is reset between iterations: '
+        '"recreate" re-runs the init command, '
+        '"template" clones a cached template database, '
+        '"snapshot" restores a PGDATA snapshot of the stopped cluster',
+    )
+    workload_group.add_argument(
+        '--cache-mode',
+        type=str,
+        choices=list(map(str, CacheMode)),
+        default=str(CacheMode.COLD),
+        help='Cache state the iterations are measured in: "cold" restarts '
+        'the server and drops the OS caches (requires sudo), "warm" keeps '
+        'the server running and discards a warm-up run of the workload, '
+        '"primed" keeps the server running and loads the dataset into '
+        'shared buffers with pg_prewarm',
+    )
+    workload_group.add_argument(
+        '--warmup-time',
+        type=int,
+        default=None,
+        help='Duration in seconds of the discarded warm-up run of the '
+        '"warm" cache mode, replacing the -T duration of the workload '
+        'command (default: the duration of the measured run)',
+    )
+    workload_group.add_argument(
+        '--template-strategy',
+        type=str,
+        choices=list(map(str, CloneStrategy)),
+        default=str(CloneStrategy.FILE_COPY),
+        help='CREATE DATABASE strategy used for template cloning (PostgreSQL 15+)',
+    )
+    workload_group.add_argument(
+        '--snapshot-method',
+        type=str,
+        choices=list(map(str, SnapshotMethod)),
+        default=str(SnapshotMethod.AUTO),
+        help='PGDATA snapshot method for the "snapshot" reset strategy '
+        '("auto" tries a reflink copy first, then rsync)',
+    )
+    workload_group.add_argument(
+        '--snapshot-path',
+        type=str,
+        default=None,
+        help='PGDATA snapshot directory on the database host '
+        '(default: next to --pg-data-path)',
+    )
+    workload_group.add_argument(
+        '--snapshot-create-command',
+        type=str,
+        default=None,
+        help='Shell command creating the snapshot for --snapshot-method=command '
+        '(e.g. a btrfs or LVM snapshot), '
+        'placeholders: ARG_PG_DATA_PATH, ARG_SNAPSHOT_PATH',
+    )
+    workload_group.add_argument(
+        '--snapshot-restore-command',
+        type=str,
+        default=None,
+        help='Shell command restoring the snapshot for --snapshot-method=command, '
+        'placeholders: ARG_PG_DATA_PATH, ARG_SNAPSHOT_PATH',
+    )
+
+    workload_group.add_argument(
+        '--workload-location',
+        type=str,
+        choices=list(map(str, WorkloadLocation)),
+        default=str(WorkloadLocation.LOCAL),
+        help='Host running the init and workload commands: '
+        '"local" (this host), "db-host" (the database host, through the '
+        'SSH or Docker connection), "client-host" (a separate host over SSH)',
+    )
+    workload_group.add_argument(
+        '--workload-pg-host',
+        type=str,
+        default=None,
+        help='PostgreSQL host as seen from the workload host '
+        '(default for "db-host": --remote-pg-host or --docker-pg-host)',
+    )
+    workload_group.add_argument(
+        '--workload-pg-port',
+        type=str,
+        default=None,
+        help='PostgreSQL port as seen from the workload host '
+        '(default for "db-host": --remote-pg-port or --docker-pg-port)',
+    )
 
     # database connection options
     db_group = parser.add_argument_group(title='Database connection options')
@@ -124,6 +456,16 @@ def get_args_parser() -> argparse.ArgumentParser:
         default=None,
         help='Path to the custom PostgreSQL config file to be used',
     )
+    db_group.add_argument(
+        '--pg-setting',
+        type=parse_pg_setting,
+        action='append',
+        default=None,
+        help='Sweep a PostgreSQL setting over the comma-separated values '
+        '(NAME=VALUE[,VALUE...], may be repeated): every point is applied '
+        'with ALTER SYSTEM and a reload, or a restart when the setting '
+        'requires one',
+    )
     db_group.add_argument(
         '--pg-host',
         type=str,
@@ -235,6 +577,61 @@ def get_args_parser() -> argparse.ArgumentParser:
         help='Name of the container to be created or used',
     )
 
+    # client host options (--workload-location=client-host)
+    client_group = parser.add_argument_group('Client host options')
+    client_group.add_argument(
+        '--client-ssh-host',
+        type=str,
+        default=None,
+        help='SSH host running the workload for "client-host" location',
+    )
+    client_group.add_argument(
+        '--client-ssh-port',
+        type=str,
+        default='22',
+        help='SSH port of the client host',
+    )
+    client_group.add_argument(
+        '--client-ssh-user',
+        type=str,
+        default='postgres',
+        help='SSH user name on the client host',
+    )
+    client_group.add_argument(
+        '--client-ssh-key',
+        type=str,
+        default=None,
+        help='Path to SSH private key for the client host',
+    )
+
+    # multi-target benchmark options
+    targets_group = parser.add_argument_group(
+        title='Multi-target options',
+        description='Benchmark several PostgreSQL targets concurrently',
+    )
+    targets_group.add_argument(
+        '--targets',
+        type=str,
+        default=None,
+        help='Path to JSON file with a list of targets, each an object of '
+        'the options overriding the common ones (e.g. {"pg-port": 5433}), '
+        '"cpus" pins the load generator of a target to the listed CPUs',
+    )
+    targets_group.add_argument(
+        '--max-concurrent-targets',
+        type=int,
+        default=None,
+        help='Maximum number of targets benchmarked at the same time '
+        '(default: all)',
+    )
+    targets_group.add_argument(
+        '--cpu-partition',
+        action='store_true',
+        default=False,
+        help='Split the local CPUs between the concurrently running targets '
+        'and pin the load generator of every target to its part',
+    )
+
     # join mode options (comparing multiple reports)
     join_group = parser.add_argument_group(
         title='Join mode options',
@@ -259,6 +656,107 @@ def get_args_parser() -> argparse.ArgumentParser:
         help='Directory containing the JSON reports to compare',
     )
 
+    # gate mode options (checking a run against a baseline report)
+    gate_group = parser.add_argument_group(
+        title='Gate mode options',
+        description='Options for comparing a benchmark against a baseline '
+        'report, a regression ends the tool with a non-zero exit code',
+    )
+    gate_group.add_argument(
+        '--baseline-report',
+        type=str,
+        default=None,
+        help='Path to the JSON report of the baseline benchmark',
+    )
+    gate_group.add_argument(
+        '--current-report',
+        type=str,
+        default=None,
+        help='Path to the JSON report to check, the benchmark is run with '
+        'the benchmark options when not set',
+    )
+    gate_group.add_argument(
+        '--gate-tps-tolerance',
+        type=float,
+        default=DEFAULT_TPS_TOLERANCE,
+        help='Drop of tps in percent tolerated at every sweep point '
+        f'(default {DEFAULT_TPS_TOLERANCE})',
+    )
+    gate_group.add_argument(
+        '--gate-latency-tolerance',
+        type=float,
+        default=DEFAULT_LATENCY_TOLERANCE,
+        help='Growth of the average latency in percent tolerated at every '
+        f'sweep point (default {DEFAULT_LATENCY_TOLERANCE})',
+    )
+    gate_group.add_argument(
+        '--gate-alpha',
+        type=float,
+        default=DEFAULT_GATE_ALPHA,
+        help='Significance level of the Mann-Whitney U test of the samples '
+        f'of a sweep point (default {DEFAULT_GATE_ALPHA})',
+    )
+
+    # history mode options (querying the results database)
+    history_group = parser.add_argument_group(
+        title='History mode options',
+        description='Options for adding reports to the results database and '
+        'querying the stored results',
+    )
+    history_group.add_argument(
+        '--ingest',
+        type=str,
+        nargs='+',
+        default=None,
+        help='JSON reports, or directories of them, to add to the results '
+        'database before the query',
+    )
+    history_group.add_argument(
+        '--history-host',
+        type=str,
+        default=None,
+        help='Only the results of the database host',
+    )
+    history_group.add_argument(
+        '--history-pg-version',
+        type=str,
+        default=None,
+        help='Only the results of the PostgreSQL version, a major version '
+        'matches all its minor ones',
+    )
+    history_group.add_argument(
+        '--history-workload',
+        type=str,
+        default=None,
+        help='Only the results of the workload: the benchmark type or the '
+        'name of the workload directory',
+    )
+    history_group.add_argument(
+        '--history-config-hash',
+        type=str,
+        default=None,
+        help='Only the results of the PostgreSQL settings with this hash',
+    )
+    history_group.add_argument(
+        '--history-clients',
+        type=int,
+        default=None,
+        help='Only the results of the sweep points with this many clients',
+    )
+    history_group.add_argument(
+        '--history-days',
+        type=int,
+        default=None,
+        help='Only the results of the last days',
+    )
+    history_group.add_argument(
+        '--history-limit',
+        type=int,
+        default=DEFAULT_HISTORY_LIMIT,
+        help=f'Maximum number of results shown (default '
+        f'{DEFAULT_HISTORY_LIMIT})',
+    )
+
     return parser
 
 
@@ -290,12 +788,20 @@ async def execute_pg_perfbench(args: Optional[Namespace] = None):
             return None
 
         # run the appropriate mode
-        if args.mode == WorkMode.BENCHMARK:
+        if args.mode == WorkMode.BENCHMARK and getattr(args, 'targets', None):
+            # Running the benchmark against every target of the list
+            report = await MultiTargetRunner.run_targets(
+                get_args_parser(), args, logger
+            )
+
+        elif args.mode == WorkMode.BENCHMARK:
             # Creating a context for benchmark mode
             ctx = Context(args, logger)
             report = await BenchmarkRunner.run_benchmark_and_collect_metrics(
                 **ctx.structured_params
             )
+            if report is not None:
+                ResultStore.store_report(logger, args.results_db, report)
 
         elif args.mode in {
             WorkMode.COLLECT_SYS_INFO,
@@ -311,6 +817,39 @@ async def execute_pg_perfbench(args: Optional[Namespace] = None):
             ctx = JoinContext(args, logger)
             report = ReportJoiner.join_reports(**ctx.structured_params)
 
+        elif args.mode == WorkMode.GATE:
+            # Checking a report, run now or loaded, against the baseline
+            gate_ctx = GateContext(args, logger)
+            if gate_ctx.current_report:
+                report = RegressionGate.load_report(
+                    logger, gate_ctx.current_report
+                )
+                if report is None:
+                    raise ValueError(
+                        f'Invalid current report: {gate_ctx.current_report}'
+                    )
+            else:
+                report = await (
+                    BenchmarkRunner.run_benchmark_and_collect_metrics(
+                        **Context(args, logger).structured_params
+                    )
+                )
+                if report is None:
+                    raise ValueError('The benchmark of the gate failed')
+                save_report(logger, report)
+                ResultStore.store_report(logger, args.results_db, report)
+            if RegressionGate.run_gate(
+                current=report, **gate_ctx.structured_params
+            ):
+                sys.exit(REGRESSION_EXIT_CODE)
+            return report
+
+        elif args.mode == WorkMode.HISTORY:
+            # Adding reports to the results database and querying it
+            history_ctx = HistoryContext(args, logger)
+            ResultStore.run_history(**history_ctx.structured_params)
+            return None
+
         else:
             logger.error(f'Unsupported mode: {args.mode}')
             return None
@@ -0,0 +1,14 @@
+from .knee import KneeSearch
+from .tuner import (
+    DEFAULT_TUNE_BUDGET,
+    SettingsTuner,
+    get_tuned_config,
+)
+
+
+__all__ = [
+    'KneeSearch',
+    'DEFAULT_TUNE_BUDGET',
+    'SettingsTuner',
+    'get_tuned_config',
+]
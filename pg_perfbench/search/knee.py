@@ -0,0 +1,142 @@
+DEFAULT_MIN_CLIENTS = 1
+DEFAULT_MAX_CLIENTS = 1024
+# Latency blows up when it exceeds this multiple of the baseline latency
+DEFAULT_LATENCY_FACTOR = 2.0
+DEFAULT_MAX_POINTS = 20
+# Bisection stops when neighbouring client counts differ by less than this
+# fraction of the smaller one
+DEFAULT_RESOLUTION = 0.1
+
+PHASE_DOUBLING = 'doubling'
+PHASE_BISECTION = 'bisection'
+
+
+class KneeSearch:
+    """
+    Adaptive search of the saturation point over client counts.
+    The client count is doubled until latency exceeds latency_factor
+    times the baseline (the latency at the smallest client count) or the
+    maximum is reached, then the intervals around the peak-tps point and
+    around the latency blow-up are bisected down to the resolution.
+    Results are fed back with add_result before asking for the next
+    client count.
+    """
+
+    def __init__(
+        self,
+        min_clients: int | None = None,
+        max_clients: int | None = None,
+        latency_factor: float | None = None,
+        max_points: int | None = None,
+        resolution: float = DEFAULT_RESOLUTION,
+    ):
+        self.min_clients = min_clients or DEFAULT_MIN_CLIENTS
+        self.max_clients = max_clients or DEFAULT_MAX_CLIENTS
+        self.latency_factor = latency_factor or DEFAULT_LATENCY_FACTOR
+        self.max_points = max_points or DEFAULT_MAX_POINTS
+        self.resolution = resolution
+        if not 0 < self.min_clients <= self.max_clients:
+            raise ValueError(
+                f'Invalid client range: {self.min_clients}..{self.max_clients}'
+            )
+        if self.latency_factor <= 1:
+            raise ValueError(
+                f'Latency factor must be greater than 1: {self.latency_factor}'
+            )
+        self.phase = PHASE_DOUBLING
+        # clients -> (tps, latency average)
+        self.points: dict[int, tuple[float, float | None]] = {}
+        # [step, phase, clients, tps, latency average]
+        self.steps: list[list] = []
+
+    def add_result(self, clients: int, tps, latency) -> None:
+        self.points[clients] = (tps or 0.0, latency)
+        self.steps.append(
+            [len(self.steps) + 1, self.phase, clients, tps, latency]
+        )
+
+    def get_baseline_latency(self):
+        if not self.points:
+            return None
+        return self.points[min(self.points)][1]
+
+    def get_peak_clients(self) -> int | None:
+        if not self.points:
+            return None
+        # the smallest client count wins a tie
+        return max(sorted(self.points), key=lambda c: self.points[c][0])
+
+    def get_latency_bounds(self) -> tuple[int | None, int | None]:
+        """
+        Returns the largest client count whose latency is within
+        the limit and the smallest one above it.
+        """
+        baseline = self.get_baseline_latency()
+        if not baseline:
+            return None, None
+        limit = baseline * self.latency_factor
+        clients = sorted(self.points)
+        blowup = next(
+            (
+                c
+                for c in clients
+                if self.points[c][1] is not None and self.points[c][1] > limit
+            ),
+            None,
+        )
+        within = [c for c in clients if blowup is None or c < blowup]
+        return (within[-1] if within else None), blowup
+
+    def get_refine_intervals(self) -> list[tuple[int, int]]:
+        clients = sorted(self.points)
+        peak = self.get_peak_clients()
+        if peak is None:
+            return []
+        idx = clients.index(peak)
+        intervals = []
+        if idx > 0:
+            intervals.append((clients[idx - 1], peak))
+        if idx + 1 < len(clients):
+            intervals.append((peak, clients[idx + 1]))
+        knee, blowup = self.get_latency_bounds()
+        if knee is not None and blowup is not None:
+            intervals.append((knee, blowup))
+        return intervals
+
+    def next_clients(self) -> int | None:
+        """Returns the next client count to run or None when done."""
+        if len(self.points) >= self.max_points:
+            return None
+        if not self.points:
+            return self.min_clients
+
+        if self.phase == PHASE_DOUBLING:
+            last = max(self.points)
+            _, blowup = self.get_latency_bounds()
+            if blowup is None and last < self.max_clients:
+                return min(last * 2, self.max_clients)
+            self.phase = PHASE_BISECTION
+
+        for low, high in self.get_refine_intervals():
+            if high - low <= max(1, self.resolution * low):
+                continue
+            middle = (low + high) // 2
+            if middle not in self.points:
+                return middle
+        return None
+
+    def get_summary(self) -> dict:
+        knee, blowup = self.get_latency_bounds()
+        peak = self.get_peak_clients()
+        baseline = self.get_baseline_latency()
+        return {
+            'peak_clients': peak,
+            'peak_tps': self.points[peak][0] if peak is not None else None,
+            'baseline_latency': baseline,
+            'latency_limit': (
+                round(baseline * self.latency_factor, 3) if baseline else None
+            ),
+            'knee_clients': knee,
+            'blowup_clients': blowup,
+            'steps': self.steps,
+        }
@@ -0,0 +1,185 @@
+import math
+import random
+
+DEFAULT_TUNE_BUDGET = 20
+# 1/TUNE_ETA of the candidates are promoted to the next rung, where they
+# are run TUNE_ETA times as often
+TUNE_ETA = 2
+
+
+def get_halving_cost(candidates: int, eta: int = TUNE_ETA) -> int:
+    """Returns the runs successive halving needs for the candidates."""
+    runs = candidates
+    required = 1
+    # the best of the last eta candidates needs no further runs
+    while candidates > eta:
+        candidates = math.ceil(candidates / eta)
+        runs += candidates * (required * eta - required)
+        required *= eta
+    return runs
+
+
+class SettingsTuner:
+    """
+    Successive halving search of the PostgreSQL settings giving the
+    highest tps with the p99 latency within latency_limit (ms).
+    The space maps every setting to its candidate values. As many
+    configurations of their cross product as the run budget allows are
+    sampled and run once, then the better 1/TUNE_ETA of them are run
+    TUNE_ETA times as often, and so on until TUNE_ETA or fewer are left
+    or the budget is spent. A configuration is scored by the mean tps
+    and p99 latency of its runs, those over the latency limit rank below
+    all others.
+    Results are fed back with add_result before asking for the next
+    configuration.
+    """
+
+    def __init__(
+        self,
+        space: dict,
+        latency_limit: float,
+        budget: int | None = None,
+        seed: int | None = None,
+    ):
+        if not space or not all(space.values()):
+            raise ValueError('Empty settings space to tune')
+        if not latency_limit or latency_limit <= 0:
+            raise ValueError(
+                f'Latency limit must be greater than 0: {latency_limit}'
+            )
+        self.space = space
+        self.names = list(space)
+        self.latency_limit = latency_limit
+        self.budget = budget or DEFAULT_TUNE_BUDGET
+        if self.budget < 1:
+            raise ValueError(f'Invalid trial budget: {self.budget}')
+
+        self.space_size = math.prod(len(values) for values in space.values())
+        count = 1
+        while (
+            count < self.space_size
+            and get_halving_cost(count + 1) <= self.budget
+        ):
+            count += 1
+        rng = random.Random(seed)
+        self.configs = [
+            self.get_config(idx)
+            for idx in sorted(rng.sample(range(self.space_size), count))
+        ]
+        # configuration index -> [[tps, p99 latency], ...]
+        self.results: dict[int, list[list]] = {
+            idx: [] for idx in range(len(self.configs))
+        }
+        self.active = list(range(len(self.configs)))
+        self.pending = list(self.active)
+        self.rung = 0
+        # [trial, rung, *setting values, tps, p99 latency, within limit]
+        self.trials: list[list] = []
+
+    def get_config(self, idx: int) -> dict:
+        # decode a position of the cross product, the last setting fastest
+        config = {}
+        for name in reversed(self.names):
+            values = self.space[name]
+            idx, position = divmod(idx, len(values))
+            config[name] = values[position]
+        return {name: config[name] for name in self.names}
+
+    def get_score(self, idx: int) -> tuple:
+        results = self.results[idx]
+        tps = [result[0] or 0.0 for result in results]
+        p99 = [result[1] for result in results if result[1] is not None]
+        mean_tps = sum(tps) / len(tps) if tps else 0.0
+        mean_p99 = sum(p99) / len(p99) if p99 else None
+        return mean_tps, mean_p99
+
+    def is_within_limit(self, p99) -> bool:
+        return p99 is not None and p99 <= self.latency_limit
+
+    def get_rank(self, idx: int) -> tuple:
+        tps, p99 = self.get_score(idx)
+        if self.is_within_limit(p99):
+            return True, tps
+        return False, -p99 if p99 is not None else -math.inf
+
+    def next_config(self) -> dict | None:
+        """Returns the configuration to run next, None when done."""
+        if len(self.trials) >= self.budget:
+            return None
+        if not self.pending:
+            if len(self.active) <= TUNE_ETA:
+                return None
+            ranked = sorted(self.active, key=self.get_rank, reverse=True)
+            self.active = ranked[: math.ceil(len(ranked) / TUNE_ETA)]
+            self.rung += 1
+            required = TUNE_ETA**self.rung
+            self.pending = [
+                idx
+                for idx in self.active
+                for _ in range(required - len(self.results[idx]))
+            ]
+        return dict(self.configs[self.pending[0]])
+
+    def get_runs(self, config: dict) -> int:
+        """Returns how often the configuration has been run."""
+        return len(self.results[self.configs.index(config)])
+
+    def add_result(self, config: dict, tps, p99) -> None:
+        idx = self.configs.index(config)
+        if idx in self.pending:
+            self.pending.remove(idx)
+        self.results[idx].append([tps, p99])
+        self.trials.append(
+            [
+                len(self.trials) + 1,
+                self.rung,
+                *config.values(),
+                tps,
+                p99,
+                self.is_within_limit(p99),
+            ]
+        )
+
+    def get_best(self) -> int | None:
+        # the most often run configuration within the limit, by tps
+        within = [
+            idx
+            for idx, results in self.results.items()
+            if results and self.is_within_limit(self.get_score(idx)[1])
+        ]
+        if not within:
+            return None
+        return max(
+            within,
+            key=lambda idx: (len(self.results[idx]), self.get_score(idx)[0]),
+        )
+
+    def get_summary(self) -> dict:
+        best = self.get_best()
+        tps, p99 = self.get_score(best) if best is not None else (None, None)
+        return {
+            'settings': self.names,
+            'latency_limit': self.latency_limit,
+            'budget': self.budget,
+            'space_size': self.space_size,
+            'candidates': len(self.configs),
+            'best': self.configs[best] if best is not None else None,
+            'best_tps': None if tps is None else round(tps, 3),
+            'best_latency_p99': None if p99 is None else round(p99, 3),
+            'trials': self.trials,
+        }
+
+
+def get_tuned_config(summary: dict) -> str:
+    """Renders the best settings of a tuning summary as postgresql.conf."""
+    if not summary.get('best'):
+        return ''
+    lines = [
+        f'# pg_perfbench tuning: {summary["best_tps"]} tps, '
+        f'p99 latency {summary["best_latency_p99"]} ms '
+        f'(limit {summary["latency_limit"]} ms)',
+    ]
+    for name, value in summary['best'].items():
+        literal = str(value).replace("'", "''")
+        lines.append(f"{name} = '{literal}'")
+    return '\n'.join(lines) + '\n'
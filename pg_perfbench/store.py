@@ -0,0 +1,445 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+
+from pg_perfbench.const import REPORT_FOLDER, RESULTS_DB_NAME
+from pg_perfbench.log import format_table
+
+DEFAULT_HISTORY_LIMIT = 1000
+# Formats of the report date, the last one of older reports
+REPORT_DATE_FORMATS = ('%d/%m/%Y %H:%M:%S', '%Y-%m-%d_%H-%M-%S')
+STORE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Default header of the benchmark results of older reports
+RESULT_THEADER = [
+    'clients',
+    'duration',
+    'number of transactions actually processed',
+    'latency average',
+    'initial connection time',
+    'tps',
+]
+
+STORE_SCHEMA_VERSION = 1
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    report_hash TEXT NOT NULL UNIQUE,
+    report_name TEXT,
+    created_at TEXT NOT NULL,
+    host TEXT,
+    pg_version TEXT,
+    workload TEXT,
+    config_hash TEXT,
+    environment TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_host ON runs (host, created_at);
+CREATE INDEX IF NOT EXISTS runs_pg_version ON runs (pg_version, created_at);
+CREATE INDEX IF NOT EXISTS runs_workload ON runs (workload, created_at);
+CREATE INDEX IF NOT EXISTS runs_config_hash ON runs (config_hash, created_at);
+CREATE TABLE IF NOT EXISTS points (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    iteration INTEGER NOT NULL,
+    clients INTEGER,
+    command TEXT,
+    tps REAL,
+    latency_avg REAL,
+    latency_p99 REAL,
+    metrics TEXT,
+    PRIMARY KEY (run_id, iteration)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS points_clients ON points (clients, run_id);
+CREATE TABLE IF NOT EXISTS series (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    iteration INTEGER NOT NULL,
+    repetition INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    samples BLOB NOT NULL,
+    PRIMARY KEY (run_id, iteration, repetition, name)
+) WITHOUT ROWID;
+"""
+
+HISTORY_THEADER = [
+    'date',
+    'report',
+    'host',
+    'PostgreSQL',
+    'workload',
+    'config',
+    'clients',
+    'tps',
+    'latency average, ms',
+    'latency p99, ms',
+]
+HISTORY_QUERY = """SELECT r.created_at, r.report_name, r.host, r.pg_version,
+    r.workload, r.config_hash, p.clients, p.tps, p.latency_avg, p.latency_p99
+FROM runs r
+JOIN points p ON p.run_id = r.id"""
+
+
+def get_report_item(report: dict, section: str, name: str) -> dict:
+    item = report.get('sections', {}).get(section, {}).get('reports', {})
+    item = item.get(name)
+    return item if isinstance(item, dict) else {}
+
+
+def get_report_time(report: dict, default: float | None = None) -> str:
+    """
+    Returns the date of a report in the store format, from its
+    description, else from the default timestamp (e.g. the file time).
+    """
+    for date_format in REPORT_DATE_FORMATS:
+        try:
+            created = datetime.datetime.strptime(
+                str(report.get('description')), date_format
+            )
+            return created.strftime(STORE_DATE_FORMAT)
+        except ValueError:
+            continue
+    if default is None:
+        created = datetime.datetime.now()
+    else:
+        created = datetime.datetime.fromtimestamp(default)
+    return created.strftime(STORE_DATE_FORMAT)
+
+
+def get_environment(report: dict) -> dict:
+    # the fingerprint of the database host collected by the report
+    def text(name):
+        data = get_report_item(report, 'system', name).get('data')
+        return data if isinstance(data, str) else ''
+
+    def field(data, name, separator):
+        for line in data.splitlines():
+            key, sep, value = line.partition(separator)
+            if sep and key.strip() == name:
+                return value.strip().strip('"')
+        return None
+
+    return {
+        'kernel': text('uname_a').strip() or None,
+        'os': field(text('etc_os_release'), 'PRETTY_NAME', '='),
+        'cpu': field(text('cpu_info'), 'Model name', ':'),
+        'cpus': field(text('cpu_info'), 'CPU(s)', ':'),
+        'ram': text('total_ram').strip() or None,
+    }
+
+
+def get_config_hash(report: dict) -> str | None:
+    # a short hash of the PostgreSQL settings collected by the report
+    settings = get_report_item(report, 'db', 'pg_settings').get('data')
+    if not isinstance(settings, list) or not settings:
+        return None
+    data = json.dumps(sorted(settings, key=str), sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+def get_pg_version(report: dict) -> str | None:
+    # '16.8 (Ubuntu 16.8-1.pgdg22.04+1)' -> '16.8'
+    data = get_report_item(report, 'db', 'version_minor').get('data')
+    if isinstance(data, str) and data.split():
+        return data.split()[0]
+    data = get_report_item(report, 'db', 'version_major').get('data')
+    if isinstance(data, str) and data.startswith('PostgreSQL '):
+        return data.split()[1]
+    return None
+
+
+def get_report_record(report: dict, mtime: float | None = None) -> dict:
+    """
+    Extracts what the store keeps of a benchmark report: the run
+    metadata and environment fingerprint, the results of every sweep
+    point and the progress time series of every run. A report without
+    benchmark results has no points.
+    """
+    args = get_report_item(report, 'benchmark', 'args').get('data')
+    args = {
+        row[0]: None if row[1] == 'None' else row[1]
+        for row in (args if isinstance(args, list) else [])
+        if isinstance(row, list) and len(row) == 2 and 'password' not in row[0]
+    }
+    if args.get('connection_type') == 'ssh' and args.get('ssh_host'):
+        host = args['ssh_host']
+    else:
+        host = args.get('pg_host')
+    workload_path = args.get('workload_path')
+    workload = (
+        os.path.basename(workload_path.rstrip('/'))
+        if workload_path
+        else args.get('benchmark_type')
+    )
+
+    outputs = get_report_item(report, 'result', 'pgbench_outputs')
+    theader = outputs.get('theader') or RESULT_THEADER
+    commands = get_report_item(report, 'benchmark', 'options').get('data')
+    commands = commands if isinstance(commands, list) else []
+    points = []
+    rows = outputs.get('data')
+    for idx, row in enumerate(rows if isinstance(rows, list) else []):
+        if not isinstance(row, list) or len(row) != len(theader):
+            continue
+        metrics = dict(zip(theader, row))
+        command = commands[idx] if idx < len(commands) else None
+        points.append(
+            {
+                'iteration': idx + 1,
+                'clients': metrics.get('clients'),
+                'command': (
+                    command[-1] if isinstance(command, list) else None
+                ),
+                'tps': metrics.get('tps'),
+                'latency_avg': metrics.get('latency average'),
+                'latency_p99': metrics.get('latency p99, ms'),
+                'metrics': metrics,
+            }
+        )
+
+    series: dict[tuple, list] = {}
+    progress = get_report_item(report, 'result', 'pgbench_progress')
+    rows = progress.get('data')
+    for row in rows if isinstance(rows, list) else []:
+        if isinstance(row, list) and len(row) > 2:
+            series.setdefault((row[0], row[1], 'progress'), []).append(row[2:])
+
+    return {
+        'report_hash': hashlib.sha256(
+            json.dumps(report, sort_keys=True).encode('utf-8')
+        ).hexdigest(),
+        'report_name': report.get('report_name'),
+        'created_at': get_report_time(report, mtime),
+        'host': host,
+        'pg_version': get_pg_version(report),
+        'workload': workload,
+        'config_hash': get_config_hash(report),
+        'environment': get_environment(report),
+        'metadata': {
+            'args': args,
+            'workload_command': args.get('workload_command'),
+        },
+        'points': points,
+        'series': series,
+    }
+
+
+class ResultStore:
+    """
+    Local SQLite database of the benchmark results. Every report is
+    stored once (by its content hash) as a run with its metadata,
+    environment fingerprint and PostgreSQL settings hash, the results
+    of its sweep points and its progress time series compressed with
+    zlib. Runs are indexed by host, PostgreSQL version, workload,
+    settings hash and date.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > STORE_SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(
+                f'Results database {path} has the newer schema {version}'
+            )
+        self.conn.executescript(STORE_SCHEMA)
+        self.conn.execute(f'PRAGMA user_version = {STORE_SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def get_path(path: str | None) -> str:
+        return str(REPORT_FOLDER / RESULTS_DB_NAME) if path is None else path
+
+    def ingest_report(self, report: dict, mtime: float | None = None):
+        """
+        Stores a benchmark report, returns the id of the new run or None
+        when the report is stored already or has no benchmark results.
+        """
+        record = get_report_record(report, mtime)
+        if not record['points']:
+            return None
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO runs (report_hash, report_name, '
+                'created_at, host, pg_version, workload, config_hash, '
+                'environment, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    record['report_hash'],
+                    record['report_name'],
+                    record['created_at'],
+                    record['host'],
+                    record['pg_version'],
+                    record['workload'],
+                    record['config_hash'],
+                    json.dumps(record['environment']),
+                    json.dumps(record['metadata']),
+                ),
+            )
+            if not cursor.rowcount:
+                return None
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        run_id,
+                        point['iteration'],
+                        point['clients'],
+                        point['command'],
+                        point['tps'],
+                        point['latency_avg'],
+                        point['latency_p99'],
+                        json.dumps(point['metrics']),
+                    )
+                    for point in record['points']
+                ],
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?)',
+                [
+                    (
+                        run_id,
+                        iteration,
+                        repetition,
+                        name,
+                        zlib.compress(json.dumps(samples).encode('utf-8')),
+                    )
+                    for (iteration, repetition, name), samples in record[
+                        'series'
+                    ].items()
+                ],
+            )
+        return run_id
+
+    def ingest_path(self, logger, path: str) -> int:
+        """
+        Stores a report file or the reports of a directory, join reports
+        excluded, returns how many runs were added.
+        """
+        if os.path.isdir(path):
+            files = [
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith('.json') and 'join' not in name
+            ]
+        else:
+            files = [path]
+        added = 0
+        for file in files:
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f'Cannot load {file}: {e}')
+                continue
+            if not isinstance(report, dict):
+                continue
+            if self.ingest_report(report, os.path.getmtime(file)):
+                added += 1
+            else:
+                logger.debug(f'Not stored (no results or stored): {file}')
+        return added
+
+    def query(
+        self,
+        host: str | None = None,
+        pg_version: str | None = None,
+        workload: str | None = None,
+        config_hash: str | None = None,
+        clients: int | None = None,
+        days: int | None = None,
+        limit: int = DEFAULT_HISTORY_LIMIT,
+        now: datetime.datetime | None = None,
+    ) -> list[list]:
+        """
+        Returns the results of the stored sweep points matching the
+        filters (HISTORY_THEADER), the oldest first. A major PostgreSQL
+        version matches all its minor versions, days keeps the runs of
+        the last days.
+        """
+        conditions = []
+        params = []
+        for column, value in (
+            ('r.host', host),
+            ('r.workload', workload),
+            ('r.config_hash', config_hash),
+            ('p.clients', clients),
+        ):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if pg_version is not None:
+            conditions.append('(r.pg_version = ? OR r.pg_version LIKE ?)')
+            params += [pg_version, f'{pg_version}.%']
+        if days is not None:
+            since = (now or datetime.datetime.now()) - datetime.timedelta(
+                days=days
+            )
+            conditions.append('r.created_at >= ?')
+            params.append(since.strftime(STORE_DATE_FORMAT))
+        sql = HISTORY_QUERY
+        if conditions:
+            sql += '\nWHERE ' + ' AND '.join(conditions)
+        sql += '\nORDER BY r.created_at, r.id, p.iteration\nLIMIT ?'
+        params.append(limit)
+        return [list(row) for row in self.conn.execute(sql, params)]
+
+    def get_series(self, run_id: int, name: str = 'progress') -> dict:
+        """Returns the time series of a run by iteration and repetition."""
+        return {
+            (iteration, repetition): json.loads(zlib.decompress(samples))
+            for iteration, repetition, samples in self.conn.execute(
+                'SELECT iteration, repetition, samples FROM series '
+                'WHERE run_id = ? AND name = ? ORDER BY iteration, repetition',
+                (run_id, name),
+            )
+        }
+
+    @staticmethod
+    def store_report(logger, path: str | None, report: dict) -> None:
+        """
+        Adds the report of a benchmark to the results database, an empty
+        path disables it. A failure only loses the stored copy.
+        """
+        path = ResultStore.get_path(path)
+        if not path:
+            return
+        try:
+            with ResultStore(path) as store:
+                if store.ingest_report(report):
+                    logger.info(f'Results stored in {path}')
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f'Cannot store the results in {path}: {e}')
+
+    @staticmethod
+    def run_history(
+        logger, results_db: str | None, ingest: list[str], filters: dict
+    ) -> list[list]:
+        """
+        Adds the given reports to the results database, then prints the
+        stored results matching the filters.
+        """
+        path = ResultStore.get_path(results_db)
+        if not path:
+            raise ValueError('The history mode requires --results-db')
+        with ResultStore(path) as store:
+            for source in ingest:
+                added = store.ingest_path(logger, source)
+                logger.info(f'{added} runs stored from {source}')
+            rows = store.query(**filters)
+        logger.info(
+            f'{len(rows)} stored results in {path}:\n'
+            + format_table(HISTORY_THEADER, rows)
+        )
+        return rows
@@ -1,5 +1,15 @@
 import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
 from pg_perfbench.benchmark import BenchmarkRunner
+from pg_perfbench.const import CacheMode, ResetStrategy
+from pg_perfbench.db_operations.conn_tasks import get_snapshot_commands
+from pg_perfbench.db_operations.reset import (
+    RecreateReset,
+    SnapshotReset,
+    TemplateReset,
+    get_reset_strategy,
+)
 
 
 class TestBenchmarkFunctions(unittest.TestCase):
@@ -31,3 +41,539 @@ class TestBenchmarkFunctions(unittest.TestCase):
     def test_load_iterations_config_empty(self):
         res = BenchmarkRunner.load_iterations_config({}, {})
         self.assertEqual(res, [])
+
+    def test_get_sweep_points(self):
+        workload_conf = {
+            'pgbench_sweep': {
+                'pgbench_clients': [8, 16],
+                'pgbench_jobs': [4],
+                'pgbench_scale': [10, 100],
+            }
+        }
+        points = BenchmarkRunner.get_sweep_points(workload_conf)
+        self.assertEqual(
+            points,
+            [
+                {'pgbench_scale': 10, 'pgbench_clients': 8, 'pgbench_jobs': 4},
+                {
+                    'pgbench_scale': 10,
+                    'pgbench_clients': 16,
+                    'pgbench_jobs': 4,
+                },
+                {
+                    'pgbench_scale': 100,
+                    'pgbench_clients': 8,
+                    'pgbench_jobs': 4,
+                },
+                {
+                    'pgbench_scale': 100,
+                    'pgbench_clients': 16,
+                    'pgbench_jobs': 4,
+                },
+            ],
+        )
+        self.assertEqual(
+            BenchmarkRunner.get_sweep_points(
+                {'pgbench_iter_name': 'pgbench_time', 'pgbench_iter_list': [5]}
+            ),
+            [{'pgbench_time': 5}],
+        )
+
+    def test_get_sweep_points_pg_settings(self):
+        workload_conf = {
+            'pgbench_sweep': {'pgbench_clients': [8, 16]},
+            'pg_settings_sweep': {'shared_buffers': ['128MB', '1GB']},
+        }
+        points = BenchmarkRunner.get_sweep_points(workload_conf)
+        # the settings change fastest
+        self.assertEqual(
+            points[:2],
+            [
+                {'pgbench_clients': 8, 'shared_buffers': '128MB'},
+                {'pgbench_clients': 8, 'shared_buffers': '1GB'},
+            ],
+        )
+        self.assertEqual(len(points), 4)
+        self.assertEqual(
+            BenchmarkRunner.get_point_settings(workload_conf, points[1]),
+            {'shared_buffers': '1GB'},
+        )
+
+    def test_load_iterations_config_sweep(self):
+        workload_conf = {
+            'init_command': 'init -s ARG_PGBENCH_SCALE',
+            'workload_command': 'work -c ARG_PGBENCH_CLIENTS -j ARG_PGBENCH_JOBS',
+            'pgbench_sweep': {
+                'pgbench_clients': [8, 16],
+                'pgbench_jobs': [2],
+                'pgbench_scale': [10, 100],
+            },
+        }
+        res = BenchmarkRunner.load_iterations_config({}, workload_conf)
+        self.assertEqual(
+            res,
+            [
+                ['init -s 10', 'work -c 8 -j 2'],
+                ['init -s 10', 'work -c 16 -j 2'],
+                ['init -s 100', 'work -c 8 -j 2'],
+                ['init -s 100', 'work -c 16 -j 2'],
+            ],
+        )
+
+    def test_load_iterations_config_workload_db_conf(self):
+        workload_conf = {
+            'init_command': 'init -h ARG_PG_HOST -p ARG_PG_PORT',
+            'workload_command': 'work -h ARG_PG_HOST -U ARG_PG_USER',
+            'pgbench_iter_name': 'pgbench_clients',
+            'pgbench_iter_list': [1],
+            'workload_db_conf': {'host': '10.0.0.5', 'port': '5432'},
+        }
+        db_conf = {'host': 'localhost', 'port': '5439', 'user': 'postgres'}
+        res = BenchmarkRunner.load_iterations_config(db_conf, workload_conf)
+        self.assertEqual(
+            res,
+            [['init -h 10.0.0.5 -p 5432', 'work -h 10.0.0.5 -U postgres']],
+        )
+
+    def test_get_run_order(self):
+        load_iterations = [['init 1', 'a'], ['init 1', 'b'], ['init 2', 'c']]
+        self.assertEqual(
+            BenchmarkRunner.get_run_order(load_iterations, 2),
+            [0, 0, 1, 1, 2, 2],
+        )
+        order = BenchmarkRunner.get_run_order(
+            load_iterations, 3, shuffle=True, seed=1
+        )
+        # runs are shuffled only among iterations sharing the dataset
+        self.assertEqual(sorted(order[:6]), [0, 0, 0, 1, 1, 1])
+        self.assertEqual(order[6:], [2, 2, 2])
+        self.assertEqual(
+            order,
+            BenchmarkRunner.get_run_order(
+                load_iterations, 3, shuffle=True, seed=1
+            ),
+        )
+
+    def test_aggregate_runs(self):
+        runs = [
+            {
+                'iteration': 1,
+                'params': {'pgbench_clients': 10},
+                'result': [10, 60, 1000, 10.0, 2.0, tps],
+                'latency': None,
+            }
+            for tps in (100.0, 110.0, 90.0)
+        ]
+        iterations = BenchmarkRunner.aggregate_runs(runs)
+        self.assertEqual(len(iterations), 1)
+        self.assertEqual(iterations[0]['repetitions'], 3)
+        self.assertEqual(
+            iterations[0]['result'], [10, 60, 1000, 10.0, 2.0, 100.0]
+        )
+        self.assertEqual(iterations[0]['stats']['tps']['stddev'], 10.0)
+        self.assertIsNone(iterations[0]['latency'])
+
+    def test_get_pgbench_progress(self):
+        line = 'progress: 5.0 s, 1203.4 tps, lat 8.301 ms stddev 2.114'
+        self.assertEqual(
+            BenchmarkRunner.get_pgbench_progress(line),
+            [5.0, 1203.4, 8.301, 2.114, None],
+        )
+        line = (
+            'progress: 10.0 s, 99.8 tps, lat 10.012 ms stddev 0.514, '
+            'lag 0.120 ms, 0 failed'
+        )
+        self.assertEqual(
+            BenchmarkRunner.get_pgbench_progress(line),
+            [10.0, 99.8, 10.012, 0.514, 0.12],
+        )
+        line = 'progress: 1.0 s, 0.0 tps, lat NaN ms stddev NaN, 0 failed'
+        self.assertEqual(
+            BenchmarkRunner.get_pgbench_progress(line),
+            [1.0, 0.0, None, None, None],
+        )
+        self.assertIsNone(BenchmarkRunner.get_pgbench_progress('tps = 1.0'))
+
+    def test_add_progress_option(self):
+        self.assertEqual(
+            BenchmarkRunner.add_progress_option('pgbench -T 10', 1),
+            'pgbench -T 10 --progress=1',
+        )
+        self.assertEqual(
+            BenchmarkRunner.add_progress_option('pgbench -P 5 -T 10', 1),
+            'pgbench -P 5 -T 10',
+        )
+        self.assertEqual(
+            BenchmarkRunner.add_progress_option('pgbench -T 10', None),
+            'pgbench -T 10',
+        )
+
+    def test_add_workload_options(self):
+        workload_conf = {'pgbench_progress': 1, 'pgbench_latency_limit': 20}
+        self.assertEqual(
+            BenchmarkRunner.add_workload_options(
+                'pgbench -T 10', workload_conf
+            ),
+            'pgbench -T 10 --progress=1 --latency-limit=20',
+        )
+        self.assertEqual(
+            BenchmarkRunner.add_workload_options(
+                'pgbench -L 5', workload_conf
+            ),
+            'pgbench -L 5 --progress=1',
+        )
+
+    def test_get_pgbench_rate_results(self):
+        output = (
+            'number of transactions actually processed: 9850\n'
+            'number of transactions skipped: 150 (1.500%)\n'
+            'number of transactions above the 50.0 ms latency limit: '
+            '42/9850 (0.426%)\n'
+            'latency average = 4.218 ms\n'
+            'rate limit schedule lag: avg 1.375 (max 61.442) ms\n'
+            'tps = 985.0\n'
+        )
+        self.assertEqual(
+            BenchmarkRunner.get_pgbench_rate_results(
+                output, 'pgbench -T 10 --rate=1000 --latency-limit=50'
+            ),
+            {
+                'target_rate': 1000.0,
+                'lag_avg': 1.375,
+                'lag_max': 61.442,
+                'skipped': 150,
+                'late': 42,
+            },
+        )
+        self.assertIsNone(
+            BenchmarkRunner.get_pgbench_rate_results('tps = 10', 'pgbench')
+        )
+        self.assertEqual(
+            BenchmarkRunner.aggregate_rate_results(
+                [
+                    {'target_rate': 100.0, 'lag_max': 2.0, 'skipped': 1},
+                    {'target_rate': 100.0, 'lag_max': 5.0, 'skipped': 2},
+                ]
+            ),
+            {'target_rate': 100.0, 'lag_max': 5.0, 'skipped': 1.5},
+        )
+
+
+class TestSteadyStateRun(unittest.IsolatedAsyncioTestCase):
+    async def test_run_workload_stops_in_steady_state(self):
+        # pgbench-like progress reports on stderr, one per 0.05 s
+        workload_cmd = (
+            'for i in $(seq 1 100); do echo "progress: $i.0 s, 500.0 tps, '
+            'lat 8.000 ms stddev 1.000, 0 failed" >&2; sleep 0.05; done '
+            '# -c 4 -T 100'
+        )
+        benchmark = await BenchmarkRunner.run_workload(
+            MagicMock(),
+            workload_cmd,
+            steady_state={'window': 3, 'max_cv': 1, 'min_time': 5},
+        )
+        self.assertEqual(len(benchmark['progress']), 5)
+        self.assertEqual(benchmark['steady_state']['time_saved'], 95.0)
+        self.assertEqual(benchmark['result'], [4, 3.0, 1500, 8.0, None, 500.0])
+        # the client CPU use is measured although the run was stopped
+        self.assertEqual(benchmark['client']['threads'], 1)
+        self.assertIsNotNone(benchmark['client']['cpu_per_xact_us'])
+
+    async def test_run_workload_measures_client_cpu(self):
+        workload_cmd = (
+            'i=0; while [ $i -lt 200000 ]; do i=$((i+1)); done; '
+            'echo "number of transactions actually processed: 100"'
+            ' # -j 2'
+        )
+        benchmark = await BenchmarkRunner.run_workload(
+            MagicMock(), workload_cmd
+        )
+        self.assertEqual(benchmark['result'][2], 100)
+        client = benchmark['client']
+        self.assertEqual(client['threads'], 2)
+        self.assertGreater(client['user'] + client['system'], 0)
+        self.assertGreater(client['cpu_per_xact_us'], 0)
+
+
+class TestPgSettings(unittest.IsolatedAsyncioTestCase):
+    async def test_apply_pg_settings(self):
+        db_tasks = AsyncMock()
+        db_tasks.get_settings.side_effect = [
+            {
+                'shared_buffers': ['128MB', 'postmaster'],
+                'work_mem': ['4MB', 'user'],
+            },
+            {
+                'shared_buffers': ['1GB', 'postmaster'],
+                'work_mem': ['64MB', 'user'],
+            },
+        ]
+        db_tasks.alter_system.return_value = ['shared_buffers']
+        conn_tasks = AsyncMock()
+        settings = {'shared_buffers': '1GB', 'work_mem': '64MB'}
+        effective = await BenchmarkRunner.apply_pg_settings(
+            MagicMock(), db_tasks, conn_tasks, settings
+        )
+        self.assertEqual(effective, settings)
+        db_tasks.alter_system.assert_awaited_once_with(settings)
+        conn_tasks.stop_db.assert_awaited_once()
+        conn_tasks.start_db.assert_awaited_once()
+
+    async def test_apply_pg_settings_reload_only(self):
+        db_tasks = AsyncMock()
+        db_tasks.get_settings.return_value = {
+            'shared_buffers': ['1GB', 'postmaster'],
+            'work_mem': ['4MB', 'user'],
+        }
+        # the server reports no pending restart for a postmaster setting
+        # keeping its value, whatever unit the value is written in
+        db_tasks.alter_system.return_value = []
+        conn_tasks = AsyncMock()
+        await BenchmarkRunner.apply_pg_settings(
+            MagicMock(),
+            db_tasks,
+            conn_tasks,
+            {'shared_buffers': '131072', 'work_mem': '64MB'},
+        )
+        conn_tasks.stop_db.assert_not_awaited()
+
+        await BenchmarkRunner.restore_pg_settings(
+            MagicMock(), db_tasks, conn_tasks, ['shared_buffers', 'work_mem']
+        )
+        db_tasks.alter_system.assert_awaited_with(
+            {'shared_buffers': None, 'work_mem': None}
+        )
+        conn_tasks.stop_db.assert_not_awaited()
+
+        with self.assertRaises(ValueError):
+            await BenchmarkRunner.apply_pg_settings(
+                MagicMock(), db_tasks, conn_tasks, {'no_such_setting': '1'}
+            )
+
+
+class TestTuning(unittest.IsolatedAsyncioTestCase):
+    async def test_run_tuning(self):
+        async def run_iterations(*args, repetition_offset=0):
+            point = args[6][0]
+            tps = 1000.0 if point['shared_buffers'] == '128MB' else 2000.0
+            return [
+                {
+                    'iteration': 1,
+                    'repetition': repetition_offset + 1,
+                    'params': point,
+                    'result': [8, 10, 100, 1.0, 1.0, tps],
+                    'latency': {'percentiles': {'99': 5.0}},
+                }
+            ]
+
+        workload_conf = {
+            'tune_settings': {'shared_buffers': ['128MB', '1GB', '4GB']},
+            'tune_latency_p99': 10.0,
+            'tune_budget': 5,
+        }
+        with patch.object(
+            BenchmarkRunner, 'setup_reset_strategy', return_value=AsyncMock()
+        ), patch.object(
+            BenchmarkRunner,
+            'run_benchmark_iterations',
+            side_effect=run_iterations,
+        ), patch.object(
+            BenchmarkRunner, 'restore_pg_settings'
+        ) as restore, patch(
+            'pg_perfbench.benchmark.get_conn_type_tasks'
+        ):
+            runs, points, summary = await BenchmarkRunner.run_tuning(
+                MagicMock(),
+                ['init', 'work'],
+                'local',
+                None,
+                {},
+                workload_conf,
+                {'pgbench_clients': 8},
+            )
+        restore.assert_awaited_once()
+        # 3 runs, one more of the better 2
+        self.assertEqual(len(runs), 5)
+        self.assertEqual(len(points), 3)
+        self.assertEqual(
+            points[0], {'pgbench_clients': 8, 'shared_buffers': '128MB'}
+        )
+        self.assertEqual([run['run'] for run in runs], [1, 2, 3, 4, 5])
+        self.assertEqual([run['repetition'] for run in runs], [1, 1, 1, 2, 2])
+        self.assertEqual(summary['best']['shared_buffers'], '1GB')
+
+
+class TestResetStrategies(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.logger = MagicMock()
+        self.db_tasks = AsyncMock()
+        self.db_tasks.db_conf = {'database': 'tdb'}
+        self.db_tasks.get_server_version_num.return_value = 160000
+        self.conn_tasks = AsyncMock()
+        self.run_init = AsyncMock()
+
+    async def test_recreate_runs_init_every_time(self):
+        strategy = RecreateReset(
+            self.logger, self.db_tasks, self.conn_tasks, {}
+        )
+        await strategy.reset('init', self.run_init)
+        timings = await strategy.reset('init', self.run_init)
+        self.assertEqual(self.run_init.await_count, 2)
+        self.assertEqual(self.db_tasks.init_db.await_count, 2)
+        self.assertEqual(timings['dataset'], 'initialized')
+
+    async def test_recreate_keeps_caches_when_not_cold(self):
+        strategy = RecreateReset(
+            self.logger,
+            self.db_tasks,
+            self.conn_tasks,
+            {'cache_mode': CacheMode.WARM},
+        )
+        await strategy.reset('init', self.run_init)
+        self.conn_tasks.stop_db.assert_not_awaited()
+        self.conn_tasks.drop_caches.assert_not_awaited()
+        self.db_tasks.init_db.assert_awaited_once()
+
+        strategy = RecreateReset(
+            self.logger, self.db_tasks, self.conn_tasks, {}
+        )
+        await strategy.reset('init', self.run_init)
+        self.conn_tasks.drop_caches.assert_awaited_once()
+
+    async def test_template_built_once_per_init_command(self):
+        strategy = TemplateReset(
+            self.logger,
+            self.db_tasks,
+            self.conn_tasks,
+            {'template_strategy': 'file_copy'},
+        )
+        await strategy.reset('init --scale=1', self.run_init)
+        await strategy.reset('init --scale=1', self.run_init)
+        self.assertEqual(self.run_init.await_count, 1)
+        self.db_tasks.create_template_db.assert_awaited_once_with(
+            'tdb_pg_perfbench_tmpl', 'FILE_COPY'
+        )
+        self.assertEqual(self.db_tasks.create_db_from_template.await_count, 2)
+
+        await strategy.reset('init --scale=2', self.run_init)
+        self.assertEqual(self.run_init.await_count, 2)
+        self.assertEqual(self.db_tasks.create_template_db.await_count, 2)
+
+        await strategy.cleanup()
+        self.db_tasks.drop_template_db.assert_awaited_once()
+
+    async def test_template_without_clone_strategy_before_pg15(self):
+        self.db_tasks.get_server_version_num.return_value = 140000
+        strategy = TemplateReset(
+            self.logger, self.db_tasks, self.conn_tasks, {}
+        )
+        await strategy.reset('init', self.run_init)
+        self.db_tasks.create_db_from_template.assert_awaited_with(
+            'tdb_pg_perfbench_tmpl', None
+        )
+
+    def test_get_reset_strategy(self):
+        self.assertIs(
+            get_reset_strategy(ResetStrategy.TEMPLATE), TemplateReset
+        )
+        self.assertIs(get_reset_strategy('recreate'), RecreateReset)
+        self.assertIsNone(get_reset_strategy('unknown'))
+
+    async def test_snapshot_auto_falls_back_to_rsync(self):
+        self.conn_tasks.snapshot_db.side_effect = [
+            RuntimeError('reflink not supported'),
+            None,
+        ]
+        strategy = SnapshotReset(
+            self.logger,
+            self.db_tasks,
+            self.conn_tasks,
+            {'snapshot_method': 'auto', 'snapshot_path': '/data_snap'},
+        )
+        timings = await strategy.reset('init', self.run_init)
+        await strategy.reset('init', self.run_init)
+        self.assertEqual(timings['dataset'], 'restored')
+        self.assertEqual(self.run_init.await_count, 1)
+        self.assertEqual(strategy.snapshot_conf['method'], 'rsync')
+        self.assertEqual(self.conn_tasks.restore_db.await_count, 2)
+        # init restart, snapshot and the second restore stop the server
+        self.assertEqual(self.conn_tasks.stop_db.await_count, 3)
+
+
+class TestCacheModes(unittest.IsolatedAsyncioTestCase):
+    def test_get_warmup_command(self):
+        self.assertEqual(
+            BenchmarkRunner.get_warmup_command('pgbench -c 8 -T 600', 30),
+            'pgbench -c 8 -T 30',
+        )
+        self.assertEqual(
+            BenchmarkRunner.get_warmup_command('pgbench --time=600 -c 8', 30),
+            'pgbench --time=30 -c 8',
+        )
+        self.assertEqual(
+            BenchmarkRunner.get_warmup_command('pgbench -c 8 -T 600', None),
+            'pgbench -c 8 -T 600',
+        )
+
+    async def test_prepare_cache(self):
+        load_iteration = ['init', 'pgbench -c 8 -T 600']
+        with patch.object(BenchmarkRunner, 'run_benchmark') as run:
+            state = await BenchmarkRunner.prepare_cache(
+                MagicMock(), load_iteration, {}, {}
+            )
+            self.assertEqual(state, {'mode': 'cold'})
+            run.assert_not_awaited()
+
+            state = await BenchmarkRunner.prepare_cache(
+                MagicMock(),
+                load_iteration,
+                {},
+                {'cache_mode': CacheMode.WARM, 'warmup_time': 30},
+            )
+        self.assertEqual(
+            run.await_args.args[1], ['init', 'pgbench -c 8 -T 30']
+        )
+        self.assertFalse(run.await_args.kwargs['run_init'])
+        self.assertEqual(state['mode'], 'warm')
+        self.assertIsNotNone(state['warmup_time'])
+
+        with patch('pg_perfbench.benchmark.DBTasks') as db_tasks:
+            db_tasks.return_value.prewarm_db = AsyncMock(
+                return_value=(12, 3400)
+            )
+            state = await BenchmarkRunner.prepare_cache(
+                MagicMock(),
+                load_iteration,
+                {},
+                {'cache_mode': CacheMode.PRIMED},
+            )
+        self.assertEqual(state['primed'], (12, 3400))
+        self.assertIsNotNone(state['prime_time'])
+
+
+class TestSnapshotCommands(unittest.TestCase):
+    def test_rsync_commands(self):
+        create, restore = get_snapshot_commands(
+            'rsync', '/var/lib/pg/data/', '/var/lib/pg/snap'
+        )
+        self.assertIn('/var/lib/pg/data/ /var/lib/pg/snap/', create)
+        self.assertIn('/var/lib/pg/snap/ /var/lib/pg/data/', restore)
+        self.assertNotIn('link-dest', restore)
+
+    def test_reflink_commands(self):
+        create, restore = get_snapshot_commands('reflink', '/d', '/s')
+        self.assertEqual(create, 'rm -rf /s && cp -a --reflink=always /d /s')
+        self.assertEqual(restore, 'rm -rf /d && cp -a --reflink=always /s /d')
+
+    def test_user_commands(self):
+        create, restore = get_snapshot_commands(
+            'command',
+            '/d',
+            '/s',
+            'btrfs subvolume snapshot ARG_PG_DATA_PATH ARG_SNAPSHOT_PATH',
+            'restore.sh ARG_SNAPSHOT_PATH ARG_PG_DATA_PATH',
+        )
+        self.assertEqual(create, 'btrfs subvolume snapshot /d /s')
+        self.assertEqual(restore, 'restore.sh /s /d')
+        with self.assertRaises(ValueError):
+            get_snapshot_commands('command', '/d', '/s')
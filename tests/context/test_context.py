@@ -1,8 +1,22 @@
 import unittest
 from unittest.mock import MagicMock
 
-from pg_perfbench.const import ConnectionType, WorkMode, WorkloadTypes
+from pg_perfbench.const import (
+    ConnectionType,
+    WorkMode,
+    WorkloadTypes,
+    WorkloadLocation,
+)
 from pg_perfbench.context import Context, CollectInfoContext, JoinContext
+from pg_perfbench.run import get_args_parser
+
+
+class BenchmarkArgs:
+    """The parser defaults of the options a test does not set"""
+
+    def __init__(self):
+        defaults = get_args_parser().parse_args(['--mode', 'benchmark'])
+        vars(self).update(vars(defaults))
 
 
 class TestContext(unittest.TestCase):
@@ -10,8 +24,9 @@ class TestContext(unittest.TestCase):
         self.logger = MagicMock()
 
     def test_context_ssh_ok(self):
-        class Args:
+        class Args(BenchmarkArgs):
             def __init__(self):
+                super().__init__()
                 self.connection_type = ConnectionType.SSH
                 self.ssh_host = '192.168.0.10'
                 self.ssh_port = '22'
@@ -58,8 +73,9 @@ class TestContext(unittest.TestCase):
         )
 
     def test_context_docker_ok(self):
-        class Args:
+        class Args(BenchmarkArgs):
             def __init__(self):
+                super().__init__()
                 self.connection_type = ConnectionType.DOCKER
                 self.container_name = 'my_container'
 
@@ -117,8 +133,9 @@ class TestContext(unittest.TestCase):
         )
 
     def test_context_local_ok(self):
-        class Args:
+        class Args(BenchmarkArgs):
             def __init__(self):
+                super().__init__()
                 self.connection_type = ConnectionType.LOCAL
                 self.ssh_host = None
                 self.ssh_port = None
@@ -159,9 +176,411 @@ class TestContext(unittest.TestCase):
             '/some/path',
         )
 
+    def test_context_parameter_sweep(self):
+        class Args(BenchmarkArgs):
+            def __init__(self):
+                super().__init__()
+                self.connection_type = ConnectionType.LOCAL
+                self.ssh_host = None
+                self.ssh_port = None
+                self.ssh_key = None
+                self.remote_pg_host = None
+                self.remote_pg_port = None
+
+                self.pg_host = 'localhost'
+                self.pg_port = '5434'
+                self.pg_user = 'postgres'
+                self.pg_password = ''
+                self.pg_database = 'local_db'
+                self.pg_data_path = '/local/data'
+                self.pg_bin_path = '/local/bin'
+
+                self.init_command = 'init_local'
+                self.workload_command = 'work_local'
+                self.pgbench_path = 'local_pgbench'
+                self.psql_path = 'local_psql'
+                self.benchmark_type = WorkloadTypes.DEFAULT
+                self.workload_path = None
+                self.pgbench_clients = [8, 16]
+                self.pgbench_time = [60]
+                self.pgbench_jobs = [4, 8]
+                self.pgbench_scale = [100]
+                self.pg_custom_config = None
+
+                self.collect_pg_logs = False
+                self.clear_logs = False
+                self.log_level = 'info'
+                self.report_name = 'sweep_report'
+
+        context_obj = Context(Args(), self.logger)
+        workload_conf = context_obj.structured_params['workload_conf']
+        self.assertEqual(
+            workload_conf['pgbench_sweep'],
+            {
+                'pgbench_scale': [100],
+                'pgbench_clients': [8, 16],
+                'pgbench_jobs': [4, 8],
+                'pgbench_time': [60],
+            },
+        )
+        self.assertNotIn('pgbench_iter_name', workload_conf)
+
+    def test_context_pg_settings_sweep(self):
+        parser = get_args_parser()
+        args = parser.parse_args(
+            [
+                '--mode',
+                'benchmark',
+                '--connection-type',
+                'local',
+                '--pg-host',
+                'localhost',
+                '--pg-port',
+                '5432',
+                '--pg-user',
+                'postgres',
+                '--pg-database',
+                'test',
+                '--pg-data-path',
+                '/data',
+                '--pg-bin-path',
+                '/bin',
+                '--benchmark-type',
+                'default',
+                '--pgbench-path',
+                'pgbench',
+                '--psql-path',
+                'psql',
+                '--pgbench-clients',
+                '8',
+                '--init-command',
+                'init',
+                '--workload-command',
+                'work',
+                '--pg-setting',
+                'shared_buffers=128MB,1GB',
+                '--pg-setting',
+                'work_mem=4MB',
+            ]
+        )
+        context_obj = Context(args, self.logger)
+        self.assertEqual(
+            context_obj.structured_params['workload_conf'][
+                'pg_settings_sweep'
+            ],
+            {'shared_buffers': ['128MB', '1GB'], 'work_mem': ['4MB']},
+        )
+
+        args.pg_setting = [['shared_buffers', ['1GB']]] * 2
+        with self.assertRaises(ValueError):
+            Context(args, self.logger)
+        args.pg_setting = [["x'; DROP", ['1']]]
+        with self.assertRaises(ValueError):
+            Context(args, self.logger)
+
+    def test_context_tuning(self):
+        args = get_args_parser().parse_args(
+            [
+                '--mode',
+                'benchmark',
+                '--connection-type',
+                'local',
+                '--pg-host',
+                'localhost',
+                '--pg-port',
+                '5432',
+                '--pg-user',
+                'postgres',
+                '--pg-database',
+                'test',
+                '--pg-data-path',
+                '/data',
+                '--pg-bin-path',
+                '/bin',
+                '--benchmark-type',
+                'default',
+                '--pgbench-path',
+                'pgbench',
+                '--psql-path',
+                'psql',
+                '--pgbench-clients',
+                '8',
+                '--init-command',
+                'init',
+                '--workload-command',
+                'work',
+                '--pgbench-latency-log',
+                '--tune-setting',
+                'shared_buffers=128MB,1GB',
+                '--tune-latency-p99',
+                '20',
+            ]
+        )
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(
+            workload_conf['tune_settings'],
+            {'shared_buffers': ['128MB', '1GB']},
+        )
+        self.assertEqual(workload_conf['tune_latency_p99'], 20.0)
+
+        # the p99 latency needs the transaction logs
+        args.pgbench_latency_log = False
+        with self.assertRaises(ValueError):
+            Context(args, self.logger)
+        args.pgbench_latency_log = True
+        args.pgbench_clients = [8, 16]
+        with self.assertRaises(ValueError):
+            Context(args, self.logger)
+        # the error names the option of the settings sweep
+        args.pgbench_clients = [8]
+        args.pg_setting = [['work_mem', ['4MB']]]
+        with self.assertRaisesRegex(ValueError, '"--pg-setting"'):
+            Context(args, self.logger)
+
+    def test_context_repetitions(self):
+        parser = get_args_parser()
+        argv = [
+            '--mode',
+            'benchmark',
+            '--connection-type',
+            'local',
+            '--pg-host',
+            'localhost',
+            '--pg-port',
+            '5432',
+            '--pg-database',
+            'test',
+            '--pg-data-path',
+            '/data',
+            '--pg-bin-path',
+            '/bin',
+            '--benchmark-type',
+            'default',
+            '--pgbench-path',
+            'pgbench',
+            '--psql-path',
+            'psql',
+            '--init-command',
+            'init',
+            '--workload-command',
+            'work',
+        ]
+        workload_conf = Context(
+            parser.parse_args(argv), self.logger
+        ).structured_params['workload_conf']
+        self.assertEqual(workload_conf['repetitions'], 1)
+
+        for repetitions in ('0', '-1'):
+            args = parser.parse_args(argv + ['--repetitions', repetitions])
+            with self.assertRaisesRegex(ValueError, '"--repetitions"'):
+                Context(args, self.logger)
+
+    def test_context_profile_frequency(self):
+        class Args(BenchmarkArgs):
+            def __init__(self):
+                super().__init__()
+                self.connection_type = ConnectionType.LOCAL
+                self.pg_host = 'localhost'
+                self.pg_port = '5432'
+                self.pg_database = 'testdb'
+                self.pg_data_path = '/var/lib/postgresql/data'
+                self.pg_bin_path = '/usr/lib/postgresql/bin'
+
+                self.init_command = 'init_cmd'
+                self.workload_command = 'work_cmd'
+                self.pgbench_path = 'pgbench'
+                self.psql_path = 'psql'
+                self.benchmark_type = WorkloadTypes.DEFAULT
+                self.profile_iterations = [1]
+
+        args = Args()
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(workload_conf['profile_frequency'], 99)
+
+        args.profile_frequency = 499
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(workload_conf['profile_frequency'], 499)
+
+        for frequency in (0, -1):
+            args.profile_frequency = frequency
+            with self.assertRaisesRegex(ValueError, '"--profile-frequency"'):
+                Context(args, self.logger)
+
+    def test_context_workload_location(self):
+        class Args(BenchmarkArgs):
+            def __init__(self):
+                super().__init__()
+                self.connection_type = ConnectionType.SSH
+                self.ssh_host = '192.168.0.10'
+                self.ssh_port = '22'
+                self.ssh_key = 'my_ssh_key'
+                self.remote_pg_host = '127.0.0.1'
+                self.remote_pg_port = '5432'
+
+                self.pg_host = 'localhost'
+                self.pg_port = '5439'
+                self.pg_user = 'postgres'
+                self.pg_password = 'pswd'
+                self.pg_database = 'testdb'
+                self.pg_data_path = '/var/lib/postgresql/data'
+                self.pg_bin_path = '/usr/lib/postgresql/bin'
+
+                self.init_command = 'init_cmd'
+                self.workload_command = 'work_cmd'
+                self.pgbench_path = 'pgbench'
+                self.psql_path = 'psql'
+                self.benchmark_type = WorkloadTypes.DEFAULT
+                self.workload_path = None
+                self.pgbench_clients = [5, 10]
+                self.pgbench_time = None
+                self.pg_custom_config = None
+                self.workload_location = WorkloadLocation.DB_HOST
+
+                self.collect_pg_logs = False
+                self.clear_logs = False
+                self.log_level = 'info'
+                self.report_name = 'test_report'
+
+        args = Args()
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(
+            workload_conf['workload_location'], WorkloadLocation.DB_HOST
+        )
+        # pgbench on the database host bypasses the SSH tunnel
+        self.assertEqual(
+            workload_conf['workload_db_conf'],
+            {'host': '127.0.0.1', 'port': '5432'},
+        )
+
+        args.workload_location = WorkloadLocation.CLIENT_HOST
+        args.client_ssh_host = '192.168.0.20'
+        args.workload_pg_host = '192.168.0.10'
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(
+            workload_conf['client_conn_params']['host'], '192.168.0.20'
+        )
+        self.assertEqual(
+            workload_conf['workload_db_conf'], {'host': '192.168.0.10'}
+        )
+
+        args.client_ssh_host = None
+        with self.assertRaises(ValueError) as cm:
+            _ = Context(args, self.logger)
+        self.assertIn(
+            'Parameter "--client-ssh-host" must be specified',
+            str(cm.exception),
+        )
+
+    def test_context_steady_state(self):
+        class Args(BenchmarkArgs):
+            def __init__(self):
+                super().__init__()
+                self.connection_type = ConnectionType.LOCAL
+                self.pg_host = 'localhost'
+                self.pg_port = '5432'
+                self.pg_user = 'postgres'
+                self.pg_password = 'pswd'
+                self.pg_database = 'testdb'
+                self.pg_data_path = '/var/lib/postgresql/data'
+                self.pg_bin_path = '/usr/lib/postgresql/bin'
+
+                self.init_command = 'init_cmd'
+                self.workload_command = 'work_cmd'
+                self.pgbench_path = 'pgbench'
+                self.psql_path = 'psql'
+                self.benchmark_type = WorkloadTypes.DEFAULT
+                self.workload_path = None
+                self.pgbench_clients = [5, 10]
+                self.pgbench_time = None
+                self.pg_custom_config = None
+                self.steady_state_window = 10
+                self.steady_state_cv = 3
+
+                self.collect_pg_logs = False
+                self.clear_logs = False
+                self.log_level = 'info'
+                self.report_name = 'test_report'
+
+        args = Args()
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(
+            workload_conf['steady_state'],
+            {'window': 10, 'max_cv': 3, 'min_time': None},
+        )
+        # the detection reads the progress reports
+        self.assertEqual(workload_conf['pgbench_progress'], 1)
+
+        args.pgbench_progress = 10
+        with self.assertRaises(ValueError):
+            _ = Context(args, self.logger)
+
+        args.pgbench_progress = None
+        args.benchmark_type = WorkloadTypes.NATIVE
+        with self.assertRaises(ValueError):
+            _ = Context(args, self.logger)
+
+    def test_context_cache_mode(self):
+        class Args(BenchmarkArgs):
+            def __init__(self):
+                super().__init__()
+                self.connection_type = ConnectionType.LOCAL
+                self.pg_host = 'localhost'
+                self.pg_port = '5432'
+                self.pg_user = 'postgres'
+                self.pg_password = 'pswd'
+                self.pg_database = 'testdb'
+                self.pg_data_path = '/var/lib/postgresql/data'
+                self.pg_bin_path = '/usr/lib/postgresql/bin'
+
+                self.init_command = 'init_cmd'
+                self.workload_command = 'work_cmd'
+                self.pgbench_path = 'pgbench'
+                self.psql_path = 'psql'
+                self.benchmark_type = WorkloadTypes.DEFAULT
+                self.workload_path = None
+                self.pgbench_clients = [5, 10]
+                self.pgbench_time = None
+                self.pg_custom_config = None
+                self.cache_mode = 'warm'
+                self.warmup_time = 30
+
+                self.collect_pg_logs = False
+                self.clear_logs = False
+                self.log_level = 'info'
+                self.report_name = 'test_report'
+
+        args = Args()
+        workload_conf = Context(args, self.logger).structured_params[
+            'workload_conf'
+        ]
+        self.assertEqual(workload_conf['cache_mode'], 'warm')
+        self.assertEqual(workload_conf['warmup_time'], 30)
+
+        args.warmup_time = 0
+        with self.assertRaises(ValueError):
+            _ = Context(args, self.logger)
+
+        args.warmup_time = 30
+        args.cache_mode = 'primed'
+        with self.assertRaises(ValueError):
+            _ = Context(args, self.logger)
+
     def test_context_parameters_missing_raises(self):
-        class Args:
+        class Args(BenchmarkArgs):
             def __init__(self):
+                super().__init__()
                 self.connection_type = ConnectionType.SSH
                 self.ssh_host = '192.168.0.10'
                 self.ssh_port = '22'
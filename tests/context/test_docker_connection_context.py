@@ -1,4 +1,3 @@
-import argparse
 import unittest
 from unittest.mock import MagicMock
 
@@ -7,13 +6,15 @@ from pg_perfbench.const import (
     ConnectionType,
 )
 from pg_perfbench.context import Context
+from pg_perfbench.run import get_args_parser
 from pg_perfbench.connections import DockerConnection
 
 
 class TestDockerConnectionFunctions(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        dummy_args = argparse.Namespace(
+        dummy_args = get_args_parser().parse_args(['--mode', 'benchmark'])
+        vars(dummy_args).update(
             connection_type=ConnectionType.DOCKER,
             container_name='test_container',
             pg_bin_path='/usr/lib/postgresql/12/bin',
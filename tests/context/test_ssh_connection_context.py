@@ -1,4 +1,3 @@
-import argparse
 import inspect
 import unittest
 from unittest.mock import MagicMock, patch
@@ -11,14 +10,16 @@ from pg_perfbench.const import (
     ConnectionType,
 )
 from pg_perfbench.context import Context
+from pg_perfbench.run import get_args_parser
 from pg_perfbench.connections import SSHConnection
 
 
 class TestSSHConnectionFunctions(unittest.IsolatedAsyncioTestCase):
     @classmethod
     def setUpClass(cls):
-        # Create dummy arguments similar to those produced by argparse
-        dummy_args = argparse.Namespace(
+        # The parser defaults with the options of the test
+        dummy_args = get_args_parser().parse_args(['--mode', 'benchmark'])
+        vars(dummy_args).update(
             connection_type=ConnectionType.SSH,
             ssh_host='127.0.0.1',
             ssh_port='22',
@@ -0,0 +1,177 @@
+import concurrent.futures
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pg_perfbench.driver import parse_native_options, run_native_workload
+from pg_perfbench.driver.native import (
+    get_native_rate_results,
+    get_native_results,
+    get_progress,
+    get_worker_confs,
+    load_scripts,
+    run_sessions,
+)
+from pg_perfbench.metrics import LatencyHistogram
+
+
+class TestNativeDriver(unittest.TestCase):
+    def test_parse_native_options(self):
+        options, unknown = parse_native_options(
+            '-b select-only@3 -b tpcb@1 -c 5 -j 2 -T 10 -P 1 -n '
+            '-h localhost -p 5432 -U postgres bench'
+        )
+        self.assertEqual(options.client, 5)
+        self.assertEqual(options.time, 10)
+        self.assertEqual(options.host, 'localhost')
+        self.assertEqual(options.dbname, 'bench')
+        self.assertEqual(unknown, ['-n'])
+        scripts = load_scripts(options)
+        self.assertEqual(
+            [(name, weight) for name, _, weight in scripts],
+            [('select-only', 3), ('tpcb', 1)],
+        )
+        # the default is 10 transactions per client as in pgbench
+        options, _ = parse_native_options('-b select-only')
+        self.assertEqual(options.transactions, 10)
+
+    def test_parse_native_options_invalid(self):
+        for command in ('-c 2 -T 5', '-b select-only -T 5 -t 10', '-c x'):
+            with self.assertRaises(ValueError):
+                parse_native_options(command)
+
+    def test_get_worker_confs(self):
+        options, _ = parse_native_options(
+            '-b select-only -c 5 -j 2 -T 10 -D factor=2'
+        )
+        confs = get_worker_confs(
+            options, load_scripts(options), {'host': 'db', 'port': '5432'}
+        )
+        self.assertEqual(
+            [conf['client_ids'] for conf in confs], [[0, 1, 2], [3, 4]]
+        )
+        self.assertEqual(confs[0]['variables'], {'scale': 1, 'factor': 2})
+        self.assertEqual(confs[0]['connect_params']['host'], 'db')
+
+    def test_results_and_progress(self):
+        options, _ = parse_native_options('-b select-only -c 4 -j 2 -T 2')
+        worker_results = [
+            {
+                'transactions': 200,
+                'elapsed': 2.0,
+                'conn_time': 0.01,
+                'histogram': {'total': 400000.0},
+                'intervals': {
+                    0: [100, 200000.0, 4.0e8, 10000.0],
+                    1: [100, 200000.0, 4.0e8, 10000.0],
+                },
+            },
+            {
+                'transactions': 100,
+                'elapsed': 2.0,
+                'conn_time': 0.03,
+                'histogram': {'total': 400000.0},
+                'intervals': {
+                    0: [50, 200000.0, 8.0e8, 5000.0],
+                    1: [50, 200000.0, 8.0e8, 5000.0],
+                },
+            },
+        ]
+        self.assertEqual(
+            get_native_results(options, worker_results),
+            [4, 2, 300, 2.667, 20.0, 150.0],
+        )
+        progress = get_progress(worker_results, 1)
+        self.assertEqual(progress[0], [1.0, 150.0, 2.667, 0.943, None])
+        self.assertEqual(len(progress), 2)
+        # the schedule lag is reported for rate-limited runs
+        self.assertEqual(get_progress(worker_results, 1, 200)[0][4], 0.1)
+
+    def test_rate_results(self):
+        options, _ = parse_native_options(
+            '-b select-only -c 4 -T 2 -R 100 -L 50'
+        )
+        self.assertEqual(get_worker_confs(options, [], {})[0]['rate'], 25.0)
+        worker_results = [
+            {
+                'transactions': 190,
+                'skipped': 10,
+                'late': 3,
+                'lag_sum': 190000.0,
+                'lag_max': 60000.0,
+            }
+        ]
+        self.assertEqual(
+            get_native_rate_results(options, worker_results),
+            {
+                'target_rate': 100.0,
+                'lag_avg': 1.0,
+                'lag_max': 60.0,
+                'skipped': 10,
+                'late': 3,
+            },
+        )
+        options, _ = parse_native_options('-b select-only -T 2')
+        self.assertIsNone(get_native_rate_results(options, worker_results))
+
+
+class ThreadExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Runs the workers in threads, records where it is shut down."""
+
+    shutdown_threads = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        super().__init__(
+            max_workers, initializer=initializer, initargs=initargs
+        )
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdown_threads.append(threading.current_thread())
+        super().shutdown(wait, cancel_futures=cancel_futures)
+
+
+def run_worker(worker_conf: dict) -> dict:
+    return {
+        'transactions': 10,
+        'elapsed': 1.0,
+        'conn_time': 0.01,
+        'histogram': LatencyHistogram().to_dict(),
+        'intervals': {},
+        'skipped': 0,
+        'failed': 0,
+        'late': 0,
+        'lag_sum': 0.0,
+        'lag_max': 0.0,
+    }
+
+
+class TestNativeWorkload(unittest.IsolatedAsyncioTestCase):
+    async def test_executor_shutdown_off_the_loop(self):
+        with patch(
+            'concurrent.futures.ProcessPoolExecutor', ThreadExecutor
+        ), patch('pg_perfbench.driver.native.run_worker', run_worker):
+            benchmark = await run_native_workload(
+                MagicMock(), '-b select-only -c 2 -j 2 -T 1', {}
+            )
+        self.assertEqual(benchmark['result'][2], 20)
+        # the workers are waited for in a thread, not in the event loop
+        self.assertEqual(len(ThreadExecutor.shutdown_threads), 1)
+        self.assertIsNot(
+            ThreadExecutor.shutdown_threads[0], threading.main_thread()
+        )
+
+    async def test_sessions_closed_on_connect_failure(self):
+        conns = [AsyncMock(), AsyncMock()]
+        connect = AsyncMock(
+            side_effect=[conns[0], OSError('too many clients'), conns[1]]
+        )
+        worker_conf = {
+            'scripts': [('SELECT 1;', 1)],
+            'connect_params': {},
+            'client_ids': [0, 1, 2],
+        }
+        with patch('pg_perfbench.driver.native.asyncpg.connect', connect):
+            with self.assertRaisesRegex(OSError, 'too many clients'):
+                await run_sessions(worker_conf)
+        for conn in conns:
+            conn.close.assert_awaited_once()
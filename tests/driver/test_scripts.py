@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from pg_perfbench.driver import (
+    BUILTIN_SCRIPTS,
+    compile_expression,
+    parse_script,
+)
+from pg_perfbench.driver.scripts import split_weight, substitute_variables
+
+
+class TestExpressions(unittest.TestCase):
+    def test_arithmetic(self):
+        self.assertEqual(compile_expression('1 + 2 * :x')({'x': 3}, None), 7)
+        # integer division and modulo truncate towards zero as in pgbench
+        self.assertEqual(compile_expression('-7 / 2')({}, None), -3)
+        self.assertEqual(compile_expression('-7 % 3')({}, None), -1)
+        self.assertEqual(compile_expression('7.0 / 2')({}, None), 3.5)
+        self.assertEqual(
+            compile_expression('greatest(abs(-3), least(5, 4))')({}, None), 4
+        )
+
+    def test_random(self):
+        rng = random.Random(1)
+        expression = compile_expression('random(1, 10 * :scale)')
+        values = [expression({'scale': 2}, rng) for _ in range(200)]
+        self.assertEqual(min(values), 1)
+        self.assertEqual(max(values), 20)
+        gaussian = compile_expression('random_gaussian(1, 10, 2.5)')
+        self.assertTrue(all(1 <= gaussian({}, rng) <= 10 for _ in range(200)))
+
+    def test_rejected(self):
+        for text in ('__import__("os")', 'x.y', '[1]', '1 +', '2 ** 3'):
+            with self.assertRaises(ValueError):
+                compile_expression(text)
+        with self.assertRaises(ValueError):
+            compile_expression(':missing + 1')({}, None)
+
+
+class TestScripts(unittest.TestCase):
+    def test_parse_script(self):
+        script = parse_script(
+            '-- comment\n'
+            '\\set aid random(1, 10)\n'
+            '\\sleep 5 ms\n'
+            'SELECT *\n'
+            '  FROM t WHERE id = :aid;\n'
+            'SELECT 1'
+        )
+        self.assertEqual(
+            [command[0] for command in script], ['set', 'sleep', 'sql', 'sql']
+        )
+        self.assertEqual(script[2][1], 'SELECT *\n  FROM t WHERE id = :aid;')
+        self.assertEqual(script[1][2], 0.001)
+        for text in BUILTIN_SCRIPTS.values():
+            self.assertTrue(parse_script(text))
+
+    def test_parse_script_invalid(self):
+        for text in ('\\set aid', '\\gset', '\\sleep 1 min\nSELECT 1;', ''):
+            with self.assertRaises(ValueError):
+                parse_script(text)
+
+    def test_substitute_variables(self):
+        self.assertEqual(
+            substitute_variables(
+                'SELECT :aid::int, :other', {'aid': 5, 'unused': 1}
+            ),
+            'SELECT 5::int, :other',
+        )
+
+    def test_split_weight(self):
+        self.assertEqual(split_weight('select.sql@9'), ('select.sql', 9))
+        self.assertEqual(split_weight('a@b.sql'), ('a@b.sql', 1))
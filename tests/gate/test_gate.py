@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pg_perfbench.context import GateContext
+from pg_perfbench.gate import RegressionGate
+from pg_perfbench.run import get_args_parser
+
+
+class MockLogg:
+    """A simple mock logger for testing."""
+
+    def __init__(self):
+        self.messages = []
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        self.messages.append(msg)
+
+    def error(self, msg):
+        self.messages.append(msg)
+
+    def warning(self, msg):
+        pass
+
+
+def get_report(name: str, tps: list[list], latency: float = 2.0) -> dict:
+    # a report of one sweep point per clients value with repeated runs
+    outputs = []
+    runs = []
+    for idx, (clients, samples) in enumerate(tps, start=1):
+        outputs.append(
+            [clients, 10, 1000, latency, 1.0, sum(samples) / len(samples)]
+        )
+        for repetition, value in enumerate(samples, start=1):
+            runs.append(
+                [len(runs) + 1, idx, repetition, clients, 10, 1000]
+                + [latency, 1.0, value]
+            )
+    return {
+        'report_name': name,
+        'sections': {
+            'result': {
+                'reports': {
+                    'pgbench_outputs': {'data': outputs},
+                    'pgbench_runs': {'data': runs},
+                    'pgbench_progress': {'data': []},
+                }
+            }
+        },
+    }
+
+
+class TestRegressionGate(unittest.TestCase):
+    def setUp(self):
+        self.baseline = get_report(
+            'baseline',
+            [[1, [1000.0, 1010.0, 990.0, 1005.0]]]
+            + [[8, [5000.0, 5050.0, 4950.0, 5020.0]]],
+        )
+
+    def test_point_samples(self):
+        points = RegressionGate.get_point_samples(self.baseline)
+        self.assertEqual(list(points), [1, 2])
+        self.assertEqual(points[2]['clients'], 8)
+        self.assertEqual(len(points[2]['pgbench_runs']), 4)
+        self.assertEqual(points[1]['pgbench_outputs'], [[1001.25, 2.0]])
+
+    def test_regression(self):
+        current = get_report(
+            'current',
+            [[1, [1003.0, 995.0, 1008.0, 1001.0]]]
+            + [[8, [4200.0, 4250.0, 4180.0, 4230.0]]],
+        )
+        rows = RegressionGate.compare_reports(self.baseline, current)
+        verdicts = {(row[0], row[1]): row[-1] for row in rows}
+        self.assertEqual(verdicts[('iteration 1 (clients=1)', 'tps')], 'ok')
+        self.assertEqual(
+            verdicts[('iteration 2 (clients=8)', 'tps')], 'regression'
+        )
+        self.assertEqual(
+            verdicts[('iteration 2 (clients=8)', 'latency average, ms')],
+            'ok',
+        )
+        tps_row = rows[2]
+        self.assertEqual(tps_row[2], '4/4')
+        self.assertAlmostEqual(tps_row[5], -15.87, places=2)
+        # all current runs below all baseline runs: 2 / C(8, 4)
+        self.assertAlmostEqual(tps_row[6], 0.0286, places=4)
+
+    def test_drop_within_noise(self):
+        # a drop beyond the tolerance, but not significant
+        current = get_report(
+            'current',
+            [[1, [880.0, 1020.0, 1015.0, 850.0]]]
+            + [[8, [5000.0, 5050.0, 4950.0, 5020.0]]],
+        )
+        rows = RegressionGate.compare_reports(self.baseline, current)
+        self.assertLess(rows[0][5], -5)
+        self.assertEqual(rows[0][-1], 'ok')
+
+    def test_single_results(self):
+        # without repeated runs the tolerance alone decides
+        baseline = get_report('baseline', [[1, [1000.0]]])
+        current = get_report('current', [[1, [1200.0]]], latency=2.5)
+        rows = RegressionGate.compare_reports(baseline, current)
+        self.assertEqual(rows[0][2], '1/1')
+        self.assertIsNone(rows[0][6])
+        self.assertEqual(rows[0][-1], 'improvement')
+        self.assertEqual(rows[1][-1], 'regression')
+
+    def test_missing_point(self):
+        current = get_report('current', [[1, [1000.0, 1000.0]]])
+        rows = RegressionGate.compare_reports(self.baseline, current)
+        self.assertEqual(rows[-1][0], 'iteration 2 (clients=8)')
+        self.assertEqual(rows[-1][-1], 'missing')
+
+    def test_format_table(self):
+        rows = RegressionGate.compare_reports(self.baseline, self.baseline)
+        lines = RegressionGate.format_table(rows).splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith('point'))
+        self.assertTrue(set(lines[1]) <= {'-', ' '})
+        self.assertTrue(all(line.endswith('ok') for line in lines[2:]))
+
+    def test_run_gate(self):
+        current = get_report(
+            'current',
+            [[1, [1000.0, 1010.0, 990.0, 1005.0]]]
+            + [[8, [4200.0, 4250.0, 4180.0, 4230.0]]],
+        )
+        logger = MockLogg()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.baseline, f)
+            params = {
+                'logger': logger,
+                'baseline_report': path,
+                'tps_tolerance': 5.0,
+                'latency_tolerance': 10.0,
+                'alpha': 0.05,
+            }
+            self.assertTrue(RegressionGate.run_gate(current=current, **params))
+            self.assertFalse(
+                RegressionGate.run_gate(current=self.baseline, **params)
+            )
+            with self.assertRaises(ValueError):
+                RegressionGate.run_gate(
+                    current=current,
+                    **{**params, 'baseline_report': f'{tmp}/missing.json'},
+                )
+        self.assertIn('regression', logger.messages[0])
+
+    def test_context(self):
+        parser = get_args_parser()
+        args = parser.parse_args(
+            ['--mode=gate', '--baseline-report=base.json']
+            + ['--current-report=cur.json', '--gate-tps-tolerance=3']
+        )
+        ctx = GateContext(args, MockLogg())
+        self.assertEqual(ctx.current_report, 'cur.json')
+        self.assertEqual(ctx.structured_params['tps_tolerance'], 3.0)
+        self.assertEqual(ctx.structured_params['alpha'], 0.05)
+        with self.assertRaises(ValueError):
+            GateContext(parser.parse_args(['--mode=gate']), MockLogg())
+        with self.assertRaises(ValueError):
+            GateContext(
+                parser.parse_args(
+                    ['--mode=gate', '--baseline-report=b', '--gate-alpha=1']
+                ),
+                MockLogg(),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -254,6 +254,42 @@ class TestReportProcessing(unittest.TestCase):
             "Expected description to contain 'Comparison Reports'",
         )
 
+    def test_11join_statements(self):
+        """Check that join_statements lines up the top statements of the reports."""
+        reports = []
+        for i, mean_time in enumerate([2.0, 3.0]):
+            rows = [['SELECT 1', 10, 10 * mean_time, mean_time, 0, 10, 5, 0]]
+            if i:
+                rows.append(['SELECT 2', 1, 1.0, 1.0, 0, 1, 1, 0])
+            reports.append(
+                {
+                    'report_name': f'report_{i + 1}',
+                    'sections': {
+                        'result': {
+                            'reports': {
+                                'pg_statements': {
+                                    'state': 'collapsed',
+                                    'data': [['iteration 1', rows]],
+                                }
+                            }
+                        }
+                    },
+                }
+            )
+        ReportJoiner.join_statements(reports[0], reports)
+        item = reports[0]['sections']['result']['reports']['pg_statements']
+        self.assertEqual(item['theader'][:2], ['query', 'report'])
+        label, rows = item['data'][0]
+        self.assertEqual(label, 'iteration 1')
+        self.assertEqual(
+            [row[:2] + row[-1:] for row in rows],
+            [
+                ['SELECT 1', 'report_1', 0.0],
+                ['SELECT 1', 'report_2', 50.0],
+                ['SELECT 2', 'report_2', None],
+            ],
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
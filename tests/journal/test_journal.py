@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pg_perfbench.benchmark import BenchmarkRunner
+from pg_perfbench.journal import RunJournal
+
+
+LOAD_ITERATIONS = [['init -s 1', 'work -c 1'], ['init -s 1', 'work -c 10']]
+DB_CONF = {'host': '127.0.0.1', 'port': '5432', 'database': 'tdb'}
+WORKLOAD_CONF = {
+    'init_command': 'init -s ARG_PGBENCH_SCALE',
+    'workload_command': 'work -c ARG_PGBENCH_CLIENTS',
+    'pgbench_sweep': {'pgbench_clients': [1, 10]},
+    'repetitions': 2,
+}
+
+
+class TestRunJournal(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.logger = MagicMock()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'r.journal.jsonl')
+        self.config = RunJournal.get_config(DB_CONF, WORKLOAD_CONF)
+
+    def test_resume_restores_completed_runs(self):
+        journal = RunJournal(self.path, self.logger)
+        journal.start(self.config)
+        journal.phase('iterations')
+        journal.add_run(LOAD_ITERATIONS[0], 1, {'result': [1, 10]})
+        # a line cut by a crash
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "run", "key": ')
+
+        resumed = RunJournal(self.path, self.logger)
+        resumed.start(self.config, resume=True)
+        self.assertEqual(
+            resumed.get_run(LOAD_ITERATIONS[0], 1), {'result': [1, 10]}
+        )
+        self.assertIsNone(resumed.get_run(LOAD_ITERATIONS[0], 2))
+        self.assertIsNone(resumed.get_run(LOAD_ITERATIONS[1], 1))
+        self.assertEqual(
+            [record['event'] for record in resumed.read()],
+            ['start', 'phase', 'run', 'start'],
+        )
+
+    def test_resume_checks_config(self):
+        with self.assertRaises(ValueError):
+            RunJournal(self.path, self.logger).start(self.config, resume=True)
+
+        RunJournal(self.path, self.logger).start(self.config)
+        config = RunJournal.get_config(
+            {**DB_CONF, 'port': '5433'}, WORKLOAD_CONF
+        )
+        with self.assertRaises(ValueError):
+            RunJournal(self.path, self.logger).start(config, resume=True)
+
+    def test_tune_seed_is_journaled(self):
+        workload_conf = {**WORKLOAD_CONF, 'tune_settings': {'work_mem': []}}
+        journal = RunJournal(self.path, self.logger)
+        BenchmarkRunner.set_tune_seed(workload_conf, journal)
+        seed = workload_conf['tune_seed']
+        self.assertIsInstance(seed, int)
+        journal.start(RunJournal.get_config(DB_CONF, workload_conf))
+
+        # the resumed tuning samples the configurations of the journal
+        resumed_conf = {
+            **WORKLOAD_CONF,
+            'tune_settings': {'work_mem': []},
+            'resume': True,
+        }
+        resumed = RunJournal(self.path, self.logger)
+        BenchmarkRunner.set_tune_seed(resumed_conf, resumed)
+        self.assertEqual(resumed_conf['tune_seed'], seed)
+        resumed.start(
+            RunJournal.get_config(DB_CONF, resumed_conf), resume=True
+        )
+
+        # a given seed is kept
+        given_conf = {**resumed_conf, 'tune_seed': 7}
+        BenchmarkRunner.set_tune_seed(given_conf, resumed)
+        self.assertEqual(given_conf['tune_seed'], 7)
+
+    async def test_run_benchmark_iterations_skips_journaled_runs(self):
+        journal = RunJournal(self.path, self.logger)
+        journal.start(self.config)
+        journal.add_run(
+            LOAD_ITERATIONS[1], 1, {'result': [10], 'reset': {'dataset': 'x'}}
+        )
+        journal = RunJournal(self.path, self.logger)
+        journal.start(self.config, resume=True)
+
+        reset_strategy = AsyncMock()
+        reset_strategy.reset.return_value = {
+            'dataset': 'initialized',
+            'reset_time': 0.1,
+            'init_time': 0.2,
+            'cache_time': 0,
+        }
+        with patch.object(
+            BenchmarkRunner,
+            'setup_reset_strategy',
+            return_value=reset_strategy,
+        ), patch.object(
+            BenchmarkRunner,
+            'take_pg_stats_snapshot',
+            AsyncMock(return_value=None),
+        ), patch.object(
+            BenchmarkRunner,
+            'run_benchmark',
+            AsyncMock(return_value={'result': [1]}),
+        ) as run_mock:
+            runs = await BenchmarkRunner.run_benchmark_iterations(
+                self.logger,
+                LOAD_ITERATIONS,
+                'local',
+                None,
+                DB_CONF,
+                WORKLOAD_CONF,
+                [{'pgbench_clients': 1}, {'pgbench_clients': 10}],
+                [0, 1, 0, 1],
+                journal=journal,
+            )
+
+        self.assertEqual(run_mock.await_count, 3)
+        self.assertEqual(
+            [(run['iteration'], run['repetition']) for run in runs],
+            [(1, 1), (2, 1), (1, 2), (2, 2)],
+        )
+        self.assertEqual(runs[1]['result'], [10])
+        self.assertEqual(runs[1]['params'], {'pgbench_clients': 10})
+        # the new runs are journaled for the next resume
+        resumed = RunJournal(self.path, self.logger)
+        resumed.start(self.config, resume=True)
+        self.assertEqual(len(resumed.completed), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from pg_perfbench.metrics import get_cache_summary, merge_cache_stats
+
+
+class TestCache(unittest.TestCase):
+    def test_get_cache_summary(self):
+        summary = get_cache_summary(
+            'primed',
+            prime_time=1.5,
+            primed=(4, 3400),
+            pg_stats={'blks_hit': 990, 'blks_read': 10},
+        )
+        self.assertEqual(
+            summary,
+            {
+                'mode': 'primed',
+                'warmup_time': None,
+                'prime_time': 1.5,
+                'relations': 4,
+                'blocks': 3400,
+                'hit_ratio': 99.0,
+            },
+        )
+        summary = get_cache_summary('cold')
+        self.assertIsNone(summary['hit_ratio'])
+        self.assertIsNone(summary['relations'])
+
+    def test_merge(self):
+        merged = merge_cache_stats(
+            [
+                get_cache_summary(
+                    'warm',
+                    warmup_time=30.5,
+                    pg_stats={'blks_hit': 90, 'blks_read': 10},
+                ),
+                get_cache_summary(
+                    'warm',
+                    warmup_time=31.5,
+                    pg_stats={'blks_hit': 100, 'blks_read': 0},
+                ),
+                None,
+            ]
+        )
+        self.assertEqual(merged['mode'], 'warm')
+        self.assertEqual(merged['warmup_time'], 31.0)
+        self.assertEqual(merged['hit_ratio'], 95.0)
+        self.assertIsNone(merged['blocks'])
+        self.assertIsNone(merge_cache_stats([None]))
+
+
+if __name__ == '__main__':
+    unittest.main()
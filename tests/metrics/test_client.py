@@ -0,0 +1,54 @@
+import unittest
+
+from pg_perfbench.metrics import (
+    get_client_cpu_times,
+    get_progress_transactions,
+    get_client_summary,
+    merge_client_stats,
+)
+
+
+class TestClient(unittest.TestCase):
+    def test_get_client_cpu_times(self):
+        output = (
+            'tps = 500.0 (without initial connection time)\n'
+            '#client-times\n'
+            '0m0.002s 0m0.001s\n'
+            '1m2.500000s 0m7.250000s\n'
+        )
+        self.assertEqual(get_client_cpu_times(output), (62.502, 7.251))
+        self.assertIsNone(get_client_cpu_times('tps = 500.0\n'))
+        self.assertIsNone(get_client_cpu_times('#client-times\n0m0s 0m0s'))
+
+    def test_get_progress_transactions(self):
+        progress = [[1.0, 100.0], [3.0, 200.0], [4.0, None]]
+        self.assertEqual(get_progress_transactions(progress), 500)
+        self.assertIsNone(get_progress_transactions([]))
+
+    def test_get_client_summary(self):
+        summary = get_client_summary((15.0, 3.0), 10.0, 4, 1000, cpus=2)
+        # 18 s of CPU in 10 s on the 2 CPUs the 4 threads may use
+        self.assertEqual(summary['utilization'], 90.0)
+        self.assertEqual(summary['cpu_per_xact_us'], 18000.0)
+        self.assertTrue(summary['saturated'])
+        summary = get_client_summary((15.0, 3.0), 10.0, 4, None)
+        self.assertEqual(summary['utilization'], 45.0)
+        self.assertIsNone(summary['cpu_per_xact_us'])
+        self.assertFalse(summary['saturated'])
+
+    def test_merge(self):
+        merged = merge_client_stats(
+            [
+                get_client_summary((9.5, 0.0), 10.0, 1, 1000),
+                get_client_summary((5.5, 0.0), 10.0, 1, 1000),
+                None,
+            ]
+        )
+        self.assertEqual(merged['utilization'], 75.0)
+        self.assertEqual(merged['cpu_per_xact_us'], 7500.0)
+        self.assertTrue(merged['saturated'])
+        self.assertIsNone(merge_client_stats([None]))
+
+
+if __name__ == '__main__':
+    unittest.main()
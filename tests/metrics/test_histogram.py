@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pg_perfbench.metrics import (
+    LatencyHistogram,
+    get_latency_summary,
+    get_pgbench_log_files,
+    read_pgbench_log,
+)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram(precision=0.01)
+        histogram.add_batch([float(value) for value in range(1, 10001)])
+        self.assertEqual(histogram.count, 10000)
+        for percent, expected in ((50, 5000), (99, 9900), (99.9, 9990)):
+            value = histogram.percentile(percent)
+            self.assertLessEqual(abs(value - expected) / expected, 0.01)
+        self.assertEqual(histogram.percentile(100), 10000)
+        self.assertEqual(histogram.percentile(0), 1)
+
+    def test_merge_equals_single_histogram(self):
+        values = [float(value) for value in range(1, 5001)]
+        single = LatencyHistogram()
+        single.add_batch(values)
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.add_batch(values[::2])
+        second.add_batch(values[1::2])
+        merged = first.merge(second)
+        self.assertEqual(merged.buckets, single.buckets)
+        self.assertEqual(merged.count, single.count)
+        self.assertEqual((merged.min, merged.max), (1, 5000))
+
+    def test_merge_different_precision(self):
+        with self.assertRaises(ValueError):
+            LatencyHistogram(0.01).merge(LatencyHistogram(0.05))
+
+    def test_dict_round_trip(self):
+        histogram = LatencyHistogram()
+        histogram.add_batch([0.0, 10.0, 250.0, 250.0])
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+        self.assertEqual(restored.buckets, histogram.buckets)
+        self.assertEqual(restored.zero_count, 1)
+        self.assertEqual(restored.percentile(90), histogram.percentile(90))
+
+    def test_empty_histogram(self):
+        summary = get_latency_summary(LatencyHistogram())
+        self.assertEqual(summary['transactions'], 0)
+        self.assertIsNone(summary['percentiles']['99'])
+        self.assertIsNone(summary['max'])
+
+
+class TestPgbenchLog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.prefix = os.path.join(self.temp_dir, 'pgbench_log')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_read_pgbench_log(self):
+        with open(f'{self.prefix}.100', 'w') as log_file:
+            log_file.write(
+                '0 1 1500 0 1700000000 100\n'
+                '0 2 2500 0 1700000000 200 30\n'
+                '1 1 skipped 0 1700000001 300 5000\n'
+                '1 2 failed 0 1700000001 400 0 serialization\n'
+            )
+        with open(f'{self.prefix}.100.1', 'w') as log_file:
+            log_file.write('2 1 3500 0 1700000002 100\n')
+
+        log_files = get_pgbench_log_files(self.prefix)
+        self.assertEqual(len(log_files), 2)
+
+        histogram = LatencyHistogram()
+        counters = {'skipped': 0, 'failed': 0}
+        for log_file in log_files:
+            for key, value in read_pgbench_log(log_file, histogram).items():
+                counters[key] += value
+        self.assertEqual(counters, {'skipped': 1, 'failed': 1})
+
+        summary = get_latency_summary(histogram, counters)
+        self.assertEqual(summary['transactions'], 3)
+        self.assertEqual(summary['max'], 3.5)
+        self.assertAlmostEqual(summary['percentiles']['50'], 2.5, delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
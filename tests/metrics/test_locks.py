@@ -0,0 +1,85 @@
+import unittest
+
+from pg_perfbench.metrics import LockSampler, merge_locks, get_chain_depth
+
+
+class TestLocks(unittest.TestCase):
+    def test_chain_depth(self):
+        self.assertEqual(get_chain_depth({}), 0)
+        # 3 waits for 2 which waits for 1
+        self.assertEqual(get_chain_depth({2: [1], 3: [2], 4: [1]}), 2)
+        # a deadlock cycle does not loop
+        self.assertEqual(get_chain_depth({1: [2], 2: [1]}), 2)
+
+    def test_sampler_aggregation(self):
+        sampler = LockSampler(None, 0.5, None)
+        rows = [
+            {
+                'pid': 2,
+                'blocking_pids': [1],
+                'relation': 'pgbench_branches',
+                'mode': 'ShareLock',
+            },
+            {
+                'pid': 3,
+                'blocking_pids': [2],
+                'relation': 'pgbench_branches',
+                'mode': 'ShareLock',
+            },
+            {
+                'pid': 4,
+                'blocking_pids': [1],
+                'relation': 'transactionid',
+                'mode': 'ShareLock',
+            },
+        ]
+        sampler.add_sample(rows, 0.0)
+        sampler.add_sample(rows[:1], 1.0)
+        sampler.add_sample([], 1.5)
+        summary = sampler.get_summary()
+        self.assertEqual(
+            summary['locks'],
+            [
+                # 2 sessions for 0.5 s and one for 1 s
+                ['pgbench_branches', 'ShareLock', 2.0, 2],
+                ['transactionid', 'ShareLock', 0.5, 1],
+            ],
+        )
+        self.assertEqual(summary['blocked_time'], 2.5)
+        self.assertEqual(summary['max_blocked'], 3)
+        self.assertEqual(summary['max_depth'], 2)
+
+    def test_merge(self):
+        overhead = {'query_ms': 1.0, 'busy': 1.0}
+        merged = merge_locks(
+            [
+                {
+                    'locks': [['t', 'RowExclusiveLock', 2.0, 3]],
+                    'blocked_time': 2.0,
+                    'max_blocked': 3,
+                    'max_depth': 1,
+                    'samples': 10,
+                    'interval': 0.1,
+                    'overhead': overhead,
+                },
+                {
+                    'locks': [],
+                    'blocked_time': 0.0,
+                    'max_blocked': 0,
+                    'max_depth': 0,
+                    'samples': 10,
+                    'interval': 0.1,
+                    'overhead': overhead,
+                },
+                None,
+            ]
+        )
+        self.assertEqual(merged['locks'], [['t', 'RowExclusiveLock', 1.0, 3]])
+        self.assertEqual(merged['blocked_time'], 1.0)
+        self.assertEqual(merged['max_depth'], 1)
+        self.assertEqual(merged['samples'], 20)
+        self.assertIsNone(merge_locks([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import unittest
+
+from pg_perfbench.connections.local import LocalConnection
+from pg_perfbench.metrics import (
+    OS_STATS_FIELDS,
+    OSSampler,
+    parse_os_sample,
+    get_os_series,
+)
+
+
+def get_lines(cpu, disk, net, available_kb, pswpout):
+    return [
+        'cpu  {} 0 {} {} {} 0 0 0 0 0'.format(*cpu),
+        'MemTotal:        8000000 kB',
+        f'MemAvailable:    {available_kb} kB',
+        'Dirty:              2048 kB',
+        'pswpin 0',
+        f'pswpout {pswpout}',
+        'pgmajfault 10',
+        '   8       0 sda {} 0 {} 0 {} 0 {} 0 0 {} 0'.format(
+            disk[0], disk[0], disk[1], disk[1], disk[2]
+        ),
+        '   8       1 sda1 100 0 100 0 100 0 100 0 0 100 0',
+        '   7       0 loop0 100 0 100 0 100 0 100 0 0 100 0',
+        'Inter-|   Receive                            |  Transmit',
+        ' face |bytes    packets errs drop fifo frame compressed multicast'
+        '|bytes    packets errs drop fifo colls carrier compressed',
+        '    lo: 999999 10 0 0 0 0 0 0 999999 10 0 0 0 0 0 0',
+        '  eth0: {} 10 0 0 0 0 0 0 {} 10 0 0 0 0 0 0'.format(*net),
+    ]
+
+
+class TestOSStats(unittest.TestCase):
+    def test_parse_os_sample(self):
+        sample = parse_os_sample(
+            get_lines([10, 5, 80, 5], [8, 16, 100], [1000, 2000], 4096, 0)
+        )
+        self.assertEqual(sample['cpu'][:5], [10, 0, 5, 80, 5])
+        self.assertEqual(sample['memory']['MemAvailable'], 4096)
+        self.assertEqual(sample['vmstat']['pgmajfault'], 10)
+        # partitions, loop devices and the loopback interface are skipped
+        self.assertEqual(sample['disk'], [8, 16, 100])
+        self.assertEqual(sample['net'], [1000, 2000])
+
+    def test_get_os_series(self):
+        first = parse_os_sample(
+            get_lines([10, 5, 80, 5], [0, 0, 0], [0, 0], 4096, 0)
+        )
+        second = parse_os_sample(
+            get_lines(
+                [40, 15, 120, 25],
+                [4096, 8192, 1000],
+                [1048576, 2097152],
+                2048,
+                20,
+            )
+        )
+        rows = get_os_series([(0.1, 100.0, first), (2.1, 102.0, second)])
+        self.assertEqual(len(rows), 1)
+        row = dict(zip(OS_STATS_FIELDS, rows[0]))
+        self.assertEqual(row['time'], 2.1)
+        # 100 jiffies: 30 user, 10 system, 40 idle, 20 iowait
+        self.assertEqual(row['cpu_user'], 30.0)
+        self.assertEqual(row['cpu_system'], 10.0)
+        self.assertEqual(row['cpu_iowait'], 20.0)
+        self.assertEqual(row['cpu_idle'], 40.0)
+        # rates over the 2 seconds of the remote clock
+        self.assertEqual(row['disk_read_mb'], 1.0)
+        self.assertEqual(row['disk_write_mb'], 2.0)
+        self.assertEqual(row['disk_util'], 50.0)
+        self.assertEqual(row['net_rx_mb'], 0.5)
+        self.assertEqual(row['net_tx_mb'], 1.0)
+        self.assertEqual(row['mem_available_mb'], 2.0)
+        self.assertEqual(row['mem_dirty_mb'], 2.0)
+        self.assertEqual(row['swap_out'], 10.0)
+        self.assertEqual(row['major_faults'], 0.0)
+
+        self.assertEqual(get_os_series([(0.1, 100.0, first)]), [])
+
+
+@unittest.skipUnless(os.path.exists('/proc/stat'), 'requires /proc')
+class TestOSSampler(unittest.IsolatedAsyncioTestCase):
+    async def test_sampler_local(self):
+        sampler = OSSampler(
+            LocalConnection({}), 1, logging.getLogger('test_os_stats')
+        )
+        await sampler.start()
+        await asyncio.sleep(2.5)
+        os_stats = await sampler.stop()
+        self.assertEqual(os_stats['fields'], OS_STATS_FIELDS)
+        self.assertGreaterEqual(len(os_stats['samples']), 1)
+        self.assertTrue(
+            all(
+                len(row) == len(OS_STATS_FIELDS) for row in os_stats['samples']
+            )
+        )
+        self.assertFalse(os.path.exists(sampler.stop_file))
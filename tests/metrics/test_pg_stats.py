@@ -0,0 +1,183 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from pg_perfbench.metrics import (
+    get_pg_stats_snapshot,
+    get_pg_stats_delta,
+    get_pg_stats_ratios,
+    merge_pg_stats,
+    reset_pg_stat_statements,
+    get_top_statements,
+    merge_statements,
+)
+from pg_perfbench.metrics.pg_stats import get_pg_stat_queries
+
+
+class TestPgStats(unittest.IsolatedAsyncioTestCase):
+    def test_queries_by_server_version(self):
+        def views(version):
+            queries = ' '.join(get_pg_stat_queries(version))
+            return [
+                view
+                for view in (
+                    'pg_stat_bgwriter',
+                    'pg_stat_checkpointer',
+                    'pg_current_wal_lsn',
+                    'pg_stat_wal',
+                    'pg_stat_io',
+                )
+                if view in queries
+            ]
+
+        self.assertEqual(
+            views(130000), ['pg_stat_bgwriter', 'pg_current_wal_lsn']
+        )
+        self.assertEqual(views(150000), ['pg_stat_bgwriter', 'pg_stat_wal'])
+        self.assertEqual(
+            views(160000), ['pg_stat_bgwriter', 'pg_stat_wal', 'pg_stat_io']
+        )
+        self.assertEqual(
+            views(170000),
+            [
+                'pg_stat_bgwriter',
+                'pg_stat_checkpointer',
+                'pg_stat_wal',
+                'pg_stat_io',
+            ],
+        )
+
+    async def test_snapshot(self):
+        db_conn = AsyncMock()
+        db_conn.fetchval.return_value = '140005'
+        db_conn.fetchrow.side_effect = [
+            {'xact_commit': 10, 'blks_hit': 90},
+            {'checkpoints_timed': 1},
+            {'wal_bytes': 4096},
+        ]
+        snapshot = await get_pg_stats_snapshot(db_conn)
+        self.assertEqual(
+            snapshot,
+            {
+                'xact_commit': 10,
+                'blks_hit': 90,
+                'checkpoints_timed': 1,
+                'wal_bytes': 4096,
+            },
+        )
+
+    def test_delta_and_merge(self):
+        before = {'xact_commit': 10, 'wal_bytes': 100, 'blks_hit': None}
+        after = {'xact_commit': 110, 'wal_bytes': 1100, 'blks_hit': 5}
+        delta = get_pg_stats_delta(before, after)
+        self.assertEqual(delta, {'xact_commit': 100, 'wal_bytes': 1000})
+        # the sampler polls are not commits of the workload
+        self.assertEqual(
+            get_pg_stats_delta(before, after, 30)['xact_commit'], 70
+        )
+        self.assertEqual(
+            merge_pg_stats([delta, {'xact_commit': 200}, None]),
+            {'xact_commit': 150.0, 'wal_bytes': 1000.0},
+        )
+        self.assertIsNone(merge_pg_stats([None]))
+
+    def test_ratios(self):
+        delta = {
+            'xact_commit': 1000,
+            'xact_rollback': 3,
+            'blks_hit': 990,
+            'blks_read': 10,
+            'temp_bytes': 0,
+            'deadlocks': 0,
+            'checkpoints_timed': 1,
+            'checkpoints_req': 1,
+            'wal_bytes': 512000,
+        }
+        self.assertEqual(
+            get_pg_stats_ratios(delta, 500),
+            {
+                'cache_hit_ratio': 99.0,
+                'wal_bytes_per_xact': 1024.0,
+                'temp_bytes_per_xact': 0.0,
+                'checkpoints': 2,
+                'deadlocks': 0,
+                'rollbacks': 3,
+            },
+        )
+        # committed transactions without the pgbench count
+        self.assertEqual(
+            get_pg_stats_ratios(delta)['wal_bytes_per_xact'], 512.0
+        )
+        self.assertIsNone(get_pg_stats_ratios(None)['cache_hit_ratio'])
+
+    async def test_reset_statements(self):
+        db_conn = AsyncMock()
+        db_conn.fetchval.return_value = 'auto_explain'
+        self.assertFalse(await reset_pg_stat_statements(db_conn))
+        db_conn.execute.assert_not_called()
+
+        db_conn.fetchval.return_value = 'auto_explain,pg_stat_statements'
+        self.assertTrue(await reset_pg_stat_statements(db_conn))
+        self.assertEqual(db_conn.execute.await_count, 2)
+
+    async def test_top_statements(self):
+        db_conn = AsyncMock()
+        row = {
+            'queryid': 1,
+            'query': 'SELECT abalance\n  FROM pgbench_accounts',
+            'calls': 10,
+            'total_time': 5.12345,
+            'mean_time': 0.512345,
+            'stddev_time': 0.1,
+            'rows': 10,
+            'shared_blks_hit': 30,
+            'shared_blks_read': 2,
+        }
+        for version, column in (
+            ('120000', 'total_time'),
+            ('160000', 'total_exec_time'),
+        ):
+            db_conn.fetchval.return_value = version
+            db_conn.fetch.return_value = [row]
+            statements = await get_top_statements(
+                db_conn, 5, ['SELECT 1\n  FROM pg_locks']
+            )
+            self.assertIn(
+                f'ORDER BY {column} DESC', db_conn.fetch.call_args[0][0]
+            )
+            self.assertEqual(db_conn.fetch.call_args[0][1], 5)
+            # the sampler queries are compared without the whitespace
+            self.assertEqual(
+                db_conn.fetch.call_args[0][2], ['SELECT 1 FROM pg_locks']
+            )
+        self.assertEqual(
+            statements[0]['query'], 'SELECT abalance FROM pgbench_accounts'
+        )
+        self.assertEqual(statements[0]['total_time'], 5.123)
+
+    def test_merge_statements(self):
+        def statement(query, calls, mean_time):
+            return {
+                'query': query,
+                'calls': calls,
+                'total_time': calls * mean_time,
+                'mean_time': mean_time,
+            }
+
+        merged = merge_statements(
+            [
+                [statement('a', 10, 1.0), statement('b', 10, 0.5)],
+                [statement('a', 20, 2.0), statement('c', 1, 1.0)],
+                None,
+            ]
+        )
+        self.assertEqual([item['query'] for item in merged], ['a', 'b'])
+        self.assertEqual(merged[0]['calls'], 15.0)
+        self.assertEqual(merged[0]['mean_time'], 1.5)
+        # b did not run in the second repetition
+        self.assertEqual(merged[1]['total_time'], 2.5)
+        self.assertEqual(merged[1]['mean_time'], 0.5)
+        self.assertIsNone(merge_statements([None]))
+
+
+if __name__ == '__main__':
+    unittest.main()
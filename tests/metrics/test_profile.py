@@ -0,0 +1,73 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+from pg_perfbench.connections.local import LocalConnection
+from pg_perfbench.metrics import Profiler, StackFolder
+
+PERF_SCRIPT_OUTPUT = """#pids 101,102
+#method perf
+        postgres   101 [000]  1000.000001:   10101010 cycles:
+\t    55d5c1a2b3c4 hash_search_with_hash_value+0x34 (/usr/bin/postgres)
+\t    55d5c1a2b3c5 ReadBuffer_common+0x10 (/usr/bin/postgres)
+\t    55d5c1a2b3c6 main+0x1 (/usr/bin/postgres)
+
+        postgres   102 [001]  1000.000002:   10101010 cycles:
+\t    55d5c1a2b3c7 [unknown] ([unknown])
+\t    55d5c1a2b3c6 main+0x1 (/usr/bin/postgres)
+
+        postgres   101 [000]  1000.010001:   10101010 cycles:
+\t    55d5c1a2b3c4 hash_search_with_hash_value+0x34 (/usr/bin/postgres)
+\t    55d5c1a2b3c5 ReadBuffer_common+0x10 (/usr/bin/postgres)
+\t    55d5c1a2b3c6 main+0x1 (/usr/bin/postgres)
+"""
+
+
+class TestProfile(unittest.IsolatedAsyncioTestCase):
+    def test_fold_perf_script(self):
+        folder = StackFolder()
+        for line in PERF_SCRIPT_OUTPUT.splitlines():
+            folder.add_line(line)
+        self.assertEqual(folder.method, 'perf')
+        self.assertEqual(
+            folder.get_stacks(),
+            [
+                [
+                    'postgres;main;ReadBuffer_common;'
+                    'hash_search_with_hash_value',
+                    2,
+                ],
+                ['postgres;main;[unknown]', 1],
+            ],
+        )
+
+    def test_fold_proc_samples(self):
+        folder = StackFolder()
+        for line in [
+            '#pids 101',
+            '#method proc',
+            '#proc R 0',
+            '#proc S do_epoll_wait',
+            '#proc R 0',
+        ]:
+            folder.add_line(line)
+        self.assertEqual(
+            folder.get_stacks(),
+            [['postgres;running', 2], ['postgres;sleeping;do_epoll_wait', 1]],
+        )
+
+    @patch('pg_perfbench.metrics.profile.PROFILE_DELAY', 0)
+    async def test_profiler_without_backends(self):
+        # without a postmaster the run goes on without a profile
+        profiler = Profiler(
+            LocalConnection({}),
+            99,
+            '/nonexistent',
+            logging.getLogger('test_profile'),
+        )
+        await profiler.start()
+        self.assertIsNone(await profiler.stop())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from pg_perfbench.metrics import (
+    get_summary_stats,
+    t_critical_95,
+    mann_whitney_u,
+)
+
+
+class TestSummaryStats(unittest.TestCase):
+    def test_summary_stats(self):
+        stats = get_summary_stats([100.0, 110.0, 90.0, 100.0])
+        self.assertEqual(stats['n'], 4)
+        self.assertEqual(stats['mean'], 100.0)
+        self.assertAlmostEqual(stats['stddev'], 8.165, places=3)
+        self.assertAlmostEqual(stats['cv'], 0.0816, places=4)
+        # t(0.975, 3) = 3.182
+        self.assertAlmostEqual(stats['ci_low'], 87.01, places=3)
+        self.assertAlmostEqual(stats['ci_high'], 112.99, places=3)
+
+    def test_single_sample(self):
+        stats = get_summary_stats([5.0, None])
+        self.assertEqual(stats['n'], 1)
+        self.assertEqual(stats['mean'], 5.0)
+        self.assertIsNone(stats['stddev'])
+        self.assertIsNone(stats['ci_low'])
+
+    def test_no_samples(self):
+        self.assertIsNone(get_summary_stats([])['mean'])
+
+    def test_t_critical_95(self):
+        self.assertEqual(t_critical_95(1), 12.706)
+        self.assertEqual(t_critical_95(35), 2.042)
+        self.assertEqual(t_critical_95(1000), 1.96)
+        with self.assertRaises(ValueError):
+            t_critical_95(0)
+
+
+class TestMannWhitney(unittest.TestCase):
+    def test_exact(self):
+        # separated samples: 2 of the C(8, 4) orderings are as extreme
+        u, p_value = mann_whitney_u([5, 6, 7, 8], [1, 2, 3, 4])
+        self.assertEqual(u, 16.0)
+        self.assertAlmostEqual(p_value, 2 / 70)
+        u, p_value = mann_whitney_u([1, 3, 5], [2, 4, 6])
+        self.assertEqual(u, 3.0)
+        self.assertEqual(p_value, 0.7)
+
+    def test_ties(self):
+        # normal approximation with the tie and continuity corrections
+        u, p_value = mann_whitney_u([1, 2, 3, 4, 5], [3, 6, 7, 8, 9])
+        self.assertEqual(u, 2.5)
+        self.assertAlmostEqual(p_value, 0.0465, places=4)
+        self.assertEqual(mann_whitney_u([2, 2], [2, 2]), (2.0, 1.0))
+
+    def test_no_samples(self):
+        self.assertIsNone(mann_whitney_u([None], [1.0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from pg_perfbench.metrics import SteadyStateDetector
+
+
+def feed(detector, samples):
+    for time, tps in enumerate(samples, start=1):
+        if detector.add_sample(float(time), tps, 1000 / tps):
+            return time
+    return None
+
+
+class TestSteadyStateDetector(unittest.TestCase):
+    def test_steady_after_warm_up(self):
+        detector = SteadyStateDetector(window=5, max_cv=2)
+        # tps climbs while the cache warms up, then settles around 1000
+        stopped = feed(
+            detector,
+            [200, 500, 800, 950, 990, 1000, 1010, 995, 1005, 1000, 1000],
+        )
+        self.assertEqual(stopped, 9)
+        summary = detector.get_summary(duration=60)
+        self.assertTrue(summary['steady'])
+        self.assertEqual(summary['window_start'], 4.0)
+        self.assertEqual(summary['window_end'], 9.0)
+        self.assertEqual(summary['tps'], 1000.0)
+        self.assertLessEqual(summary['cv'], 2)
+        self.assertEqual(summary['time_saved'], 51.0)
+
+    def test_min_time(self):
+        detector = SteadyStateDetector(window=2, max_cv=5, min_time=6)
+        self.assertEqual(feed(detector, [100] * 10), 6)
+
+    def test_never_steady(self):
+        detector = SteadyStateDetector(window=3, max_cv=1)
+        self.assertIsNone(feed(detector, [100, 200] * 5))
+        summary = detector.get_summary(duration=10)
+        self.assertFalse(summary['steady'])
+        self.assertEqual(summary['time_saved'], 0)
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            SteadyStateDetector(window=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import unittest
+from unittest.mock import AsyncMock
+
+from pg_perfbench.metrics import (
+    SAMPLER_APPLICATION_NAME,
+    WaitEventSampler,
+    merge_wait_events,
+    get_active_sessions,
+)
+
+
+def get_db_conn():
+    db_conn = AsyncMock()
+    db_conn.fetch.return_value = [
+        {'wait_event_type': 'LWLock', 'wait_event': 'WALWrite', 'sessions': 3},
+        {'wait_event_type': 'CPU', 'wait_event': 'CPU', 'sessions': 1},
+    ]
+    return db_conn
+
+
+class TestWaitEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_sampler(self):
+        db_conn = get_db_conn()
+        sampler = WaitEventSampler(
+            AsyncMock(return_value=db_conn),
+            0.01,
+            logging.getLogger('test_wait_events'),
+        )
+        await sampler.start()
+        await asyncio.sleep(0.1)
+        summary = await sampler.stop()
+
+        # the sampling connections are excluded by their application_name
+        self.assertEqual(
+            db_conn.fetch.call_args[0][1], SAMPLER_APPLICATION_NAME
+        )
+        db_conn.close.assert_awaited_once()
+        samples = summary['samples']
+        self.assertGreater(samples, 1)
+        self.assertEqual(
+            summary['events'],
+            [['LWLock', 'WALWrite', 3 * samples], ['CPU', 'CPU', samples]],
+        )
+        self.assertEqual(
+            get_active_sessions(summary),
+            {'LWLock:WALWrite': 3.0, 'CPU:CPU': 1.0},
+        )
+        self.assertGreaterEqual(summary['overhead']['query_ms'], 0)
+        self.assertGreaterEqual(summary['overhead']['busy'], 0)
+
+    async def test_sampler_connection_failure(self):
+        sampler = WaitEventSampler(
+            AsyncMock(side_effect=OSError('refused')),
+            0.01,
+            logging.getLogger('test_wait_events'),
+        )
+        await sampler.start()
+        self.assertIsNone(await sampler.stop())
+
+    def test_merge(self):
+        overhead = {'query_ms': 1.0, 'busy': 2.0}
+        merged = merge_wait_events(
+            [
+                {
+                    'events': [['IO', 'DataFileRead', 4]],
+                    'samples': 2,
+                    'interval': 0.1,
+                    'overhead': overhead,
+                },
+                {
+                    'events': [['IO', 'DataFileRead', 2], ['CPU', 'CPU', 6]],
+                    'samples': 2,
+                    'interval': 0.1,
+                    'overhead': {'query_ms': 3.0, 'busy': 4.0},
+                },
+                None,
+            ]
+        )
+        self.assertEqual(
+            merged['events'],
+            [['IO', 'DataFileRead', 6], ['CPU', 'CPU', 6]],
+        )
+        self.assertEqual(merged['samples'], 4)
+        self.assertEqual(merged['overhead'], {'query_ms': 2.0, 'busy': 3.0})
+        self.assertEqual(
+            get_active_sessions(merged),
+            {'IO:DataFileRead': 1.5, 'CPU:CPU': 1.5},
+        )
+        self.assertIsNone(merge_wait_events([None]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pg_perfbench.multi_target import MultiTargetRunner
+from pg_perfbench.run import get_args_parser
+
+
+def get_base_args(*options):
+    return get_args_parser().parse_args(
+        [
+            '--mode=benchmark',
+            '--connection-type=local',
+            '--pg-host=127.0.0.1',
+            '--pg-port=5432',
+            '--pg-user=postgres',
+            '--pg-database=tdb',
+            '--pg-data-path=/var/lib/postgresql/data',
+            '--pg-bin-path=/usr/lib/postgresql/bin',
+            '--benchmark-type=default',
+            '--psql-path=psql',
+            '--pgbench-path=pgbench',
+            '--init-command=init_cmd',
+            '--workload-command=work_cmd -c ARG_PGBENCH_CLIENTS',
+            '--pgbench-clients=1,10',
+            '--report-name=cmp',
+            *options,
+        ]
+    )
+
+
+def get_report(name, tps):
+    return {
+        'report_name': name,
+        'sections': {
+            'result': {
+                'reports': {
+                    'chart': {'data': {'series': [{'data': [tps]}]}},
+                    'pgbench_outputs': {'data': [[tps]]},
+                }
+            }
+        },
+    }
+
+
+class TestMultiTargetRunner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.logger = MagicMock()
+        self.parser = get_args_parser()
+
+    def write_targets(self, targets):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(targets, f)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_get_target_args(self):
+        base_args = get_base_args()
+        args = MultiTargetRunner.get_target_args(
+            self.parser,
+            base_args,
+            {'pg-port': 5433, 'pgbench_clients': [2, 4], 'cpus': [0]},
+            1,
+        )
+        self.assertEqual(args.pg_port, '5433')
+        self.assertEqual(args.pgbench_clients, [2, 4])
+        self.assertEqual(args.pg_host, '127.0.0.1')
+        self.assertEqual(args.report_name, 'cmp-target-1')
+        # the common arguments are not modified
+        self.assertEqual(base_args.pg_port, '5432')
+        self.assertEqual(base_args.pgbench_clients, [1, 10])
+
+        args = MultiTargetRunner.get_target_args(
+            self.parser, base_args, {'report_name': 'pg17'}, 2
+        )
+        self.assertEqual(args.report_name, 'pg17')
+
+        with self.assertRaises(ValueError), patch('sys.stderr'):
+            MultiTargetRunner.get_target_args(
+                self.parser, base_args, {'no-such-option': 1}, 3
+            )
+
+    def test_get_cpu_partitions(self):
+        self.assertEqual(
+            MultiTargetRunner.get_cpu_partitions(3, list(range(8))),
+            [[0, 1, 2], [3, 4, 5], [6, 7]],
+        )
+        self.assertEqual(
+            MultiTargetRunner.get_cpu_partitions(1, [2, 3]), [[2, 3]]
+        )
+        with self.assertRaises(ValueError):
+            MultiTargetRunner.get_cpu_partitions(3, [0, 1])
+
+    def test_load_targets_invalid(self):
+        with self.assertRaises(ValueError):
+            MultiTargetRunner.load_targets(self.write_targets({'pg-port': 1}))
+        with self.assertRaises(ValueError):
+            MultiTargetRunner.load_targets(self.write_targets([]))
+
+    async def test_run_targets(self):
+        targets = [
+            {'pg-port': 5414, 'report-name': 'pg14'},
+            {'pg-port': 5415, 'report-name': 'pg15', 'cpus': [1]},
+            {'pg-port': 5416, 'report-name': 'pg16'},
+        ]
+        args = get_base_args(
+            f'--targets={self.write_targets(targets)}',
+            '--max-concurrent-targets=2',
+        )
+        running = []
+        max_running = []
+
+        async def run_benchmark(**params):
+            running.append(params['db_conf']['port'])
+            max_running.append(len(running))
+            # let the other targets start while this one is running
+            for _ in range(3):
+                await asyncio.sleep(0)
+            running.remove(params['db_conf']['port'])
+            if params['db_conf']['port'] == '5416':
+                return None
+            return get_report(
+                params['report_conf']['report_name'],
+                int(params['db_conf']['port']),
+            )
+
+        with patch(
+            'pg_perfbench.multi_target.BenchmarkRunner.'
+            'run_benchmark_and_collect_metrics',
+            side_effect=run_benchmark,
+        ) as run_mock, patch(
+            'pg_perfbench.multi_target.save_report'
+        ) as save_mock, patch(
+            'pg_perfbench.multi_target.ResultStore.store_report'
+        ) as store_mock:
+            joined = await MultiTargetRunner.run_targets(
+                self.parser, args, self.logger
+            )
+
+        self.assertEqual(run_mock.call_count, 3)
+        self.assertEqual(max(max_running), 2)
+        cpu_sets = [
+            call.kwargs['workload_conf']['cpu_set']
+            for call in run_mock.call_args_list
+        ]
+        self.assertEqual(cpu_sets, [None, [1], None])
+        # the failed target is left out of the comparison
+        self.assertEqual(
+            [call.args[1]['report_name'] for call in save_mock.call_args_list],
+            ['pg14', 'pg15'],
+        )
+        self.assertEqual(
+            [
+                call.args[2]['report_name']
+                for call in store_mock.call_args_list
+            ],
+            ['pg14', 'pg15'],
+        )
+        self.assertEqual(joined['report_name'], 'cmp-join')
+        series = joined['sections']['result']['reports']['chart']['data'][
+            'series'
+        ]
+        self.assertEqual([item['name'] for item in series], ['pg14', 'pg15'])
+
+
+if __name__ == '__main__':
+    unittest.main()
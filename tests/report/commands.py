@@ -4,9 +4,26 @@ import os
 from unittest.mock import patch
 from unittest import IsolatedAsyncioTestCase
 from pg_perfbench.report.commands import (
+    benchmark_result,
+    cache_state,
+    chart_os,
+    chart_pg_settings,
+    chart_progress,
+    chart_sweep,
+    chart_wait_events,
     get_script_text,
+    lock_contention,
+    pgbench_options_table,
+    pg_settings_results,
+    pg_statements,
+    profile,
+    rate_results,
     run_shell_command,
     run_sql_command,
+    steady_state,
+    tuning_summary,
+    tuning_trials,
+    workload_parse,
 )
 
 
@@ -53,6 +70,48 @@ class TestReportCommands(IsolatedAsyncioTestCase):
         with self.assertRaises(FileNotFoundError):
             get_script_text('/no/such/path.sh')
 
+    def test_workload_parse_native(self) -> None:
+        """Check the workload section of the native benchmark type."""
+        sql_path = os.path.join(self.temp_dir, 'select.sql')
+        with open(sql_path, 'w', encoding='utf-8') as f:
+            f.write('SELECT 1;\n')
+        report_data = {
+            'workload_conf': {
+                'benchmark_type': 'native',
+                'init_command': 'pgbench -i -s 1',
+                'workload_command': '-c ARG_PGBENCH_CLIENTS -j 2 -T 10 '
+                '-b select-only@3 -f ARG_WORKLOAD_PATH/select.sql',
+                'workload_path': self.temp_dir,
+            },
+            'load_iterations': [
+                [
+                    'pgbench -i -s 1',
+                    f'-c {clients} -j 2 -T 10 -b select-only@3 '
+                    f'-f {sql_path}',
+                ]
+                for clients in (4, 8)
+            ],
+        }
+        item = {}
+        workload_parse(report_data, item)
+        self.assertIn(
+            'iteration 2: clients 8, jobs 2, duration 10 s', item['data']
+        )
+        self.assertIn('builtin select-only@3 :', item['data'])
+        self.assertIn('SELECT abalance FROM pgbench_accounts', item['data'])
+        self.assertIn(f'{sql_path} :\nSELECT 1;', item['data'])
+        self.assertNotIn('Unknown', item['data'])
+
+        # without the commands of the run the placeholders stay unparsed
+        del report_data['load_iterations']
+        item = {}
+        workload_parse(report_data, item)
+        self.assertIn('iteration 1: Invalid native workload', item['data'])
+
+        item = {}
+        workload_parse(report_data, item, phase='init')
+        self.assertEqual(item['data'], 'pgbench -i -s 1')
+
     async def test_run_shell_command_plain_text(self) -> None:
         """Check that run_shell_command processes a 'plain_text' item_type successfully."""
 
@@ -99,3 +158,608 @@ class TestReportCommands(IsolatedAsyncioTestCase):
             item,
             "Expected no 'data' key in item due to missing 'sql_command_file'",
         )
+
+    def test_chart_progress(self) -> None:
+        """Check that chart_progress charts each iteration with progress data."""
+        report_data = {
+            'report_conf': {'report_name': 'report'},
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {'iteration': 1, 'progress': [[1.0, 10.0, 1.0, 0.1, None]]},
+                {'iteration': 2, 'progress': []},
+            ],
+        }
+        item = {'data': {'title': {'align': 'left'}}}
+        chart_progress(report_data, item)
+        self.assertEqual(len(item['data']), 1)
+        self.assertEqual(
+            item['data'][0]['title']['text'],
+            'tps over time, iteration 1 (clients=1)',
+        )
+        self.assertEqual(item['data'][0]['series'][0]['data'], [[1.0, 10.0]])
+
+        report_data['iterations'] = [{'iteration': 1, 'progress': []}]
+        item = {'data': {}}
+        chart_progress(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_chart_os(self) -> None:
+        """Check that chart_os plots the OS metrics of every sampled run against tps."""
+        fields = ['time', 'cpu_user', 'cpu_system', 'cpu_iowait']
+        fields += ['disk_read_mb', 'disk_write_mb']
+        report_data = {
+            'report_conf': {'report_name': 'report'},
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {
+                    'iteration': 1,
+                    'progress': [[1.0, 10.0, 1.0, 0.1, None]],
+                    'os_stats': {
+                        'fields': fields,
+                        'samples': [[1.0, 20.0, 5.5, 1.0, 0.5, 2.0]],
+                    },
+                },
+                {'iteration': 2, 'os_stats': None},
+            ],
+        }
+        item = {'data': {'title': {'align': 'left'}}}
+        chart_os(report_data, item)
+        self.assertEqual(len(item['data']), 1)
+        chart = item['data'][0]
+        self.assertEqual(
+            chart['title']['text'],
+            'database host OS metrics, iteration 1 (clients=1)',
+        )
+        series = {serie['name']: serie['data'] for serie in chart['series']}
+        self.assertEqual(series['cpu busy, %'], [[1.0, 25.5]])
+        self.assertEqual(series['cpu iowait, %'], [[1.0, 1.0]])
+        self.assertEqual(series['disk write, MB/s'], [[1.0, 2.0]])
+        self.assertEqual(series['report,tps'], [[1.0, 10.0]])
+        self.assertEqual(len(chart['yaxis']), len(chart['series']))
+
+        report_data['iterations'] = [{'iteration': 1, 'os_stats': None}]
+        item = {'data': {}}
+        chart_os(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_pg_statements(self) -> None:
+        """Check that pg_statements builds a top statements table per iteration."""
+        statement = {
+            'queryid': 1,
+            'query': 'SELECT 1 WHERE 1 < 2',
+            'calls': 10,
+            'total_time': 5.0,
+            'mean_time': 0.5,
+            'stddev_time': 0.1,
+            'rows': 10,
+            'shared_blks_hit': 3,
+            'shared_blks_read': 0,
+        }
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {'iteration': 1, 'statements': [statement]},
+                {'iteration': 2, 'statements': None},
+            ],
+        }
+        item = {'data': []}
+        pg_statements(report_data, item)
+        self.assertEqual(item['theader'][0], 'query')
+        self.assertEqual(
+            item['data'],
+            [
+                [
+                    'iteration 1 (clients=1)',
+                    [['SELECT 1 WHERE 1 &lt; 2', 10, 5.0, 0.5, 0.1, 10, 3, 0]],
+                ]
+            ],
+        )
+
+        report_data['iterations'] = [{'iteration': 1, 'statements': []}]
+        item = {'data': []}
+        pg_statements(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_chart_wait_events(self) -> None:
+        """Check that chart_wait_events stacks the sessions by wait event."""
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {
+                    'iteration': 1,
+                    'wait_events': {
+                        'events': [['CPU', 'CPU', 4]],
+                        'samples': 4,
+                    },
+                },
+                {
+                    'iteration': 2,
+                    'wait_events': {
+                        'events': [['Lock', 'tuple', 6], ['CPU', 'CPU', 2]],
+                        'samples': 2,
+                    },
+                },
+            ],
+        }
+        item = {'data': {'xaxis': {'type': 'category'}}}
+        with patch('pg_perfbench.report.commands.WAIT_EVENTS_CHART_LIMIT', 1):
+            chart_wait_events(report_data, item)
+        self.assertEqual(
+            item['data']['xaxis']['categories'],
+            ['iteration 1 (clients=1)', 'iteration 2 (clients=2)'],
+        )
+        self.assertEqual(item['data']['xaxis']['type'], 'category')
+        self.assertEqual(
+            item['data']['series'],
+            [
+                {'name': 'Lock:tuple', 'data': [0, 3.0]},
+                {'name': 'other', 'data': [1.0, 1.0]},
+            ],
+        )
+
+        report_data['iterations'] = [{'iteration': 1, 'wait_events': None}]
+        item = {'data': {}}
+        chart_wait_events(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_lock_contention(self) -> None:
+        """Check that lock_contention lists the blocking chains next to tps."""
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {'iteration': 1, 'result': [1, 10, 100, 1.0, 2.0, 100.0]},
+                {
+                    'iteration': 2,
+                    'result': [2, 10, 120, 1.5, 2.0, 120.0],
+                    'locks': {
+                        'locks': [['pgbench_branches', 'ShareLock', 1.5, 2]],
+                        'blocked_time': 1.5,
+                        'max_blocked': 2,
+                        'max_depth': 2,
+                        'samples': 100,
+                        'overhead': {'query_ms': 0.5, 'busy': 5.0},
+                    },
+                },
+            ],
+        }
+        item = {'data': []}
+        lock_contention(report_data, item)
+        self.assertEqual(
+            item['data'],
+            [
+                [
+                    'iteration 2 (clients=2)',
+                    120.0,
+                    1.5,
+                    2,
+                    2,
+                    'pgbench_branches ShareLock 1.5 (max 2 blocked)',
+                    100,
+                    0.5,
+                ]
+            ],
+        )
+
+        report_data['iterations'].pop()
+        item = {'data': []}
+        lock_contention(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_profile(self) -> None:
+        """Check that profile renders a flame graph of every profiled run."""
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'clients',
+                'pgbench_iter_list': [1, 2],
+            },
+            'iterations': [
+                {'iteration': 1, 'profile': None},
+                {
+                    'iteration': 2,
+                    'profile': {
+                        'method': 'perf',
+                        'frequency': 99,
+                        'samples': 3,
+                        'stacks': [
+                            ['postgres;main;hash_search<int>', 2],
+                            ['postgres;main;ExecScan', 1],
+                        ],
+                    },
+                },
+            ],
+        }
+        item = {'data': []}
+        profile(report_data, item)
+        self.assertEqual(len(item['data']), 1)
+        label, svg = item['data'][0]
+        self.assertEqual(
+            label,
+            'iteration 2 (clients=2), perf record -g at 99 Hz, 3 samples',
+        )
+        self.assertTrue(svg.startswith('<svg'))
+        self.assertIn('hash_search&lt;int&gt; (2 samples, 66.67%)', svg)
+        self.assertIn('ExecScan (1 samples, 33.33%)', svg)
+
+        report_data['iterations'].pop()
+        item = {'data': []}
+        profile(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_chart_sweep(self) -> None:
+        """Check that chart_sweep builds one chart per slice and a series per value."""
+        sweep = {
+            'pgbench_scale': [10, 100],
+            'pgbench_clients': [1, 2],
+            'pgbench_jobs': [1, 2],
+        }
+        iterations = []
+        for scale in sweep['pgbench_scale']:
+            for clients in sweep['pgbench_clients']:
+                for jobs in sweep['pgbench_jobs']:
+                    iterations.append(
+                        {
+                            'params': {
+                                'pgbench_scale': scale,
+                                'pgbench_clients': clients,
+                                'pgbench_jobs': jobs,
+                            },
+                            'result': [
+                                clients,
+                                10,
+                                100,
+                                1.0,
+                                1.0,
+                                clients * jobs,
+                            ],
+                        }
+                    )
+        report_data = {
+            'report_conf': {'report_name': 'report'},
+            'workload_conf': {'pgbench_sweep': sweep},
+            'iterations': iterations,
+        }
+        item = {'data': {'title': {'align': 'left'}}}
+        chart_sweep(report_data, item)
+        self.assertEqual(len(item['data']), 2)
+        self.assertEqual(
+            item['data'][1]['title']['text'], 'tps(clients), scale=100'
+        )
+        self.assertEqual(
+            item['data'][0]['series'],
+            [
+                {'name': 'report,jobs=1', 'data': [[1, 1], [2, 2]]},
+                {'name': 'report,jobs=2', 'data': [[1, 2], [2, 4]]},
+            ],
+        )
+
+        report_data['workload_conf'] = {'pgbench_sweep': {'pgbench_time': [1]}}
+        item = {'data': {}}
+        chart_sweep(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_rate_results(self) -> None:
+        """Check that rate_results compares the achieved and target rate."""
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'pgbench_rate',
+                'pgbench_iter_list': [100, 200],
+            },
+            'iterations': [
+                {
+                    'iteration': idx,
+                    'result': [4, 10, tps * 10, 2.0, 1.0, tps],
+                    'latency': None,
+                    'rate': {
+                        'target_rate': target,
+                        'lag_avg': 0.5,
+                        'lag_max': 3.0,
+                        'skipped': skipped,
+                        'late': 0,
+                    },
+                }
+                for idx, target, tps, skipped in (
+                    (1, 100, 100.0, 0),
+                    (2, 200, 150.0, 400),
+                )
+            ],
+        }
+        item = {}
+        rate_results(report_data, item)
+        self.assertEqual(
+            item['data'][1][:8],
+            [
+                'iteration 2 (pgbench_rate=200)',
+                200,
+                150.0,
+                75.0,
+                0.5,
+                3.0,
+                400,
+                0,
+            ],
+        )
+
+        item = {}
+        rate_results({'iterations': [{'iteration': 1, 'rate': None}]}, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_steady_state(self) -> None:
+        """Check that steady_state lists the measured windows and savings."""
+        window = {
+            'steady': True,
+            'window_start': 40.0,
+            'window_end': 50.0,
+            'tps': 1000.0,
+            'latency_avg': 4.0,
+            'cv': 1.2,
+            'stopped_at': 50.0,
+            'time_saved': 250.0,
+        }
+        report_data = {
+            'workload_conf': {
+                'pgbench_iter_name': 'pgbench_clients',
+                'pgbench_iter_list': [4, 8],
+            },
+            'runs': [
+                {'iteration': 1, 'repetition': 1, 'steady_state': window},
+                {
+                    'iteration': 2,
+                    'repetition': 1,
+                    'steady_state': {'steady': False, 'time_saved': 0},
+                },
+            ],
+        }
+        item = {}
+        steady_state(report_data, item)
+        self.assertEqual(item['data'][0][2:5], ['yes', '40.0-50.0', 1000.0])
+        self.assertEqual(item['data'][1][2:4], ['no', 'full run'])
+        self.assertEqual(item['data'][2][0], 'total')
+        self.assertEqual(item['data'][2][-1], 250.0)
+
+        item = {}
+        steady_state({'runs': [{'iteration': 1}]}, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_benchmark_result_pg_stats(self) -> None:
+        """Check that benchmark_result adds the server statistics ratios."""
+        result = [4, 10, 1000, 2.0, 1.0, 100.0]
+        report_data = {
+            'pgbench_outputs': [result],
+            'iterations': [
+                {
+                    'iteration': 1,
+                    'result': result,
+                    'latency': None,
+                    'pg_stats': {
+                        'xact_commit': 1002,
+                        'blks_hit': 75,
+                        'blks_read': 25,
+                        'wal_bytes': 8192000,
+                    },
+                }
+            ],
+        }
+        item = {}
+        benchmark_result(report_data, item)
+        self.assertEqual(
+            item['theader'][6:8], ['cache hit, %', 'WAL bytes per transaction']
+        )
+        self.assertEqual(item['data'][0][:8], result + [75.0, 8192.0])
+
+    def test_benchmark_result_client(self) -> None:
+        """Check that benchmark_result adds the client CPU use."""
+        result = [4, 10, 1000, 2.0, 1.0, 100.0]
+        report_data = {
+            'pgbench_outputs': [result, result],
+            'iterations': [
+                {
+                    'iteration': 1,
+                    'result': result,
+                    'client': {
+                        'cpu_per_xact_us': 9500.0,
+                        'utilization': 95.0,
+                        'saturated': True,
+                    },
+                },
+                {'iteration': 2, 'result': result, 'client': None},
+            ],
+        }
+        item = {}
+        benchmark_result(report_data, item)
+        self.assertEqual(item['theader'][6], 'client CPU per transaction, µs')
+        self.assertEqual(item['data'][0][6:], [9500.0, 95.0, 'yes'])
+        self.assertEqual(item['data'][1][6:], [None, None, None])
+
+    def test_cache_state(self) -> None:
+        """Check the cache state table, hidden for cold runs only."""
+        cold = {
+            'mode': 'cold',
+            'warmup_time': None,
+            'prime_time': None,
+            'relations': None,
+            'blocks': None,
+            'hit_ratio': 62.5,
+        }
+        report_data = {'runs': [{'iteration': 1, 'cache': cold}]}
+        item = {}
+        cache_state(report_data, item)
+        self.assertEqual(item['state'], 'hidden')
+
+        primed = {
+            **cold,
+            'mode': 'primed',
+            'prime_time': 1.25,
+            'relations': 4,
+            'blocks': 3400,
+            'hit_ratio': 99.9,
+        }
+        report_data = {
+            'runs': [
+                {'iteration': 1, 'repetition': 1, 'cache': primed},
+                {'iteration': 1, 'repetition': 2, 'cache': primed},
+            ]
+        }
+        item = {}
+        cache_state(report_data, item)
+        self.assertNotIn('state', item)
+        self.assertEqual(item['theader'][2], 'cache mode')
+        self.assertEqual(
+            item['data'][1],
+            ['iteration 1', 2, 'primed', None, 1.25, 4, 3400, 99.9],
+        )
+
+    def test_pgbench_options_sweep(self) -> None:
+        """Check the commands table of a 2-D sweep."""
+        sweep_points = [
+            {'pgbench_clients': clients, 'pgbench_jobs': jobs}
+            for clients in (1, 8)
+            for jobs in (1, 2)
+        ]
+        report_data = {
+            'workload_conf': {
+                'workload_command': 'pgbench -c ARG_PGBENCH_CLIENTS '
+                '-j ARG_PGBENCH_JOBS -T 10',
+                'pgbench_sweep': {
+                    'pgbench_clients': [1, 8],
+                    'pgbench_jobs': [1, 2],
+                },
+            },
+            'sweep_points': sweep_points,
+            'load_iterations': [
+                [
+                    'pgbench -i',
+                    f'pgbench -c {point["pgbench_clients"]} '
+                    f'-j {point["pgbench_jobs"]} -T 10',
+                ]
+                for point in sweep_points
+            ],
+        }
+        item = {}
+        pgbench_options_table(report_data, item)
+        self.assertEqual(
+            item['theader'],
+            ['iteration number', 'sweep point', 'pgbench_options'],
+        )
+        self.assertEqual(len(item['data']), 4)
+        self.assertEqual(
+            item['data'][3],
+            [3, 'clients=8, jobs=2', 'pgbench -c 8 -j 2 -T 10'],
+        )
+
+        # a single swept parameter keeps the two columns
+        report_data['sweep_points'] = [{'pgbench_clients': 1}]
+        report_data['load_iterations'] = [['pgbench -i', 'pgbench -c 1']]
+        item = {}
+        pgbench_options_table(report_data, item)
+        self.assertEqual(item['data'], [[0, 'pgbench -c 1']])
+
+    def test_pg_settings_sweep(self) -> None:
+        """Check the table and charts of a PostgreSQL settings sweep."""
+        iterations = [
+            {
+                'iteration': idx,
+                'params': {
+                    'pgbench_clients': clients,
+                    'shared_buffers': value,
+                },
+                'result': [clients, 10, 1000, latency, 1.0, tps],
+                'settings': {'shared_buffers': value},
+            }
+            for idx, (clients, value, latency, tps) in enumerate(
+                [
+                    (8, '128MB', 4.0, 2000.0),
+                    (8, '1GB', 2.0, 4000.0),
+                    (16, '128MB', 8.0, 2000.0),
+                    (16, '1GB', 4.0, 4000.0),
+                ],
+                start=1,
+            )
+        ]
+        report_data = {
+            'report_conf': {'report_name': 'report'},
+            'workload_conf': {
+                'pgbench_sweep': {'pgbench_clients': [8, 16]},
+                'pg_settings_sweep': {'shared_buffers': ['128MB', '1GB']},
+            },
+            'iterations': iterations,
+        }
+        item = {}
+        pg_settings_results(report_data, item)
+        self.assertEqual(
+            item['theader'][:4],
+            ['iteration', 'clients', 'shared_buffers', 'effective settings'],
+        )
+        self.assertEqual(
+            item['data'][1],
+            [2, 8, '1GB', 'shared_buffers=1GB', 4000.0, 2.0, None],
+        )
+
+        item = {'data': {'xaxis': {'type': 'category'}}}
+        chart_pg_settings(report_data, item)
+        self.assertEqual(len(item['data']), 2)
+        chart = item['data'][1]
+        self.assertEqual(
+            chart['title']['text'], 'tps, latency(shared_buffers), clients=16'
+        )
+        self.assertEqual(chart['xaxis']['categories'], ['128MB', '1GB'])
+        self.assertEqual(chart['series'][0]['data'], [2000.0, 4000.0])
+        self.assertEqual(chart['series'][1]['data'], [8.0, 4.0])
+
+        item = {}
+        pg_settings_results({'iterations': iterations}, item)
+        self.assertEqual(item['state'], 'hidden')
+
+    def test_tuning(self) -> None:
+        """Check the summary and trial table of the settings tuning."""
+        tuning = {
+            'settings': ['shared_buffers'],
+            'latency_limit': 10.0,
+            'budget': 5,
+            'space_size': 3,
+            'candidates': 3,
+            'best': {'shared_buffers': '1GB'},
+            'best_tps': 2000.0,
+            'best_latency_p99': 5.0,
+            'trials': [
+                [1, 0, '128MB', 1000.0, 12.0, False],
+                [2, 0, '1GB', 2000.0, 5.0, True],
+            ],
+        }
+        item = {}
+        tuning_summary({'tuning': tuning}, item)
+        self.assertIn("shared_buffers = '1GB'", item['data'])
+        self.assertIn('3 sampled of 3, 2 of 5 runs', item['data'])
+
+        item = {}
+        tuning_trials({'tuning': tuning}, item)
+        self.assertEqual(
+            item['theader'],
+            [
+                'trial',
+                'rung',
+                'shared_buffers',
+                'tps',
+                'latency p99, ms',
+                'within limit',
+            ],
+        )
+        self.assertEqual(item['data'][0], [1, 0, '128MB', 1000.0, 12.0, 'no'])
+
+        item = {}
+        tuning_trials({}, item)
+        self.assertEqual(item['state'], 'hidden')
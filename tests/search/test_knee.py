@@ -0,0 +1,52 @@
+import unittest
+
+from pg_perfbench.search import KneeSearch
+
+
+def saturating_server(clients):
+    # tps grows linearly up to 48 clients, flat up to 96, collapses after
+    tps = 100.0 * min(clients, 48) if clients <= 96 else 4800.0 * 96 / clients
+    latency = clients / tps * 1000
+    return tps, latency
+
+
+class TestKneeSearch(unittest.TestCase):
+    def run_search(self, search, model):
+        while (clients := search.next_clients()) is not None:
+            search.add_result(clients, *model(clients))
+        return search.get_summary()
+
+    def test_finds_peak_and_latency_knee(self):
+        summary = self.run_search(KneeSearch(), saturating_server)
+        self.assertEqual(summary['peak_clients'], 48)
+        self.assertEqual(summary['peak_tps'], 4800.0)
+        self.assertEqual(summary['latency_limit'], 20.0)
+        self.assertEqual(summary['knee_clients'], 96)
+        self.assertGreater(summary['blowup_clients'], 96)
+        # doubling first, bisection after the blow-up is seen
+        phases = [step[1] for step in summary['steps']]
+        self.assertEqual(phases[:8], ['doubling'] * 8)
+        self.assertEqual(set(phases[8:]), {'bisection'})
+        self.assertLessEqual(len(summary['steps']), 20)
+
+    def test_max_points(self):
+        summary = self.run_search(KneeSearch(max_points=5), saturating_server)
+        self.assertEqual(len(summary['steps']), 5)
+
+    def test_no_blowup_within_max_clients(self):
+        summary = self.run_search(
+            KneeSearch(min_clients=2, max_clients=16), saturating_server
+        )
+        self.assertEqual(summary['peak_clients'], 16)
+        self.assertIsNone(summary['blowup_clients'])
+        self.assertEqual(summary['knee_clients'], 16)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            KneeSearch(min_clients=10, max_clients=5)
+        with self.assertRaises(ValueError):
+            KneeSearch(latency_factor=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from pg_perfbench.search import SettingsTuner, get_tuned_config
+from pg_perfbench.search.tuner import get_halving_cost
+
+SPACE = {
+    'shared_buffers': ['128MB', '1GB', '4GB'],
+    'max_wal_size': ['1GB', '8GB'],
+    'checkpoint_completion_target': ['0.5', '0.9'],
+}
+
+
+def tuned_server(config):
+    # more memory helps, the largest WAL blows the p99 latency up
+    tps = {'128MB': 1000.0, '1GB': 2000.0, '4GB': 3000.0}[
+        config['shared_buffers']
+    ]
+    if config['checkpoint_completion_target'] == '0.9':
+        tps += 100.0
+    p99 = 12.0 if config['max_wal_size'] == '8GB' else 8.0
+    return tps, p99
+
+
+class TestSettingsTuner(unittest.TestCase):
+    def run_search(self, tuner, model):
+        while (config := tuner.next_config()) is not None:
+            tuner.add_result(config, *model(config))
+        return tuner.get_summary()
+
+    def test_halving_cost(self):
+        self.assertEqual(get_halving_cost(2), 2)
+        # 8 runs, one more run of the best 4, two more of the best 2
+        self.assertEqual(get_halving_cost(8), 16)
+
+    def test_finds_best_within_latency_limit(self):
+        tuner = SettingsTuner(SPACE, 10.0, budget=100, seed=1)
+        # the budget covers the whole space of 12 configurations
+        self.assertEqual(len(tuner.configs), 12)
+        summary = self.run_search(tuner, tuned_server)
+        self.assertEqual(
+            summary['best'],
+            {
+                'shared_buffers': '4GB',
+                'max_wal_size': '1GB',
+                'checkpoint_completion_target': '0.9',
+            },
+        )
+        self.assertEqual(summary['best_tps'], 3100.0)
+        self.assertEqual(summary['best_latency_p99'], 8.0)
+        rungs = [trial[1] for trial in summary['trials']]
+        self.assertEqual(rungs[:12], [0] * 12)
+        # 12, 6, 3 and the last 2 configurations
+        self.assertEqual(max(rungs), 3)
+        self.assertEqual(
+            get_tuned_config(summary).splitlines()[1:],
+            [
+                "shared_buffers = '4GB'",
+                "max_wal_size = '1GB'",
+                "checkpoint_completion_target = '0.9'",
+            ],
+        )
+
+    def test_budget(self):
+        summary = self.run_search(
+            SettingsTuner(SPACE, 10.0, budget=12, seed=1), tuned_server
+        )
+        # 5 runs, one more of the best 3, two more of the best 2
+        self.assertEqual(summary['candidates'], 5)
+        self.assertEqual(len(summary['trials']), 12)
+        # the same seed samples the same configurations
+        self.assertEqual(
+            SettingsTuner(SPACE, 10.0, budget=10, seed=1).configs,
+            SettingsTuner(SPACE, 10.0, budget=10, seed=1).configs,
+        )
+
+    def test_no_configuration_within_limit(self):
+        summary = self.run_search(
+            SettingsTuner(SPACE, 5.0, budget=6), tuned_server
+        )
+        self.assertIsNone(summary['best'])
+        self.assertEqual(get_tuned_config(summary), '')
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            SettingsTuner({}, 10.0)
+        with self.assertRaises(ValueError):
+            SettingsTuner(SPACE, 0)
+        with self.assertRaises(ValueError):
+            SettingsTuner(SPACE, 10.0, budget=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
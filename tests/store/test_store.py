@@ -0,0 +1,289 @@
+import copy
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+from pg_perfbench.context import HistoryContext
+from pg_perfbench.run import get_args_parser
+from pg_perfbench.store import (
+    ResultStore,
+    get_report_record,
+    HISTORY_QUERY,
+)
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+JOIN_REPORTS_DIR = os.path.join(
+    os.path.dirname(TEST_DIR), 'join', 'join_reports'
+)
+
+
+class MockLogg:
+    """A simple mock logger for testing."""
+
+    def __init__(self):
+        self.messages = []
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        self.messages.append(msg)
+
+    def error(self, msg):
+        pass
+
+    def warning(self, msg):
+        self.messages.append(msg)
+
+
+def get_report(
+    name: str,
+    date: str,
+    clients: list[int],
+    tps: float,
+    host: str = '10.0.0.1',
+    version: str = '16.8 (Ubuntu 16.8-1)',
+    settings: list | None = None,
+) -> dict:
+    # a benchmark report of one sweep point per clients value
+    args = [
+        ['benchmark_type', 'default'],
+        ['workload_path', 'None'],
+        ['connection_type', 'ssh'],
+        ['ssh_host', host],
+        ['pg_host', '127.0.0.1'],
+        ['pg_password', 'secret'],
+    ]
+    return {
+        'report_name': name,
+        'description': date,
+        'sections': {
+            'system': {
+                'reports': {
+                    'uname_a': {'data': '6.8.0-52-generic x86_64\n'},
+                    'etc_os_release': {
+                        'data': 'NAME="Ubuntu"\n'
+                        'PRETTY_NAME="Ubuntu 22.04.5 LTS"\n'
+                    },
+                    'cpu_info': {
+                        'data': 'CPU(s):        16\n'
+                        'Model name:    Intel(R) Xeon(R)\n'
+                    },
+                }
+            },
+            'db': {
+                'reports': {
+                    'version_minor': {'data': version},
+                    'pg_settings': {
+                        'data': settings or [['shared_buffers', '128MB']]
+                    },
+                }
+            },
+            'benchmark': {
+                'reports': {
+                    'args': {'data': args},
+                    'options': {
+                        'data': [
+                            [idx, f'pgbench -c {value} -T 10']
+                            for idx, value in enumerate(clients)
+                        ]
+                    },
+                }
+            },
+            'result': {
+                'reports': {
+                    'pgbench_outputs': {
+                        'theader': [
+                            'clients',
+                            'duration',
+                            'number of transactions actually processed',
+                            'latency average',
+                            'initial connection time',
+                            'tps',
+                            'latency p99, ms',
+                        ],
+                        'data': [
+                            [value, 10, 1000, 2.0, 1.0, tps * value, 4.5]
+                            for value in clients
+                        ],
+                    },
+                    'pgbench_progress': {
+                        'data': [
+                            [1, 1, 1.0, tps, 2.0, 0.5, None],
+                            [1, 1, 2.0, tps + 10, 2.1, 0.4, None],
+                        ]
+                    },
+                }
+            },
+        },
+    }
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.sqlite3')
+        self.store = ResultStore(self.path)
+        self.now = datetime.datetime(2025, 6, 1)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_report_record(self):
+        record = get_report_record(
+            get_report('r1', '01/05/2025 10:00:00', [1, 8], 100.0)
+        )
+        self.assertEqual(record['created_at'], '2025-05-01 10:00:00')
+        self.assertEqual(record['host'], '10.0.0.1')
+        self.assertEqual(record['pg_version'], '16.8')
+        self.assertEqual(record['workload'], 'default')
+        self.assertEqual(len(record['config_hash']), 16)
+        self.assertEqual(
+            record['environment'],
+            {
+                'kernel': '6.8.0-52-generic x86_64',
+                'os': 'Ubuntu 22.04.5 LTS',
+                'cpu': 'Intel(R) Xeon(R)',
+                'cpus': '16',
+                'ram': None,
+            },
+        )
+        self.assertNotIn('pg_password', record['metadata']['args'])
+        self.assertEqual(
+            [
+                [point['clients'], point['tps'], point['latency_p99']]
+                for point in record['points']
+            ],
+            [[1, 100.0, 4.5], [8, 800.0, 4.5]],
+        )
+        self.assertEqual(record['points'][1]['command'], 'pgbench -c 8 -T 10')
+        self.assertEqual(len(record['series'][(1, 1, 'progress')]), 2)
+
+    def test_ingest_and_query(self):
+        run_id = self.store.ingest_report(
+            get_report('r1', '01/05/2025 10:00:00', [1, 8], 100.0)
+        )
+        self.assertIsNotNone(run_id)
+        # the same report is stored once
+        self.assertIsNone(
+            self.store.ingest_report(
+                get_report('r1', '01/05/2025 10:00:00', [1, 8], 100.0)
+            )
+        )
+        self.store.ingest_report(
+            get_report('r2', '01/01/2025 10:00:00', [8], 90.0, version='17.2')
+        )
+        self.store.ingest_report(
+            get_report('r3', '20/05/2025 10:00:00', [8], 110.0, host='h2')
+        )
+
+        rows = self.store.query(clients=8)
+        self.assertEqual([row[1] for row in rows], ['r2', 'r1', 'r3'])
+        self.assertEqual(rows[0][6:8], [8, 720.0])
+        rows = self.store.query(clients=8, days=90, now=self.now)
+        self.assertEqual([row[1] for row in rows], ['r1', 'r3'])
+        rows = self.store.query(pg_version='16', host='10.0.0.1')
+        self.assertEqual([row[6] for row in rows], [1, 8])
+        self.assertEqual(self.store.query(pg_version='17')[0][3], '17.2')
+        self.assertEqual(len(self.store.query(limit=1)), 1)
+        self.assertEqual(
+            self.store.get_series(run_id),
+            {
+                (1, 1): [
+                    [1.0, 100.0, 2.0, 0.5, None],
+                    [2.0, 110.0, 2.1, 0.4, None],
+                ]
+            },
+        )
+
+    def test_config_hash(self):
+        base = get_report('r1', '01/05/2025 10:00:00', [8], 100.0)
+        other = copy.deepcopy(base)
+        other['report_name'] = 'r2'
+        tuned = get_report(
+            'r3',
+            '01/05/2025 10:00:00',
+            [8],
+            100.0,
+            settings=[['shared_buffers', '8GB']],
+        )
+        for report in (base, other, tuned):
+            self.store.ingest_report(report)
+        config_hash = get_report_record(base)['config_hash']
+        rows = self.store.query(config_hash=config_hash)
+        self.assertEqual([row[1] for row in rows], ['r1', 'r2'])
+
+    def test_query_uses_indexes(self):
+        sql = HISTORY_QUERY + (
+            '\nWHERE r.workload = ? AND p.clients = ? AND r.created_at >= ?'
+        )
+        plan = ' '.join(
+            str(row[-1])
+            for row in self.store.conn.execute(
+                f'EXPLAIN QUERY PLAN {sql}', ('default', 64, '2025-01-01')
+            )
+        )
+        self.assertNotIn('SCAN r', plan)
+        self.assertIn('USING', plan)
+
+    def test_ingest_path(self):
+        # the reports of a directory without the join reports
+        logger = MockLogg()
+        added = self.store.ingest_path(logger, JOIN_REPORTS_DIR)
+        reports = [
+            name
+            for name in os.listdir(JOIN_REPORTS_DIR)
+            if name.endswith('.json')
+        ]
+        self.assertEqual(added, len(reports))
+        self.assertEqual(self.store.ingest_path(logger, JOIN_REPORTS_DIR), 0)
+        rows = self.store.query()
+        self.assertEqual(rows[0][0], '2025-03-11 00:00:00')
+        self.assertEqual(rows[0][3], '16.8')
+
+    def test_store_report(self):
+        logger = MockLogg()
+        report = get_report('r1', '01/05/2025 10:00:00', [8], 100.0)
+        path = os.path.join(self.tmp.name, 'other', 'results.sqlite3')
+        ResultStore.store_report(logger, path, report)
+        with ResultStore(path) as store:
+            self.assertEqual(len(store.query()), 1)
+        # an empty path disables the store
+        ResultStore.store_report(logger, '', report)
+        ResultStore.store_report(logger, self.tmp.name, report)
+        self.assertIn('Cannot store', logger.messages[-1])
+
+    def test_history(self):
+        with open(
+            os.path.join(self.tmp.name, 'r1.json'), 'w', encoding='utf-8'
+        ) as f:
+            json.dump(
+                get_report('r1', '01/05/2025 10:00:00', [1, 8], 100.0), f
+            )
+        args = get_args_parser().parse_args(
+            [
+                '--mode=history',
+                f'--results-db={self.path}',
+                f'--ingest={self.tmp.name}',
+                '--history-clients=8',
+            ]
+        )
+        logger = MockLogg()
+        ctx = HistoryContext(args, logger)
+        rows = ResultStore.run_history(**ctx.structured_params)
+        self.assertEqual([row[1] for row in rows], ['r1'])
+        self.assertIn('1 stored results', logger.messages[-1])
+        with self.assertRaises(ValueError):
+            HistoryContext(
+                get_args_parser().parse_args(
+                    ['--mode=history', '--history-limit=0']
+                ),
+                logger,
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()